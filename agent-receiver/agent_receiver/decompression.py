@@ -3,15 +3,23 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+from collections.abc import Iterator
 from enum import Enum
-from zlib import decompress
+from typing import Final, IO
+from zlib import decompress, decompressobj
 from zlib import error as zlibError
 
+_CHUNK_SIZE: Final = 1024 * 1024
+
 
 class DecompressionError(Exception):
     ...
 
 
+class DecompressedDataTooLarge(DecompressionError):
+    ...
+
+
 class Decompressor(Enum):
     ZLIB = "zlib"
 
@@ -23,6 +31,20 @@ class Decompressor(Enum):
         """
         return {Decompressor.ZLIB: Decompressor._zlib_decompress}[self](data)
 
+    def iter_chunks(self, compressed: IO[bytes], max_size: int) -> Iterator[bytes]:
+        """Decompress the given file chunk by chunk, without holding all data in memory
+
+        >>> from io import BytesIO
+        >>> from zlib import compress
+        >>> b"".join(Decompressor("zlib").iter_chunks(BytesIO(compress(b"blablub")), 7))
+        b'blablub'
+        >>> b"".join(Decompressor("zlib").iter_chunks(BytesIO(compress(b"blablub")), 6))
+        Traceback (most recent call last):
+            ...
+        agent_receiver.decompression.DecompressedDataTooLarge: ...
+        """
+        return {Decompressor.ZLIB: Decompressor._zlib_iter_chunks}[self](compressed, max_size)
+
     @staticmethod
     def _zlib_decompress(data: bytes) -> bytes:
         """
@@ -38,3 +60,40 @@ class Decompressor(Enum):
             return decompress(data)
         except zlibError as e:
             raise DecompressionError(f"Decompression with zlib failed: {e}") from e
+
+    @staticmethod
+    def _zlib_iter_chunks(compressed: IO[bytes], max_size: int) -> Iterator[bytes]:
+        """
+        >>> from io import BytesIO
+        >>> from zlib import compress
+        >>> list(Decompressor._zlib_iter_chunks(BytesIO(compress(b"blablub")[:-2]), 100))
+        Traceback (most recent call last):
+            ...
+        agent_receiver.decompression.DecompressionError: ...
+        """
+        decompressor = decompressobj()
+        size = 0
+        try:
+            while compressed_chunk := compressed.read(_CHUNK_SIZE):
+                # Limit the output per step, highly compressed data would fill the memory otherwise
+                while compressed_chunk:
+                    chunk = decompressor.decompress(compressed_chunk, _CHUNK_SIZE)
+                    compressed_chunk = decompressor.unconsumed_tail
+                    size += len(chunk)
+                    Decompressor._check_size(size, max_size)
+                    yield chunk
+            chunk = decompressor.flush()
+        except zlibError as e:
+            raise DecompressionError(f"Decompression with zlib failed: {e}") from e
+        Decompressor._check_size(size + len(chunk), max_size)
+        yield chunk
+
+        if not decompressor.eof:
+            raise DecompressionError("Decompression with zlib failed: Incomplete data")
+
+    @staticmethod
+    def _check_size(size: int, max_size: int) -> None:
+        if size > max_size:
+            raise DecompressedDataTooLarge(
+                f"Decompressed data exceeds the limit of {max_size} bytes"
+            )
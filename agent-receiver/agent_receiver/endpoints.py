@@ -3,11 +3,13 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import asyncio
 import os
 import tempfile
+from collections.abc import Iterable
 from functools import lru_cache
 from pathlib import Path
-from typing import assert_never
+from typing import assert_never, Final
 
 from agent_receiver.apps_and_routers import AGENT_RECEIVER_APP, UUID_VALIDATION_ROUTER
 from agent_receiver.checkmk_rest_api import (
@@ -20,7 +22,7 @@ from agent_receiver.checkmk_rest_api import (
     post_csr,
     register,
 )
-from agent_receiver.decompression import DecompressionError, Decompressor
+from agent_receiver.decompression import DecompressedDataTooLarge, DecompressionError, Decompressor
 from agent_receiver.log import logger
 from agent_receiver.models import (
     CertificateRenewalBody,
@@ -47,17 +49,20 @@ from agent_receiver.utils import (
     NotRegisteredException,
     R4R,
     RegisteredHost,
+    RegisteredHostCache,
     uuid_from_pem_csr,
 )
 from cryptography.x509 import Certificate
 from fastapi import Depends, File, Header, HTTPException, Response, UploadFile
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from pydantic import UUID4
+from starlette.concurrency import run_in_threadpool
 from starlette.status import (
     HTTP_204_NO_CONTENT,
     HTTP_400_BAD_REQUEST,
     HTTP_403_FORBIDDEN,
     HTTP_404_NOT_FOUND,
+    HTTP_413_REQUEST_ENTITY_TOO_LARGE,
     HTTP_500_INTERNAL_SERVER_ERROR,
     HTTP_501_NOT_IMPLEMENTED,
 )
@@ -69,6 +74,16 @@ from .certs import extract_cn_from_csr, serialize_to_pem, sign_agent_csr, site_r
 
 security = HTTPBasic()
 
+# Limit for the decompressed agent data of a single upload
+MAX_AGENT_DATA_SIZE: Final = 256 * 1024 * 1024
+
+# The agent data is decompressed and stored in worker threads to keep the event loop responsive.
+# Limiting the number of uploads processed at once bounds the memory and disk load.
+_MAX_CONCURRENT_AGENT_DATA: Final = 8
+_agent_data_slots = asyncio.Semaphore(_MAX_CONCURRENT_AGENT_DATA)
+
+_registered_hosts = RegisteredHostCache(max_size=100000)
+
 
 def _validate_uuid_against_csr(uuid: UUID4, csr_field: CsrField) -> None:
     if str(uuid) != (cn := extract_cn_from_csr(csr_field.csr)):
@@ -330,7 +345,7 @@ def _validate_is_cce(credentials: HTTPBasicCredentials, uuid: UUID4) -> None:
 
 def _store_agent_data(
     target_dir: Path,
-    decompressed_data: bytes,
+    decompressed_data: Iterable[bytes],
 ) -> None:
     target_dir.resolve().mkdir(parents=True, exist_ok=True)
     with tempfile.NamedTemporaryFile(
@@ -338,7 +353,8 @@ def _store_agent_data(
         delete=False,
     ) as temp_file:
         try:
-            temp_file.write(decompressed_data)
+            for chunk in decompressed_data:
+                temp_file.write(chunk)
             os.rename(temp_file.name, target_dir / "agent_output")
         finally:
             Path(temp_file.name).unlink(missing_ok=True)
@@ -355,7 +371,7 @@ async def agent_data(
     monitoring_data: UploadFile = File(...),
 ) -> Response:
     try:
-        host = RegisteredHost(uuid)
+        host = _registered_hosts.get(uuid)
     except NotRegisteredException:
         logger.error(
             "uuid=%s Host is not registered",
@@ -389,7 +405,23 @@ async def agent_data(
         )
 
     try:
-        decompressed_agent_data = decompressor(monitoring_data.file.read())
+        async with _agent_data_slots:
+            # The previous agent data is only replaced once all data is decompressed
+            await run_in_threadpool(
+                _store_agent_data,
+                host.source_path,
+                decompressor.iter_chunks(monitoring_data.file, MAX_AGENT_DATA_SIZE),
+            )
+    except DecompressedDataTooLarge as e:
+        logger.error(
+            "uuid=%s Decompressed agent data is too large: %s",
+            uuid,
+            e,
+        )
+        raise HTTPException(
+            status_code=HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Decompressed agent data is too large",
+        ) from e
     except DecompressionError as e:
         logger.error(
             "uuid=%s Decompression of agent data failed: %s",
@@ -401,11 +433,6 @@ async def agent_data(
             detail="Decompression of agent data failed",
         ) from e
 
-    _store_agent_data(
-        host.source_path,
-        decompressed_agent_data,
-    )
-
     logger.info(
         "uuid=%s Agent data saved",
         uuid,
@@ -4,6 +4,7 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import os
+from collections import OrderedDict
 from contextlib import suppress
 from dataclasses import dataclass
 from pathlib import Path
@@ -43,6 +44,43 @@ class RegisteredHost:
         )
 
 
+class RegisteredHostCache:
+    """Remember the registered hosts to avoid resolving their symlinks on every request
+
+    A cached host is only used as long as its symlink is unchanged. Registering a host again
+    replaces the symlink, which is detected by its inode and change time.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self._max_size: Final = max_size
+        self._hosts: OrderedDict[Path, tuple[tuple[int, int], RegisteredHost]] = OrderedDict()
+
+    def get(self, uuid: UUID4) -> RegisteredHost:
+        source_path = agent_output_dir() / str(uuid)
+        try:
+            stat = source_path.lstat()
+        except OSError:
+            self._hosts.pop(source_path, None)
+            raise NotRegisteredException("Source path does not exist")
+        identity = (stat.st_ino, stat.st_ctime_ns)
+
+        if (cached := self._hosts.get(source_path)) is not None and cached[0] == identity:
+            self._hosts.move_to_end(source_path)
+            return cached[1]
+
+        try:
+            host = RegisteredHost(uuid)
+        except NotRegisteredException:
+            self._hosts.pop(source_path, None)
+            raise
+
+        self._hosts[source_path] = (identity, host)
+        self._hosts.move_to_end(source_path)
+        if len(self._hosts) > self._max_size:
+            self._hosts.popitem(last=False)
+        return host
+
+
 @dataclass(frozen=True)
 class R4R:
     status: RegistrationStatusEnum
@@ -47,6 +47,8 @@ described by the following four phases:
     * ``filter_regex_inverse: regular_expression''
       Only further process a file, if its full path *does not* match the given
       regular expression.
+    Directories in which no file can pass the regex filters (judging by the
+    fixed text the regular expressions start with) will not be searched at all.
     * ``filter_size: specification''
       Only further process a file, if its size in bytes matches the provided
       specification. The specification consists of one of the operators '>',
@@ -168,50 +170,88 @@ def parse_arguments(argv=None):
 class FileStat:
     """Wrapper arount os.stat
 
-    Only call os.stat once.
+    Only call os.stat once, and only if any of its results are needed.
+    If the file was found using os.scandir, pass the DirEntry to reuse its stat data.
     """
 
-    def __init__(self, path):
+    def __init__(self, path, dir_entry=None):
         super().__init__()
         LOGGER.debug("Creating FileStat(%r)", path)
         self.path = ensure_text(path)
-        self.stat_status = "ok"
-        self.size = None
-        self.age = None
+        self._dir_entry = dir_entry
+        self._stat_done = False
+        self._stat_status = "ok"
+        self._size = None
+        self._age = None
         self._m_time = None
         # report on errors, regard failure as 'file'
-        self.isfile = True
-        self.isdir = False
+        self._isfile = True
+        self._isdir = False
+
+    def _stat(self):
+        if self._stat_done:
+            return
+        self._stat_done = True
 
         LOGGER.debug("os.stat(%r)", self.path)
-        path = self.path.encode("utf8")
         try:
-            file_stat = os.stat(path)
+            if self._dir_entry is not None:
+                file_stat = self._dir_entry.stat()
+            else:
+                file_stat = os.stat(self.path.encode("utf8"))
         except OSError as exc:
-            self.stat_status = "file vanished" if exc.errno == errno.ENOENT else str(exc)
+            self._stat_status = "file vanished" if exc.errno == errno.ENOENT else str(exc)
             return
+        finally:
+            self._dir_entry = None
 
         try:
-            self.size = int(file_stat.st_size)
+            self._size = int(file_stat.st_size)
         except ValueError as exc:
-            self.stat_status = str(exc)
+            self._stat_status = str(exc)
             return
 
         try:
             self._m_time = int(file_stat.st_mtime)
-            self.age = int(time.time()) - self._m_time
+            self._age = int(time.time()) - self._m_time
         except ValueError as exc:
-            self.stat_status = str(exc)
+            self._stat_status = str(exc)
             return
 
-        self.isfile = stat.S_ISREG(file_stat.st_mode)
-        self.isdir = stat.S_ISDIR(file_stat.st_mode)
+        self._isfile = stat.S_ISREG(file_stat.st_mode)
+        self._isdir = stat.S_ISDIR(file_stat.st_mode)
+
+    @property
+    def stat_status(self):
+        self._stat()
+        return self._stat_status
+
+    @property
+    def size(self):
+        self._stat()
+        return self._size
+
+    @property
+    def age(self):
+        self._stat()
+        return self._age
+
+    @property
+    def isfile(self):
+        self._stat()
+        return self._isfile
+
+    @property
+    def isdir(self):
+        self._stat()
+        return self._isdir
 
     def __repr__(self):
         # type: () -> str
         return "FileStat(%r)" % self.path
 
     def dumps(self):
+        self._stat()
         data = {
             "type": "file",
             "path": self.path,
@@ -237,19 +277,63 @@ class FileStat:
 
 
 class PatternIterator:
-    """Recursively iterate over all files"""
+    """Recursively iterate over all files
+
+    Directories are skipped if none of the files within can pass the file filters.
+    """
 
-    def __init__(self, pattern_list):
+    def __init__(self, pattern_list, file_filters=()):
         super().__init__()
         self._patterns = [os.path.abspath(os.path.expanduser(p)) for p in pattern_list]
+        self._file_filters = file_filters
+
+    def _excludes_directory(self, path):
+        if any(f.excludes_directory(path) for f in self._file_filters):
+            LOGGER.debug("skipping directory: %r", path)
+            return True
+        return False
 
     def _iter_files(self, pattern):
         for item in glob.iglob(pattern):
             filestat = FileStat(item)
             if filestat.isfile:
                 yield filestat
-            elif filestat.isdir:
-                for filestat in self._iter_files(os.path.join(item, "*")):
+            elif filestat.isdir and not self._excludes_directory(filestat.path):
+                for filestat in self._iter_directory(item):
+                    yield filestat
+
+    def _iter_directory(self, path):
+        if not hasattr(os, "scandir"):  # Python < 3.5
+            for filestat in self._iter_files(os.path.join(path, "*")):
+                yield filestat
+            return
+
+        # os.scandir knows the type of most entries without calling stat, and if we need
+        # to stat a file, the DirEntry caches the result.
+        try:
+            entries = os.scandir(path)
+        except OSError as exc:
+            LOGGER.info("cannot read directory %r: %s", path, exc)
+            return
+
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue  # as skipped by the globbing pattern '*'
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+
+            if is_dir:
+                if not self._excludes_directory(ensure_text(entry.path)):
+                    for filestat in self._iter_directory(entry.path):
+                        yield filestat
+            elif entry.is_file():
+                yield FileStat(entry.path, entry)
+            else:
+                # e.g. broken symlinks are reported, other special files are skipped
+                filestat = FileStat(entry.path)
+                if filestat.isfile:
                     yield filestat
 
     def __iter__(self):
@@ -259,8 +343,11 @@ class PatternIterator:
                 yield filestat
 
 
-def get_file_iterator(config):
-    """get a FileStat iterator"""
+def get_file_iterator(config, file_filters=()):
+    """get a FileStat iterator
+
+    The file filters are only used to skip directories, they are not applied to the files.
+    """
     input_specs = [(k[6:], v) for k, v in config.items() if k.startswith("input_")]
     if not input_specs:
         raise ValueError("missing input definition")
@@ -270,7 +357,7 @@ def get_file_iterator(config):
     if variety != "patterns":
         raise ValueError("unknown input type: %r" % variety)
     patterns = shlex.split(spec_string)
-    return PatternIterator(patterns)
+    return PatternIterator(patterns, file_filters)
 
 
 # .
@@ -293,6 +380,10 @@ class AbstractFilter:
         """return a boolean"""
         raise NotImplementedError()
 
+    def excludes_directory(self, path):
+        """return True if no file within the directory can match"""
+        raise NotImplementedError()
+
 
 COMPARATORS = {
     "<": operator.lt,
@@ -321,6 +412,9 @@ class AbstractNumericFilter:
     def matches(self, filestat):
         raise NotImplementedError()
 
+    def excludes_directory(self, path):
+        return False
+
 
 class SizeFilter(AbstractNumericFilter):
     def matches(self, filestat):
@@ -344,20 +438,67 @@ class AgeFilter(AbstractNumericFilter):
         return filestat.stat_status != "file vanished"
 
 
+def _split_literal_prefix(regex_pattern):
+    r"""split the regex into the text every match starts with and the remaining pattern
+
+    >>> _split_literal_prefix(r'/var/spool/postfix/[a-f0-9]+/.*')
+    ('/var/spool/postfix/', '[a-f0-9]+/.*')
+
+    >>> _split_literal_prefix(r'/tmp/foo\.d/bar?')
+    ('/tmp/foo.d/ba', 'r?')
+
+    >>> _split_literal_prefix(r'/tmp|/var/tmp')
+    ('', '/tmp|/var/tmp')
+    """
+    # an alternative may start with anything
+    if re.search(r"(?<!\\)(?:\\\\)*\|", regex_pattern):
+        return "", regex_pattern
+
+    prefix = []
+    idx = 0
+    while idx < len(regex_pattern):
+        char = regex_pattern[idx]
+        if char == "\\":
+            escaped = regex_pattern[idx + 1 : idx + 2]
+            if not escaped or escaped.isalnum():  # e.g. \d
+                break
+            char_len = 2
+            char = escaped
+        elif char in ".^$*+?{}[]()":
+            break
+        else:
+            char_len = 1
+        if regex_pattern[idx + char_len : idx + char_len + 1] in ("*", "?", "{"):
+            break  # optional character
+        prefix.append(char)
+        idx += char_len
+    return "".join(prefix), regex_pattern[idx:]
+
+
 class RegexFilter:
     def __init__(self, regex_pattern):
         super().__init__()
         LOGGER.debug("initializing with pattern: %r", regex_pattern)
         self._regex = re.compile(ensure_text(regex_pattern), re.UNICODE)
+        self._prefix, self._remainder = _split_literal_prefix(self._regex.pattern)
 
     def matches(self, filestat):
         return bool(self._regex.match(filestat.path))
 
+    def excludes_directory(self, path):
+        """the paths of matching files need to start with the literal prefix of the regex"""
+        dir_prefix = os.path.join(path, "")
+        return not (dir_prefix.startswith(self._prefix) or self._prefix.startswith(dir_prefix))
+
 
 class InverseRegexFilter(RegexFilter):
     def matches(self, filestat):
         return not bool(self._regex.match(filestat.path))
 
+    def excludes_directory(self, path):
+        """the regex matches every path starting with its prefix, if nothing else is required"""
+        return self._remainder in ("", ".*") and os.path.join(path, "").startswith(self._prefix)
+
 
 def get_file_filters(config):
     filter_specs = ((k[7:], v) for k, v in config.items() if k.startswith("filter_"))
@@ -634,10 +775,10 @@ def main():
     sys.stdout.write("<<<filestats:sep(0)>>>\n")
     for config_section_name, config in iter_config_section_dicts(args["cfg_file"]):
         # 1 input
-        files_iter = get_file_iterator(config)
+        filters = get_file_filters(config)
+        files_iter = get_file_iterator(config, filters)
 
         # 2 filtering
-        filters = get_file_filters(config)
         filtered_files = iter_filtered_files(filters, files_iter)
 
         # 3 grouping
@@ -13,6 +13,8 @@ Options:
     -h               Show help.
     --no_state       No state
     -v               Verbose output for debugging purposes (no debug mode).
+    --benchmark      Process the configured logfiles from their beginning and report
+                     the number of lines processed per second. Nothing else is written.
 
 You should find an example configuration file at
 '../cfg_examples/logwatch.cfg' relative to this file.
@@ -36,6 +38,7 @@ import io
 import itertools
 import locale
 import logging
+import multiprocessing
 import os
 import platform
 import re
@@ -227,6 +230,7 @@ class ArgsParser:  # pylint: disable=too-few-public-methods
         self.config = argv[argv.index("-c") + 1] if "-c" in argv else None
         self.debug = "-d" in argv or "--debug" in argv
         self.no_state = "--no_state" in argv
+        self.benchmark = "--benchmark" in argv
 
 
 def get_status_filename(cluster_config, remote):
@@ -352,6 +356,8 @@ def consume_global_options_block(config_lines):
         attr, value = config_lines.pop(0).split(None, 1)
         if attr == "retention_period":
             options.retention_period = int(value)
+        elif attr == "parallel_jobs":
+            options.parallel_jobs = int(value)
 
     return options
 
@@ -512,6 +518,7 @@ class LogLinesIter:
         self._lines = []  # List[Text]
         self._buffer = b""
         self._reached_end = False  # used for optimization only
+        self.blocks_read = 0
         self._enc = encoding or self._get_encoding()
         self._nl = "\n"
         # for Windows we need a bit special processing. It is difficult to fit this processing
@@ -569,6 +576,7 @@ class LogLinesIter:
         raw_lines = self._buffer.decode(self._enc, "replace").split(self._nl)
         self._buffer = raw_lines.pop().encode(self._enc)  # unfinished line
         self._lines.extend(l + self._nl for l in raw_lines)
+        self.blocks_read += 1
 
     def set_position(self, position):
         if position is None:
@@ -590,6 +598,13 @@ class LogLinesIter:
         self._buffer = b""
         self._lines = []
 
+    def buffered_text(self):
+        # type: () -> text_type
+        """
+        Return the lines read from the file, but not yet consumed
+        """
+        return "".join(self._lines)
+
     def push_back_line(self, line):
         self._lines.insert(0, line)
 
@@ -698,14 +713,23 @@ def process_logfile(section, filestate, debug):  # pylint: disable=too-many-bran
         warnings_and_errors = []
         lines_parsed = 0
         start_time = time.time()
+        prefiltered_block = None
 
         while True:
             line = log_iter.next_line()
             if line is None:
                 break  # End of file
 
+            # Only consider the patterns which may match any line of the block just read
+            if log_iter.blocks_read != prefiltered_block:
+                prefiltered_block = log_iter.blocks_read
+                section.pattern_matcher.prefilter(line + log_iter.buffered_text())
+
             # Handle option maxlinesize
-            if section.options.maxlinesize is not None and len(line) > section.options.maxlinesize:
+            truncated = (
+                section.options.maxlinesize is not None and len(line) > section.options.maxlinesize
+            )
+            if truncated:
                 line = line[: section.options.maxlinesize] + "[TRUNCATED]\n"
 
             lines_parsed += 1
@@ -741,44 +765,40 @@ def process_logfile(section, filestate, debug):  # pylint: disable=too-many-bran
                 break
 
             level = DEFAULT_LOG_LEVEL
-            for lev, pattern, cont_patterns, replacements in section.compiled_patterns:
-                matches = pattern.search(line[:-1])
-                if matches:
-                    level = lev
-                    levelint = {"C": 2, "W": 1, "O": 0, "I": -1, ".": -1}[lev]
-                    worst = max(levelint, worst)
-
-                    # TODO: the following for block should be a method of the iterator
-                    # Check for continuation lines
-                    for cont_pattern in cont_patterns:
-                        if isinstance(cont_pattern, int):  # add that many lines
-                            for _unused_x in range(cont_pattern):
-                                cont_line = log_iter.next_line()
-                                if cont_line is None:  # end of file
-                                    break
+            found = section.pattern_matcher.search(line[:-1], prefiltered=not truncated)
+            if found is not None:
+                index, matches = found
+                level, _pattern, cont_patterns, replacements = section.compiled_patterns[index]
+                levelint = {"C": 2, "W": 1, "O": 0, "I": -1, ".": -1}[level]
+                worst = max(levelint, worst)
+
+                # TODO: the following for block should be a method of the iterator
+                # Check for continuation lines
+                for cont_pattern in cont_patterns:
+                    if isinstance(cont_pattern, int):  # add that many lines
+                        for _unused_x in range(cont_pattern):
+                            cont_line = log_iter.next_line()
+                            if cont_line is None:  # end of file
+                                break
+                            line = line[:-1] + "\1" + cont_line
+
+                    else:  # pattern is regex
+                        while True:
+                            cont_line = log_iter.next_line()
+                            if cont_line is None:  # end of file
+                                break
+                            if cont_pattern.search(cont_line[:-1]):
                                 line = line[:-1] + "\1" + cont_line
+                            else:
+                                log_iter.push_back_line(cont_line)  # sorry for stealing this line
+                                break
 
-                        else:  # pattern is regex
-                            while True:
-                                cont_line = log_iter.next_line()
-                                if cont_line is None:  # end of file
-                                    break
-                                if cont_pattern.search(cont_line[:-1]):
-                                    line = line[:-1] + "\1" + cont_line
-                                else:
-                                    log_iter.push_back_line(
-                                        cont_line
-                                    )  # sorry for stealing this line
-                                    break
-
-                    # Replacement
-                    for replace in replacements:
-                        line = replace.replace("\\0", line.rstrip()) + "\n"
-                        for num, group in enumerate(matches.groups()):
-                            if group is not None:
-                                line = line.replace("\\%d" % (num + 1), group)
-
-                    break  # matching rule found and executed
+                # Replacement
+                for replace in replacements:
+                    line = replace.replace("\\0", line.rstrip()) + "\n"
+                    for num, group in enumerate(matches.groups()):
+                        if group is not None:
+                            line = line.replace("\\%d" % (num + 1), group)
 
             if level == "I":
                 level = "."
@@ -947,6 +967,7 @@ class GlobalOptions:
     def __init__(self):
         super().__init__()
         self.retention_period = 60
+        self.parallel_jobs = 1
 
 
 class PatternConfigBlock:
@@ -1027,6 +1048,152 @@ def _compile_continuation_pattern(raw_pattern):
         return re.compile(_search_optimize_raw_pattern(raw_pattern), re.UNICODE)
 
 
+# {m}, {m,n}, {m,} or {,n}, any other brace is taken literally
+_REPEAT_QUANTIFIER = re.compile(r"\{(?:\d+|\d*,\d*)\}")
+
+
+def _skip_character_class(raw_pattern, idx):
+    # type: (text_type, int) -> int
+    """return the index behind the character class starting at idx"""
+    idx += 1
+    if raw_pattern[idx : idx + 1] == "^":
+        idx += 1
+    if raw_pattern[idx : idx + 1] == "]":  # a leading ] is part of the class
+        idx += 1
+    while idx < len(raw_pattern) and raw_pattern[idx] != "]":
+        idx += 2 if raw_pattern[idx] == "\\" else 1
+    return idx + 1
+
+
+def _skip_group(raw_pattern, idx):
+    # type: (text_type, int) -> int
+    """return the index behind the group starting at idx"""
+    depth = 0
+    while idx < len(raw_pattern):
+        char = raw_pattern[idx]
+        if char == "\\":
+            idx += 2
+            continue
+        if char == "[":
+            idx = _skip_character_class(raw_pattern, idx)
+            continue
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if not depth:
+                return idx + 1
+        idx += 1
+    return idx
+
+
+def _required_literal(compiled_pattern):
+    # type: (re.Pattern) -> text_type | None
+    """return a text every line matched by the pattern contains, if there is a usable one
+
+    Only the parts of the pattern outside of groups and character classes are considered.
+    Characters followed by an optional quantifier are not required.
+    """
+    raw_pattern = compiled_pattern.pattern
+    if not isinstance(raw_pattern, text_type) or compiled_pattern.flags & (
+        re.IGNORECASE | re.VERBOSE
+    ):
+        return None
+
+    literals = []
+    current = []  # type: list[text_type]
+    idx = 0
+    while idx < len(raw_pattern):
+        char = raw_pattern[idx]
+        if char == "\\":
+            escaped = raw_pattern[idx + 1 : idx + 2]
+            if escaped and not escaped.isalnum():
+                current.append(escaped)
+                idx += 2
+                continue
+            # character classes like \d, anchors like \b, character codes or back references
+            literals.append("".join(current))
+            current = []
+            idx += 2
+            if escaped in "xuUN" or escaped.isdigit():
+                while idx < len(raw_pattern) and (
+                    raw_pattern[idx].isalnum() or raw_pattern[idx] in "{}"
+                ):
+                    idx += 1
+            continue
+
+        if char == "|":
+            return None
+        quantifier = _REPEAT_QUANTIFIER.match(raw_pattern, idx) if char == "{" else None
+        if char in "*?" or quantifier:
+            # the previous character is optional
+            if current:
+                current.pop()
+            literals.append("".join(current))
+            current = []
+            idx = quantifier.end() if quantifier else idx + 1
+            continue
+        if char in "+.^$()[":
+            literals.append("".join(current))
+            current = []
+        if char == "(":
+            idx = _skip_group(raw_pattern, idx)
+        elif char == "[":
+            idx = _skip_character_class(raw_pattern, idx)
+        else:
+            if char not in "+.^$)":
+                current.append(char)  # including braces not being part of a quantifier
+            idx += 1
+    literals.append("".join(current))
+
+    longest = max(literals, key=len)
+    return longest if len(longest) >= 2 else None
+
+
+class PatternMatcher:
+    """Find the first pattern of a logfile section, which matches a line
+
+    Searching each line for every pattern is expensive when there are many patterns. Most
+    patterns contain a literal text, which needs to be part of every matching line. Looking up
+    these texts in a whole block of lines at once rules out most of the patterns for all the
+    lines of the block. The remaining patterns are tried in their configured order.
+    """
+
+    def __init__(self, patterns):
+        # type: (Sequence[re.Pattern]) -> None
+        self._entries = [
+            (index, pattern, _required_literal(pattern)) for index, pattern in enumerate(patterns)
+        ]
+        self._block_entries = self._entries
+
+    def prefilter(self, block):
+        # type: (text_type) -> None
+        """Only consider the patterns which may match lines contained in the block"""
+        literals_found = {}  # type: dict[text_type, bool]
+        block_entries = []
+        for entry in self._entries:
+            literal = entry[2]
+            if literal is not None and literal not in literals_found:
+                literals_found[literal] = literal in block
+            if literal is None or literals_found[literal]:
+                block_entries.append(entry)
+        self._block_entries = block_entries
+
+    def search(self, text, prefiltered=True):
+        # type: (text_type, bool) -> tuple[int, re.Match] | None
+        """Return the index and the match of the first pattern found in the text
+
+        Unless prefiltered is False, the text needs to be a part of the last prefiltered block.
+        """
+        for index, pattern, literal in self._block_entries if prefiltered else self._entries:
+            if literal is not None and literal not in text:
+                continue
+            matches = pattern.search(text)
+            if matches:
+                return index, matches
+        return None
+
+
 class LogfileSection:
     def __init__(self, logfile_ref):
         # type: (tuple[text_type | binary_type, text_type]) -> None
@@ -1040,6 +1207,7 @@ class LogfileSection:
         self._compiled_patterns = (
             None
         )  # type: list[tuple[text_type, re.Pattern, Sequence[re.Pattern | int], Sequence[text_type]]] | None
+        self._pattern_matcher = None  # type: PatternMatcher | None
 
     @property
     def compiled_patterns(self):
@@ -1061,6 +1229,13 @@ class LogfileSection:
         self._compiled_patterns = compiled_patterns
         return self._compiled_patterns
 
+    @property
+    def pattern_matcher(self):
+        # type: () -> PatternMatcher
+        if self._pattern_matcher is None:
+            self._pattern_matcher = PatternMatcher([p[1] for p in self.compiled_patterns])
+        return self._pattern_matcher
+
 
 def parse_sections(logfiles_config):
     # type: (Iterable[PatternConfigBlock]) -> tuple[list[LogfileSection], list[text_type]]
@@ -1234,6 +1409,96 @@ def filter_output(lines, options):
     return lines_filtered
 
 
+def _process_section(job):
+    # type: (tuple[LogfileSection, dict[str, Any], bool]) -> tuple[text_type | None, list[text_type], dict[str, Any]]
+    section, filestate, debug = job
+    try:
+        header, log_lines = process_logfile(section, filestate, debug)
+        return header, list(filter_output(log_lines, section.options)), filestate
+    except Exception as exc:
+        if debug:
+            raise
+        LOGGER.debug("Exception when processing %r: %s", section.name_fs, exc)
+        return None, [], filestate
+
+
+def process_sections(sections, state, debug, jobs=1):
+    # type: (Sequence[LogfileSection], State, bool, int) -> list[tuple[text_type, list[text_type]]]
+    """
+    Process the logfiles of the sections and update their state.
+    Returns the header and the filtered lines of each logfile processed successfully.
+
+    The logfiles are independent of each other, so up to jobs of them are processed
+    concurrently. This needs fork(), the workers rely on inheriting the loaded configuration.
+    Where processes cannot be forked, e.g. on Windows, the logfiles are processed serially.
+    """
+    jobs_args = [(section, state.get(section.name_fs), debug) for section in sections]
+
+    results = None
+    if jobs > 1 and len(jobs_args) > 1 and hasattr(os, "fork") and not debug:
+        try:
+            if hasattr(multiprocessing, "get_context"):
+                # Python 3 may default to another start method, e.g. spawn on macOS
+                pool = multiprocessing.get_context("fork").Pool(min(jobs, len(jobs_args)))
+            else:  # Python < 3.4 always forks on POSIX
+                pool = multiprocessing.Pool(min(jobs, len(jobs_args)))
+        except (ImportError, OSError, ValueError) as exc:  # e.g. no working semaphores
+            LOGGER.debug("Cannot process logfiles in parallel: %s", exc)
+        else:
+            try:
+                results = pool.map(_process_section, jobs_args, 1)
+            finally:
+                pool.close()
+                pool.join()
+    if results is None:
+        results = [_process_section(job) for job in jobs_args]
+
+    processed = []
+    for section, (header, log_lines, filestate) in zip(sections, results):
+        # the workers only updated a copy of the state
+        state.get(section.name_fs).update(filestate)
+        if header is not None:
+            processed.append((header, log_lines))
+    return processed
+
+
+def _count_lines(path, size):
+    # type: (text_type | binary_type, int) -> int
+    count = 0
+    with open(path, "rb") as logfile:
+        while size > 0:
+            chunk = logfile.read(min(size, 1024 * 1024))
+            if not chunk:
+                break
+            count += chunk.count(b"\n")
+            size -= len(chunk)
+    return count
+
+
+def run_benchmark(sections, jobs):
+    # type: (Sequence[LogfileSection], int) -> None
+    """
+    Process the logfiles from their beginning, without limits and without writing anything
+    but the processing rate.
+    """
+    for section in sections:
+        section.options.values.update(fromstart=True, maxlines=None, maxtime=None)
+
+    state = State(os.devnull)  # never read nor written
+    start_time = time.time()
+    process_sections(sections, state, False, jobs)
+    duration = max(time.time() - start_time, 1e-6)
+
+    lines = sum(
+        _count_lines(section.name_fs, state.get(section.name_fs).get("offset", 0))
+        for section in sections
+    )
+    sys.stdout.write(
+        "%d logfiles, %d lines in %.2f s: %.0f lines/s (%d parallel jobs)\n"
+        % (len(sections), lines, duration, lines / duration, jobs)
+    )
+
+
 def _is_outdated_batch(batch_file, retention_period, now):
     # type: (str, float, float) -> bool
     return now - os.stat(batch_file).st_mtime > retention_period
@@ -1308,6 +1573,10 @@ def main(argv=None):  # pylint: disable=too-many-branches
 
     found_sections, non_matching_patterns = parse_sections(logfiles_config)
 
+    if args.benchmark:
+        run_benchmark(found_sections, global_options.parallel_jobs)
+        return
+
     output = (
         str(
             "[[[%s:missing]]]\n" % pattern
@@ -1329,16 +1598,9 @@ def main(argv=None):  # pylint: disable=too-many-branches
         # lose a message in the extreme case of a corrupted status file.
         LOGGER.warning("Exception reading status file: %s", str(exc))
 
-    for section in found_sections:
-        filestate = state.get(section.name_fs)
-        try:
-            header, log_lines = process_logfile(section, filestate, args.debug)
-            filtered_log_lines = filter_output(log_lines, section.options)
-        except Exception as exc:
-            if args.debug:
-                raise
-            LOGGER.debug("Exception when processing %r: %s", section.name_fs, exc)
-
+    for header, filtered_log_lines in process_sections(
+        found_sections, state, args.debug, global_options.parallel_jobs
+    ):
         output = itertools.chain(
             output,
             [
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 tribe29 GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Protocol between the GUI and the automation helper
+
+The automation helper ("cmk --automation-helper") keeps the configuration and the check plugins
+loaded and executes the automation calls of the local GUI. Requests and responses are exchanged
+over a UNIX socket as JSON documents, each prefixed with its length.
+"""
+
+from __future__ import annotations
+
+import json
+import socket
+import struct
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+
+_HEADER = struct.Struct("!I")
+_MAX_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class AutomationHelperRequest:
+    command: str
+    args: Sequence[str]
+    stdin: str
+    log_level: int
+
+    def serialize(self) -> bytes:
+        return json.dumps(asdict(self)).encode("utf-8")
+
+    @classmethod
+    def deserialize(cls, raw: bytes) -> AutomationHelperRequest:
+        return cls(**json.loads(raw))
+
+
+@dataclass(frozen=True)
+class AutomationHelperResponse:
+    """Result of an automation call
+
+    Requests are not executed while the helper is reloading the check plugins. The caller has to
+    execute them itself in this case.
+    """
+
+    executed: bool
+    exit_code: int = 0
+    stdout: str = ""
+    stderr: str = ""
+
+    def serialize(self) -> bytes:
+        return json.dumps(asdict(self)).encode("utf-8")
+
+    @classmethod
+    def deserialize(cls, raw: bytes) -> AutomationHelperResponse:
+        return cls(**json.loads(raw))
+
+
+def send_message(sock: socket.socket, payload: bytes) -> None:
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def receive_message(sock: socket.socket) -> bytes:
+    (length,) = _HEADER.unpack(_receive_exactly(sock, _HEADER.size))
+    return _receive_exactly(sock, length)
+
+
+def _receive_exactly(sock: socket.socket, length: int) -> bytes:
+    buf = bytearray(length)
+    view = memoryview(buf)
+    received = 0
+    while received < length:
+        num_bytes = sock.recv_into(view[received:], min(length - received, _MAX_CHUNK_SIZE))
+        if not num_bytes:
+            raise ConnectionError("Connection closed after %d of %d bytes" % (received, length))
+        received += num_bytes
+    return bytes(buf)
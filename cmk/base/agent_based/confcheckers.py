@@ -10,6 +10,7 @@ from __future__ import annotations
 import itertools
 import logging
 from collections.abc import Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from typing import Final
 
 import cmk.utils.tty as tty
@@ -31,7 +32,7 @@ from cmk.utils.type_defs import (
 
 from cmk.snmplib.type_defs import SNMPRawData
 
-from cmk.fetchers import Fetcher, get_raw_data, Mode
+from cmk.fetchers import Fetcher, FetcherType, get_raw_data, Mode
 from cmk.fetchers.filecache import FileCache, FileCacheOptions, MaxAge
 
 from cmk.checkers import (
@@ -66,19 +67,80 @@ __all__ = [
 ]
 
 
+_FetchJob = tuple[SourceInfo, FileCache, Fetcher]
+_FetchResult = tuple[SourceInfo, result.Result[AgentRawData | SNMPRawData, Exception], Snapshot]
+
+# These fetchers rely on process global state (e.g. the SNMP OID cache) and must not run
+# concurrently. They are fetched one after another in a single thread.
+_SERIAL_FETCHER_TYPES: Final = frozenset({FetcherType.SNMP, FetcherType.IPMI})
+
+_fetch_executor: tuple[int, ThreadPoolExecutor] | None = None
+
+
 def _fetch_all(
-    sources: Iterable[Source], *, simulation: bool, file_cache_options: FileCacheOptions, mode: Mode
-) -> Sequence[tuple[SourceInfo, result.Result[AgentRawData | SNMPRawData, Exception], Snapshot]]:
+    sources: Iterable[Source],
+    *,
+    simulation: bool,
+    file_cache_options: FileCacheOptions,
+    mode: Mode,
+    max_concurrency: int = 1,
+) -> Sequence[_FetchResult]:
     console.verbose("%s+%s %s\n", tty.yellow, tty.normal, "Fetching data".upper())
-    return [
-        _do_fetch(
+    jobs = [
+        (
             source.source_info(),
             source.file_cache(simulation=simulation, file_cache_options=file_cache_options),
             source.fetcher(),
-            mode=mode,
         )
         for source in sources
     ]
+    if max_concurrency <= 1 or len(jobs) <= 1:
+        return [_do_fetch(*job, mode=mode) for job in jobs]
+    return _fetch_concurrently(jobs, mode=mode, max_concurrency=max_concurrency)
+
+
+def _fetch_concurrently(
+    jobs: Sequence[_FetchJob], *, mode: Mode, max_concurrency: int
+) -> Sequence[_FetchResult]:
+    """Fetch the sources in a thread pool, the results are in the order of the jobs
+
+    The thread pool is shared by all calls, so the number of concurrent fetches of the process
+    never exceeds max_concurrency.
+    """
+    serial = [idx for idx, job in enumerate(jobs) if job[0].fetcher_type in _SERIAL_FETCHER_TYPES]
+    groups = [[idx] for idx, job in enumerate(jobs) if idx not in serial]
+    if serial:
+        groups.append(serial)
+
+    fetched: list[_FetchResult | None] = [None] * len(jobs)
+
+    def fetch_group(group: Sequence[int]) -> None:
+        for idx in group:
+            fetched[idx] = _do_fetch(*jobs[idx], mode=mode, per_thread=True)
+
+    futures = [_get_fetch_executor(max_concurrency).submit(fetch_group, g) for g in groups]
+    try:
+        for future in futures:
+            future.result()
+    except BaseException:
+        # E.g. a timeout of the check: Don't start any further fetches
+        for future in futures:
+            future.cancel()
+        raise
+
+    return [f for f in fetched if f is not None]
+
+
+def _get_fetch_executor(max_workers: int) -> ThreadPoolExecutor:
+    global _fetch_executor
+    if _fetch_executor is None or _fetch_executor[0] != max_workers:
+        if _fetch_executor is not None:
+            _fetch_executor[1].shutdown(wait=False)
+        _fetch_executor = (
+            max_workers,
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch"),
+        )
+    return _fetch_executor[1]
 
 
 def _do_fetch(
@@ -87,9 +149,10 @@ def _do_fetch(
     fetcher: Fetcher,
     *,
     mode: Mode,
-) -> tuple[SourceInfo, result.Result[AgentRawData | SNMPRawData, Exception], Snapshot]:
+    per_thread: bool = False,
+) -> _FetchResult:
     console.vverbose(f"  Source: {source_info}\n")
-    with CPUTracker() as tracker:
+    with CPUTracker(per_thread=per_thread) as tracker:
         raw_data = get_raw_data(file_cache, fetcher, mode)
     return source_info, raw_data, tracker.duration
 
@@ -270,6 +333,7 @@ class ConfiguredFetcher:
             simulation=self.simulation_mode,
             file_cache_options=self.file_cache_options,
             mode=self.mode,
+            max_concurrency=config.max_concurrent_fetches,
         )
 
 
@@ -282,11 +346,13 @@ class SectionPluginMapper(Mapping[SectionName, PSectionPlugin]):
         return _api.get_section_plugin(__key)
 
     def __iter__(self) -> Iterator[SectionName]:
+        _api.import_all_plugins()
         return iter(
             frozenset(_api.registered_agent_sections) | frozenset(_api.registered_snmp_sections)
         )
 
     def __len__(self) -> int:
+        _api.import_all_plugins()
         return len(
             frozenset(_api.registered_agent_sections) | frozenset(_api.registered_snmp_sections)
         )
@@ -297,11 +363,13 @@ class HostLabelPluginMapper(Mapping[SectionName, PHostLabelDiscoveryPlugin]):
         return _api.get_section_plugin(__key)
 
     def __iter__(self) -> Iterator[SectionName]:
+        _api.import_all_plugins()
         return iter(
             frozenset(_api.registered_agent_sections) | frozenset(_api.registered_snmp_sections)
         )
 
     def __len__(self) -> int:
+        _api.import_all_plugins()
         return len(
             frozenset(_api.registered_agent_sections) | frozenset(_api.registered_snmp_sections)
         )
@@ -316,9 +384,11 @@ class CheckPluginMapper(Mapping[CheckPluginName, PCheckPlugin]):
         return value
 
     def __iter__(self) -> Iterator[CheckPluginName]:
+        _api.import_all_plugins()
         return iter(_api.registered_check_plugins)
 
     def __len__(self) -> int:
+        _api.import_all_plugins()
         return len(_api.registered_check_plugins)
 
 
@@ -333,19 +403,26 @@ class DiscoveryPluginMapper(Mapping[CheckPluginName, PDiscoveryPlugin]):
         return value
 
     def __iter__(self) -> Iterator[CheckPluginName]:
+        _api.import_all_plugins()
         return iter(_api.registered_check_plugins)
 
     def __len__(self) -> int:
+        _api.import_all_plugins()
         return len(_api.registered_check_plugins)
 
 
 class InventoryPluginMapper(Mapping[InventoryPluginName, PInventoryPlugin]):
     # See comment to SectionPluginMapper.
     def __getitem__(self, __key: InventoryPluginName) -> PInventoryPlugin:
-        return _api.registered_inventory_plugins[__key]
+        value = _api.get_inventory_plugin(__key)
+        if value is None:
+            raise KeyError(__key)
+        return value
 
     def __iter__(self) -> Iterator[InventoryPluginName]:
+        _api.import_all_plugins()
         return iter(_api.registered_inventory_plugins)
 
     def __len__(self) -> int:
+        _api.import_all_plugins()
         return len(_api.registered_inventory_plugins)
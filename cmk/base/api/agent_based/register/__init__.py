@@ -13,6 +13,8 @@ from cmk.base.api.agent_based.register._config import (
     add_host_label_ruleset,
     add_inventory_plugin,
     add_section_plugin,
+    disable_lazy_loading,
+    enable_lazy_loading,
     get_check_plugin,
     get_discovery_ruleset,
     get_host_label_ruleset,
@@ -38,14 +40,46 @@ from cmk.base.api.agent_based.register._config import (
     set_discovery_ruleset,
     set_host_label_ruleset,
 )
+from cmk.base.api.agent_based.register._index import (
+    create_plugin_index,
+    load_plugin_index,
+    plugin_index_path,
+    PLUGIN_PACKAGE,
+    plugins_fingerprint,
+    save_plugin_index,
+)
+
 
+def load_all_plugins(*, lazy: bool = False) -> list[str]:
+    """Load all agent based plugins
 
-def load_all_plugins() -> list[str]:
+    In "lazy" mode, the plugins are only imported once they are used, given that there is a valid
+    plugin index. Otherwise all plugins are imported and the index is created for the next time.
+    """
+    index_path = plugin_index_path()
+    fingerprint = plugins_fingerprint() if lazy else ""
+    if lazy and (index := load_plugin_index(index_path, fingerprint)) is not None:
+        enable_lazy_loading(index)
+        return list(index.errors)
+
+    disable_lazy_loading()
     errors = []
-    for plugin, exception in load_plugins_with_exceptions("cmk.base.plugins.agent_based"):
+    for plugin, exception in load_plugins_with_exceptions(PLUGIN_PACKAGE):
         errors.append(f"Error in agent based plugin {plugin}: {exception}\n")
         if cmk.utils.debug.enabled():
             raise exception
+
+    if lazy:
+        save_plugin_index(
+            index_path,
+            create_plugin_index(
+                fingerprint,
+                errors,
+                [*iter_all_agent_sections(), *iter_all_snmp_sections()],
+                iter_all_check_plugins(),
+                iter_all_inventory_plugins(),
+            ),
+        )
     return errors
 
 
@@ -3,8 +3,9 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import importlib
 from collections import defaultdict
-from collections.abc import Sequence
+from collections.abc import Mapping, Sequence
 from typing import Dict, Iterable, List, Optional, Set
 
 from cmk.utils.rulesets.ruleset_matcher import RuleSpec
@@ -18,6 +19,7 @@ from cmk.utils.type_defs import (
 
 from cmk.base.api.agent_based.checking_classes import CheckPlugin
 from cmk.base.api.agent_based.inventory_classes import InventoryPlugin
+from cmk.base.api.agent_based.register._index import PluginIndex
 from cmk.base.api.agent_based.register.check_plugins import management_plugin_factory
 from cmk.base.api.agent_based.register.section_plugins import trivial_section_factory
 from cmk.base.api.agent_based.register.utils import validate_check_ruleset_item_consistency
@@ -42,6 +44,71 @@ _sections_by_parsed_name: Dict[ParsedSectionName, Dict[SectionName, SectionPlugi
     dict
 )
 
+# Index of the plugins which are imported on demand, see enable_lazy_loading()
+_plugin_index: Optional[PluginIndex] = None
+_imported_modules: Set[str] = set()
+
+
+def enable_lazy_loading(index: PluginIndex) -> None:
+    """Import the modules of the indexed plugins only once the plugins are looked up
+
+    Iterating over all plugins of a kind imports all remaining modules. The names of the indexed
+    rulesets are known right away, so that the configuration can be loaded without importing any
+    plugin.
+    """
+    global _plugin_index
+    _plugin_index = index
+    _imported_modules.clear()
+    for ruleset_name in index.rulesets:
+        stored_rulesets.setdefault(RuleSetName(ruleset_name), [])
+
+
+def disable_lazy_loading() -> None:
+    global _plugin_index
+    _plugin_index = None
+    _imported_modules.clear()
+
+
+def _import_modules(modules: Iterable[str]) -> None:
+    for module in modules:
+        if module not in _imported_modules:
+            _imported_modules.add(module)
+            importlib.import_module(module)
+
+
+def _import_indexed_module(plugins: Mapping[str, str], name: str) -> None:
+    if (module := plugins.get(name)) is not None:
+        _import_modules((module,))
+
+
+def _import_section_plugin(section_name: SectionName) -> None:
+    if _plugin_index is not None:
+        _import_indexed_module(_plugin_index.sections, str(section_name))
+
+
+def _import_section_producers(parsed_section_name: ParsedSectionName) -> None:
+    if _plugin_index is not None:
+        _import_modules(_plugin_index.parsed_sections.get(str(parsed_section_name), ()))
+
+
+def _import_check_plugin(plugin_name: CheckPluginName) -> None:
+    if _plugin_index is not None:
+        _import_indexed_module(_plugin_index.check_plugins, str(plugin_name))
+
+
+def _import_inventory_plugin(plugin_name: InventoryPluginName) -> None:
+    if _plugin_index is not None:
+        _import_indexed_module(_plugin_index.inventory_plugins, str(plugin_name))
+
+
+def import_all_plugins() -> None:
+    """Import the modules of all indexed plugins which are not imported yet"""
+    global _plugin_index
+    if _plugin_index is not None:
+        modules = _plugin_index.modules
+        _plugin_index = None
+        _import_modules(modules)
+
 
 def add_check_plugin(check_plugin: CheckPlugin) -> None:
     validate_check_ruleset_item_consistency(check_plugin, _check_plugins_by_ruleset_name)
@@ -76,12 +143,15 @@ def get_check_plugin(plugin_name: CheckPluginName) -> Optional[CheckPlugin]:
 
     Management plugins may be created on the fly.
     """
+    _import_check_plugin(plugin_name)
     plugin = registered_check_plugins.get(plugin_name)
     if plugin is not None or not plugin_name.is_management_name():
         return plugin
 
     # create management board plugin on the fly:
-    non_mgmt_plugin = registered_check_plugins.get(plugin_name.create_basic_name())
+    basic_name = plugin_name.create_basic_name()
+    _import_check_plugin(basic_name)
+    non_mgmt_plugin = registered_check_plugins.get(basic_name)
     if non_mgmt_plugin is not None:
         mgmt_plugin = management_plugin_factory(non_mgmt_plugin)
         add_check_plugin(mgmt_plugin)
@@ -102,6 +172,7 @@ def get_host_label_ruleset(ruleset_name: RuleSetName) -> Sequence[RuleSpec]:
 
 def get_inventory_plugin(plugin_name: InventoryPluginName) -> Optional[InventoryPlugin]:
     """Returns the registered inventory plugin"""
+    _import_inventory_plugin(plugin_name)
     return registered_inventory_plugins.get(plugin_name)
 
 
@@ -123,6 +194,9 @@ def get_relevant_raw_sections(
         if inventory_plugin:
             parsed_section_names.update(inventory_plugin.sections)
 
+    for parsed_name in parsed_section_names:
+        _import_section_producers(parsed_name)
+
     return {
         section_name: section
         for parsed_name in parsed_section_names
@@ -131,6 +205,7 @@ def get_relevant_raw_sections(
 
 
 def get_section_plugin(section_name: SectionName) -> SectionPlugin:
+    _import_section_plugin(section_name)
     return (
         registered_agent_sections.get(section_name)
         or registered_snmp_sections.get(section_name)
@@ -139,18 +214,22 @@ def get_section_plugin(section_name: SectionName) -> SectionPlugin:
 
 
 def get_section_producers(parsed_section_name: ParsedSectionName) -> Set[SectionName]:
+    _import_section_producers(parsed_section_name)
     return set(_sections_by_parsed_name[parsed_section_name])
 
 
 def get_snmp_section_plugin(section_name: SectionName) -> SNMPSectionPlugin:
+    _import_section_plugin(section_name)
     return registered_snmp_sections[section_name]
 
 
 def is_registered_check_plugin(check_plugin_name: CheckPluginName) -> bool:
+    _import_check_plugin(check_plugin_name)
     return check_plugin_name in registered_check_plugins
 
 
 def is_registered_inventory_plugin(inventory_plugin_name: InventoryPluginName) -> bool:
+    _import_inventory_plugin(inventory_plugin_name)
     return inventory_plugin_name in registered_inventory_plugins
 
 
@@ -161,6 +240,7 @@ def is_registered_section_plugin(section_name: SectionName) -> bool:
 
 
 def is_registered_agent_section_plugin(section_name: SectionName) -> bool:
+    _import_section_plugin(section_name)
     return section_name in registered_agent_sections
 
 
@@ -174,10 +254,12 @@ def needs_redetection(section_name: SectionName) -> bool:
 
 
 def iter_all_agent_sections() -> Iterable[AgentSectionPlugin]:
+    import_all_plugins()
     return registered_agent_sections.values()
 
 
 def iter_all_check_plugins() -> Iterable[CheckPlugin]:
+    import_all_plugins()
     return registered_check_plugins.values()
 
 
@@ -190,14 +272,17 @@ def iter_all_host_label_rulesets() -> Iterable[RuleSetName]:
 
 
 def iter_all_inventory_plugins() -> Iterable[InventoryPlugin]:
+    import_all_plugins()
     return registered_inventory_plugins.values()
 
 
 def iter_all_snmp_sections() -> Iterable[SNMPSectionPlugin]:
+    import_all_plugins()
     return registered_snmp_sections.values()
 
 
 def len_snmp_sections() -> int:
+    import_all_plugins()
     return len(registered_snmp_sections)
 
 
@@ -215,4 +300,5 @@ def set_host_label_ruleset(ruleset_name: RuleSetName, rules: Sequence[RuleSpec])
 
 
 def is_registered_snmp_section_plugin(section_name: SectionName) -> bool:
+    _import_section_plugin(section_name)
     return section_name in registered_snmp_sections
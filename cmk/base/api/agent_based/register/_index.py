@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 tribe29 GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Index of the agent based plugins
+
+Importing all agent based plugins takes a considerable part of the startup time of "cmk". The
+index records the module defining each plugin, so that only the modules of the plugins which are
+actually used need to be imported. It is created after all plugins have been imported and becomes
+invalid once a plugin file or the Checkmk version changes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+from collections import defaultdict
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import cmk.utils.paths
+import cmk.utils.store as store
+import cmk.utils.version as cmk_version
+
+from cmk.base.api.agent_based.checking_classes import CheckPlugin
+from cmk.base.api.agent_based.inventory_classes import InventoryPlugin
+from cmk.base.api.agent_based.type_defs import SectionPlugin
+
+PLUGIN_PACKAGE = "cmk.base.plugins.agent_based"
+
+
+def plugin_index_path() -> Path:
+    return cmk.utils.paths.tmp_dir / "agent_based_plugin_index.json"
+
+
+@dataclass(frozen=True)
+class PluginIndex:
+    """Maps the names of plugins and rulesets to the modules registering them
+
+    The errors of loading the plugins are kept to report them also when loading on demand.
+    """
+
+    fingerprint: str
+    errors: Sequence[str]
+    sections: Mapping[str, str]
+    parsed_sections: Mapping[str, Sequence[str]]
+    check_plugins: Mapping[str, str]
+    inventory_plugins: Mapping[str, str]
+    rulesets: Mapping[str, Sequence[str]]
+
+    @property
+    def modules(self) -> Sequence[str]:
+        return sorted(
+            {
+                *self.sections.values(),
+                *self.check_plugins.values(),
+                *self.inventory_plugins.values(),
+            }
+        )
+
+    def serialize(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def deserialize(cls, raw: str) -> PluginIndex:
+        return cls(**json.loads(raw))
+
+
+def create_plugin_index(
+    fingerprint: str,
+    errors: Sequence[str],
+    sections: Iterable[SectionPlugin],
+    check_plugins: Iterable[CheckPlugin],
+    inventory_plugins: Iterable[InventoryPlugin],
+) -> PluginIndex:
+    """Create the index of the given plugins
+
+    Plugins migrated from legacy checks have no module. They are registered while loading the
+    legacy checks and are therefore not indexed.
+    """
+    section_modules: dict[str, str] = {}
+    parsed_sections: defaultdict[str, set[str]] = defaultdict(set)
+    check_plugin_modules: dict[str, str] = {}
+    inventory_plugin_modules: dict[str, str] = {}
+    rulesets: defaultdict[str, set[str]] = defaultdict(set)
+
+    for section in sections:
+        if section.module is None:
+            continue
+        module = _full_module_name(section.module)
+        section_modules[str(section.name)] = module
+        parsed_sections[str(section.parsed_section_name)].add(module)
+        if section.host_label_ruleset_name is not None:
+            rulesets[str(section.host_label_ruleset_name)].add(module)
+
+    for check_plugin in check_plugins:
+        if check_plugin.module is None:
+            continue
+        module = _full_module_name(check_plugin.module)
+        check_plugin_modules[str(check_plugin.name)] = module
+        if check_plugin.discovery_ruleset_name is not None:
+            rulesets[str(check_plugin.discovery_ruleset_name)].add(module)
+
+    for inventory_plugin in inventory_plugins:
+        inventory_plugin_modules[str(inventory_plugin.name)] = _full_module_name(
+            inventory_plugin.module
+        )
+
+    return PluginIndex(
+        fingerprint=fingerprint,
+        errors=errors,
+        sections=section_modules,
+        parsed_sections={name: sorted(modules) for name, modules in parsed_sections.items()},
+        check_plugins=check_plugin_modules,
+        inventory_plugins=inventory_plugin_modules,
+        rulesets={name: sorted(modules) for name, modules in rulesets.items()},
+    )
+
+
+def _full_module_name(module: str) -> str:
+    return f"{PLUGIN_PACKAGE}.{module}"
+
+
+def plugins_fingerprint() -> str:
+    """Identify the state of all plugin files and the Checkmk version"""
+    __import__(PLUGIN_PACKAGE)
+    digest = hashlib.sha256(cmk_version.__version__.encode("utf-8"))
+    for package_path in sys.modules[PLUGIN_PACKAGE].__path__:
+        for dir_path, dir_names, file_names in os.walk(package_path):
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                if not file_name.endswith(".py"):
+                    continue
+                path = os.path.join(dir_path, file_name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                digest.update(f"{path}\0{stat.st_mtime_ns}\0{stat.st_size}\0".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def load_plugin_index(path: Path, fingerprint: str) -> PluginIndex | None:
+    """Return the stored index, in case it is still valid for the given fingerprint"""
+    try:
+        index = PluginIndex.deserialize(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError, TypeError):
+        return None
+    return index if index.fingerprint == fingerprint else None
+
+
+def save_plugin_index(path: Path, index: PluginIndex) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    store.save_text_to_file(path, index.serialize())
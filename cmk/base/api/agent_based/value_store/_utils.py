@@ -3,23 +3,32 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import abc
+import marshal
+import os
+import struct
 from ast import literal_eval
 from contextlib import contextmanager
 from pathlib import Path
 from typing import (
     Any,
+    BinaryIO,
     Callable,
+    Collection,
     Container,
     Dict,
     Final,
+    Generic,
     Hashable,
     Iterable,
     Iterator,
     Mapping,
     MutableMapping,
     Optional,
+    Sequence,
     Set,
     Tuple,
+    Type,
     TypeVar,
     Union,
 )
@@ -69,6 +78,195 @@ class _DynamicDiskSyncedMapping(Dict[_TKey, _TValue]):
         return super().pop(key, *args)
 
 
+class ValueStoreStorage(abc.ABC, Generic[_TKey, _TValue]):
+    """The on disk format of the stored values of a host
+
+    The caller is responsible for holding the lock on the path while calling
+    `load` and `store`.
+    """
+
+    def __init__(self, path: Path, log_debug: Callable[[str], None]) -> None:
+        self.path: Final = path
+        self._log_debug = log_debug
+
+    @abc.abstractmethod
+    def load(self, current: Mapping[_TKey, _TValue]) -> Mapping[_TKey, _TValue]:
+        """Return the values on disk
+
+        `current` are the values returned by the last call to `load` or passed to
+        the last call of `store`. Implementations may use them to avoid re-reading
+        data that has not changed since.
+        """
+
+    @abc.abstractmethod
+    def store(
+        self,
+        data: Mapping[_TKey, _TValue],
+        *,
+        removed: Collection[_TKey],
+        updated: Mapping[_TKey, _TValue],
+    ) -> None:
+        """Persist `data`, which is the previous data with `removed` and `updated` applied"""
+
+
+class LiteralValueStoreStorage(ValueStoreStorage[_TKey, _TValue]):
+    """Stores the values as one python literal
+
+    Every change rewrites (and every external change re-reads) the whole file.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        log_debug: Callable[[str], None],
+        *,
+        serializer: Callable[[Mapping[_TKey, _TValue]], str] = repr,
+        deserializer: Callable[[str], Mapping[_TKey, _TValue]] = literal_eval,
+    ) -> None:
+        super().__init__(path, log_debug)
+        self._serializer: Final = serializer
+        self._deserializer: Final = deserializer
+        self._last_sync: Optional[float] = None
+
+    def load(self, current: Mapping[_TKey, _TValue]) -> Mapping[_TKey, _TValue]:
+        if self.path.stat().st_mtime == self._last_sync:
+            self._log_debug("already loaded")
+            return current
+
+        self._log_debug("loading from disk")
+        data = self._deserializer(store.load_text_from_file(self.path, default="{}", lock=False))
+        self._last_sync = self.path.stat().st_mtime
+        return data
+
+    def store(
+        self,
+        data: Mapping[_TKey, _TValue],
+        *,
+        removed: Collection[_TKey],
+        updated: Mapping[_TKey, _TValue],
+    ) -> None:
+        self._log_debug("writing to disk")
+        store.save_text_to_file(self.path, self._serializer(data))
+        self._last_sync = self.path.stat().st_mtime
+
+
+class AppendLogValueStoreStorage(ValueStoreStorage[_TKey, _TValue]):
+    """Stores the values as a log of marshalled changes
+
+    The file consists of a header followed by length prefixed records of
+    (removed keys, updated items). The first record is a full snapshot. Changes
+    are appended as further records, which are only read by the processes that
+    have not seen them yet. Once the appended changes outgrow the snapshot, the
+    file is compacted to a single snapshot again.
+
+    Every snapshot gets a new random generation in the header, which tells the
+    readers whether they have seen the start of the file already.
+
+    Files in the literal format are read as well, they are converted on the
+    next write.
+    """
+
+    MAGIC: Final = b"CMK-VS-LOG-1\n"
+    _GENERATION_SIZE: Final = 16
+    _HEADER_SIZE: Final = len(MAGIC) + _GENERATION_SIZE
+    _RECORD_HEADER: Final = struct.Struct("<I")
+
+    def __init__(self, path: Path, log_debug: Callable[[str], None]) -> None:
+        super().__init__(path, log_debug)
+        # Generation of the file and the read position after the last load / store.
+        self._synced: Optional[Tuple[bytes, int]] = None
+        self._snapshot_size = 0
+
+    def _read_generation(self, f: BinaryIO) -> Optional[bytes]:
+        header = f.read(self._HEADER_SIZE)
+        if len(header) < self._HEADER_SIZE or not header.startswith(self.MAGIC):
+            return None
+        return header[len(self.MAGIC) :]
+
+    def _file_state(self) -> Optional[Tuple[bytes, int]]:
+        with self.path.open("rb") as f:
+            if (generation := self._read_generation(f)) is None:
+                return None
+            return generation, os.fstat(f.fileno()).st_size
+
+    def load(self, current: Mapping[_TKey, _TValue]) -> Mapping[_TKey, _TValue]:
+        with self.path.open("rb") as f:
+            if (generation := self._read_generation(f)) is None:
+                self._synced = None  # Not yet converted, force writing a snapshot
+                self._log_debug("loading from disk")
+                return literal_eval(store.load_text_from_file(self.path, default="{}", lock=False))
+
+            size = os.fstat(f.fileno()).st_size
+            if self._synced is not None and self._synced[0] == generation:
+                if size == self._synced[1]:
+                    self._log_debug("already loaded")
+                    return current
+                if size > self._synced[1]:
+                    self._log_debug("loading appended changes from disk")
+                    f.seek(self._synced[1])
+                    changed = dict(current)
+                    self._synced = generation, self._replay(f, changed)
+                    return changed
+
+            self._log_debug("loading from disk")
+            data: Dict[_TKey, _TValue] = {}
+            self._synced = generation, self._replay(f, data, first_is_snapshot=True)
+            return data
+
+    def _replay(
+        self, f: BinaryIO, data: Dict[_TKey, _TValue], *, first_is_snapshot: bool = False
+    ) -> int:
+        """Apply the records to data and return the offset after the last complete record"""
+        offset = f.tell()
+        while True:
+            header = f.read(self._RECORD_HEADER.size)
+            if len(header) < self._RECORD_HEADER.size:
+                return offset
+            (length,) = self._RECORD_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return offset  # Incomplete (interrupted) write, ignore it
+            removed, updated = marshal.loads(payload)
+            for key in removed:
+                if key in data:
+                    del data[key]
+            data.update(updated)
+            if first_is_snapshot:
+                self._snapshot_size = length
+                first_is_snapshot = False
+            offset += self._RECORD_HEADER.size + length
+
+    def _record(self, removed: Sequence[_TKey], updated: Sequence[Tuple[_TKey, _TValue]]) -> bytes:
+        payload = marshal.dumps([list(removed), list(updated)])
+        return self._RECORD_HEADER.pack(len(payload)) + payload
+
+    def store(
+        self,
+        data: Mapping[_TKey, _TValue],
+        *,
+        removed: Collection[_TKey],
+        updated: Mapping[_TKey, _TValue],
+    ) -> None:
+        delta = self._record(tuple(removed), tuple(updated.items()))
+        if (
+            self._synced is not None
+            and self._synced == self._file_state()
+            and self._synced[1] + len(delta) <= self._HEADER_SIZE + 2 * self._snapshot_size + 4096
+        ):
+            self._log_debug("appending changes to disk")
+            with self.path.open("ab") as f:
+                f.write(delta)
+            self._synced = self._synced[0], self._synced[1] + len(delta)
+            return
+
+        self._log_debug("writing to disk")
+        generation = os.urandom(self._GENERATION_SIZE)
+        snapshot = self._record((), tuple(data.items()))
+        store.save_bytes_to_file(self.path, self.MAGIC + generation + snapshot)
+        self._snapshot_size = len(snapshot) - self._RECORD_HEADER.size
+        self._synced = generation, self._HEADER_SIZE + len(snapshot)
+
+
 class _StaticDiskSyncedMapping(Mapping[_TKey, _TValue]):
     """Represents the values stored on disk
 
@@ -81,17 +279,13 @@ class _StaticDiskSyncedMapping(Mapping[_TKey, _TValue]):
     def __init__(
         self,
         *,
-        path: Path,
+        storage: ValueStoreStorage[_TKey, _TValue],
         log_debug: Callable[[str], None],
-        serializer: Callable[[Mapping[_TKey, _TValue]], str],
-        deserializer: Callable[[str], Mapping[_TKey, _TValue]],
     ) -> None:
-        self._path: Final = path
-        self._last_sync: Optional[float] = None
+        self._path: Final = storage.path
+        self._storage: Final = storage
         self._data: Mapping[_TKey, _TValue] = {}
         self._log_debug = log_debug
-        self._serializer: Final = serializer
-        self._deserializer: Final = deserializer
         self.disksync()
 
     def __getitem__(self, key: _TKey) -> _TValue:
@@ -123,22 +317,15 @@ class _StaticDiskSyncedMapping(Mapping[_TKey, _TValue]):
 
         with store.locked(self._path):
             try:
-                if self._path.stat().st_mtime == self._last_sync:
-                    self._log_debug("already loaded")
-                else:
-                    self._log_debug("loading from disk")
-                    self._data = self._deserializer(
-                        store.load_text_from_file(self._path, default="{}", lock=False)
-                    )
+                self._data = self._storage.load(self._data)
 
-                if removed or updated:
+                updated_items = dict(updated)
+                if removed or updated_items:
+                    removed_keys = [k for k in self._data if k in removed]
                     data = {k: v for k, v in self._data.items() if k not in removed}
-                    data.update(updated)
-                    self._log_debug("writing to disk")
-                    store.save_text_to_file(self._path, self._serializer(data))
+                    data.update(updated_items)
+                    self._storage.store(data, removed=removed_keys, updated=updated_items)
                     self._data = data
-
-                self._last_sync = self._path.stat().st_mtime
             except Exception as exc:
                 raise MKGeneralException from exc
 
@@ -150,19 +337,12 @@ class _DiskSyncedMapping(MutableMapping[_TKey, _TValue]):  # pylint: disable=too
     def make(
         cls,
         *,
-        path: Path,
+        storage: ValueStoreStorage[_TKey, _TValue],
         log_debug: Callable[[str], None],
-        serializer: Callable[[Mapping[_TKey, _TValue]], str],
-        deserializer: Callable[[str], Mapping[_TKey, _TValue]],
     ) -> "_DiskSyncedMapping":
         return cls(
             dynamic=_DynamicDiskSyncedMapping(),
-            static=_StaticDiskSyncedMapping(
-                path=path,
-                log_debug=log_debug,
-                serializer=serializer,
-                deserializer=deserializer,
-            ),
+            static=_StaticDiskSyncedMapping(storage=storage, log_debug=log_debug),
         )
 
     def __init__(
@@ -279,13 +459,13 @@ class ValueStoreManager:
     """
 
     STORAGE_PATH = Path(cmk.utils.paths.counters_dir)
+    STORAGE: Type[ValueStoreStorage] = AppendLogValueStoreStorage
 
     def __init__(self, host_name: HostName) -> None:
+        log_debug = lambda x: logger.debug("value store: %s", x)
         self._value_store: _DiskSyncedMapping[_ValueStoreKey, Any] = _DiskSyncedMapping.make(
-            path=self.STORAGE_PATH / str(host_name),
-            log_debug=lambda x: logger.debug("value store: %s", x),
-            serializer=repr,
-            deserializer=literal_eval,
+            storage=self.STORAGE(self.STORAGE_PATH / str(host_name), log_debug),
+            log_debug=log_debug,
         )
         self.active_service_interface: Optional[_ValueStore] = None
         self._host_name = host_name
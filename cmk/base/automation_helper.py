@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 tribe29 GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Long running helper for the automation calls of the local GUI
+
+Each "cmk --automation ..." call loads all check plugins and the configuration before it can
+start to work. The helper loads them once and forks a child process for every request, which
+executes the automation with the loaded state and exits afterwards. This way automations can
+neither influence each other nor the helper.
+
+Before executing a request, the helper reloads the configuration if any of the configuration
+files changed. In case local check plugins changed, the helper answers the request as not
+executed and executes itself again. The GUI then falls back to calling "cmk --automation".
+"""
+
+import io
+import logging
+import os
+import signal
+import socket
+import sys
+import tempfile
+import traceback
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager, suppress
+from pathlib import Path
+from types import FrameType
+from typing import IO
+
+import cmk.utils.log as log
+import cmk.utils.paths
+from cmk.utils.daemon import pid_file_lock
+from cmk.utils.exceptions import MKTerminate
+
+from cmk.automations.helper import (
+    AutomationHelperRequest,
+    AutomationHelperResponse,
+    receive_message,
+    send_message,
+)
+
+import cmk.base.automations as automations
+import cmk.base.check_api as check_api
+import cmk.base.config as config
+
+logger = logging.getLogger("cmk.base.automation_helper")
+
+_Generation = tuple[tuple[str, int], ...]
+
+# Interval for collecting the terminated child processes while no requests arrive
+_REAP_INTERVAL = 5.0
+
+
+def main() -> None:
+    pid_file = cmk.utils.paths.omd_root / "tmp" / "run" / "automation-helper.pid"
+    with pid_file_lock(pid_file):
+        # Import all plugins in advance instead of on demand in each of the forked children
+        for error in config.load_all_agent_based_plugins(check_api.get_check_api_context):
+            logger.error(error.rstrip())
+        helper = AutomationHelper(cmk.utils.paths.automation_helper_socket)
+        restart = helper.serve()
+
+    if restart:
+        logger.info("Restarting to load the changed check plugins")
+        os.execv(sys.executable, [sys.executable, *sys.argv])
+
+
+class AutomationHelper:
+    def __init__(self, socket_path: Path) -> None:
+        self._socket_path = socket_path
+        self._config_generation: _Generation | None = None
+        self._plugins_generation = _plugins_generation()
+
+    def serve(self) -> bool:
+        """Serve requests until terminated
+
+        Returns True when the helper needs to be restarted to load changed check plugins.
+        """
+        signal.signal(signal.SIGTERM, _raise_terminate)
+        self._load_config()
+        try:
+            with _listen(self._socket_path) as listener:
+                while True:
+                    _reap_children()
+                    try:
+                        connection, _addr = listener.accept()
+                    except socket.timeout:
+                        continue
+
+                    with connection:
+                        if not self._handle_connection(connection, listener):
+                            return True
+        except MKTerminate:
+            logger.info("Terminated")
+            return False
+
+    def _load_config(self) -> None:
+        generation = _config_generation()
+        try:
+            config.load(validate_hosts=False)
+        except Exception:
+            # Leave the broken configuration to "cmk --automation", which reports the error
+            logger.exception("Failed to load the configuration")
+            self._config_generation = None
+            return
+        self._config_generation = generation
+
+    def _handle_connection(self, connection: socket.socket, listener: socket.socket) -> bool:
+        """Handle a single request, return False in case the helper needs to be restarted"""
+        try:
+            request = AutomationHelperRequest.deserialize(receive_message(connection))
+        except (OSError, ValueError, TypeError):
+            logger.exception("Failed to read the request")
+            return True
+
+        if _plugins_generation() != self._plugins_generation:
+            _send_response(connection, AutomationHelperResponse(executed=False))
+            return False
+
+        if _config_generation() != self._config_generation:
+            self._load_config()
+        if self._config_generation is None:
+            _send_response(connection, AutomationHelperResponse(executed=False))
+            return True
+
+        if os.fork():
+            return True
+
+        # Child process: Never return to the loop of the helper
+        try:
+            listener.close()
+            _send_response(connection, _execute_automation(request))
+        finally:
+            os._exit(0)
+
+
+def _raise_terminate(signum: int, stackframe: FrameType | None) -> None:
+    raise MKTerminate()
+
+
+@contextmanager
+def _listen(socket_path: Path) -> Iterator[socket.socket]:
+    with suppress(FileNotFoundError):
+        socket_path.unlink()
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+        listener.bind(str(socket_path))
+        socket_path.chmod(0o660)
+        listener.listen(socket.SOMAXCONN)
+        listener.settimeout(_REAP_INTERVAL)
+        try:
+            yield listener
+        finally:
+            with suppress(FileNotFoundError):
+                socket_path.unlink()
+
+
+def _reap_children() -> None:
+    with suppress(ChildProcessError):
+        while os.waitpid(-1, os.WNOHANG)[0]:
+            pass
+
+
+def _send_response(connection: socket.socket, response: AutomationHelperResponse) -> None:
+    try:
+        send_message(connection, response.serialize())
+    except OSError:
+        logger.exception("Failed to send the response")
+
+
+def _execute_automation(request: AutomationHelperRequest) -> AutomationHelperResponse:
+    """Execute the automation like "cmk --automation" does, capturing stdout and stderr"""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    sys.stdin = io.StringIO(request.stdin)
+
+    log.logger.setLevel(request.log_level)
+    if request.command not in automations.COMMANDS_WITH_CONSOLE_LOGGING:
+        log.clear_console_logging()
+
+    with tempfile.TemporaryFile() as stdout, tempfile.TemporaryFile() as stderr:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        # Redirect the file descriptors to also capture the output of sub processes
+        os.dup2(stdout.fileno(), 1)
+        os.dup2(stderr.fileno(), 2)
+        sys.stdout = open(1, "w", encoding="utf-8", closefd=False)
+        sys.stderr = open(2, "w", encoding="utf-8", closefd=False)
+        try:
+            exit_code = automations.automations.execute(
+                request.command, list(request.args), preloaded=True
+            )
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else int(e.code is not None)
+        except Exception:
+            traceback.print_exc()
+            exit_code = 2
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+
+        return AutomationHelperResponse(
+            executed=True,
+            exit_code=exit_code,
+            stdout=_read_output(stdout),
+            stderr=_read_output(stderr),
+        )
+
+
+def _read_output(output: IO[bytes]) -> str:
+    output.seek(0)
+    return output.read().decode("utf-8", errors="replace")
+
+
+def _config_generation() -> _Generation:
+    return _files_generation(
+        [
+            Path(cmk.utils.paths.main_config_file),
+            Path(cmk.utils.paths.final_config_file),
+            Path(cmk.utils.paths.local_config_file),
+            cmk.utils.paths.make_experimental_config_file(),
+            *Path(cmk.utils.paths.check_mk_config_dir).rglob("*"),
+        ]
+    )
+
+
+def _plugins_generation() -> _Generation:
+    return _files_generation(
+        [
+            *Path(cmk.utils.paths.local_checks_dir).rglob("*"),
+            *cmk.utils.paths.local_agent_based_plugins_dir.rglob("*"),
+        ]
+    )
+
+
+def _files_generation(paths: Iterable[Path]) -> _Generation:
+    """Identify the state of the given files by their names and modification times"""
+    generation = []
+    for path in paths:
+        with suppress(FileNotFoundError):
+            generation.append((str(path), path.stat().st_mtime_ns))
+    return tuple(sorted(generation))
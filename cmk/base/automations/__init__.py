@@ -30,6 +30,21 @@ class MKAutomationError(MKException):
     pass
 
 
+# At least for the automation calls that buffer and handle the stdout/stderr on their own
+# we can now enable this. In the future we should remove this call for all automations calls and
+# handle the output in a common way.
+COMMANDS_WITH_CONSOLE_LOGGING = frozenset(
+    {
+        "restart",
+        "reload",
+        "start",
+        "create-diagnostics-dump",
+        "try-inventory",
+        "service-discovery-preview",
+    }
+)
+
+
 class Automations:
     def __init__(self) -> None:
         super().__init__()
@@ -40,7 +55,12 @@ class Automations:
             raise TypeError()
         self._automations[automation.cmd] = automation
 
-    def execute(self, cmd: str, args: list[str]) -> Any:
+    def execute(self, cmd: str, args: list[str], *, preloaded: bool = False) -> Any:
+        """Execute an automation call
+
+        The automation helper loads the check plugins and the configuration in advance and
+        indicates this with "preloaded".
+        """
         self._handle_generic_arguments(args)
 
         try:
@@ -49,14 +69,15 @@ class Automations:
             except KeyError:
                 raise MKAutomationError("Automation command '%s' is not implemented." % cmd)
 
-            if automation.needs_checks:
+            if automation.needs_checks and not preloaded:
                 with redirect_stdout(open(os.devnull, "w")):
                     log.setup_console_logging()
                     config.load_all_agent_based_plugins(
                         check_api.get_check_api_context,
+                        lazy=True,
                     )
 
-            if automation.needs_config:
+            if automation.needs_config and not preloaded:
                 config.load(validate_hosts=False)
 
             result = automation.execute(args)
@@ -1817,6 +1817,8 @@ class AutomationUpdateDNSCache(Automation):
                 configured_ipv6_addresses=config.ipv6addresses,
                 simulation_mode=config.simulation_mode,
                 override_dns=config.fake_dns,
+                max_workers=config.max_concurrent_dns_lookups,
+                timeout=config.dns_lookup_timeout,
             )
         )
 
@@ -11,6 +11,7 @@ import ipaddress
 import itertools
 import logging
 import marshal
+import mmap
 import numbers
 import os
 import pickle
@@ -531,7 +532,9 @@ def load(
         _verify_non_duplicate_hosts()
 
 
-def load_packed_config(config_path: ConfigPath) -> None:
+def load_packed_config(
+    config_path: ConfigPath, host_names: Iterable[HostName] | None = None
+) -> None:
     """Load the configuration for the CMK helpers of CMC
 
     These files are written by PackedConfig().
@@ -541,12 +544,15 @@ def load_packed_config(config_path: ConfigPath) -> None:
 
     The validations which are performed during load() also don't need to be performed.
 
+    With host_names given, only the configuration of these hosts (and of their clusters or
+    nodes) is loaded, see PackedConfigStore.
+
     See Also:
         cmk.base.core_nagios._dump_precompiled_hostcheck()
 
     """
     _initialize_config()
-    globals().update(PackedConfigStore.from_serial(config_path).read())
+    globals().update(PackedConfigStore.from_serial(config_path).read(host_names))
     _perform_post_config_loading_actions()
 
 
@@ -566,6 +572,8 @@ def _perform_post_config_loading_actions() -> None:
 
     get_config_cache().initialize()
 
+    piggyback.set_storage_format(piggyback_storage_format)
+
     # In case the checks are not loaded yet it seems the current mode
     # is not working with the checks. In this case also don't load the
     # static checks into the configuration.
@@ -909,7 +917,17 @@ class PackedConfigGenerator:
 
 
 class PackedConfigStore:
-    """Caring about persistence of the packed configuration"""
+    """Caring about persistence of the packed configuration
+
+    The configuration is split into a core, which is needed for every host, and one slice per
+    host. A slice holds the values of the host specific variables (e.g. host_tags) and the
+    rules which explicitly list the host in their host condition. The index of the slices is
+    stored at the beginning of the file, so that reading the configuration of a few hosts only
+    needs to unpickle the core and the slices of these hosts from the memory mapped file.
+    """
+
+    _MAGIC: Final = b"CMK_PACKED_CONFIG_SLICED_1\n"
+    _INDEX_LENGTH: Final = struct.Struct("!Q")
 
     def __init__(self, path: Path) -> None:
         self.path: Final = path
@@ -923,15 +941,237 @@ class PackedConfigStore:
         return Path(config_path) / "precompiled_check_config.mk"
 
     def write(self, helper_config: Mapping[str, Any]) -> None:
+        core, slices = _slice_packed_config(helper_config)
+
+        blobs = [pickle.dumps(core, pickle.HIGHEST_PROTOCOL)]
+        index: _PackedConfigIndex = {"core": (0, len(blobs[0])), "hosts": {}}
+        offset = len(blobs[0])
+        for host_name, host_slice in slices.items():
+            blobs.append(pickle.dumps(host_slice, pickle.HIGHEST_PROTOCOL))
+            index["hosts"][host_name] = (offset, len(blobs[-1]), host_slice["related_hosts"])
+            offset += len(blobs[-1])
+        raw_index = pickle.dumps(index, pickle.HIGHEST_PROTOCOL)
+
         self.path.parent.mkdir(parents=True, exist_ok=True)
         tmp_path = self.path.with_suffix(self.path.suffix + ".compiled")
         with tmp_path.open("wb") as compiled_file:
-            pickle.dump(helper_config, compiled_file)
+            compiled_file.write(self._MAGIC)
+            compiled_file.write(self._INDEX_LENGTH.pack(len(raw_index)))
+            compiled_file.write(raw_index)
+            for blob in blobs:
+                compiled_file.write(blob)
         tmp_path.rename(self.path)
 
-    def read(self) -> Mapping[str, Any]:
-        with self.path.open("rb") as f:
-            return pickle.load(f)  # nosec B301 # BNS:c3c5e9
+    def read(self, host_names: Iterable[HostName] | None = None) -> Mapping[str, Any]:
+        """Read the whole configuration or only the one needed for the given hosts"""
+        with self.path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[: len(self._MAGIC)] != self._MAGIC:
+                # Written before the configuration was sliced
+                return pickle.loads(mm)  # nosec B301 # BNS:c3c5e9
+
+            index_start = len(self._MAGIC) + self._INDEX_LENGTH.size
+            (index_length,) = self._INDEX_LENGTH.unpack_from(mm, len(self._MAGIC))
+            data_start = index_start + index_length
+            index: _PackedConfigIndex = pickle.loads(  # nosec B301 # BNS:c3c5e9
+                mm[index_start:data_start]
+            )
+
+            def load(offset: int, length: int) -> Any:
+                return pickle.loads(  # nosec B301 # BNS:c3c5e9
+                    mm[data_start + offset : data_start + offset + length]
+                )
+
+            if host_names is None:
+                needed_hosts: Iterable[HostName] = index["hosts"]
+            else:
+                needed_hosts = {
+                    needed
+                    for host_name in host_names
+                    if host_name in index["hosts"]
+                    for needed in (host_name, *index["hosts"][host_name][2])
+                }
+
+            return _merge_packed_config(
+                load(*index["core"]),
+                [
+                    load(*index["hosts"][host_name][:2])
+                    for host_name in needed_hosts
+                    if host_name in index["hosts"]
+                ],
+            )
+
+
+class _PackedConfigIndex(TypedDict):
+    core: tuple[int, int]
+    hosts: dict[HostName, tuple[int, int, Sequence[HostName]]]
+
+
+class _PackedConfigCore(TypedDict):
+    variables: dict[str, Any]
+    # Original positions of the rules that remained in the core, per ruleset
+    rule_positions: dict[tuple[str, ...], Sequence[int]]
+
+
+class _PackedConfigSlice(TypedDict):
+    # Clusters of a node and nodes of a cluster: Their slices are needed as well
+    related_hosts: list[HostName]
+    variables: dict[str, Any]
+    explicit_host_conf: dict[str, Any]
+    all_hosts: list[tuple[int, str]]
+    clusters: list[tuple[int, str, list[HostName]]]
+    rules: list[tuple[tuple[str, ...], int, Any]]
+
+
+# Packed configuration variables holding one value per host
+_HOST_KEYED_PACKED_VARIABLES: Final = frozenset(
+    {
+        "explicit_snmp_communities",
+        "host_attributes",
+        "host_labels",
+        "host_paths",
+        "host_tags",
+        "ipaddresses",
+        "ipv6addresses",
+    }
+)
+
+# Rules listing more hosts stay in the core instead of being copied to all their slices
+_MAX_HOSTS_OF_SLICED_RULE: Final = 10
+
+
+def _slice_packed_config(
+    helper_config: Mapping[str, Any]
+) -> tuple[_PackedConfigCore, dict[HostName, _PackedConfigSlice]]:
+    slices: dict[HostName, _PackedConfigSlice] = {}
+
+    def get_slice(host_name: HostName) -> _PackedConfigSlice:
+        try:
+            return slices[host_name]
+        except KeyError:
+            return slices.setdefault(
+                host_name,
+                {
+                    "related_hosts": [],
+                    "variables": {},
+                    "explicit_host_conf": {},
+                    "all_hosts": [],
+                    "clusters": [],
+                    "rules": [],
+                },
+            )
+
+    core: _PackedConfigCore = {"variables": {}, "rule_positions": {}}
+    for varname, value in helper_config.items():
+        if varname in _HOST_KEYED_PACKED_VARIABLES:
+            core["variables"][varname] = {}
+            for host_name, host_value in value.items():
+                get_slice(host_name)["variables"].setdefault(varname, {})[host_name] = host_value
+
+        elif varname == "explicit_host_conf":
+            core["variables"][varname] = {}
+            for conf_varname, values_per_host in value.items():
+                core["variables"][varname][conf_varname] = {}
+                for host_name, host_value in values_per_host.items():
+                    get_slice(host_name)["explicit_host_conf"].setdefault(conf_varname, {})[
+                        host_name
+                    ] = host_value
+
+        elif varname == "all_hosts":
+            core["variables"][varname] = []
+            for position, entry in enumerate(value):
+                get_slice(entry.split("|", 1)[0])["all_hosts"].append((position, entry))
+
+        elif varname == "clusters":
+            core["variables"][varname] = {}
+            for position, (entry, nodes) in enumerate(value.items()):
+                cluster_name = entry.split("|", 1)[0]
+                get_slice(cluster_name)["clusters"].append((position, entry, nodes))
+                for node in nodes:
+                    get_slice(cluster_name)["related_hosts"].append(node)
+                    get_slice(node)["related_hosts"].append(cluster_name)
+
+        elif _is_ruleset(value):
+            core["variables"][varname] = _slice_ruleset((varname,), value, core, get_slice)
+
+        elif isinstance(value, dict) and any(_is_ruleset(v) for v in value.values()):
+            core["variables"][varname] = {
+                key: _slice_ruleset((varname, key), v, core, get_slice) if _is_ruleset(v) else v
+                for key, v in value.items()
+            }
+
+        else:
+            core["variables"][varname] = value
+
+    return core, slices
+
+
+def _is_ruleset(value: object) -> bool:
+    return (
+        isinstance(value, list)
+        and bool(value)
+        and all(isinstance(rule, dict) and "condition" in rule for rule in value)
+    )
+
+
+def _slice_ruleset(
+    path: tuple[str, ...],
+    ruleset: Sequence[Mapping[str, Any]],
+    core: _PackedConfigCore,
+    get_slice: Callable[[HostName], _PackedConfigSlice],
+) -> list[Mapping[str, Any]]:
+    """Move the rules explicitly listing their hosts to the slices of these hosts"""
+    core_rules = []
+    positions = []
+    for position, rule in enumerate(ruleset):
+        host_names = rule["condition"].get("host_name")
+        if (
+            isinstance(host_names, list)
+            and 0 < len(host_names) <= _MAX_HOSTS_OF_SLICED_RULE
+            and all(isinstance(host_name, str) for host_name in host_names)
+        ):
+            for host_name in host_names:
+                get_slice(host_name)["rules"].append((path, position, rule))
+        else:
+            core_rules.append(rule)
+            positions.append(position)
+
+    if len(core_rules) != len(ruleset):
+        core["rule_positions"][path] = positions
+    return core_rules
+
+
+def _merge_packed_config(
+    core: _PackedConfigCore, slices: Iterable[_PackedConfigSlice]
+) -> dict[str, Any]:
+    helper_config = core["variables"]
+    all_hosts: list[tuple[int, str]] = []
+    clusters: list[tuple[int, str, list[HostName]]] = []
+    rules: dict[tuple[str, ...], dict[int, Any]] = {}
+
+    for host_slice in slices:
+        for varname, values in host_slice["variables"].items():
+            helper_config[varname].update(values)
+        for conf_varname, values in host_slice["explicit_host_conf"].items():
+            helper_config["explicit_host_conf"][conf_varname].update(values)
+        all_hosts.extend(host_slice["all_hosts"])
+        clusters.extend(host_slice["clusters"])
+        for path, position, rule in host_slice["rules"]:
+            rules.setdefault(path, {})[position] = rule
+
+    if all_hosts:
+        helper_config["all_hosts"] = [entry for _position, entry in sorted(all_hosts)]
+    if clusters:
+        helper_config["clusters"] = {entry: nodes for _position, entry, nodes in sorted(clusters)}
+
+    for path, host_rules in rules.items():
+        container = helper_config
+        for key in path[:-1]:
+            container = container[key]
+        ruleset = dict(zip(core["rule_positions"][path], container[path[-1]]))
+        ruleset.update(host_rules)
+        container[path[-1]] = [rule for _position, rule in sorted(ruleset.items())]
+
+    return helper_config
 
 
 @contextlib.contextmanager
@@ -1541,12 +1781,19 @@ def max_cachefile_age(
 
 def load_all_agent_based_plugins(
     get_check_api_context: GetCheckApiContext,
+    *,
+    lazy: bool = False,
 ) -> list[str]:
+    """Load the agent based plugins and the legacy checks
+
+    With "lazy", the agent based plugins are imported once they are used. The legacy checks are
+    always loaded, as they define the check variables the configuration may refer to.
+    """
     global _all_checks_loaded
 
     _initialize_data_structures()
 
-    errors = agent_based_register.load_all_plugins()
+    errors = agent_based_register.load_all_plugins(lazy=lazy)
 
     # LEGACY CHECK PLUGINS
     filelist = get_plugin_paths(
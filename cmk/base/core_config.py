@@ -19,6 +19,7 @@ import cmk.utils.config_warnings as config_warnings
 import cmk.utils.debug
 import cmk.utils.password_store
 import cmk.utils.paths
+import cmk.utils.piggyback as piggyback
 from cmk.utils.config_path import VersionedConfigPath
 from cmk.utils.exceptions import MKGeneralException
 from cmk.utils.labels import Labels
@@ -40,6 +41,7 @@ from cmk.checkers.check_table import ConfiguredService
 
 import cmk.base.api.agent_based.register as agent_based_register
 import cmk.base.config as config
+import cmk.base.ip_lookup as ip_lookup
 import cmk.base.obsolete_output as out
 from cmk.base.config import ConfigCache, ObjectAttributes
 from cmk.base.nagios_utils import do_check_nagiosconfig
@@ -335,13 +337,38 @@ def _create_core_config(
     _verify_non_duplicate_hosts(duplicates)
     _verify_non_deprecated_checkgroups()
 
+    if config.use_dns_cache:
+        _prefetch_dns_lookups(config_cache, hosts_to_update)
+
     config_path = next(VersionedConfigPath.current())
     with config_path.create(is_cmc=core.is_cmc()), _backup_objects_file(core):
-        core.create_config(config_path, config_cache, hosts_to_update=hosts_to_update)
+        # The piggyback data of all hosts is looked up for the legacy piggyback host detection
+        with piggyback.read_pass():
+            core.create_config(config_path, config_cache, hosts_to_update=hosts_to_update)
 
     cmk.utils.password_store.save_for_helpers(config_path)
 
 
+def _prefetch_dns_lookups(config_cache: ConfigCache, hosts_to_update: HostsToUpdate) -> None:
+    """Resolve the host names missing in the DNS cache concurrently
+
+    The failed lookups are left to the configuration generation, which reports them.
+    """
+    host_names = config_cache.all_active_hosts()
+    if hosts_to_update is not None:
+        host_names = host_names.intersection(hosts_to_update)
+
+    ip_lookup.prefetch_dns_lookups(
+        ip_lookup_configs=(config_cache.ip_lookup_config(hn) for hn in sorted(host_names)),
+        configured_ipv4_addresses=config.ipaddresses,
+        configured_ipv6_addresses=config.ipv6addresses,
+        simulation_mode=config.simulation_mode,
+        override_dns=config.fake_dns,
+        max_workers=config.max_concurrent_dns_lookups,
+        timeout=config.dns_lookup_timeout,
+    )
+
+
 def _verify_non_deprecated_checkgroups() -> None:
     """Verify that the user has no deprecated check groups configured."""
     # 'check_plugin.check_ruleset_name' is of type RuleSetName, which is an PluginName (good),
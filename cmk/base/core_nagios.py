@@ -1244,7 +1244,7 @@ if '-d' in sys.argv:
     for check_plugin_name in sorted(needed_legacy_check_plugin_names):
         console.verbose(" %s%s%s", tty.green, check_plugin_name, tty.normal, stream=sys.stderr)
 
-    output.write("config.load_packed_config(LATEST_CONFIG)\n")
+    output.write(f"config.load_packed_config(LATEST_CONFIG, [{hostname!r}])\n")
 
     # IP addresses
     (
@@ -48,6 +48,8 @@ snmp_ports: list[RuleSpec[object]] = []
 tcp_connect_timeout = 5.0
 tcp_connect_timeouts: list[RuleSpec[object]] = []
 use_dns_cache = True  # prevent DNS by using own cache file
+max_concurrent_dns_lookups = 10
+dns_lookup_timeout = 10.0  # secs
 delay_precompile = False  # delay Python compilation to Nagios execution
 restart_locking: Literal["abort", "wait"] | None = "abort"
 check_submission: Literal["file", "pipe"] = "file"
@@ -55,7 +57,10 @@ default_host_group = "check_mk"
 
 check_max_cachefile_age = 0  # per default do not use cache files when checking
 cluster_max_cachefile_age = 90  # secs.
+max_concurrent_fetches = 1  # fetch the sources of a host one after another
 piggyback_max_cachefile_age = 3600  # secs
+# Layout newly received piggyback data is stored in (see cmk.utils.piggyback)
+piggyback_storage_format: Literal["files", "segments"] = "files"
 # Ruleset for translating piggyback host names
 piggyback_translation: list[RuleSpec[object]] = []
 # Ruleset for translating service descriptions
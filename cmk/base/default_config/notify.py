@@ -24,6 +24,12 @@ notification_rules: list[EventRule] = []
 # Check every 10 seconds for ripe bulks
 notification_bulk_interval = 10
 notification_plugin_timeout = 60
+# Execution of notification plugins in keepalive mode: Number of parallel plugin
+# executions, limits per plugin and contact and maximum number of queued executions
+notification_plugin_workers = 4
+notification_plugin_max_per_plugin = 3
+notification_plugin_max_per_contact = 1
+notification_plugin_max_queued = 1000
 
 # Notification Spooling.
 
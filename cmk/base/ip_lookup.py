@@ -7,7 +7,9 @@ from __future__ import annotations
 
 import enum
 import socket
-from collections.abc import Iterable, Iterator, Mapping, MutableMapping
+import time
+from collections.abc import Iterable, Iterator, Mapping, MutableMapping, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from contextlib import contextmanager
 from pathlib import Path
 from typing import Any, NamedTuple
@@ -128,6 +130,7 @@ def lookup_ip_address(
     if family is AddressFamily.NO_IP:
         return None
 
+    # Keep _needs_dns_lookup() in sync with the conditions above
     return cached_dns_lookup(
         host_name,
         # NO_IP handled in guard.
@@ -138,6 +141,26 @@ def lookup_ip_address(
     )
 
 
+def _needs_dns_lookup(
+    *,
+    configured_ip_address: HostAddress | None,
+    simulation_mode: bool,
+    is_snmp_usewalk_host: bool,
+    override_dns: HostAddress | None,
+    is_dyndns_host: bool,
+) -> bool:
+    """Whether lookup_ip_address() resolves the address of a host via DNS"""
+    return not (
+        _fake_dns
+        or override_dns
+        or simulation_mode
+        or _enforce_localhost
+        or is_snmp_usewalk_host
+        or configured_ip_address
+        or is_dyndns_host
+    )
+
+
 # Variables needed during the renaming of hosts (see automation.py)
 def cached_dns_lookup(
     hostname: HostName,
@@ -237,6 +260,57 @@ def _actual_dns_lookup(
         )
 
 
+def _resolve_concurrently(
+    cache_ids: Sequence[IPLookupCacheId],
+    *,
+    max_workers: int,
+    timeout: float,
+) -> Iterator[tuple[IPLookupCacheId, HostAddress | MKIPAddressLookupError]]:
+    """Resolve the given host names with a pool of threads, yielding the results as they arrive
+
+    A lookup which takes longer than the timeout is reported as failed. Its thread is left to the
+    resolver of the system, which gives up eventually.
+    """
+    started: dict[IPLookupCacheId, float] = {}
+
+    def lookup(cache_id: IPLookupCacheId) -> HostAddress:
+        started[cache_id] = time.monotonic()
+        return _actual_dns_lookup(host_name=cache_id[0], family=cache_id[1])
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dns-lookup")
+    try:
+        futures: dict[Future[HostAddress], IPLookupCacheId] = {
+            executor.submit(lookup, cache_id): cache_id for cache_id in cache_ids
+        }
+        pending = set(futures)
+        while pending:
+            now = time.monotonic()
+            deadline = min(
+                (started[futures[f]] + timeout for f in pending if futures[f] in started),
+                default=now + timeout,
+            )
+            done, pending = wait(
+                pending, timeout=max(deadline - now, 0), return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                try:
+                    yield futures[future], future.result()
+                except MKIPAddressLookupError as e:
+                    yield futures[future], e
+
+            now = time.monotonic()
+            for future in [f for f in pending if started.get(futures[f], now) + timeout <= now]:
+                pending.remove(future)
+                host_name, family = futures[future]
+                family_str = {socket.AF_INET: "IPv4", socket.AF_INET6: "IPv6"}[family]
+                yield futures[future], MKIPAddressLookupError(
+                    f"Failed to lookup {family_str} address of {host_name} via DNS: "
+                    f"Timeout after {timeout} seconds"
+                )
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
 class IPLookupCacheSerializer:
     def __init__(self) -> None:
         self._dim_serializer = store.DimSerializer()
@@ -334,6 +408,24 @@ class IPLookupCache:
             self._cache[cache_id] = ipa
             self.save_persisted()
 
+    def update(self, entries: Mapping[IPLookupCacheId, HostAddress]) -> None:
+        """Updates the cache with several new / changed entries at once
+
+        Same as setting the entries one by one, but the persisted cache is read and written only
+        once.
+        """
+        if not entries:
+            return
+
+        if not self._persist_on_update:
+            self._cache.update(entries)
+            return
+
+        with self._store.locked():
+            self._cache.update(self._store.read_obj(default={}))
+            self._cache.update(entries)
+            self.save_persisted()
+
     def save_persisted(self) -> None:
         self._store.write_obj(self._cache)
 
@@ -363,19 +455,39 @@ def update_dns_cache(
     # will just clear the cache.
     simulation_mode: bool,
     override_dns: HostAddress | None,
+    max_workers: int,
+    timeout: float,
 ) -> UpdateDNSCacheResult:
     failed = []
 
     ip_lookup_cache = _get_ip_lookup_cache()
+    ip_lookup_configs = list(ip_lookup_configs)
 
     with ip_lookup_cache.persisting_disabled():
         console.verbose("Cleaning up existing DNS cache...\n")
         ip_lookup_cache.clear()
 
         console.verbose("Updating DNS cache...\n")
+        # Resolve all host names up front, the lookups below are answered by the cache
+        failed_lookups = _prefetch_dns_lookups(
+            ip_lookup_cache,
+            ip_lookup_configs=ip_lookup_configs,
+            configured_ipv4_addresses=configured_ipv4_addresses,
+            configured_ipv6_addresses=configured_ipv6_addresses,
+            simulation_mode=simulation_mode,
+            override_dns=override_dns,
+            max_workers=max_workers,
+            timeout=timeout,
+        )
+
         # `_annotate_family()` handles DUAL_STACK and NO_IP
         for host_name, host_config, family in _annotate_family(ip_lookup_configs):
             console.verbose(f"{host_name} ({family})...")
+            if (error := failed_lookups.get((host_name, family))) is not None:
+                failed.append(host_name)
+                console.verbose("lookup failed: %s\n" % error)
+                continue
+
             try:
                 ip = lookup_ip_address(
                     host_name=host_name,
@@ -392,7 +504,7 @@ def update_dns_cache(
                     ),
                     override_dns=override_dns,
                     is_dyndns_host=host_config.is_dyndns_host,
-                    force_file_cache_renewal=True,  # it's cleared anyway
+                    force_file_cache_renewal=False,  # it's cleared and refilled above
                 )
                 console.verbose(f"{ip}\n")
 
@@ -424,3 +536,75 @@ def _annotate_family(
             yield host_config.hostname, host_config, socket.AF_INET
         if AddressFamily.IPv6 in host_config.address_family:
             yield host_config.hostname, host_config, socket.AF_INET6
+
+
+def prefetch_dns_lookups(
+    *,
+    ip_lookup_configs: Iterable[IPLookupConfig],
+    configured_ipv4_addresses: Mapping[HostName, HostAddress],
+    configured_ipv6_addresses: Mapping[HostName, HostAddress],
+    simulation_mode: bool,
+    override_dns: HostAddress | None,
+    max_workers: int,
+    timeout: float,
+) -> Mapping[IPLookupCacheId, MKIPAddressLookupError]:
+    """Resolve the host names missing in the DNS cache concurrently
+
+    The resolved addresses are added to the cache, which is persisted once afterwards. Subsequent
+    calls of lookup_ip_address() find them there. Returns the failed lookups.
+    """
+    return _prefetch_dns_lookups(
+        _get_ip_lookup_cache(),
+        ip_lookup_configs=ip_lookup_configs,
+        configured_ipv4_addresses=configured_ipv4_addresses,
+        configured_ipv6_addresses=configured_ipv6_addresses,
+        simulation_mode=simulation_mode,
+        override_dns=override_dns,
+        max_workers=max_workers,
+        timeout=timeout,
+    )
+
+
+def _prefetch_dns_lookups(
+    ip_lookup_cache: IPLookupCache,
+    *,
+    ip_lookup_configs: Iterable[IPLookupConfig],
+    configured_ipv4_addresses: Mapping[HostName, HostAddress],
+    configured_ipv6_addresses: Mapping[HostName, HostAddress],
+    simulation_mode: bool,
+    override_dns: HostAddress | None,
+    max_workers: int,
+    timeout: float,
+) -> Mapping[IPLookupCacheId, MKIPAddressLookupError]:
+    cache_ids = [
+        (host_name, family)
+        for host_name, host_config, family in _annotate_family(ip_lookup_configs)
+        if ip_lookup_cache.get((host_name, family)) is None
+        and _needs_dns_lookup(
+            configured_ip_address=(
+                configured_ipv4_addresses if family is socket.AF_INET else configured_ipv6_addresses
+            ).get(host_name),
+            simulation_mode=simulation_mode,
+            is_snmp_usewalk_host=(
+                host_config.snmp_backend is SNMPBackendEnum.STORED_WALK and host_config.is_snmp_host
+            ),
+            override_dns=override_dns,
+            is_dyndns_host=host_config.is_dyndns_host,
+        )
+    ]
+    if not cache_ids:
+        return {}
+
+    console.verbose(f"Resolving {len(cache_ids)} host names ({max_workers} at a time)...\n")
+    failed: dict[IPLookupCacheId, MKIPAddressLookupError] = {}
+    resolved: dict[IPLookupCacheId, HostAddress] = {}
+    for cache_id, result in _resolve_concurrently(
+        cache_ids, max_workers=max_workers, timeout=timeout
+    ):
+        if isinstance(result, MKIPAddressLookupError):
+            failed[cache_id] = result
+        else:
+            resolved[cache_id] = result
+
+    ip_lookup_cache.update(resolved)
+    return failed
@@ -835,6 +835,8 @@ def mode_update_dns_cache() -> None:
         configured_ipv4_addresses=config.ipv6addresses,
         simulation_mode=config.simulation_mode,
         override_dns=config.fake_dns,
+        max_workers=config.max_concurrent_dns_lookups,
+        timeout=config.dns_lookup_timeout,
     )
 
 
@@ -1413,17 +1415,7 @@ def mode_automation(args: list[str]) -> None:
     if not args:
         raise automations.MKAutomationError("You need to provide arguments")
 
-    # At least for the automation calls that buffer and handle the stdout/stderr on their own
-    # we can now enable this. In the future we should remove this call for all automations calls and
-    # handle the output in a common way.
-    if args[0] not in [
-        "restart",
-        "reload",
-        "start",
-        "create-diagnostics-dump",
-        "try-inventory",
-        "service-discovery-preview",
-    ]:
+    if args[0] not in automations.COMMANDS_WITH_CONSOLE_LOGGING:
         log.clear_console_logging()
 
     sys.exit(automations.automations.execute(args[0], args[1:]))
@@ -1442,6 +1434,23 @@ modes.register(
     )
 )
 
+
+def mode_automation_helper() -> None:
+    import cmk.base.automation_helper as automation_helper  # pylint: disable=import-outside-toplevel
+
+    automation_helper.main()
+
+
+modes.register(
+    Mode(
+        long_option="automation-helper",
+        handler_function=mode_automation_helper,
+        needs_config=False,
+        needs_checks=False,
+        short_help="Internal helper executing the automations of the local GUI",
+    )
+)
+
 # .
 #   .--notify--------------------------------------------------------------.
 #   |                                 _   _  __                            |
@@ -19,15 +19,20 @@ import io
 import logging
 import os
 import re
+import signal
 import subprocess
 import sys
+import threading
 import time
 import traceback
 import uuid
-from collections.abc import Mapping, Sequence
+from collections import Counter, deque
+from collections.abc import Callable, Mapping, Sequence
+from contextlib import suppress
+from dataclasses import asdict, dataclass, replace
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, cast, Literal, overload, Union
+from typing import Any, cast, IO, Literal, NamedTuple, overload, Union
 
 import cmk.utils.debug
 import cmk.utils.log as log
@@ -385,14 +390,290 @@ def notification_analyse_backlog(nr: int) -> NotifyAnalysisInfo | None:
 
 # TODO: Make use of the generic do_keepalive() mechanism?
 def notify_keepalive() -> None:
+    global _plugin_pool
     cmk.base.utils.register_sigint_handler()
+
+    if config.notification_plugin_workers > 1:
+        _plugin_pool = NotificationPluginPool(
+            workers=config.notification_plugin_workers,
+            max_per_plugin=config.notification_plugin_max_per_plugin,
+            max_per_contact=config.notification_plugin_max_per_contact,
+            max_queued=config.notification_plugin_max_queued,
+        )
+
     events.event_keepalive(
         event_function=notify_notify,
-        call_every_loop=send_ripe_bulks,
+        call_every_loop=_notify_keepalive_loop,
         loop_interval=config.notification_bulk_interval,
+        shutdown_function=_shutdown_plugin_pool,
     )
 
 
+def _notify_keepalive_loop() -> None:
+    send_ripe_bulks()
+    if _plugin_pool is not None:
+        _plugin_pool.report_statistics(
+            Path(notification_logdir, "plugin_pool_statistics.mk"),
+            interval=config.notification_bulk_interval,
+        )
+
+
+def _shutdown_plugin_pool() -> None:
+    global _plugin_pool
+    if _plugin_pool is not None:
+        logger.info("Waiting for %d queued notifications", _plugin_pool.statistics().queued)
+        _plugin_pool.shutdown()
+        _plugin_pool = None
+
+
+# .
+#   .--Plugin pool---------------------------------------------------------.
+#   |              ____  _             _                          _        |
+#   |             |  _ \| |_   _  __ _(_)_ __    _ __   ___   ___ | |      |
+#   |             | |_) | | | | |/ _` | | '_ \  | '_ \ / _ \ / _ \| |      |
+#   |             |  __/| | |_| | (_| | | | | | | |_) | (_) | (_) | |      |
+#   |             |_|   |_|\__,_|\__, |_|_| |_| | .__/ \___/ \___/|_|      |
+#   |                           |___/          |_|                         |
+#   +----------------------------------------------------------------------+
+#   |  In keepalive mode the notification plugins are executed by a pool   |
+#   |  of worker threads. A slow plugin does not delay the notifications   |
+#   |  queued behind it anymore.                                           |
+#   '----------------------------------------------------------------------'
+
+
+class _PluginJob(NamedTuple):
+    seqno: int
+    plugin_name: NotificationPluginNameStr
+    path: str
+    plugin_context: NotificationContext
+    submitted_at: float
+
+    @property
+    def contact(self) -> str:
+        return self.plugin_context.get("CONTACTNAME", "")
+
+
+@dataclass
+class PluginPoolStatistics:
+    queued: int = 0
+    running: int = 0
+    peak_queued: int = 0
+    submitted: int = 0
+    completed: int = 0
+    wait_time_total: float = 0.0
+    wait_time_max: float = 0.0
+    run_time_total: float = 0.0
+    run_time_max: float = 0.0
+
+    @property
+    def wait_time_avg(self) -> float:
+        return self.wait_time_total / self.completed if self.completed else 0.0
+
+    @property
+    def run_time_avg(self) -> float:
+        return self.run_time_total / self.completed if self.completed else 0.0
+
+
+class NotificationPluginPool:
+    """Executes notification plugins in a bounded pool of worker threads
+
+    The jobs are started in the order of their submission, as far as the limits per plugin and
+    per contact allow. If too many jobs are queued, submit() blocks until the workers caught up.
+    This way the core gets no "ready" reply and keeps the notifications in its own queue.
+
+    The history entries are written in the order of the submission: The notification entry is
+    written when a job is submitted, the result entry as soon as all earlier jobs are finished.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int,
+        max_per_plugin: int,
+        max_per_contact: int,
+        max_queued: int,
+    ) -> None:
+        self._max_per_plugin = max_per_plugin
+        self._max_per_contact = max_per_contact
+        self._max_queued = max_queued
+
+        self._condition = threading.Condition()
+        self._queue: deque[_PluginJob] = deque()
+        self._running_per_plugin: Counter[NotificationPluginNameStr] = Counter()
+        self._running_per_contact: Counter[str] = Counter()
+        self._statistics = PluginPoolStatistics()
+        self._shutdown = False
+        self._next_seqno = 0
+
+        # Result messages waiting for the results of earlier jobs
+        self._history_lock = threading.Lock()
+        self._results: dict[int, str] = {}
+        self._next_result_seqno = 0
+
+        self._last_report = 0.0
+        self._last_reported_submitted = 0
+
+        self._threads = [
+            threading.Thread(target=self._work, name=f"notify-plugin-{nr}", daemon=True)
+            for nr in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(
+        self,
+        plugin_name: NotificationPluginNameStr,
+        plugin_context: NotificationContext,
+    ) -> None:
+        log_to_history(
+            notification_message(
+                NotificationPluginName(plugin_name),
+                plugin_context,
+            )
+        )
+
+        if not (path := path_to_notification_script(plugin_name)):
+            return
+
+        with self._condition:
+            while len(self._queue) >= self._max_queued:
+                self._condition.wait()
+
+            self._queue.append(
+                _PluginJob(
+                    seqno=self._next_seqno,
+                    plugin_name=plugin_name,
+                    path=path,
+                    plugin_context=plugin_context,
+                    submitted_at=time.time(),
+                )
+            )
+            self._next_seqno += 1
+            self._statistics.submitted += 1
+            self._statistics.peak_queued = max(self._statistics.peak_queued, len(self._queue))
+            self._condition.notify_all()
+
+    def shutdown(self) -> None:
+        """Executes the queued jobs and stops the workers"""
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    def statistics(self) -> PluginPoolStatistics:
+        with self._condition:
+            return replace(
+                self._statistics,
+                queued=len(self._queue),
+                running=sum(self._running_per_plugin.values()),
+            )
+
+    def report_statistics(self, path: Path, *, interval: int) -> None:
+        if (now := time.time()) - self._last_report < interval:
+            return
+        self._last_report = now
+
+        statistics = self.statistics()
+        if statistics.submitted == self._last_reported_submitted and not statistics.running:
+            return
+        self._last_reported_submitted = statistics.submitted
+
+        logger.info(
+            "Plugin pool: %d queued (peak %d), %d running, %d completed, "
+            "waited %.1f/%.1f sec, ran %.1f/%.1f sec (avg/max)",
+            statistics.queued,
+            statistics.peak_queued,
+            statistics.running,
+            statistics.completed,
+            statistics.wait_time_avg,
+            statistics.wait_time_max,
+            statistics.run_time_avg,
+            statistics.run_time_max,
+        )
+        store.save_object_to_file(
+            path,
+            {
+                **asdict(statistics),
+                "wait_time_avg": statistics.wait_time_avg,
+                "run_time_avg": statistics.run_time_avg,
+            },
+        )
+
+    def _work(self) -> None:
+        while (job := self._next_job()) is not None:
+            started_at = time.time()
+            try:
+                exitcode, output_lines = _execute_notification_script(
+                    job.path,
+                    job.plugin_context,
+                    _make_plugin_log(f"[{job.plugin_name}/{job.contact}] "),
+                )
+            except Exception as e:
+                logger.exception("    ERROR:")
+                exitcode, output_lines = 2, [str(e)]
+
+            self._finish_job(
+                job,
+                started_at,
+                notification_result_message(
+                    NotificationPluginName(job.plugin_name),
+                    NotificationContext(job.plugin_context),
+                    NotificationResultCode(exitcode),
+                    output_lines,
+                ),
+            )
+
+    def _next_job(self) -> _PluginJob | None:
+        with self._condition:
+            while True:
+                for job in self._queue:
+                    if (
+                        self._running_per_plugin[job.plugin_name] < self._max_per_plugin
+                        and self._running_per_contact[job.contact] < self._max_per_contact
+                    ):
+                        self._queue.remove(job)
+                        self._running_per_plugin[job.plugin_name] += 1
+                        self._running_per_contact[job.contact] += 1
+                        # Wake up a blocked submit()
+                        self._condition.notify_all()
+                        return job
+
+                if self._shutdown and not self._queue:
+                    return None
+                self._condition.wait()
+
+    def _finish_job(self, job: _PluginJob, started_at: float, result_message: str) -> None:
+        finished_at = time.time()
+        with self._condition:
+            self._running_per_plugin[job.plugin_name] -= 1
+            self._running_per_contact[job.contact] -= 1
+
+            wait_time = started_at - job.submitted_at
+            run_time = finished_at - started_at
+            self._statistics.completed += 1
+            self._statistics.wait_time_total += wait_time
+            self._statistics.wait_time_max = max(self._statistics.wait_time_max, wait_time)
+            self._statistics.run_time_total += run_time
+            self._statistics.run_time_max = max(self._statistics.run_time_max, run_time)
+
+            self._results[job.seqno] = result_message
+            self._condition.notify_all()
+
+        with self._history_lock:
+            with self._condition:
+                result_messages = []
+                while self._next_result_seqno in self._results:
+                    result_messages.append(self._results.pop(self._next_result_seqno))
+                    self._next_result_seqno += 1
+
+            for message in result_messages:
+                log_to_history(message)
+
+
+_plugin_pool: NotificationPluginPool | None = None
+
+
 # .
 #   .--Rule-Based-Notifications--------------------------------------------.
 #   |            ____        _      _                        _             |
@@ -548,7 +829,7 @@ def _process_notifications(  # pylint: disable=too-many-branches
                     else rbn_split_plugin_context(plugin_context)
                 )
                 for context in plugin_contexts:
-                    call_notification_script(plugin_name, context)
+                    _deliver_notification(plugin_name, context)
             else:
                 logger.info("No rule matched, would notify fallback contacts, but none configured")
     else:
@@ -599,7 +880,7 @@ def _process_notifications(  # pylint: disable=too-many-branches
                             NotificationViaPlugin({"context": context, "plugin": plugin_name}),
                         )
                     else:
-                        call_notification_script(plugin_name, context)
+                        _deliver_notification(plugin_name, context)
 
             except Exception as e:
                 if cmk.utils.debug.enabled():
@@ -1270,16 +1551,56 @@ def call_notification_script(
         )
     )
 
-    def plugin_log(s: str) -> None:
-        logger.info("     %s", s)
-
     # Call actual script without any arguments
     path = path_to_notification_script(plugin_name)
     if not path:
         return 2
 
+    exitcode, output_lines = _execute_notification_script(
+        path, plugin_context, _make_plugin_log("")
+    )
+
+    # Result is already logged to history for spoolfiles by
+    # mknotifyd.spool_handler
+    if not is_spoolfile:
+        log_to_history(
+            notification_result_message(
+                NotificationPluginName(plugin_name),
+                NotificationContext(plugin_context),
+                NotificationResultCode(exitcode),
+                output_lines,
+            )
+        )
+
+    return exitcode
+
+
+def _deliver_notification(
+    plugin_name: NotificationPluginNameStr,
+    plugin_context: NotificationContext,
+) -> None:
+    if _plugin_pool is None:
+        call_notification_script(plugin_name, plugin_context)
+    else:
+        _plugin_pool.submit(plugin_name, plugin_context)
+
+
+def _make_plugin_log(prefix: str) -> Callable[[str], None]:
+    def plugin_log(s: str) -> None:
+        logger.info("     %s%s", prefix, s)
+
+    return plugin_log
+
+
+def _execute_notification_script(
+    path: str,
+    plugin_context: NotificationContext,
+    plugin_log: Callable[[str], None],
+) -> tuple[int, list[str]]:
     plugin_log("executing %s" % path)
 
+    in_main_thread = threading.current_thread() is threading.main_thread()
+    output_lines: list[str] = []
     with subprocess.Popen(
         [path],
         stdout=subprocess.PIPE,
@@ -1287,48 +1608,67 @@ def call_notification_script(
         env=notification_script_env(plugin_context),
         encoding="utf-8",
         close_fds=True,
+        # The workers of the plugin pool wait for the end of the output. The sub processes of a
+        # plugin would keep the output open, so they have to be killed together with the plugin.
+        start_new_session=not in_main_thread,
     ) as p:
-        output_lines: list[str] = []
         assert p.stdout is not None
 
-        with Timeout(
-            config.notification_plugin_timeout,
-            message="Notification plugin timed out",
-        ) as timeout_guard:
-            try:
-                while True:
-                    # read and output stdout linewise to ensure we don't force python to produce
-                    # one - potentially huge - memory buffer
-                    if not (line := p.stdout.readline()):
-                        break
-                    output = line.rstrip()
-                    plugin_log("Output: %s" % output)
-                    output_lines.append(output)
-                    if _log_to_stdout:
-                        out.output(line)
-            except MKTimeout:
-                plugin_log(
-                    "Notification plugin did not finish within %d seconds. Terminating."
-                    % config.notification_plugin_timeout
-                )
+        timed_out = threading.Event()
+
+        def kill() -> None:
+            timed_out.set()
+            plugin_log(
+                "Notification plugin did not finish within %d seconds. Terminating."
+                % config.notification_plugin_timeout
+            )
+            if in_main_thread:
                 p.kill()
+            else:
+                with suppress(ProcessLookupError):
+                    os.killpg(p.pid, signal.SIGKILL)
 
-    if exitcode := 1 if timeout_guard.signaled else p.returncode:
+        if in_main_thread:
+            with Timeout(
+                config.notification_plugin_timeout,
+                message="Notification plugin timed out",
+            ):
+                try:
+                    _read_plugin_output(p.stdout, output_lines, plugin_log)
+                except MKTimeout:
+                    kill()
+
+        else:
+            # Signals are only handled by the main thread, so the workers of the plugin pool
+            # terminate the plugin from a timer thread.
+            timer = threading.Timer(config.notification_plugin_timeout, kill)
+            timer.start()
+            try:
+                _read_plugin_output(p.stdout, output_lines, plugin_log)
+            finally:
+                timer.cancel()
+
+    if exitcode := 1 if timed_out.is_set() else p.returncode:
         plugin_log("Plugin exited with code %d" % exitcode)
 
-    # Result is already logged to history for spoolfiles by
-    # mknotifyd.spool_handler
-    if not is_spoolfile:
-        log_to_history(
-            notification_result_message(
-                NotificationPluginName(plugin_name),
-                NotificationContext(plugin_context),
-                NotificationResultCode(exitcode),
-                output_lines,
-            )
-        )
+    return exitcode, output_lines
 
-    return exitcode
+
+def _read_plugin_output(
+    stdout: IO[str],
+    output_lines: list[str],
+    plugin_log: Callable[[str], None],
+) -> None:
+    while True:
+        # read and output stdout linewise to ensure we don't force python to produce
+        # one - potentially huge - memory buffer
+        if not (line := stdout.readline()):
+            break
+        output = line.rstrip()
+        plugin_log("Output: %s" % output)
+        output_lines.append(output)
+        if _log_to_stdout:
+            out.output(line)
 
 
 # Construct the environment for the notification script
@@ -6,11 +6,13 @@
 from __future__ import annotations
 
 import ast
+import multiprocessing
 import os
 import pickle
 import time
+from collections.abc import Iterable, Mapping
 from pathlib import Path
-from typing import Optional, TypedDict
+from typing import NamedTuple, Optional, TypedDict
 
 from redis import Redis
 
@@ -23,6 +25,12 @@ from cmk.utils.redis import get_redis_client
 
 from cmk.bi.aggregation import BIAggregation
 from cmk.bi.data_fetcher import BIStructureFetcher, get_cache_dir, SiteProgramStart
+from cmk.bi.dependencies import (
+    affected_aggregations,
+    BIAggregationDependencies,
+    BIRecordingSearcher,
+    config_fingerprint,
+)
 from cmk.bi.lib import SitesCallback
 from cmk.bi.packs import BIAggregationPacks
 from cmk.bi.searcher import BISearcher
@@ -36,16 +44,53 @@ class ConfigStatus(TypedDict):
     online_sites: set[SiteProgramStart]
 
 
+class CompilationState(NamedTuple):
+    """The basis of the last compilation, used to determine what needs to be recompiled"""
+
+    program_starts: set[SiteProgramStart]
+    dependencies: dict[str, BIAggregationDependencies]
+    lookup_aggregation_ids: set[str]
+
+
+# The aggregations are compiled in forked processes, which inherit the searcher and the
+# aggregations instead of receiving them pickled
+_worker_searcher: BIRecordingSearcher | None = None
+_worker_aggregations: dict[str, tuple[BIAggregation, str]] = {}
+
+
+def _compile_aggregation(aggr_id: str) -> tuple[str, dict, BIAggregationDependencies]:
+    assert _worker_searcher is not None
+    aggregation, fingerprint = _worker_aggregations[aggr_id]
+    _worker_searcher.start_recording()
+    compiled_aggregation = aggregation.compile(_worker_searcher)
+    return (
+        aggr_id,
+        compiled_aggregation.serialize(),
+        _worker_searcher.recorded_dependencies(fingerprint),
+    )
+
+
 class BICompiler:
-    def __init__(self, bi_configuration_file: str, sites_callback: SitesCallback) -> None:
+    def __init__(
+        self,
+        bi_configuration_file: str,
+        sites_callback: SitesCallback,
+        *,
+        parallel_compilation: bool = False,
+    ) -> None:
         self._sites_callback = sites_callback
         self._bi_configuration_file = bi_configuration_file
+        # Forking is unsafe in the threaded GUI, only processes which do not serve requests, like
+        # background jobs or cmk-update-config, may compile in forked processes
+        self._parallel_compilation = parallel_compilation
 
         self._logger = logger.getChild("bi.compiler")
         self._compiled_aggregations: dict[str, BICompiledAggregation] = {}
+        self.compiled_version: tuple[int, int] | None = None
         self._path_compilation_lock = Path(get_cache_dir(), "compilation.LOCK")
         self._path_compilation_timestamp = Path(get_cache_dir(), "last_compilation")
         self._path_compiled_aggregations = Path(get_cache_dir(), "compiled_aggregations")
+        self._path_compilation_state = Path(get_cache_dir(), "compilation_state")
         self._path_compiled_aggregations.mkdir(parents=True, exist_ok=True)
 
         self._redis_client: Redis[str] | None = None
@@ -76,7 +121,22 @@ class BICompiler:
         try:
             self._check_compilation_status()
         finally:
+            compiled_version = self._get_compiled_version()
             self._load_compiled_aggregations()
+            # Unknown in case the compiled aggregations changed while loading them
+            self.compiled_version = (
+                compiled_version if compiled_version == self._get_compiled_version() else None
+            )
+
+    def _get_compiled_version(self) -> tuple[int, int]:
+        """Changes whenever the compiled or the frozen aggregations change"""
+        version = []
+        for path in [self._path_compilation_timestamp, frozen_aggregations_dir]:
+            try:
+                version.append(path.stat().st_mtime_ns)
+            except FileNotFoundError:
+                version.append(0)
+        return version[0], version[1]
 
     def get_frozen_aggr_id(self, frozen_info: FrozenBIInfo) -> str:
         return f"frozen_{frozen_info.based_on_aggregation_id}_{frozen_info.based_on_branch_title}"
@@ -215,19 +275,60 @@ class BICompiler:
                 self._logger.debug("No compilation required. An other process already compiled it")
                 return
 
+            previous_state = self._load_compilation_state()
             self.prepare_for_compilation(current_configstatus["online_sites"])
 
-            # Compile the raw tree
             all_aggregations_by_id: dict[str, BIAggregation] = {
                 x.id: x for x in self._bi_packs.get_all_aggregations()
             }
-            for aggregation in all_aggregations_by_id.values():
-                start = time.time()
-                self._compiled_aggregations[aggregation.id] = aggregation.compile(self.bi_searcher)
-                self._logger.debug(f"Compilation of {aggregation.id} took {time.time() - start:f}")
+            fingerprints = {
+                aggr_id: config_fingerprint(self._bi_packs, aggregation)
+                for aggr_id, aggregation in all_aggregations_by_id.items()
+            }
+            outdated_ids = self._outdated_aggregations(
+                fingerprints, previous_state, current_configstatus["online_sites"]
+            )
+            self._logger.debug(
+                "Compiling %d of %d aggregations" % (len(outdated_ids), len(fingerprints))
+            )
+
+            # The previous versions are needed to update the lookup of the changed aggregations
+            vanished_ids = (
+                set(previous_state.dependencies) - set(all_aggregations_by_id)
+                if previous_state
+                else set()
+            )
+            previous_aggregations = self._load_compiled_aggregation_files(
+                outdated_ids | vanished_ids
+            )
+
+            compiled_aggregations = self._load_compiled_aggregation_files(
+                set(all_aggregations_by_id) - outdated_ids
+            )
+            dependencies: dict[str, BIAggregationDependencies] = {}
+            if previous_state:
+                dependencies.update(
+                    {x: previous_state.dependencies[x] for x in compiled_aggregations}
+                )
+            # Recompile the aggregations whose previous compilation got lost
+            outdated_ids = set(all_aggregations_by_id) - set(compiled_aggregations)
+
+            for aggr_id, compiled_aggr_schema, aggr_dependencies in self._compile_aggregations(
+                {x: (all_aggregations_by_id[x], fingerprints[x] or "") for x in outdated_ids}
+            ):
+                compiled_aggregations[aggr_id] = BIAggregation.create_trees_from_schema(
+                    compiled_aggr_schema
+                )
+                if fingerprints[aggr_id] is not None:
+                    dependencies[aggr_id] = aggr_dependencies
+
+            self._compiled_aggregations = {
+                x: compiled_aggregations[x] for x in all_aggregations_by_id
+            }
             self._verify_aggregation_title_uniqueness(self._compiled_aggregations)
 
-            for aggr_id, compiled_aggr in self._compiled_aggregations.items():
+            for aggr_id in outdated_ids:
+                compiled_aggr = self._compiled_aggregations[aggr_id]
                 start = time.time()
                 result = compiled_aggr.serialize()
                 self._logger.debug(
@@ -237,7 +338,17 @@ class BICompiler:
                 self._save_data(self._path_compiled_aggregations.joinpath(aggr_id), result)
 
             self._compiled_aggregations = self._manage_frozen_branches(self._compiled_aggregations)
-            self._generate_part_of_aggregation_lookup(self._compiled_aggregations)
+            self._update_part_of_aggregation_lookup(
+                previous_state, previous_aggregations, outdated_ids
+            )
+
+            self._save_compilation_state(
+                CompilationState(
+                    program_starts=current_configstatus["online_sites"],
+                    dependencies=dependencies,
+                    lookup_aggregation_ids=set(self._compiled_aggregations),
+                )
+            )
 
         known_sites = {kv[0]: kv[1] for kv in current_configstatus.get("known_sites", set())}
         self._cleanup_vanished_aggregations()
@@ -246,6 +357,83 @@ class BICompiler:
             str(self._path_compilation_timestamp), str(current_configstatus["configfile_timestamp"])
         )
 
+    def _outdated_aggregations(
+        self,
+        fingerprints: Mapping[str, str | None],
+        previous_state: CompilationState | None,
+        program_starts: set[SiteProgramStart],
+    ) -> set[str]:
+        """Determine the aggregations whose configuration or used structure data changed"""
+        if previous_state is None:
+            return set(fingerprints)
+
+        changed_hosts = self._bi_structure_fetcher.changed_hosts(
+            previous_state.program_starts, program_starts
+        )
+        if changed_hosts is None:
+            self._logger.debug("Previous structure data is not available")
+            return set(fingerprints)
+
+        outdated_ids = {
+            aggr_id
+            for aggr_id, fingerprint in fingerprints.items()
+            if fingerprint is None
+            or aggr_id not in previous_state.dependencies
+            or previous_state.dependencies[aggr_id].config_fingerprint != fingerprint
+            or not self._path_compiled_aggregations.joinpath(aggr_id).exists()
+        }
+        return outdated_ids | affected_aggregations(
+            {
+                aggr_id: aggr_dependencies
+                for aggr_id, aggr_dependencies in previous_state.dependencies.items()
+                if aggr_id in fingerprints and aggr_id not in outdated_ids
+            },
+            changed_hosts,
+        )
+
+    def _compile_aggregations(
+        self, aggregations: Mapping[str, tuple[BIAggregation, str]]
+    ) -> list[tuple[str, dict, BIAggregationDependencies]]:
+        """Compile the given aggregations, using multiple processes if allowed and worthwhile"""
+        global _worker_searcher, _worker_aggregations
+
+        searcher = BIRecordingSearcher()
+        searcher.set_hosts(self.bi_searcher.hosts)
+        _worker_searcher = searcher
+        _worker_aggregations = dict(aggregations)
+        try:
+            num_processes = min(len(aggregations), max(1, multiprocessing.cpu_count() - 1))
+            if not self._parallel_compilation or num_processes <= 1:
+                return [_compile_aggregation(aggr_id) for aggr_id in aggregations]
+
+            with multiprocessing.get_context("fork").Pool(num_processes) as pool:
+                return pool.map(_compile_aggregation, aggregations)
+        finally:
+            _worker_searcher = None
+            _worker_aggregations = {}
+
+    def _load_compiled_aggregation_files(
+        self, aggr_ids: Iterable[str]
+    ) -> dict[str, BICompiledAggregation]:
+        compiled_aggregations = {}
+        for aggr_id in aggr_ids:
+            if data := self._load_data(self._path_compiled_aggregations.joinpath(aggr_id)):
+                compiled_aggregations[aggr_id] = BIAggregation.create_trees_from_schema(data)
+        return compiled_aggregations
+
+    def _load_compilation_state(self) -> CompilationState | None:
+        try:
+            state = pickle.loads(self._path_compilation_state.read_bytes())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self._logger.warning("Can not load compilation state %s" % str(e))
+            return None
+        return state if isinstance(state, CompilationState) else None
+
+    def _save_compilation_state(self, state: CompilationState) -> None:
+        store.save_bytes_to_file(self._path_compilation_state, pickle.dumps(state))
+
     def _cleanup_vanished_aggregations(self) -> None:
         valid_aggregations = list(self._compiled_aggregations.keys())
         for path_object in self._path_compiled_aggregations.iterdir():
@@ -393,17 +581,7 @@ class BICompiler:
                 lookup_lock.release()
 
     def _generate_part_of_aggregation_lookup(self, compiled_aggregations):
-        part_of_aggregation_map: dict[str, list[str]] = {}
-        for aggr_id, compiled_aggregation in compiled_aggregations.items():
-            for branch in compiled_aggregation.branches:
-                for _site, host_name, service_description in branch.required_elements():
-                    # This information can be used to selectively load the relevant compiled
-                    # aggregation for any host/service. Right now it is only an indicator if this
-                    # host/service is part of an aggregation
-                    key = f"bi:aggregation_lookup:{host_name}:{service_description}"
-                    part_of_aggregation_map.setdefault(key, []).append(
-                        f"{aggr_id}\t{branch.properties.title}"
-                    )
+        part_of_aggregation_map = self._part_of_aggregation_map(compiled_aggregations)
 
         client = self._get_redis_client()
 
@@ -426,3 +604,67 @@ class BICompiler:
             pipeline.delete(*obsolete_keys)
 
         pipeline.execute()
+
+    def _update_part_of_aggregation_lookup(
+        self,
+        previous_state: CompilationState | None,
+        previous_aggregations: Mapping[str, BICompiledAggregation],
+        recompiled_ids: set[str],
+    ) -> None:
+        """Update the lookup entries of the aggregations which changed since the last compilation
+
+        Falls back to regenerating the whole lookup in case the previous entries of a changed
+        aggregation can not be determined anymore, e.g. of an unfrozen branch.
+        """
+        current_ids = set(self._compiled_aggregations)
+        if (
+            previous_state is None
+            or not (previous_state.lookup_aggregation_ids - current_ids)
+            | (previous_state.lookup_aggregation_ids & recompiled_ids)
+            <= set(previous_aggregations)
+            or not self._get_redis_client().exists("bi:aggregation_lookup")
+        ):
+            self._generate_part_of_aggregation_lookup(self._compiled_aggregations)
+            return
+
+        changed_ids = (
+            recompiled_ids | (current_ids - previous_state.lookup_aggregation_ids)
+        ) & current_ids
+        previous_map = self._part_of_aggregation_map(
+            {
+                aggr_id: aggregation
+                for aggr_id, aggregation in previous_aggregations.items()
+                if aggr_id in previous_state.lookup_aggregation_ids
+            }
+        )
+        current_map = self._part_of_aggregation_map(
+            {x: self._compiled_aggregations[x] for x in changed_ids}
+        )
+
+        # Redis removes sets once their last member is removed
+        pipeline = self._get_redis_client().pipeline()
+        for key in previous_map.keys() | current_map.keys():
+            previous_values = previous_map.get(key, set())
+            values = current_map.get(key, set())
+            if added := values - previous_values:
+                pipeline.sadd(key, *added)
+            if removed := previous_values - values:
+                pipeline.srem(key, *removed)
+        pipeline.execute()
+
+    @staticmethod
+    def _part_of_aggregation_map(
+        compiled_aggregations: Mapping[str, BICompiledAggregation]
+    ) -> dict[str, set[str]]:
+        part_of_aggregation_map: dict[str, set[str]] = {}
+        for aggr_id, compiled_aggregation in compiled_aggregations.items():
+            for branch in compiled_aggregation.branches:
+                for _site, host_name, service_description in branch.required_elements():
+                    # This information can be used to selectively load the relevant compiled
+                    # aggregation for any host/service. Right now it is only an indicator if this
+                    # host/service is part of an aggregation
+                    key = f"bi:aggregation_lookup:{host_name}:{service_description}"
+                    part_of_aggregation_map.setdefault(key, set()).add(
+                        f"{aggr_id}\t{branch.properties.title}"
+                    )
+        return part_of_aggregation_map
@@ -4,14 +4,15 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import copy
-from collections.abc import Iterator
+from collections.abc import Callable, Iterator
 from typing import NamedTuple
 
 from cmk.utils.plugin_registry import Registry
 from cmk.utils.type_defs import HostName, ServiceName
 
 from cmk.bi.data_fetcher import BIStatusFetcher
-from cmk.bi.lib import RequiredBIElement
+from cmk.bi.lib import ABCBIStatusFetcher, RequiredBIElement
+from cmk.bi.state_engine import BIStateEngine
 from cmk.bi.trees import BICompiledAggregation, BICompiledRule, NodeResultBundle
 
 
@@ -57,9 +58,11 @@ class BIComputer:
         self,
         compiled_aggregations: dict[str, BICompiledAggregation],
         bi_status_fetcher: BIStatusFetcher,
+        bi_state_engine: BIStateEngine | None = None,
     ) -> None:
         self._compiled_aggregations = compiled_aggregations
         self._bi_status_fetcher = bi_status_fetcher
+        self._bi_state_engine = bi_state_engine
         self._legacy_branch_cache: dict = {}
 
     def compute_aggregation_result(
@@ -84,8 +87,12 @@ class BIComputer:
     ) -> list[tuple[BICompiledAggregation, list[NodeResultBundle]]]:
         required_aggregations = self.get_required_aggregations(bi_aggregation_filter)
         required_elements = self.get_required_elements(required_aggregations)
-        self._bi_status_fetcher.update_states(required_elements)
-        return self.compute_results(required_aggregations)
+        if self._bi_state_engine is None:
+            self._bi_status_fetcher.update_states(required_elements)
+            return self.compute_results(required_aggregations)
+
+        self._bi_status_fetcher.states = self._bi_state_engine.update_states(required_elements)
+        return self._compute_results(required_aggregations, self._bi_state_engine.compute_branches)
 
     def get_required_aggregations(
         self, bi_aggregation_filter: BIAggregationFilter
@@ -109,10 +116,26 @@ class BIComputer:
 
     def compute_results(
         self, required_aggregations: list[tuple[BICompiledAggregation, list[BICompiledRule]]]
+    ) -> list[tuple[BICompiledAggregation, list[NodeResultBundle]]]:
+        return self._compute_results(
+            required_aggregations,
+            lambda compiled_aggregation, branches, bi_status_fetcher: (
+                compiled_aggregation.compute_branches(branches, bi_status_fetcher)
+            ),
+        )
+
+    def _compute_results(
+        self,
+        required_aggregations: list[tuple[BICompiledAggregation, list[BICompiledRule]]],
+        compute_branches: Callable[
+            [BICompiledAggregation, list[BICompiledRule], ABCBIStatusFetcher],
+            list[NodeResultBundle],
+        ],
     ) -> list[tuple[BICompiledAggregation, list[NodeResultBundle]]]:
         results = []
         for compiled_aggregation, branches in required_aggregations:
-            node_result_bundles = compiled_aggregation.compute_branches(
+            node_result_bundles = compute_branches(
+                compiled_aggregation,
                 branches,
                 self._bi_status_fetcher,
             )
@@ -220,21 +220,64 @@ class BIStructureFetcher:
         # ("name", str),
 
         for host_name, values in hosts.items():
-            site_id, tags, labels, folder, services, children, parents, alias, name = values
-            self._hosts[host_name] = BIHostData(
-                site_id,
-                tags,
-                labels,
-                folder,
-                {x: BIServiceData(*y) for x, y in services.items()},
-                children,
-                parents,
-                alias,
-                name,
-            )
+            self._hosts[host_name] = self._host_data(values)
 
         self._have_sites.add(site_id)
 
+    @staticmethod
+    def _host_data(values: tuple) -> BIHostData:
+        site_id, tags, labels, folder, services, children, parents, alias, name = values
+        return BIHostData(
+            site_id,
+            tags,
+            labels,
+            folder,
+            {x: BIServiceData(*y) for x, y in services.items()},
+            children,
+            parents,
+            alias,
+            name,
+        )
+
+    def changed_hosts(
+        self,
+        previous_program_starts: set[SiteProgramStart],
+        program_starts: set[SiteProgramStart],
+    ) -> list[BIHostData] | None:
+        """Compare the structure data of the given program starts of the sites
+
+        Returns the previous and the current version of all hosts which were added, removed or
+        changed, or None if the structure data of a previous program start is no longer cached.
+        """
+        previous_timestamps = dict(previous_program_starts)
+        timestamps = dict(program_starts)
+        changed_hosts: list[BIHostData] = []
+        for site_id in previous_timestamps.keys() | timestamps.keys():
+            if previous_timestamps.get(site_id) == timestamps.get(site_id):
+                continue
+            try:
+                previous_hosts = self._load_site_data(site_id, previous_timestamps.get(site_id))
+                hosts = self._load_site_data(site_id, timestamps.get(site_id))
+            except (OSError, EOFError, ValueError, TypeError):
+                return None
+
+            for host_name in previous_hosts.keys() | hosts.keys():
+                previous_values = previous_hosts.get(host_name)
+                values = hosts.get(host_name)
+                if previous_values == values:
+                    continue
+                changed_hosts.extend(
+                    self._host_data(x) for x in (previous_values, values) if x is not None
+                )
+        return changed_hosts
+
+    def _load_site_data(self, site_id: SiteId, timestamp: int | None) -> dict:
+        if timestamp is None:
+            return {}
+        return self._marshal_load_data(
+            self._path_site_structure_data.joinpath(self._site_data_filename(site_id, timestamp))
+        )
+
     def cleanup_orphaned_files(self, known_sites: Mapping[SiteId, int]) -> None:
         for path_object, (site_id, timestamp) in self._get_site_data_files():
             try:
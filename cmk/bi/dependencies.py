@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 tribe29 GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Track the structure data each compiled aggregation depends on
+
+The searches of an aggregation decide for every host on its own, whether it matches. A compiled
+aggregation can therefore only change, if a changed host matches one of the searches executed
+during its compilation or was looked up by its name. Recording these while compiling allows to
+recompile only the affected aggregations after the structure data of a site has changed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections.abc import Iterable, Mapping
+from typing import Any, NamedTuple
+
+from cmk.utils.type_defs import HostName
+
+from cmk.bi.aggregation import BIAggregation
+from cmk.bi.lib import BIHostData, BIHostSearchMatch, BIServiceSearchMatch
+from cmk.bi.packs import BIAggregationPacks
+from cmk.bi.searcher import BISearcher, is_host_name_regex
+
+
+class BIAggregationDependencies(NamedTuple):
+    config_fingerprint: str
+    host_names: frozenset[HostName]
+    host_conditions: tuple[dict[str, Any], ...]
+    service_conditions: tuple[dict[str, Any], ...]
+    host_name_patterns: frozenset[str]
+
+
+class _RecordingHosts(dict[HostName, BIHostData]):
+    """Records the host names which are looked up"""
+
+    def __init__(self, hosts: Mapping[HostName, BIHostData]) -> None:
+        super().__init__(hosts)
+        self.looked_up: set[HostName] = set()
+
+    def __getitem__(self, host_name: HostName) -> BIHostData:
+        self.looked_up.add(host_name)
+        return super().__getitem__(host_name)
+
+    def __contains__(self, host_name: object) -> bool:
+        self.looked_up.add(host_name)  # type: ignore[arg-type]
+        return super().__contains__(host_name)
+
+    def get(self, host_name: HostName, default: Any = None) -> Any:
+        self.looked_up.add(host_name)
+        return super().get(host_name, default)
+
+
+class BIRecordingSearcher(BISearcher):
+    """A searcher recording the searches and host lookups of a compilation"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.hosts: _RecordingHosts = _RecordingHosts({})
+        self._host_conditions: dict[str, dict[str, Any]] = {}
+        self._service_conditions: dict[str, dict[str, Any]] = {}
+        self._host_name_patterns: set[str] = set()
+        self._search_depth = 0
+
+    def set_hosts(self, hosts: dict[HostName, BIHostData]) -> None:
+        super().set_hosts(hosts)
+        self.hosts = _RecordingHosts(hosts)
+
+    def start_recording(self) -> None:
+        self.hosts.looked_up.clear()
+        self._host_conditions.clear()
+        self._service_conditions.clear()
+        self._host_name_patterns.clear()
+
+    def recorded_dependencies(self, config_fingerprint: str) -> BIAggregationDependencies:
+        return BIAggregationDependencies(
+            config_fingerprint=config_fingerprint,
+            host_names=frozenset(self.hosts.looked_up),
+            host_conditions=tuple(self._host_conditions.values()),
+            service_conditions=tuple(self._service_conditions.values()),
+            host_name_patterns=frozenset(self._host_name_patterns),
+        )
+
+    def search_hosts(self, conditions: dict) -> list[BIHostSearchMatch]:
+        # The host search of a service search is covered by the service conditions
+        if not self._search_depth and not _is_host_name_lookup(conditions):
+            self._host_conditions.setdefault(_conditions_key(conditions), conditions)
+        self._search_depth += 1
+        try:
+            return super().search_hosts(conditions)
+        finally:
+            self._search_depth -= 1
+
+    def search_services(self, conditions: dict) -> list[BIServiceSearchMatch]:
+        if not _is_host_name_lookup(conditions):
+            self._service_conditions.setdefault(_conditions_key(conditions), conditions)
+        self._search_depth += 1
+        try:
+            return super().search_services(conditions)
+        finally:
+            self._search_depth -= 1
+
+    def get_host_name_matches(
+        self,
+        hosts: list[BIHostData],
+        pattern: str,
+    ) -> tuple[list[BIHostData], dict]:
+        # Within a search, the host name pattern is part of the recorded search conditions
+        if not self._search_depth and is_host_name_regex(pattern):
+            self._host_name_patterns.add(pattern)
+        return super().get_host_name_matches(hosts, pattern)
+
+
+def _is_host_name_lookup(conditions: Mapping[str, Any]) -> bool:
+    """Searches for a single host name only depend on the looked up host, which is recorded"""
+    host_choice = conditions["host_choice"]
+    return host_choice["type"] == "host_name_regex" and not is_host_name_regex(
+        host_choice["pattern"]
+    )
+
+
+def _conditions_key(conditions: Mapping[str, Any]) -> str:
+    return json.dumps(conditions, sort_keys=True, default=repr)
+
+
+def config_fingerprint(bi_packs: BIAggregationPacks, aggregation: BIAggregation) -> str | None:
+    """Identify the configuration of the aggregation and all the rules it uses
+
+    Returns None in case the configuration refers to unknown rules.
+    """
+    digest = hashlib.sha256(repr(aggregation.serialize()).encode("utf-8"))
+    try:
+        rule_ids = bi_packs.get_rule_ids_of_aggregation(aggregation.id)
+        for rule_id in sorted(rule_ids):
+            digest.update(repr(bi_packs.get_rule_mandatory(rule_id).serialize()).encode("utf-8"))
+    except Exception:
+        return None
+    return digest.hexdigest()
+
+
+def affected_aggregations(
+    dependencies: Mapping[str, BIAggregationDependencies],
+    changed_hosts: Iterable[BIHostData],
+) -> set[str]:
+    """Determine the aggregations which may change due to the given hosts
+
+    The hosts are expected to contain the previous and the current version of all changed hosts.
+    """
+    # The previous and the current version of a host have the same name, search them separately
+    searchers: list[BISearcher] = []
+    for host in changed_hosts:
+        for searcher in searchers:
+            if host.name not in searcher.hosts:
+                break
+        else:
+            searcher = BISearcher()
+            searcher.set_hosts({})
+            searchers.append(searcher)
+        searcher.hosts[host.name] = host
+    if not searchers:
+        return set()
+
+    changed_host_names = {name for searcher in searchers for name in searcher.hosts}
+    return {
+        aggr_id
+        for aggr_id, aggr_dependencies in dependencies.items()
+        if not aggr_dependencies.host_names.isdisjoint(changed_host_names)
+        or any(_matches(searcher, aggr_dependencies) for searcher in searchers)
+    }
+
+
+def _matches(searcher: BISearcher, dependencies: BIAggregationDependencies) -> bool:
+    try:
+        return (
+            any(searcher.search_hosts(x) for x in dependencies.host_conditions)
+            or any(searcher.search_services(x) for x in dependencies.service_conditions)
+            or any(
+                searcher.get_host_name_matches(list(searcher.hosts.values()), x)[0]
+                for x in dependencies.host_name_patterns
+            )
+        )
+    except Exception:
+        # The conditions were valid during the compilation. Be on the safe side anyway.
+        return True
@@ -37,6 +37,11 @@ from cmk.bi.lib import ABCBISearcher, BIHostData, BIHostSearchMatch, BIServiceSe
 #   +----------------------------------------------------------------------+
 
 
+def is_host_name_regex(pattern: str) -> bool:
+    """Patterns without regex characters are looked up as host name"""
+    return any(map(lambda x: x in pattern, ["(", ")", "*", "$", "|", "[", "]"]))
+
+
 class BISearcher(ABCBISearcher):
     def set_hosts(self, hosts: dict[HostName, BIHostData]) -> None:
         self.cleanup()
@@ -85,8 +90,7 @@ class BISearcher(ABCBISearcher):
         if pattern == "(.*)":
             return hosts, self._host_match_groups(hosts)
 
-        is_regex_match = any(map(lambda x: x in pattern, ["(", ")", "*", "$", "|", "[", "]"]))
-        if not is_regex_match:
+        if not is_host_name_regex(pattern):
             host = self.hosts.get(pattern)
             if host:
                 return [host], {pattern: (pattern,)}
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 tribe29 GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Keep the status data and the computed branches of BI between computations
+
+Computing aggregations requires the states of all their hosts and services. Instead of fetching
+all of them for every computation, the state engine keeps a snapshot of the status data of each
+site and only fetches what changed since the last update:
+
+* the hosts and services which were checked since then
+* the hosts and services which entered or left a downtime, an acknowledgement or their service
+  period, which is determined by comparing the (usually few) objects having one of these
+
+The computed branches are kept as well and are only computed again, in case the status of one of
+their hosts changed. The snapshot of a site is discarded when its core was restarted or after a
+maximum age, so that changes missed by the above are corrected eventually.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Hashable, Iterable, Mapping
+from dataclasses import dataclass, field
+from typing import Final, NamedTuple
+
+from livestatus import LivestatusOutputFormat, LivestatusResponse, SiteId
+
+from cmk.utils.type_defs import HostName, ServiceName
+
+from cmk.bi.data_fetcher import BIStatusFetcher
+from cmk.bi.lib import (
+    ABCBIStatusFetcher,
+    BIHostSpec,
+    BIHostStatusInfoRow,
+    BIServiceWithFullState,
+    BIStatusInfo,
+    RequiredBIElement,
+    SitesCallback,
+)
+from cmk.bi.trees import BICompiledAggregation, BICompiledRule, NodeResultBundle
+
+# Check results are processed after the check was executed, i.e. they may show up with a check
+# time before the previous update. Besides the execution time of the check, which is tracked per
+# site, this allows for the latency of processing the result.
+_LAST_CHECK_OVERLAP: Final = 15
+_MAX_SNAPSHOT_AGE: Final = 600
+_HOST_FILTER_CHUNK_SIZE: Final = 250
+# Fetching all hosts of a site is cheaper for the core than a filter with too many host names
+_MAX_HOST_FILTER: Final = 1000
+
+_HOST_COLUMNS: Final = [
+    c for c in BIStatusFetcher.get_status_columns() if c != "services_with_fullstate"
+]
+# The order of the entries of services_with_fullstate
+_SERVICE_COLUMNS: Final = [
+    "description",
+    "state",
+    "has_been_checked",
+    "plugin_output",
+    "last_hard_state",
+    "current_attempt",
+    "max_check_attempts",
+    "scheduled_downtime_depth",
+    "acknowledged",
+    "in_service_period",
+]
+_FLAG_FILTER: Final = (
+    "Filter: scheduled_downtime_depth > 0\n"
+    "Filter: acknowledged = 1\n"
+    "Filter: in_service_period = 0\n"
+    "Or: 3\n"
+)
+
+# Downtime depth, acknowledged and in service period
+_Flags = tuple[int, bool, bool]
+_NO_FLAGS: Final[_Flags] = (0, False, True)
+
+
+@dataclass
+class _SiteSnapshot:
+    program_start: int
+    created: float
+    last_check: int
+    # The longest execution time of a check, its result may show up that late
+    execution_time: float
+    hosts: dict[HostName, BIHostStatusInfoRow] = field(default_factory=dict)
+    absent: set[HostName] = field(default_factory=set)
+    complete: bool = False
+    flags: dict[tuple[HostName, ServiceName | None], _Flags] = field(default_factory=dict)
+    generations: dict[HostName, int] = field(default_factory=dict)
+
+
+class _BranchResult(NamedTuple):
+    generation: int
+    hosts: frozenset[BIHostSpec]
+    bundle: NodeResultBundle | None
+
+
+class BIStateEngine:
+    def __init__(self, sites_callback: SitesCallback) -> None:
+        self._sites_callback = sites_callback
+        self._lock = threading.Lock()
+        self._snapshots: dict[SiteId, _SiteSnapshot] = {}
+        # The hosts of a discarded snapshot count as changed
+        self._discarded: dict[SiteId, int] = {}
+        self._generation = 0
+        self._compiled_version: Hashable | None = None
+        self._branch_results: dict[tuple[str, str], _BranchResult] = {}
+
+    def set_compiled_version(self, compiled_version: Hashable | None) -> None:
+        """Identifies the compiled aggregations. Branches are only kept with a known version."""
+        with self._lock:
+            if compiled_version is None or compiled_version != self._compiled_version:
+                self._branch_results.clear()
+            self._compiled_version = compiled_version
+
+    def update_states(self, required_elements: set[RequiredBIElement]) -> BIStatusInfo:
+        required_hosts: dict[SiteId, set[HostName]] = {}
+        for site_id, host_name, _service_description in required_elements:
+            required_hosts.setdefault(site_id, set()).add(host_name)
+
+        if not required_hosts:
+            return {}
+
+        with self._lock:
+            online_sites = self._update_snapshots(required_hosts)
+            for site_id in online_sites:
+                self._fetch_missing_hosts(
+                    self._snapshots[site_id], site_id, required_hosts[site_id]
+                )
+
+            return {
+                BIHostSpec(site_id, host_name): row
+                for site_id in online_sites
+                for host_name in required_hosts[site_id]
+                if (row := self._snapshots[site_id].hosts.get(host_name)) is not None
+            }
+
+    def compute_branches(
+        self,
+        compiled_aggregation: BICompiledAggregation,
+        branches: list[BICompiledRule],
+        bi_status_fetcher: ABCBIStatusFetcher,
+    ) -> list[NodeResultBundle]:
+        """Compute the branches whose hosts changed since they were last computed
+
+        The status data has to be fetched by update_states before.
+        """
+        assumed_state_ids = set(bi_status_fetcher.assumed_states)
+        results = []
+        with self._lock:
+            for branch in branches:
+                key = (compiled_aggregation.id, branch.properties.title)
+                if self._compiled_version is None or not assumed_state_ids.isdisjoint(
+                    branch.required_elements()
+                ):
+                    self._branch_results.pop(key, None)
+                    results.extend(
+                        compiled_aggregation.compute_branches([branch], bi_status_fetcher)
+                    )
+                    continue
+
+                if (cached := self._branch_results.get(key)) is None or not self._is_unchanged(
+                    cached
+                ):
+                    computed = compiled_aggregation.compute_branches([branch], bi_status_fetcher)
+                    cached = self._branch_results[key] = _BranchResult(
+                        self._generation,
+                        frozenset(branch.get_required_hosts()),
+                        computed[0] if computed else None,
+                    )
+                if cached.bundle is not None:
+                    results.append(cached.bundle)
+        return results
+
+    def _is_unchanged(self, branch_result: _BranchResult) -> bool:
+        return all(
+            self._host_generation(host) <= branch_result.generation for host in branch_result.hosts
+        )
+
+    def _host_generation(self, host: BIHostSpec) -> int:
+        if (snapshot := self._snapshots.get(host.site_id)) is not None and (
+            generation := snapshot.generations.get(host.host_name)
+        ) is not None:
+            return generation
+        return self._discarded.get(host.site_id, 0)
+
+    def _changed(self, snapshot: _SiteSnapshot, host_name: HostName) -> None:
+        self._generation += 1
+        snapshot.generations[host_name] = self._generation
+
+    def _discard(self, site_id: SiteId) -> None:
+        if self._snapshots.pop(site_id, None) is not None:
+            self._generation += 1
+            self._discarded[site_id] = self._generation
+
+    def _query(self, query: str, only_sites: Iterable[SiteId]) -> LivestatusResponse:
+        return self._sites_callback.query(
+            query, list(only_sites), output_format=LivestatusOutputFormat.JSON
+        )
+
+    def _update_snapshots(self, required_hosts: Mapping[SiteId, set[HostName]]) -> set[SiteId]:
+        """Bring the snapshots of the required sites up to date, returns the online sites"""
+        program_starts = {
+            site_id: int(program_start)
+            for site_id, program_start in self._query(
+                "GET status\nColumns: program_start\n", required_hosts
+            )
+        }
+        now = time.time()
+        for site_id in list(self._snapshots):
+            if (
+                site_id in required_hosts
+                and self._snapshots[site_id].program_start != program_starts.get(site_id)
+            ) or now - self._snapshots[site_id].created > _MAX_SNAPSHOT_AGE:
+                self._discard(site_id)
+
+        if updated_sites := set(self._snapshots).intersection(program_starts):
+            self._update_changed(updated_sites)
+
+        if new_sites := set(program_starts) - set(self._snapshots):
+            last_checks: dict[SiteId, int] = {}
+            execution_times: dict[SiteId, float] = {}
+            for table in ["hosts", "services"]:
+                for site_id, last_check, execution_time in self._query(
+                    f"GET {table}\nStats: max last_check\nStats: max execution_time\n", new_sites
+                ):
+                    last_checks[site_id] = max(last_checks.get(site_id, 0), int(last_check or 0))
+                    execution_times[site_id] = max(
+                        execution_times.get(site_id, 0.0), float(execution_time or 0)
+                    )
+            for site_id in new_sites:
+                self._snapshots[site_id] = _SiteSnapshot(
+                    program_start=program_starts[site_id],
+                    created=now,
+                    last_check=last_checks.get(site_id, 0),
+                    execution_time=execution_times.get(site_id, 0.0),
+                )
+            for site_id, flags in self._fetch_flags(new_sites).items():
+                self._snapshots[site_id].flags = flags
+
+        return set(program_starts).intersection(required_hosts)
+
+    def _update_changed(self, site_ids: set[SiteId]) -> None:
+        last_check = min(
+            self._snapshots[site_id].last_check - int(self._snapshots[site_id].execution_time)
+            for site_id in site_ids
+        )
+        last_check_filter = f"Filter: last_check >= {last_check - _LAST_CHECK_OVERLAP}\n"
+        host_rows = self._query(
+            "GET hosts\nColumns: %s execution_time last_check\n" % " ".join(_HOST_COLUMNS)
+            + last_check_filter,
+            site_ids,
+        )
+        service_rows = self._query(
+            "GET services\nColumns: host_name %s execution_time last_check\n"
+            % " ".join(_SERVICE_COLUMNS)
+            + last_check_filter,
+            site_ids,
+        )
+        flags = self._fetch_flags(site_ids)
+
+        for site_id, host_name, *values, execution_time, host_last_check in host_rows:
+            snapshot = self._snapshots[site_id]
+            snapshot.last_check = max(snapshot.last_check, int(host_last_check))
+            snapshot.execution_time = max(snapshot.execution_time, float(execution_time or 0))
+            if (row := snapshot.hosts.get(host_name)) is not None:
+                host_values = dict(zip(_HOST_COLUMNS[1:], values))
+                self._set_host(
+                    snapshot,
+                    host_name,
+                    row._replace(
+                        state=host_values["state"],
+                        has_been_checked=host_values["has_been_checked"],
+                        hard_state=host_values["hard_state"],
+                        plugin_output=host_values["plugin_output"],
+                        scheduled_downtime_depth=host_values["scheduled_downtime_depth"],
+                        in_service_period=host_values["in_service_period"],
+                        acknowledged=host_values["acknowledged"],
+                    ),
+                )
+
+        changed_services: dict[tuple[SiteId, HostName], dict[str, BIServiceWithFullState]] = {}
+        for (
+            site_id,
+            host_name,
+            description,
+            *values,
+            execution_time,
+            service_last_check,
+        ) in service_rows:
+            snapshot = self._snapshots[site_id]
+            snapshot.last_check = max(snapshot.last_check, int(service_last_check))
+            snapshot.execution_time = max(snapshot.execution_time, float(execution_time or 0))
+            if host_name in snapshot.hosts:
+                changed_services.setdefault((site_id, host_name), {})[
+                    description
+                ] = BIServiceWithFullState(*values)
+        for (site_id, host_name), services in changed_services.items():
+            self._set_services(self._snapshots[site_id], host_name, services)
+
+        for site_id in site_ids:
+            snapshot = self._snapshots[site_id]
+            site_flags = flags.get(site_id, {})
+            self._apply_flags(
+                snapshot,
+                {
+                    key: site_flags.get(key, _NO_FLAGS)
+                    for key in set(snapshot.flags).union(site_flags)
+                    if snapshot.flags.get(key) != site_flags.get(key)
+                },
+            )
+            snapshot.flags = site_flags
+
+    def _fetch_flags(
+        self, site_ids: set[SiteId]
+    ) -> dict[SiteId, dict[tuple[HostName, ServiceName | None], _Flags]]:
+        flags: dict[SiteId, dict[tuple[HostName, ServiceName | None], _Flags]] = {}
+        for site_id, host_name, *values in self._query(
+            "GET hosts\nColumns: name scheduled_downtime_depth acknowledged in_service_period\n"
+            + _FLAG_FILTER,
+            site_ids,
+        ):
+            flags.setdefault(site_id, {})[(host_name, None)] = _flags(values)
+        for site_id, host_name, description, *values in self._query(
+            "GET services\nColumns: host_name description scheduled_downtime_depth acknowledged"
+            " in_service_period\n" + _FLAG_FILTER,
+            site_ids,
+        ):
+            flags.setdefault(site_id, {})[(host_name, description)] = _flags(values)
+        return flags
+
+    def _apply_flags(
+        self,
+        snapshot: _SiteSnapshot,
+        changed_flags: Mapping[tuple[HostName, ServiceName | None], _Flags],
+    ) -> None:
+        changed_services: dict[HostName, dict[str, BIServiceWithFullState]] = {}
+        for (host_name, description), (
+            downtime_depth,
+            acknowledged,
+            in_period,
+        ) in changed_flags.items():
+            if (row := snapshot.hosts.get(host_name)) is None:
+                continue
+            if description is None:
+                self._set_host(
+                    snapshot,
+                    host_name,
+                    row._replace(
+                        scheduled_downtime_depth=downtime_depth,
+                        acknowledged=acknowledged,
+                        in_service_period=in_period,
+                    ),
+                )
+            elif (service := row.services_with_fullstate.get(description)) is not None:
+                changed_services.setdefault(host_name, {})[description] = service._replace(
+                    scheduled_downtime_depth=downtime_depth,
+                    acknowledged=acknowledged,
+                    in_service_period=in_period,
+                )
+        for host_name, services in changed_services.items():
+            self._set_services(snapshot, host_name, services)
+
+    def _set_host(
+        self, snapshot: _SiteSnapshot, host_name: HostName, row: BIHostStatusInfoRow
+    ) -> None:
+        if snapshot.hosts.get(host_name) != row:
+            snapshot.hosts[host_name] = row
+            self._changed(snapshot, host_name)
+
+    def _set_services(
+        self,
+        snapshot: _SiteSnapshot,
+        host_name: HostName,
+        services: Mapping[str, BIServiceWithFullState],
+    ) -> None:
+        row = snapshot.hosts[host_name]
+        if all(row.services_with_fullstate.get(d) == s for d, s in services.items()):
+            return
+        # The rows may still be in use, never modify them
+        self._set_host(
+            snapshot,
+            host_name,
+            row._replace(services_with_fullstate={**row.services_with_fullstate, **services}),
+        )
+
+    def _fetch_missing_hosts(
+        self, snapshot: _SiteSnapshot, site_id: SiteId, required_hosts: set[HostName]
+    ) -> None:
+        if snapshot.complete:
+            return
+        missing_hosts = sorted(required_hosts - snapshot.hosts.keys() - snapshot.absent)
+        if not missing_hosts:
+            return
+
+        query = "GET hosts\nColumns: %s\n" % " ".join(BIStatusFetcher.get_status_columns())
+        if len(missing_hosts) > _MAX_HOST_FILTER:
+            rows = self._query(query, [site_id])
+            snapshot.complete = True
+        else:
+            rows = LivestatusResponse([])
+            for start in range(0, len(missing_hosts), _HOST_FILTER_CHUNK_SIZE):
+                chunk = missing_hosts[start : start + _HOST_FILTER_CHUNK_SIZE]
+                host_filter = "".join(f"Filter: name = {host_name}\n" for host_name in chunk)
+                if len(chunk) > 1:
+                    host_filter += "Or: %d\n" % len(chunk)
+                rows.extend(self._query(query + host_filter, [site_id]))
+
+        for (_site_id, host_name), row in BIStatusFetcher.create_bi_status_data(rows).items():
+            snapshot.hosts[host_name] = row
+            self._changed(snapshot, host_name)
+        snapshot.absent.update(set(missing_hosts) - snapshot.hosts.keys())
+
+
+def _flags(values: list) -> _Flags:
+    downtime_depth, acknowledged, in_period = values
+    return int(downtime_depth), bool(acknowledged), bool(in_period)
@@ -4,15 +4,19 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import contextlib
+import math
+import mmap
 import os
 import shlex
 import subprocess
 import threading
 import time
-from collections.abc import Callable, Iterable, Sequence
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Callable, Collection, Iterable, Iterator, Sequence
 from logging import Logger
 from pathlib import Path
-from typing import Any, Literal
+from typing import Any, Final, Literal
 
 from typing_extensions import assert_never
 
@@ -65,6 +69,7 @@ class History:
         self._lock = threading.Lock()
         self._mongodb = MongoDB()
         self._active_history_period = ActiveHistoryPeriod()
+        self._file_indexes: dict[Path, HistoryFileIndex] = {}
         self.reload_configuration(config)
 
     def reload_configuration(self, config: Config) -> None:
@@ -353,13 +358,23 @@ def _add_files(history: History, event: Event, what: HistoryWhat, who: str, addi
             for colname, defval in history._event_columns
         ]
 
-        with get_logfile(
+        path = get_logfile(
             history._config,
             history._settings.paths.history_dir.value,
             history._active_history_period,
-        ).open(mode="ab") as f:
+        )
+        with path.open(mode="ab") as f:
             f.write(b"\t".join(columns) + b"\n")
 
+        # Keep an index which is in use up to date. Indexes which have not been used yet are
+        # caught up with the file when they are needed for the first time.
+        if (index := history._file_indexes.get(path)) is not None:
+            try:
+                index.update(blocking=False)
+            except OSError as e:
+                # E.g. the file has been expired meanwhile. The next query catches up.
+                history._logger.warning("Cannot update index of history file %s: %s", path, e)
+
 
 def quote_tab(col: Any) -> bytes:
     ty = type(col)
@@ -449,6 +464,7 @@ def _expire_logfiles(
                         "Deleting log file %s (age %s)", path, date_and_time(path.stat().st_mtime)
                     )
                     path.unlink()
+                    path.with_suffix(HistoryFileIndex.SUFFIX).unlink(missing_ok=True)
         except Exception as e:
             if settings.options.debug:
                 raise
@@ -512,8 +528,6 @@ def _get_files(history: History, logger: Logger, query: QueryGET) -> Iterable[An
     limit = query.limit
     logger.debug("Limit: %r", limit)
 
-    grep_pipeline = _grep_pipeline(filters)
-
     time_filters = [
         (operator_name, argument)
         for column_name, operator_name, _predicate, argument in filters
@@ -525,37 +539,362 @@ def _get_files(history: History, logger: Logger, query: QueryGET) -> Iterable[An
     )
     logger.debug("time range: %r", time_range)
 
+    paths = sorted(history._settings.paths.history_dir.value.glob("*.log"), reverse=True)
+    with history._lock:
+        # Forget about the indexes of expired files
+        for path in set(history._file_indexes) - set(paths):
+            del history._file_indexes[path]
+
+    return _stream_files(history, logger, query, paths, time_range)
+
+
+def _stream_files(
+    history: History,
+    logger: Logger,
+    query: QueryGET,
+    paths: Sequence[Path],
+    time_range: tuple[float | None, float | None],
+) -> Iterator[Any]:
     # We do not want to open all files. So our strategy is:
     # look for "time" filters and first apply the filter to
     # the first entry and modification time of the file. Only
     # if at least one of both timestamps is accepted then we
     # take that file into account.
     # Use the later logfiles first, to get the newer log entries
-    # first. When a limit is reached, the newer entries should
-    # be processed in most cases. We assume that now.
-    # To keep a consistent order of log entries, we should care
-    # about sorting the log lines in reverse, but that seems to
-    # already be done by the GUI, so we don't do that twice. Skipping
-    # this # will lead into some lines of a single file to be limited in
-    # wrong order. But this should be better than before.
-    history_entries: list[Any] = []
-    for path in sorted(history._settings.paths.history_dir.value.glob("*.log"), reverse=True):
-        if limit is not None and limit <= 0:
+    # first. Within a file the lines are processed in reverse order,
+    # so that the newest entries are returned first. The entries are
+    # streamed: When the consumer has got enough of them (e.g. because
+    # of a Limit: header), no further lines are read.
+    remaining = query.limit
+    for path in paths:
+        if remaining is not None and remaining <= 0:
             logger.debug("query limit reached")
-            break
+            return
         if not _intersects(time_range, _get_logfile_timespan(path)):
             logger.debug("skipping history file %s because of time filters", path)
             continue
-        tac = f"nl -b a {shlex.quote(str(path))} | tac"  # Process younger lines first
-        cmd = " | ".join([tac] + grep_pipeline)
-        logger.debug("preprocessing history file with command [%s]", cmd)
-        new_entries = parse_history_file(
-            history._history_columns, path, query.filter_row, cmd, limit, logger
+        with history._lock:
+            if (index := history._file_indexes.get(path)) is None:
+                index = history._file_indexes[path] = HistoryFileIndex(
+                    path, history._history_columns, logger
+                )
+        try:
+            entries: Iterable[Any] = index.query(query.filters, time_range, query.filter_row)
+        except OSError:
+            logger.exception("Cannot use index of history file %s, falling back to grep", path)
+            entries = _grep_history_file(history, logger, query, path, remaining)
+
+        for entry in entries:
+            yield entry
+            if remaining is not None:
+                remaining -= 1
+                if remaining <= 0:
+                    break
+
+
+def _grep_history_file(
+    history: History,
+    logger: Logger,
+    query: QueryGET,
+    path: Path,
+    limit: int | None,
+) -> list[Any]:
+    tac = f"nl -b a {shlex.quote(str(path))} | tac"  # Process younger lines first
+    cmd = " | ".join([tac] + _grep_pipeline(query.filters))
+    logger.debug("preprocessing history file with command [%s]", cmd)
+    return parse_history_file(history._history_columns, path, query.filter_row, cmd, limit, logger)
+
+
+# Columns of the history which are indexed and their position in a history line
+_INDEXED_COLUMNS: Final = {
+    "event_id": 5,
+    "event_host": 12,
+    "event_application": 14,
+    "event_rule_id": 18,
+    "event_state": 19,
+}
+# Columns with few distinct values, their lines are indexed per value. The event IDs are nearly
+# unique per line, they are kept in a sorted array instead.
+_VALUE_INDEXED_COLUMNS: Final = ("event_host", "event_application", "event_rule_id", "event_state")
+# An entry of the event ID index: The event ID in the upper, the line index in the lower bits
+_LINE_INDEX_BITS: Final = 32
+
+
+class HistoryFileIndex:
+    """Line offsets, times and inverted indexes of some columns of a history file
+
+    The index is used to read only the lines of a history file which may match the filters of a
+    query. Time filters are resolved with a binary search over the times of the lines, equality
+    and range filters on the event ID with a binary search over the sorted event IDs, and filters
+    on the columns in _VALUE_INDEXED_COLUMNS with the distinct values of the column.
+
+    The index is persisted next to the history file with the suffix ".idx": One line per history
+    line with the offset of the line, its time and the values of the indexed columns, separated
+    by tabs. Both files are only appended to, so the index is extended by indexing the lines
+    which have been appended to the history file since the last update.
+    """
+
+    SUFFIX: Final = ".idx"
+
+    def __init__(self, path: Path, history_columns: Columns, logger: Logger) -> None:
+        self._path = path
+        self._index_path = path.with_suffix(self.SUFFIX)
+        self._history_columns = history_columns
+        self._logger = logger
+        # Building the index of a big file takes some time, only the user of the index waits
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._reset()
+
+    def _reset(self) -> None:
+        self._size = 0  # Number of bytes of the history file which are indexed
+        self._inode: int | None = None
+        self._offsets = array("q")
+        self._times = array("d")
+        self._times_sorted = True
+        self._invalid: set[int] = set()
+        self._event_ids = array("q")
+        self._values: dict[str, dict[Any, array]] = {name: {} for name in _VALUE_INDEXED_COLUMNS}
+
+    def update(self, blocking: bool = True) -> None:
+        """Index the lines which have been appended to the history file
+
+        Without blocking nothing is done while the index is in use, the lines are indexed with
+        the next update then."""
+        if not self._lock.acquire(blocking):
+            return
+        try:
+            self._update()
+        finally:
+            self._lock.release()
+
+    def query(
+        self,
+        filters: Sequence[tuple[str, OperatorName, Callable[[Any], bool], Any]],
+        time_range: tuple[float | None, float | None],
+        filter_row: Callable[[Sequence[Any]], bool],
+    ) -> Iterator[list[Any]]:
+        """Read the lines matching the filters, the last line first
+
+        Only the lines which may match the indexed filters are read and converted, filter_row
+        decides about the rest."""
+        with self._lock:
+            self._update()
+            line_indexes = self._line_indexes(filters, time_range)
+            # The index may be extended while the lines are read
+            offsets = self._offsets
+            num_lines = len(offsets)
+            size = self._size
+            invalid = set(self._invalid)
+        return self._read_lines(line_indexes, offsets, num_lines, size, invalid, filter_row)
+
+    def _update(self) -> None:
+        stat = self._path.stat()
+        if self._inode is not None and (stat.st_ino != self._inode or stat.st_size < self._size):
+            # The history file has been replaced, start from scratch
+            self._reset()
+            self._index_path.unlink(missing_ok=True)
+        self._inode = stat.st_ino
+
+        if not self._loaded:
+            self._load(stat.st_size)
+            self._loaded = True
+
+        if stat.st_size == self._size:
+            return
+
+        with self._path.open("rb") as f:
+            f.seek(self._size)
+            data = f.read(stat.st_size - self._size)
+        # Only complete lines are indexed, a partially written line is indexed with the next update
+        data = data[: data.rfind(b"\n") + 1]
+        if not data:
+            return
+
+        records = []
+        offset = self._size
+        for line in data.splitlines(keepends=True):
+            records.append(self._add_line(offset, line))
+            offset += len(line)
+        self._size = offset
+
+        with self._index_path.open("ab") as f:
+            f.write(b"".join(records))
+
+    def _load(self, history_size: int) -> None:
+        try:
+            with self._index_path.open("rb") as f:
+                records = f.read()
+        except FileNotFoundError:
+            return
+
+        # Records of lines which do not exist (anymore) are dropped, they are written again
+        valid_length = 0
+        for record in records.splitlines(keepends=True):
+            if not record.endswith(b"\n"):
+                break
+            offset_text, *fields = record.decode("utf-8").rstrip("\n").split("\t")
+            if (offset := int(offset_text)) >= history_size:
+                break
+            if fields:
+                self._add(offset, float(fields[0]), fields[1:])
+            else:
+                self._add_invalid(offset)
+            valid_length += len(record)
+
+        if self._offsets:
+            # The end of the last indexed line is the start of the next one
+            with self._path.open("rb") as f:
+                f.seek(self._offsets[-1])
+                last_line = f.readline()
+            if not last_line.endswith(b"\n"):
+                # Do not trust an index which does not fit the file
+                self._logger.warning("Rebuilding mismatching index of history file %s", self._path)
+                self._reset()
+                valid_length = 0
+            else:
+                self._size = self._offsets[-1] + len(last_line)
+
+        with self._index_path.open("rb+") as f:
+            f.truncate(valid_length)
+
+    def _add_line(self, offset: int, line: bytes) -> bytes:
+        try:
+            values = self._parse_line(len(self._offsets) + 1, line)
+        except Exception:
+            self._logger.exception(f"Invalid line '{line!r}' in history file {self._path}")
+            self._add_invalid(offset)
+            return b"%d\n" % offset
+
+        fields = [str(values[position]) for position in _INDEXED_COLUMNS.values()]
+        self._add(offset, values[1], fields)
+        return ("\t".join([str(offset), repr(values[1]), *fields]) + "\n").encode("utf-8")
+
+    def _parse_line(self, line_number: int, line: bytes) -> list[Any]:
+        values: list[Any] = [line_number, *line.decode("utf-8").rstrip("\n").split("\t")]
+        convert_history_line(self._history_columns, values)
+        return values
+
+    def _add(self, offset: int, line_time: float, fields: Sequence[str]) -> None:
+        line_index = len(self._offsets)
+        if self._times and line_time < self._times[-1]:
+            self._times_sorted = False
+        self._offsets.append(offset)
+        self._times.append(line_time)
+        for (name, position), field in zip(_INDEXED_COLUMNS.items(), fields):
+            if name == "event_id":
+                entry = int(field) << _LINE_INDEX_BITS | line_index
+                # The IDs of new events are increasing, only updates of older events are inserted
+                if self._event_ids and entry < self._event_ids[-1]:
+                    insort(self._event_ids, entry)
+                else:
+                    self._event_ids.append(entry)
+                continue
+            # event_state is a number, all others are texts
+            value = int(field) if isinstance(self._history_columns[position][1], int) else field
+            if (line_indexes := self._values[name].get(value)) is None:
+                line_indexes = self._values[name][value] = array("I")
+            line_indexes.append(line_index)
+
+    def _add_invalid(self, offset: int) -> None:
+        self._invalid.add(len(self._offsets))
+        self._offsets.append(offset)
+        # Keep the times sorted, the line is never returned anyways
+        self._times.append(self._times[-1] if self._times else -math.inf)
+
+    def _line_indexes(
+        self,
+        filters: Sequence[tuple[str, OperatorName, Callable[[Any], bool], Any]],
+        time_range: tuple[float | None, float | None],
+    ) -> Sequence[int]:
+        low, high = 0, len(self._offsets)
+        if self._times_sorted:
+            lower_bound, upper_bound = time_range
+            if lower_bound is not None:
+                low = bisect_left(self._times, lower_bound)
+            if upper_bound is not None:
+                high = bisect_right(self._times, upper_bound)
+
+        candidates: set[int] | None = None
+        for column_name, operator_name, predicate, argument in filters:
+            if column_name == "event_id":
+                matching = self._lines_of_event_ids(operator_name, argument)
+            elif (values := self._values.get(column_name)) is not None:
+                matching = [
+                    line_indexes
+                    for value, line_indexes in values.items()
+                    if _matches(predicate, value)
+                ]
+            else:
+                continue
+            if matching is None or sum(len(lines) for lines in matching) > (high - low) // 2:
+                continue  # Not selective, reading the lines is cheaper
+            matching_lines = {i for line_indexes in matching for i in line_indexes}
+            candidates = matching_lines if candidates is None else candidates & matching_lines
+
+        if candidates is None:
+            return range(high - 1, low - 1, -1)
+        return sorted((i for i in candidates if low <= i < high), reverse=True)
+
+    def _lines_of_event_ids(
+        self, operator_name: OperatorName, argument: Any
+    ) -> Sequence[Collection[int]] | None:
+        """The lines of the events matching the filter, None if it can not be looked up"""
+        lower: int | None = None
+        upper: int | None = None
+        if operator_name in ("=", ">="):
+            lower = argument
+        elif operator_name == ">":
+            lower = argument + 1
+        if operator_name in ("=", "<="):
+            upper = argument + 1
+        elif operator_name == "<":
+            upper = argument
+        if lower is None and upper is None:
+            return None
+
+        event_ids = self._event_ids
+        begin = 0 if lower is None else bisect_left(event_ids, lower << _LINE_INDEX_BITS)
+        end = (
+            len(event_ids)
+            if upper is None
+            else bisect_left(event_ids, upper << _LINE_INDEX_BITS, lo=begin)
         )
-        history_entries += new_entries
-        if limit is not None:
-            limit -= len(new_entries)
-    return history_entries
+        line_index_mask = (1 << _LINE_INDEX_BITS) - 1
+        return [[entry & line_index_mask for entry in event_ids[begin:end]]]
+
+    def _read_lines(
+        self,
+        line_indexes: Sequence[int],
+        offsets: Sequence[int],
+        num_lines: int,
+        size: int,
+        invalid: set[int],
+        filter_row: Callable[[Sequence[Any]], bool],
+    ) -> Iterator[list[Any]]:
+        if not line_indexes:
+            return
+        with self._path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line_index in line_indexes:
+                if line_index in invalid:
+                    continue
+                end = size if line_index == num_lines - 1 else offsets[line_index + 1]
+                line = mm[offsets[line_index] : end]
+                try:
+                    values = self._parse_line(line_index + 1, line)
+                except Exception:
+                    self._logger.exception(f"Invalid line '{line!r}' in history file {self._path}")
+                    continue
+                if filter_row(values):
+                    yield values
+
+
+def _matches(predicate: Callable[[Any], bool], value: Any) -> bool:
+    try:
+        return predicate(value)
+    except Exception:
+        # Let the filtering of the rows decide
+        return True
 
 
 def _greatest_lower_bound_for_filters(
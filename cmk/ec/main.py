@@ -73,6 +73,7 @@ from .perfcounters import Perfcounters
 from .query import filter_operator_in, MKClientError, Query, QueryCOMMAND, QueryGET, QueryREPLICATE
 from .rule_matcher import match, MatchFailure, MatchResult, MatchSuccess, RuleMatcher
 from .rule_packs import load_config as load_config_using
+from .rule_prefilter import PrefilterStats, RulePrefilter
 from .settings import FileDescriptor, PortNumber, Settings
 from .settings import settings as create_settings
 from .snmp import SNMPTrapEngine
@@ -400,6 +401,8 @@ class EventServer(ECServerThread):
         self._hash_stats = []
         for _unused_facility in range(32):
             self._hash_stats.append([0] * 8)
+        self._rule_prefilter = RulePrefilter([])
+        self._prefilter_stats = PrefilterStats()
 
         self.host_config = HostConfig(self._logger)
         self._perfcounters = perfcounters
@@ -1218,12 +1221,18 @@ class EventServer(ECServerThread):
             "Compiled %d active rules (ignoring %d disabled rules)", count_rules, count_disabled
         )
         if self._config["rule_optimizer"]:
+            self._rule_prefilter = RulePrefilter(self._rules)
             self._logger.info(
                 "Rule hash: %d rules - %d hashed, %d unspecific",
                 len(self._rules),
                 len(self._rules) - count_unspecific,
                 count_unspecific,
             )
+            self._logger.info(
+                "Rule prefilter: %d rules - %d with required literals",
+                len(self._rules),
+                self._rule_prefilter.num_filtered_rules,
+            )
             for facility in list(range(23)) + [31]:
                 if facility in self._rule_hash:
                     stats = []
@@ -1300,6 +1309,17 @@ class EventServer(ECServerThread):
                 (100.0 * count / float(total_count)),
             )
 
+        stats = self._prefilter_stats
+        if stats.rules_before:
+            self._logger.info(
+                "Rule prefilter: %d events, %.1f rules per event before and %.1f after prefiltering"
+                " (%.2f%% skipped)",
+                stats.events,
+                stats.rules_before / stats.events,
+                stats.rules_after / stats.events,
+                100.0 * (stats.rules_before - stats.rules_after) / stats.rules_before,
+            )
+
     def process_line(self, line: str, address: tuple[str, int] | None) -> None:
         self.process_event(
             create_event_from_line(line, address, self._logger, verbose=self._config["debug_rules"])
@@ -1315,7 +1335,11 @@ class EventServer(ECServerThread):
         # Rule optimizer
         if self._config["rule_optimizer"]:
             self._hash_stats[event["facility"]][event["priority"]] += 1
-            rule_candidates = self._rule_hash.get(event["facility"], {}).get(event["priority"], [])
+            hashed_rules = self._rule_hash.get(event["facility"], {}).get(event["priority"], [])
+            rule_candidates = self._rule_prefilter.filter(
+                (event["facility"], event["priority"]), hashed_rules, event
+            )
+            self._prefilter_stats.count(len(hashed_rules), len(rule_candidates))
         else:
             rule_candidates = self._rules
 
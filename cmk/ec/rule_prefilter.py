@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 tribe29 GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Preselect the rules which can match an event
+
+Most rules can only match an event if its message, syslog application or host name contains a
+certain literal text, e.g. the rule with the message pattern "disk (full|error)" needs "disk" in
+the message. The literals of all rules are searched in an event at once, only the rules whose
+literals occur need to be evaluated.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Any, Final, Literal, TypeVar
+
+from .config import Rule, TextPattern
+from .event import Event
+
+# The parser of the re module is not public, but it is the only way to analyze a pattern
+sre_parser: Any = re._parser  # type: ignore[attr-defined]
+sre_constants: Any = re._constants  # type: ignore[attr-defined]
+
+EventField = Literal["text", "application", "host"]
+
+_PatternKey = Literal["match", "match_ok", "match_application", "cancel_application", "match_host"]
+
+# The rule keys restricting an event field. A field is only restricted in case the first key is
+# present, a rule matches in case any of the present patterns matches.
+_FIELD_KEYS: Final[Mapping[EventField, tuple[Sequence[_PatternKey], Sequence[_PatternKey]]]] = {
+    "text": (["match"], ["match", "match_ok"]),
+    "application": (
+        ["match_application", "cancel_application"],
+        ["match_application", "cancel_application"],
+    ),
+    "host": (["match_host"], ["match_host"]),
+}
+
+_RuleT = TypeVar("_RuleT")
+
+# A prefix of a required literal is required as well. Limiting the length keeps the matcher small.
+_MAX_LITERAL_LENGTH: Final = 32
+
+
+@dataclass
+class PrefilterStats:
+    events: int = 0
+    rules_before: int = 0
+    rules_after: int = 0
+
+    def count(self, rules_before: int, rules_after: int) -> None:
+        self.events += 1
+        self.rules_before += rules_before
+        self.rules_after += rules_after
+
+
+@dataclass
+class _BucketIndex:
+    unfiltered: list[int] = field(default_factory=list)
+    by_literal: dict[tuple[EventField, str], list[int]] = field(default_factory=dict)
+
+
+class RulePrefilter:
+    def __init__(self, rules: Iterable[Rule]) -> None:
+        self._requirements: dict[int, tuple[EventField, frozenset[str]]] = {}
+        literals: dict[EventField, set[str]] = {"text": set(), "application": set(), "host": set()}
+        for rule in rules:
+            if (requirement := rule_requirement(rule)) is not None:
+                self._requirements[id(rule)] = requirement
+                literals[requirement[0]].update(requirement[1])
+
+        self._matchers = {
+            event_field: _LiteralMatcher(field_literals)
+            for event_field, field_literals in literals.items()
+            if field_literals
+        }
+        self._bucket_indexes: dict[object, _BucketIndex] = {}
+
+    @property
+    def num_filtered_rules(self) -> int:
+        return len(self._requirements)
+
+    def filter(self, bucket_id: object, rules: Sequence[_RuleT], event: Event) -> Sequence[_RuleT]:
+        """Return the rules which can match the event, keeping their order
+
+        The index of the given rules is built on first use and cached by the given bucket ID.
+        """
+        if (found := self._found_literals(event)) is None:
+            return rules
+
+        if (index := self._bucket_indexes.get(bucket_id)) is None:
+            index = self._bucket_indexes[bucket_id] = self._make_bucket_index(rules)
+        if not index.by_literal:
+            return rules
+
+        positions = list(index.unfiltered)
+        for literal in found:
+            positions.extend(index.by_literal.get(literal, ()))
+        return [rules[position] for position in sorted(set(positions))]
+
+    def _make_bucket_index(self, rules: Sequence[object]) -> _BucketIndex:
+        index = _BucketIndex()
+        for position, rule in enumerate(rules):
+            if (requirement := self._requirements.get(id(rule))) is None:
+                index.unfiltered.append(position)
+                continue
+            event_field, literals = requirement
+            for literal in literals:
+                index.by_literal.setdefault((event_field, literal), []).append(position)
+        return index
+
+    def _found_literals(self, event: Event) -> set[tuple[EventField, str]] | None:
+        """Find the required literals contained in the event
+
+        The literals are compared with the lower case text, which is only equivalent to matching
+        case insensitive for ASCII texts. Non ASCII events are not filtered.
+        """
+        found: set[tuple[EventField, str]] = set()
+        for event_field, matcher in self._matchers.items():
+            text = event[event_field]
+            if not text.isascii():
+                return None
+            found.update((event_field, literal) for literal in matcher.find_all(text.lower()))
+        return found
+
+
+class _LiteralMatcher:
+    """Find all occurrences of many literals at once, also overlapping ones
+
+    The literals are combined in a single regular expression, structured as prefix tree. It is
+    searched as look ahead at every position of the text and finds the longest literal starting
+    there. The shorter literals starting at the same position are the prefixes of the longest one.
+    """
+
+    def __init__(self, literals: Iterable[str]) -> None:
+        tree: dict[str, Any] = {}
+        for literal in literals:
+            node = tree
+            for char in literal:
+                node = node.setdefault(char, {})
+            node[""] = {}
+        self._regex = re.compile(f"(?=({_tree_pattern(tree)}))")
+        self._prefixes = dict(_prefixes(tree))
+
+    def find_all(self, text: str) -> set[str]:
+        found: set[str] = set()
+        for match in self._regex.finditer(text):
+            found.update(self._prefixes[match.group(1)])
+        return found
+
+
+def _tree_pattern(tree: Mapping[str, Any]) -> str:
+    alternatives = [
+        re.escape(char) + _tree_pattern(subtree) for char, subtree in sorted(tree.items()) if char
+    ]
+    if not alternatives:
+        return ""
+    pattern = alternatives[0] if len(alternatives) == 1 else f"(?:{'|'.join(alternatives)})"
+    if "" in tree:
+        return f"(?:{pattern})?"
+    return pattern
+
+
+def _prefixes(tree: Mapping[str, Any]) -> Iterator[tuple[str, frozenset[str]]]:
+    """The literals ending on the path to each literal, including the literal itself"""
+    stack = [(tree, "", frozenset[str]())]
+    while stack:
+        node, prefix, found = stack.pop()
+        if "" in node:
+            found = found | {prefix}
+            yield prefix, found
+        for char, subtree in node.items():
+            if char:
+                stack.append((subtree, prefix + char, found))
+
+
+def rule_requirement(rule: Rule) -> tuple[EventField, frozenset[str]] | None:
+    """Determine the literals of which one is contained in each event the rule matches
+
+    Out of the restricted event fields, the one with the longest literals is chosen.
+    """
+    if rule.get("invert_matching"):
+        return None
+
+    best: tuple[EventField, frozenset[str]] | None = None
+    for event_field, (required_keys, keys) in _FIELD_KEYS.items():
+        if not any(key in rule for key in required_keys):
+            continue
+        literals: set[str] = set()
+        for key in keys:
+            if key not in rule:
+                continue
+            if (pattern_literals := required_literals(rule[key])) is None:
+                break
+            literals.update(pattern_literals)
+        else:
+            if best is None or _shortest(literals) > _shortest(best[1]):
+                best = event_field, frozenset(literals)
+    return best
+
+
+def _shortest(literals: Iterable[str]) -> int:
+    return min(len(literal) for literal in literals)
+
+
+def required_literals(pattern: TextPattern) -> frozenset[str] | None:
+    """Determine the lower case literals of which one is contained in each matching text
+
+    Returns None in case no such literals could be found.
+    """
+    if pattern is None:
+        return None
+    if isinstance(pattern, str):
+        # Textual patterns are already in lower case
+        return frozenset([pattern[:_MAX_LITERAL_LENGTH]]) if pattern and pattern.isascii() else None
+    try:
+        parsed = sre_parser.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return None
+    return _sequence_literals(parsed)
+
+
+def _sequence_literals(items: Iterable[tuple[Any, Any]]) -> frozenset[str] | None:
+    """The most selective literals required by a sequence of regex items"""
+    best: frozenset[str] | None = None
+    run: list[str] = []
+
+    def add_candidate(candidate: frozenset[str] | None) -> None:
+        nonlocal best
+        if candidate and (best is None or _shortest(candidate) > _shortest(best)):
+            best = candidate
+
+    def end_run() -> None:
+        if run:
+            add_candidate(frozenset(["".join(run).lower()[:_MAX_LITERAL_LENGTH]]))
+            run.clear()
+
+    for op, av in items:
+        if op is sre_constants.LITERAL and chr(av).isascii():
+            run.append(chr(av))
+            continue
+        if op is sre_constants.AT:
+            continue  # Anchors do not consume characters
+
+        end_run()
+        if op is sre_constants.SUBPATTERN:
+            add_candidate(_sequence_literals(av[3]))
+        elif op is sre_constants.ATOMIC_GROUP:
+            add_candidate(_sequence_literals(av))
+        elif op in (
+            sre_constants.MAX_REPEAT,
+            sre_constants.MIN_REPEAT,
+            sre_constants.POSSESSIVE_REPEAT,
+        ):
+            if av[0] >= 1:
+                add_candidate(_sequence_literals(av[2]))
+        elif op is sre_constants.BRANCH:
+            add_candidate(_branch_literals(av[1]))
+    end_run()
+    return best
+
+
+def _branch_literals(branches: Iterable[Iterable[tuple[Any, Any]]]) -> frozenset[str] | None:
+    literals: set[str] = set()
+    for branch in branches:
+        if (branch_literals := _sequence_literals(branch)) is None:
+            return None
+        literals.update(branch_literals)
+    return frozenset(literals)
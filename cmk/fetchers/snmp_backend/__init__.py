@@ -5,6 +5,6 @@
 """Home of our open source SNMP backends."""
 
 from .classic import ClassicSNMPBackend
-from .stored_walk import StoredWalkSNMPBackend
+from .stored_walk import StoredWalkSNMPBackend, WalkIndex
 
-__all__ = ["ClassicSNMPBackend", "StoredWalkSNMPBackend"]
+__all__ = ["ClassicSNMPBackend", "StoredWalkSNMPBackend", "WalkIndex"]
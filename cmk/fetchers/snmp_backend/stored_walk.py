@@ -4,11 +4,16 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 """Abstract classes and types."""
 
-from collections.abc import Sequence
+import bisect
+import mmap
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
 from pathlib import Path
+from typing import BinaryIO, Final, NamedTuple
 
 import cmk.utils.agent_simulator as agent_simulator
 import cmk.utils.paths
+import cmk.utils.store as store
 from cmk.utils.exceptions import MKGeneralException, MKSNMPError
 from cmk.utils.log import console
 from cmk.utils.type_defs import AgentRawData, SectionName
@@ -17,10 +22,159 @@ from cmk.snmplib.type_defs import OID, SNMPBackend, SNMPContextName, SNMPRawValu
 
 from ._utils import strip_snmp_value
 
-__all__ = ["StoredWalkSNMPBackend"]
+__all__ = ["StoredWalkSNMPBackend", "WalkIndex"]
+
+_BinOID = tuple[int, ...]
+
+# Every cached walk keeps its walk file mapped. Processes handling many hosts (e.g. the
+# keepalive fetchers) only keep the most recently used ones.
+_MAX_CACHED_WALK_INDEXES: Final = 64
+
+
+class _WalkIndexData(NamedTuple):
+    """The persisted index of a walk file
+
+    The entries are sorted by the numeric OID. Each entry points to the byte range
+    of the line (including continuation lines) in the walk file.
+    """
+
+    mtime_ns: int
+    size: int
+    oids: Sequence[_BinOID]
+    offsets: Sequence[tuple[int, int]]
+
+
+class WalkIndex:
+    """Stored walk with the OIDs sorted numerically for prefix lookups
+
+    The lines are fetched on demand via `get_line`, which is either backed by a
+    list of lines or by a memory mapped walk file.
+    """
+
+    def __init__(self, oids: Sequence[_BinOID], get_line: Callable[[int], str]) -> None:
+        self.oids: Final = oids
+        self._get_line: Final = get_line
+
+    def __len__(self) -> int:
+        return len(self.oids)
+
+    def find_prefix(self, oid_prefix: _BinOID) -> range:
+        """Positions of the OID itself and all OIDs below it"""
+        begin = bisect.bisect_left(self.oids, oid_prefix)
+        if not oid_prefix:
+            return range(begin, len(self.oids))
+        end = bisect.bisect_left(
+            self.oids, oid_prefix[:-1] + (oid_prefix[-1] + 1,), lo=begin, hi=len(self.oids)
+        )
+        return range(begin, end)
+
+    def line(self, index: int) -> str:
+        return self._get_line(index)
+
+    @classmethod
+    def from_lines(cls, lines: Sequence[str]) -> "WalkIndex":
+        entries = sorted(
+            (
+                (StoredWalkSNMPBackend._to_bin_string(line.split(None, 1)[0]), index)
+                for index, line in enumerate(lines)
+                if line.strip()
+            ),
+            key=lambda entry: entry[0],
+        )
+        positions = [index for _oid, index in entries]
+        return cls([oid for oid, _index in entries], lambda index: lines[positions[index]])
+
+    @classmethod
+    def from_path(cls, path: Path) -> "WalkIndex":
+        """Memory map the walk file and look up its lines via the sidecar index
+
+        The index is rebuilt if the walk file has been modified since it was created.
+        """
+        try:
+            with path.open("rb") as f:
+                stat = path.stat()
+                index_data = _load_walk_index(path, stat.st_mtime_ns, stat.st_size)
+                if index_data is None:
+                    index_data = _build_walk_index(f, stat.st_mtime_ns, stat.st_size)
+                    _save_walk_index(path, index_data)
+                # An empty file can not be mapped. There are no lines to look up anyways.
+                data: mmap.mmap | bytes = (
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b""
+                )
+        except OSError:
+            raise MKSNMPError("No snmpwalk file %s" % path)
+
+        offsets = index_data.offsets
+
+        def get_line(index: int) -> str:
+            start, end = offsets[index]
+            return data[start:end].decode()
+
+        return cls(index_data.oids, get_line)
+
+
+def _walk_index_path(path: Path) -> Path:
+    return cmk.utils.paths.snmpwalks_index_dir / path.name
+
+
+def _load_walk_index(path: Path, mtime_ns: int, size: int) -> _WalkIndexData | None:
+    try:
+        index_data = store.ObjectStore(
+            _walk_index_path(path), serializer=store.PickleSerializer[_WalkIndexData | None]()
+        ).read_obj(default=None)
+    except Exception:  # pylint: disable=broad-except
+        return None  # Broken index, simply rebuild it
+    if index_data is None or (index_data.mtime_ns, index_data.size) != (mtime_ns, size):
+        return None
+    return index_data
+
+
+def _save_walk_index(path: Path, index_data: _WalkIndexData) -> None:
+    index_path = _walk_index_path(path)
+    try:
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        store.ObjectStore(
+            index_path, serializer=store.PickleSerializer[_WalkIndexData]()
+        ).write_obj(index_data)
+    except OSError as e:
+        # The index is only an optimization. Don't fail in case it can not be written.
+        console.verbose(f"Cannot write walk index {index_path}: {e}\n")
+
+
+def _build_walk_index(f: BinaryIO, mtime_ns: int, size: int) -> _WalkIndexData:
+    console.vverbose(f"  Indexing {f.name}\n")
+    entries: list[tuple[_BinOID, int, int]] = []
+    offset = 0
+    for raw_line in f:
+        # Sometimes there are newlines in the data of snmpwalks.
+        # Append the data to the last OID rather than throwing it away/skipping it.
+        if raw_line.startswith(b"."):
+            entries.append(
+                (
+                    StoredWalkSNMPBackend._to_bin_string(raw_line.split(None, 1)[0].decode()),
+                    offset,
+                    offset + len(raw_line),
+                )
+            )
+        elif entries:
+            oid, start, _end = entries[-1]
+            entries[-1] = oid, start, offset + len(raw_line)
+        offset += len(raw_line)
+
+    entries.sort(key=lambda entry: entry[0])
+    return _WalkIndexData(
+        mtime_ns=mtime_ns,
+        size=size,
+        oids=[oid for oid, _start, _end in entries],
+        offsets=[(start, end) for _oid, start, end in entries],
+    )
 
 
 class StoredWalkSNMPBackend(SNMPBackend):
+    # The walk files are memory mapped, so keeping them open per process is cheap. The least
+    # recently used ones are evicted, see _MAX_CACHED_WALK_INDEXES.
+    _walk_index_cache: OrderedDict[Path, tuple[tuple[int, int], WalkIndex]] = OrderedDict()
+
     def get(self, oid: OID, context_name: SNMPContextName | None = None) -> SNMPRawValue | None:
         walk = self.walk(oid)
         # get_stored_snmpwalk returns all oids that start with oid but here
@@ -49,35 +203,39 @@ class StoredWalkSNMPBackend(SNMPBackend):
             dot_star = False
 
         console.vverbose(f"  Loading {oid}")
-        lines = self.read_walk_data()
-
-        begin = 0
-        end = len(lines)
-        hit = None
-        while end - begin > 0:
-            current = (begin + end) // 2
-            parts = lines[current].split(None, 1)
-            comp = parts[0]
-            hit = StoredWalkSNMPBackend._compare_oids(oid_prefix, comp)
-            if hit == 0:
-                break
-            if hit == 1:  # we are too low
-                begin = current + 1
-            else:
-                end = current
-
-        if hit != 0:
-            return []  # not found
-
-        rowinfo = StoredWalkSNMPBackend._collect_until(oid, oid_prefix, lines, current, -1)
-        rowinfo.reverse()
-        rowinfo += StoredWalkSNMPBackend._collect_until(oid, oid_prefix, lines, current + 1, 1)
-
-        if dot_star:
-            return [rowinfo[0]]
+        walk_index = self.load_walk_index()
+
+        rowinfo: SNMPRowInfo = []
+        for index in walk_index.find_prefix(StoredWalkSNMPBackend._to_bin_string(oid_prefix)):
+            row = StoredWalkSNMPBackend._parse_line(oid, oid_prefix, walk_index.line(index))
+            if row is None:
+                continue
+            if dot_star:
+                return [row]
+            rowinfo.append(row)
 
         return rowinfo
 
+    def load_walk_index(self) -> WalkIndex:
+        path = Path(cmk.utils.paths.snmpwalks_dir) / self.hostname
+        try:
+            stat = path.stat()
+        except OSError:
+            raise MKSNMPError("No snmpwalk file %s" % path)
+
+        stamp = stat.st_mtime_ns, stat.st_size
+        cache = self._walk_index_cache
+        if (cached := cache.get(path)) is not None and cached[0] == stamp:
+            cache.move_to_end(path)
+            return cached[1]
+
+        walk_index = WalkIndex.from_path(path)
+        cache[path] = stamp, walk_index
+        cache.move_to_end(path)
+        while len(cache) > _MAX_CACHED_WALK_INDEXES:
+            cache.popitem(last=False)
+        return walk_index
+
     @staticmethod
     def read_walk_from_path(path: Path) -> Sequence[str]:
         console.vverbose(f"  Opening {path}\n")
@@ -92,23 +250,6 @@ class StoredWalkSNMPBackend(SNMPBackend):
                     lines[-1] += line
         return lines
 
-    def read_walk_data(self) -> Sequence[str]:
-        path = Path(cmk.utils.paths.snmpwalks_dir) / self.hostname
-        try:
-            return self.read_walk_from_path(path)
-        except OSError:
-            raise MKSNMPError("No snmpwalk file %s" % path)
-
-    @staticmethod
-    def _compare_oids(a: OID, b: OID) -> int:
-        aa = StoredWalkSNMPBackend._to_bin_string(a)
-        bb = StoredWalkSNMPBackend._to_bin_string(b)
-        if len(aa) <= len(bb) and bb[: len(aa)] == aa:
-            result = 0
-        else:
-            result = (aa > bb) - (aa < bb)
-        return result
-
     @staticmethod
     def _to_bin_string(oid: OID) -> tuple[int, ...]:
         try:
@@ -117,36 +258,21 @@ class StoredWalkSNMPBackend(SNMPBackend):
             raise MKGeneralException("Invalid OID %s" % oid)
 
     @staticmethod
-    def _collect_until(
-        oid: OID, oid_prefix: OID, lines: Sequence[str], index: int, direction: int
-    ) -> SNMPRowInfo:
-        rows = []
-        # Handle case, where we run after the end of the lines list
-        if index >= len(lines):
-            if direction > 0:
-                return []
-            index -= 1
-        while True:
-            line = lines[index]
-            parts = line.split(None, 1)
-            o = parts[0]
-            if o.startswith("."):
-                o = o[1:]
-            if o == oid or o.startswith(oid_prefix + "."):
-                if len(parts) > 1:
-                    # FIXME: This encoding ping-pong is horrible...
-                    value = agent_simulator.process(
-                        AgentRawData(
-                            parts[1].encode(),
-                        ),
-                    ).decode()
-                else:
-                    value = ""
-                # Fix for missing starting oids
-                rows.append(("." + o, strip_snmp_value(value)))
-                index += direction
-                if index < 0 or index >= len(lines):
-                    break
-            else:
-                break
-        return rows
+    def _parse_line(oid: OID, oid_prefix: OID, line: str) -> tuple[OID, SNMPRawValue] | None:
+        parts = line.split(None, 1)
+        o = parts[0]
+        if o.startswith("."):
+            o = o[1:]
+        if not (o == oid or o.startswith(oid_prefix + ".")):
+            return None
+        if len(parts) > 1:
+            # FIXME: This encoding ping-pong is horrible...
+            value = agent_simulator.process(
+                AgentRawData(
+                    parts[1].encode(),
+                ),
+            ).decode()
+        else:
+            value = ""
+        # Fix for missing starting oids
+        return "." + o, strip_snmp_value(value)
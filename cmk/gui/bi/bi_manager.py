@@ -2,19 +2,29 @@
 # Copyright (C) 2019 tribe29 GmbH - License: GNU General Public License v2
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
 from livestatus import LivestatusOutputFormat, LivestatusResponse, SiteId
 
 from cmk.utils.paths import default_config_dir
+from cmk.utils.type_defs import UserId
 
 from cmk.gui import sites
 from cmk.gui.i18n import _
+from cmk.gui.logged_in import user
 
 from cmk.bi.compiler import BICompiler
 from cmk.bi.computer import BIComputer
 from cmk.bi.data_fetcher import BIStatusFetcher
 from cmk.bi.lib import SitesCallback
+from cmk.bi.state_engine import BIStateEngine
+
+# The state engines are kept by the apache process between the requests
+_MAX_STATE_ENGINES = 10
+_state_engines: OrderedDict[UserId | None, BIStateEngine] = OrderedDict()
+_state_engines_lock = threading.Lock()
 
 
 class BIManager:
@@ -23,13 +33,29 @@ class BIManager:
         self.compiler = BICompiler(self.bi_configuration_file(), sites_callback)
         self.compiler.load_compiled_aggregations()
         self.status_fetcher = BIStatusFetcher(sites_callback)
-        self.computer = BIComputer(self.compiler.compiled_aggregations, self.status_fetcher)
+        self.state_engine = _get_state_engine(sites_callback)
+        self.state_engine.set_compiled_version(self.compiler.compiled_version)
+        self.computer = BIComputer(
+            self.compiler.compiled_aggregations, self.status_fetcher, self.state_engine
+        )
 
     @classmethod
     def bi_configuration_file(cls) -> str:
         return str(Path(default_config_dir) / "multisite.d" / "wato" / "bi_config.bi")
 
 
+def _get_state_engine(sites_callback: SitesCallback) -> BIStateEngine:
+    # Users which may not see all objects get the status data of their own objects only
+    auth_user = None if user.may("bi.see_all") else user.id
+    with _state_engines_lock:
+        if (state_engine := _state_engines.get(auth_user)) is None:
+            state_engine = _state_engines[auth_user] = BIStateEngine(sites_callback)
+            while len(_state_engines) > _MAX_STATE_ENGINES:
+                _state_engines.popitem(last=False)
+        _state_engines.move_to_end(auth_user)
+        return state_engine
+
+
 def all_sites_with_id_and_online() -> list[tuple[SiteId, bool]]:
     return [
         (site_id, site_status["state"] == "online")
@@ -32,6 +32,7 @@ from cmk.utils.structured_data import (
     SDKey,
     SDPath,
     StructuredDataNode,
+    TreeOrArchiveStore,
 )
 from cmk.utils.type_defs import HostName
 
@@ -318,7 +319,8 @@ def _get_history(
     except FilterInventoryHistoryPathsError:
         return [], []
 
-    cached_tree_loader = _CachedTreeLoader()
+    archive_store = _make_tree_or_archive_store()
+    cached_tree_loader = _CachedTreeLoader(hostname, archive_store)
     corrupted_history_files: set[Path] = set()
     history: list[HistoryEntry] = []
 
@@ -326,6 +328,14 @@ def _get_history(
         if current.timestamp is None:
             continue
 
+        if (
+            delta_tree := _load_archived_delta_tree(archive_store, hostname, previous, current)
+        ) is not None:
+            # Archived trees come with the delta to their previous tree
+            if (history_entry := _make_history_entry(current.timestamp, delta_tree)) is not None:
+                history.append(history_entry)
+            continue
+
         cached_delta_tree_loader = _CachedDeltaTreeLoader(
             hostname,
             previous.timestamp,
@@ -337,8 +347,8 @@ def _get_history(
             continue
 
         try:
-            previous_tree = cached_tree_loader.get_tree(previous.path)
-            current_tree = cached_tree_loader.get_tree(current.path)
+            previous_tree = cached_tree_loader.get_tree(previous)
+            current_tree = cached_tree_loader.get_tree(current)
         except LoadStructuredDataError:
             corrupted_history_files.add(current.short)
             continue
@@ -353,21 +363,28 @@ def _get_history(
     return history, sorted([str(path) for path in corrupted_history_files])
 
 
+def _make_tree_or_archive_store() -> TreeOrArchiveStore:
+    return TreeOrArchiveStore(
+        cmk.utils.paths.inventory_output_dir,
+        cmk.utils.paths.inventory_archive_dir,
+    )
+
+
 def _get_inventory_history_paths(hostname: HostName) -> Sequence[InventoryHistoryPath]:
     inventory_path = Path(cmk.utils.paths.inventory_output_dir, hostname)
     inventory_archive_dir = Path(cmk.utils.paths.inventory_archive_dir, hostname)
 
-    try:
-        archived_tree_paths = [
-            InventoryHistoryPath(
-                path=filepath,
-                timestamp=int(filepath.name),
-            )
-            for filepath in sorted(inventory_archive_dir.iterdir())
-        ]
-    except FileNotFoundError:
+    if not inventory_archive_dir.exists():
         return []
 
+    archived_tree_paths = [
+        InventoryHistoryPath(
+            path=inventory_archive_dir / str(timestamp),
+            timestamp=timestamp,
+        )
+        for timestamp in _make_tree_or_archive_store().archive_timestamps(host_name=hostname)
+    ]
+
     try:
         archived_tree_paths.append(
             InventoryHistoryPath(
@@ -381,6 +398,43 @@ def _get_inventory_history_paths(hostname: HostName) -> Sequence[InventoryHistor
     return archived_tree_paths
 
 
+def _is_archived(hostname: HostName, tree_path: InventoryHistoryPath) -> bool:
+    return tree_path.path.parent == Path(cmk.utils.paths.inventory_archive_dir, hostname)
+
+
+def _load_archived_delta_tree(
+    archive_store: TreeOrArchiveStore,
+    hostname: HostName,
+    previous: InventoryHistoryPath,
+    current: InventoryHistoryPath,
+) -> DeltaStructuredDataNode | None:
+    if previous.timestamp is None or current.timestamp is None:
+        return None
+
+    if not _is_archived(hostname, current):
+        return None
+
+    if (
+        archive_delta := archive_store.load_archive_delta(
+            host_name=hostname,
+            timestamp=current.timestamp,
+        )
+    ) is None or archive_delta.previous_timestamp != previous.timestamp:
+        return None
+
+    return _filter_delta_tree(archive_delta.delta_tree)
+
+
+def _make_history_entry(timestamp: int, delta_tree: DeltaStructuredDataNode) -> HistoryEntry | None:
+    delta_result = delta_tree.count_entries()
+    new = delta_result["new"]
+    changed = delta_result["changed"]
+    removed = delta_result["removed"]
+    if new or changed or removed:
+        return HistoryEntry(timestamp, new, changed, removed, delta_tree)
+    return None
+
+
 def _get_pairs(
     filtered_tree_paths: FilteredInventoryHistoryPaths,
 ) -> Sequence[tuple[InventoryHistoryPath, InventoryHistoryPath]]:
@@ -396,20 +450,29 @@ def _get_pairs(
 
 @dataclass(frozen=True)
 class _CachedTreeLoader:
+    hostname: HostName
+    archive_store: TreeOrArchiveStore
     _lookup: dict[Path, StructuredDataNode] = field(default_factory=dict)
 
-    def get_tree(self, filepath: Path) -> StructuredDataNode:
-        if filepath == _DEFAULT_PATH_TO_TREE:
+    def get_tree(self, tree_path: InventoryHistoryPath) -> StructuredDataNode:
+        if tree_path.path == _DEFAULT_PATH_TO_TREE:
             return StructuredDataNode()
 
-        if filepath in self._lookup:
-            return self._lookup[filepath]
+        if tree_path.path in self._lookup:
+            return self._lookup[tree_path.path]
 
-        return self._lookup.setdefault(filepath, self._load_tree_from_file(filepath))
+        return self._lookup.setdefault(tree_path.path, self._load_tree(tree_path))
 
-    def _load_tree_from_file(self, filepath: Path) -> StructuredDataNode:
+    def _load_tree(self, tree_path: InventoryHistoryPath) -> StructuredDataNode:
         try:
-            tree = _filter_tree(load_tree(filepath))
+            tree = _filter_tree(
+                self.archive_store.load_archive(
+                    host_name=self.hostname,
+                    timestamp=tree_path.timestamp,
+                )
+                if tree_path.timestamp is not None and _is_archived(self.hostname, tree_path)
+                else load_tree(tree_path.path)
+            )
         except FileNotFoundError:
             raise LoadStructuredDataError()
 
@@ -457,18 +520,23 @@ class _CachedDeltaTreeLoader:
         previous_tree: StructuredDataNode,
         current_tree: StructuredDataNode,
     ) -> HistoryEntry | None:
-        delta_tree = current_tree.compare_with(previous_tree)
-        delta_result = delta_tree.count_entries()
-        new = delta_result["new"]
-        changed = delta_result["changed"]
-        removed = delta_result["removed"]
-        if new or changed or removed:
+        history_entry = _make_history_entry(
+            self.current_timestamp,
+            current_tree.compare_with(previous_tree),
+        )
+        if history_entry is not None:
             store.save_text_to_file(
                 self._path,
-                repr((new, changed, removed, delta_tree.serialize())),
+                repr(
+                    (
+                        history_entry.new,
+                        history_entry.changed,
+                        history_entry.removed,
+                        history_entry.delta_tree.serialize(),
+                    )
+                ),
             )
-            return HistoryEntry(self.current_timestamp, new, changed, removed, delta_tree)
-        return None
+        return history_entry
 
 
 # .
@@ -547,6 +615,15 @@ def _filter_tree(struct_tree: StructuredDataNode | None) -> StructuredDataNode |
     return struct_tree
 
 
+def _filter_delta_tree(delta_tree: DeltaStructuredDataNode) -> DeltaStructuredDataNode:
+    if permitted_paths := _get_permitted_inventory_paths():
+        return delta_tree.get_filtered_node(
+            [make_filter(entry) for entry in permitted_paths if entry]
+        )
+
+    return delta_tree
+
+
 @request_memoize()
 def _get_permitted_inventory_paths():
     """
@@ -791,10 +868,13 @@ class InventoryHousekeeping:
         except OSError:
             pass
 
-        for filename in [
-            x for x in (self._inventory_archive_path / hostname).iterdir() if not x.is_dir()
-        ]:
-            timestamps.add(filename.name)
+        timestamps.update(
+            str(timestamp)
+            for timestamp in TreeOrArchiveStore(
+                self._inventory_path,
+                self._inventory_archive_path,
+            ).archive_timestamps(host_name=hostname)
+        )
         return timestamps
 
 
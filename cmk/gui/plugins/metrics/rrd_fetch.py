@@ -9,12 +9,21 @@ import time
 from collections.abc import Callable, Iterator, Sequence
 from typing import Any
 
+import numpy as np
+import numpy.typing as npt
+
 import livestatus
 from livestatus import LivestatusRow, SiteId
 
 import cmk.utils.version as cmk_version
 from cmk.utils.exceptions import MKGeneralException
-from cmk.utils.prediction import livestatus_lql, TimeSeries, TimeSeriesValues
+from cmk.utils.prediction import (
+    ConsolidationFunctionName,
+    livestatus_lql,
+    TimeSeries,
+    TimeSeriesValues,
+    TimeWindow,
+)
 from cmk.utils.type_defs import HostName, ServiceName
 
 import cmk.gui.plugins.metrics.timeseries as ts
@@ -86,9 +95,79 @@ def align_and_resample_rrds(rrd_data: RRDData, cf: GraphConsoldiationFunction) -
         else:
             if (start_time, end_time, step) != rrddata.twindow:
                 if step >= rrddata.twindow[2]:
-                    rrddata.values = rrddata.downsample((start_time, end_time, step), spec[4] or cf)
+                    rrddata.values = _downsample(
+                        rrddata, (start_time, end_time, step), spec[4] or cf
+                    )
                 elif step < rrddata.twindow[2]:
-                    rrddata.values = rrddata.bfill_upsample((start_time, end_time, step), 0)
+                    rrddata.values = _bfill_upsample(rrddata, (start_time, end_time, step))
+
+
+def _rrd_timestamps(twindow: TimeWindow) -> npt.NDArray[np.int64]:
+    start, end, step = twindow
+    return np.arange(start, end, step, dtype=np.int64) + step
+
+
+def _is_contiguous(buckets: npt.NDArray[np.int64], num_buckets: int) -> bool:
+    """Whether the resampling methods of TimeSeries would fill the same buckets
+
+    They advance by at most one bucket per step, which is the case for aligned time series."""
+    return bool(buckets[0] <= 1 and buckets[-1] < num_buckets and (np.diff(buckets) <= 1).all())
+
+
+def _downsample(
+    rrddata: TimeSeries, twindow: TimeWindow, cf: ConsolidationFunctionName
+) -> TimeSeriesValues:
+    """Same as TimeSeries.downsample, but consolidates all buckets at once"""
+    if (
+        twindow == rrddata.twindow
+        or not (rrddata.step and twindow[2])
+        or cf.lower() not in ("max", "min", "average")
+    ):
+        return rrddata.downsample(twindow, cf)
+
+    desired_times = _rrd_timestamps(twindow)
+    times = _rrd_timestamps(rrddata.twindow)[: len(rrddata.values)]
+    # A value belongs to the first bucket ending at or after its timestamp
+    buckets = np.searchsorted(desired_times, times, side="left")
+    if not len(buckets) or not _is_contiguous(buckets, len(desired_times)):
+        return rrddata.downsample(twindow, cf)
+
+    values = np.array(rrddata.values[: len(times)], dtype=float)
+    firsts = np.flatnonzero(np.diff(buckets, prepend=-1))
+    match cf.lower():
+        case "max":
+            consolidated = np.fmax.reduceat(values, firsts)
+        case "min":
+            consolidated = np.fmin.reduceat(values, firsts)
+        case _:
+            present = ~np.isnan(values)
+            with np.errstate(invalid="ignore"):
+                consolidated = np.add.reduceat(np.where(present, values, 0.0), firsts) / (
+                    np.add.reduceat(present, firsts)
+                )
+
+    resampled = np.full(len(desired_times), np.nan)
+    resampled[buckets[firsts]] = consolidated
+    return ts.time_series_values_of_array(resampled)
+
+
+def _bfill_upsample(rrddata: TimeSeries, twindow: TimeWindow) -> TimeSeriesValues:
+    """Same as TimeSeries.bfill_upsample without shift, but fills all points at once"""
+    if twindow == rrddata.twindow or not (rrddata.step and twindow[2]):
+        return rrddata.bfill_upsample(twindow, 0)
+
+    start, end, step = twindow
+    current_times = _rrd_timestamps(rrddata.twindow)
+    # A point takes the value of the first measurement ending after it
+    indexes = np.searchsorted(
+        current_times, np.arange(start, end, step, dtype=np.int64), side="right"
+    )
+    if not len(indexes) or not _is_contiguous(
+        indexes, min(len(current_times), len(rrddata.values))
+    ):
+        return rrddata.bfill_upsample(twindow, 0)
+
+    return np.array(rrddata.values, dtype=object)[indexes].tolist()
 
 
 # The idea is to omit the empty last step of graphs which are showing the
@@ -298,7 +377,6 @@ def merge_multicol(
     if not relevant_ts:
         return TimeSeries([0, 0, 0])
 
-    _op_title, op_func = ts.time_series_operators()["MERGE"]
-    single_value_series = [ts.op_func_wrapper(op_func, tsp) for tsp in zip(*relevant_ts)]
-
-    return TimeSeries(single_value_series)
+    merged = ts.time_series_math("MERGE", [TimeSeries(data) for data in relevant_ts])
+    assert merged is not None
+    return merged
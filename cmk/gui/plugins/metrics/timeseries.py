@@ -4,14 +4,18 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import functools
+import math
 import operator
 from collections.abc import Callable, Sequence
 from itertools import chain
-from typing import Literal
+from typing import Literal, NamedTuple
+
+import numpy as np
+import numpy.typing as npt
 
 import cmk.utils.version as cmk_version
 from cmk.utils.exceptions import MKGeneralException
-from cmk.utils.prediction import TimeSeries
+from cmk.utils.prediction import TimeSeries, TimeSeriesValues, TimeWindow
 
 import cmk.gui.utils.escaping as escaping
 from cmk.gui.i18n import _
@@ -100,13 +104,32 @@ def evaluate_time_series_expression(  # type: ignore[no-untyped-def]
 
 @time_series_expression_registry.register_expression("operator")
 def expression_operator(parameters: ExpressionParams, rrd_data: RRDData) -> Sequence[TimeSeries]:
-    operator_id, operands = parameters
-    operands_evaluated = list(
-        chain.from_iterable(evaluate_time_series_expression(a, rrd_data) for a in operands)
-    )
-    if result := time_series_math(operator_id, operands_evaluated):
-        return [result]
-    return []
+    # Nested operators are evaluated on arrays, only the final result is converted to a list
+    return [
+        TimeSeries(time_series_values_of_array(values), twindow)
+        for values, twindow in _evaluate_array_expression(("operator", *parameters), rrd_data)
+    ]
+
+
+class _ArrayTimeSeries(NamedTuple):
+    values: npt.NDArray[np.float64]
+    twindow: TimeWindow
+
+
+def _evaluate_array_expression(  # type: ignore[no-untyped-def]
+    expression, rrd_data: RRDData
+) -> list[_ArrayTimeSeries]:
+    if expression[0] == "operator":
+        operator_id, operands = expression[1:]
+        result = _array_math(
+            operator_id,
+            list(chain.from_iterable(_evaluate_array_expression(a, rrd_data) for a in operands)),
+        )
+        return [] if result is None else [result]
+    return [
+        _ArrayTimeSeries(_array_of_values(ts.values), ts.twindow)
+        for ts in evaluate_time_series_expression(expression, rrd_data)
+    ]
 
 
 @time_series_expression_registry.register_expression("rrd")
@@ -136,8 +159,17 @@ def time_series_math(
     operator_id: Literal["+", "*", "-", "/", "MAX", "MIN", "AVERAGE", "MERGE"],
     operands_evaluated: list[TimeSeries],
 ) -> TimeSeries | None:
-    operators = time_series_operators()
-    if operator_id not in operators:
+    result = _array_math(
+        operator_id,
+        [_ArrayTimeSeries(_array_of_values(ts.values), ts.twindow) for ts in operands_evaluated],
+    )
+    if result is None:
+        return None
+    return TimeSeries(time_series_values_of_array(result.values), result.twindow)
+
+
+def _array_math(operator_id: str, operands: list[_ArrayTimeSeries]) -> _ArrayTimeSeries | None:
+    if operator_id not in _array_operators:
         raise MKGeneralException(
             _("Undefined operator '%s' in graph expression")
             % escaping.escape_attribute(operator_id)
@@ -145,18 +177,85 @@ def time_series_math(
     # Test for correct arity on FOUND[evaluated] data
     if any(
         (
-            operator_id in ["-", "/"] and len(operands_evaluated) != 2,
-            len(operands_evaluated) < 1,
+            operator_id in ["-", "/"] and len(operands) != 2,
+            len(operands) < 1,
         )
     ):
         # raise MKGeneralException(_("Incorrect amount of data to correctly evaluate expression"))
         # Silently return so to get an empty graph slot
         return None
 
-    _op_title, op_func = operators[operator_id]
-    twindow = operands_evaluated[0].twindow
+    # The operator is applied to all points at once: The time series are stacked into a matrix
+    # with one row per operand, None values are represented by NaN.
+    num_points = min(len(operand.values) for operand in operands)
+    matrix = np.empty((len(operands), num_points))
+    for row, operand in zip(matrix, operands):
+        row[:] = operand.values[:num_points]
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        return _ArrayTimeSeries(_array_operators[operator_id](matrix), operands[0].twindow)
+
+
+def _array_of_values(values: TimeSeriesValues) -> npt.NDArray[np.float64]:
+    # Faster than np.array(values, dtype=float), which takes a slow path for None
+    return np.fromiter(
+        (math.nan if value is None else value for value in values), dtype=float, count=len(values)
+    )
+
+
+def time_series_values_of_array(values: npt.NDArray[np.float64]) -> list[float | None]:
+    """Convert the NaN values of an array back to None"""
+    with_none = values.astype(object)
+    with_none[np.isnan(values)] = None
+    return with_none.tolist()
+
+
+def _array_sum(matrix: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    missing = np.isnan(matrix)
+    return np.where(missing.all(axis=0), np.nan, np.where(missing, 0.0, matrix).sum(axis=0))
+
+
+def _array_product(matrix: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    return matrix.prod(axis=0)
+
+
+def _array_difference(matrix: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    return matrix[0] - matrix[1]
+
+
+def _array_fraction(matrix: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    return np.where(matrix[1] == 0, np.nan, matrix[0] / matrix[1])
+
+
+def _array_maximum(matrix: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    # In contrast to max(), fmax() ignores NaN unless all values are NaN
+    return np.fmax.reduce(matrix, axis=0)
+
+
+def _array_minimum(matrix: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    return np.fmin.reduce(matrix, axis=0)
+
+
+def _array_average(matrix: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    present = ~np.isnan(matrix)
+    return np.where(present, matrix, 0.0).sum(axis=0) / present.sum(axis=0)
+
+
+def _array_merge(matrix: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    first_present = np.argmax(~np.isnan(matrix), axis=0)
+    return matrix[first_present, np.arange(np.shape(matrix)[1])]
+
 
-    return TimeSeries([op_func_wrapper(op_func, tsp) for tsp in zip(*operands_evaluated)], twindow)
+# Keep this in sync with time_series_operators(), which works on single points
+_array_operators: dict[str, Callable[[npt.NDArray[np.float64]], npt.NDArray[np.float64]]] = {
+    "+": _array_sum,
+    "*": _array_product,
+    "-": _array_difference,
+    "/": _array_fraction,
+    "MAX": _array_maximum,
+    "MIN": _array_minimum,
+    "AVERAGE": _array_average,
+    "MERGE": _array_merge,
+}
 
 
 def op_func_wrapper(op_func, tsp):
@@ -38,19 +38,21 @@ A host_config object can have the following relations present in `links`:
 
 """
 import itertools
+import json
 import operator
-from collections.abc import Iterable, Mapping, Sequence
+from collections.abc import Iterable, Iterator, Mapping, Sequence
 from typing import Any
 from urllib.parse import urlencode
 
 import cmk.utils.version as cmk_version
+from cmk.utils.encoding import json_encode
 from cmk.utils.type_defs import HostName
 
 import cmk.gui.watolib.bakery as bakery
 from cmk.gui import fields as gui_fields
 from cmk.gui.exceptions import MKAuthException, MKUserError
 from cmk.gui.fields.utils import BaseSchema
-from cmk.gui.http import Response
+from cmk.gui.http import request, Response
 from cmk.gui.logged_in import user
 from cmk.gui.plugins.openapi.endpoints.utils import folder_slug
 from cmk.gui.plugins.openapi.restful_objects import (
@@ -62,7 +64,7 @@ from cmk.gui.plugins.openapi.restful_objects import (
     response_schemas,
 )
 from cmk.gui.plugins.openapi.restful_objects.parameters import HOST_NAME
-from cmk.gui.plugins.openapi.utils import EXT, problem, serve_json
+from cmk.gui.plugins.openapi.utils import EXT, problem, serve_json, serve_json_stream
 from cmk.gui.valuespec import Hostname
 from cmk.gui.watolib.activate_changes import has_pending_changes
 from cmk.gui.watolib.check_mk_automations import delete_hosts
@@ -99,6 +101,75 @@ EFFECTIVE_ATTRIBUTES = {
     )
 }
 
+HOST_EXTENSIONS = [
+    "folder",
+    "attributes",
+    "effective_attributes",
+    "is_cluster",
+    "is_offline",
+    "cluster_nodes",
+]
+
+HOST_COLLECTION_PARAMS = {
+    "folder": gui_fields.FolderField(
+        description=(
+            "Show only the hosts of this folder and its sub-folders. The default is the "
+            "root-folder."
+        ),
+        example="/servers",
+        load_default=Folder.root_folder,  # because we can't load it too early.
+    ),
+    "sites": fields.List(
+        gui_fields.SiteField(),
+        description="Show only the hosts monitored on these sites.",
+        example=["production"],
+        load_default=list,
+    ),
+    "attributes": fields.List(
+        fields.String(pattern="[^=]+=.*"),
+        description=(
+            "Show only the hosts having all these attributes, given as `name=value`. The values "
+            "are compared as text with the attributes set on the host itself, attributes "
+            "inherited from the folders are not taken into account."
+        ),
+        example=["tag_agent=cmk-agent"],
+        load_default=list,
+    ),
+    "labels": fields.List(
+        fields.String(pattern="[^:]+:.*"),
+        description=(
+            "Show only the hosts having all these labels, given as `key:value`. This includes "
+            "the labels inherited from the folders."
+        ),
+        example=["os:linux"],
+        load_default=list,
+    ),
+    "fields": fields.List(
+        fields.String(enum=HOST_EXTENSIONS),
+        description=(
+            "Show only these fields in the extensions of the hosts. The default is to show all "
+            "fields."
+        ),
+        example=["folder", "attributes"],
+        load_default=list,
+    ),
+    "limit": fields.Integer(
+        minimum=1,
+        description=(
+            "Show at most this number of hosts. In case there are more hosts, the collection "
+            "links to the next page with the relation `next`. The default is to show all hosts."
+        ),
+        example=1000,
+    ),
+    "cursor": fields.String(
+        description=(
+            "Show only the hosts whose names are sorted after this host name. This is set by the "
+            "link to the next page."
+        ),
+        example="example.com",
+    ),
+}
+
 PERMISSIONS = permissions.AllPerm(
     [
         permissions.Perm("wato.edit"),
@@ -293,19 +364,84 @@ def _bulk_host_action_response(
     method="get",
     response_schema=response_schemas.HostConfigCollection,
     permissions_required=permissions.Optional(permissions.Perm("wato.see_all_folders")),
-    query_params=[EFFECTIVE_ATTRIBUTES],
+    query_params=[EFFECTIVE_ATTRIBUTES, HOST_COLLECTION_PARAMS],
 )
-def list_hosts(param) -> Response:  # type: ignore[no-untyped-def]
-    """Show all hosts"""
-    root_folder = Folder.root_folder()
-    root_folder.need_recursive_permission("read")
-    effective_attributes: bool = param.get("effective_attributes", False)
-    return serve_host_collection(
-        root_folder.all_hosts_recursively().values(),
-        effective_attributes=effective_attributes,
+def list_hosts(params: Mapping[str, Any]) -> Response:
+    """Show all hosts
+
+    The hosts are sorted by their names. Large collections can be fetched in pages by setting
+    `limit` and following the link with the relation `next` until there is none.
+    """
+    folder: CREFolder = params["folder"]
+    folder.need_recursive_permission("read")
+    hosts = sorted(
+        _filter_hosts(folder.all_hosts_recursively().values(), params),
+        key=operator.methodcaller("name"),
+    )
+
+    links = [constructors.link_rel("self", constructors.collection_href("host_config"))]
+    if (limit := params.get("limit")) is not None and len(hosts) > limit:
+        hosts = hosts[:limit]
+        links.append(constructors.link_rel("next", _next_page_href(hosts[-1].name())))
+
+    effective_attributes: bool = params["effective_attributes"]
+    extensions = params["fields"] or HOST_EXTENSIONS
+    if "effective_attributes" not in extensions:
+        effective_attributes = False
+
+    # The hosts are serialized while being sent, to not keep all of them in memory at once
+    schema = response_schemas.HostConfigSchema()
+    return serve_json_stream(
+        {"id": "host", "domainType": "host_config", "links": links},
+        (
+            _select_extensions(
+                schema.dump(json.loads(json_encode(serialize_host(host, effective_attributes)))),
+                extensions,
+            )
+            for host in hosts
+        ),
     )
 
 
+def _filter_hosts(hosts: Iterable[CREHost], params: Mapping[str, Any]) -> Iterator[CREHost]:
+    sites = set(params["sites"])
+    attributes = dict(attribute.split("=", 1) for attribute in params["attributes"])
+    labels = dict(label.split(":", 1) for label in params["labels"])
+    cursor = params.get("cursor")
+    for host in hosts:
+        if cursor is not None and host.name() <= cursor:
+            continue
+        if sites and host.site_id() not in sites:
+            continue
+        if attributes:
+            host_attributes = host.attributes()
+            if any(
+                name not in host_attributes or str(host_attributes[name]) != value
+                for name, value in attributes.items()
+            ):
+                continue
+        if labels:
+            host_labels = host.labels()
+            if any(host_labels.get(key) != value for key, value in labels.items()):
+                continue
+        yield host
+
+
+def _next_page_href(cursor: str) -> str:
+    args = request.args.copy()
+    args["cursor"] = cursor
+    return (
+        f"{constructors.collection_href('host_config')}?{urlencode(list(args.items(multi=True)))}"
+    )
+
+
+def _select_extensions(host: dict[str, Any], extensions: Sequence[str]) -> dict[str, Any]:
+    host["extensions"] = {
+        key: value for key, value in host["extensions"].items() if key in extensions
+    }
+    return host
+
+
 def serve_host_collection(hosts: Iterable[CREHost], effective_attributes: bool = False) -> Response:
     return serve_json(
         _host_collection(
@@ -32,6 +32,7 @@ def default_config_example() -> dict[str, Any]:
                     "tcp": {"port": 6560, "only_from": ["192.168.1.1"], "tls": False},
                 },
                 "connect_timeout": 2,
+                "query_timeout": 120.0,
                 "persistent_connection": False,
                 "url_prefix": "/heute_remote_1/",
                 "status_host": {
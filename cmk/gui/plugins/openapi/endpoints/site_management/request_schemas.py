@@ -265,6 +265,13 @@ class StatusConnectionAttributes(BaseSchema):
         description="The time that the GUI waits for a connection to the site to be established before the site is considered to be unreachable.",
         example=2,
     )
+    query_timeout = gui_fields.Timeout(
+        minimum=0.1,
+        required=False,
+        allow_none=True,
+        description="The time that the GUI waits for the response to a query before the site is considered to be unreachable. With null the GUI waits until the site has answered.",
+        example=120.0,
+    )
     persistent_connection = fields.Boolean(
         required=False,
         description="If you enable persistent connections then Multisite will try to keep open the connection to the remote sites.",
@@ -842,6 +842,10 @@ class Endpoint:
             if active_config.wato_use_git:
                 do_git_commit()
 
+        if response.is_streamed:
+            # The body is generated while being sent. Reading it here would defeat the purpose.
+            return response
+
         if (
             self.content_type == "application/json"
             and response.status_code < 300
@@ -2,17 +2,21 @@
 # Copyright (C) 2019 tribe29 GmbH - License: GNU General Public License v2
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
+import http.client
+import itertools
 import json
 import logging
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
 from typing import Any, Literal, NewType
 from urllib.parse import quote_plus
 
 import docstring_parser
+from flask import stream_with_context
 from werkzeug.exceptions import HTTPException
 
 from livestatus import SiteId
 
+from cmk.utils import crash_reporting
 from cmk.utils.encoding import json_encode
 from cmk.utils.livestatus_helpers.queries import Query
 
@@ -388,3 +392,68 @@ def serve_json(
     response.set_content_type(content_type)
     response.set_data(json_encode(data))
     return response
+
+
+def serve_json_stream(
+    data: dict[str, Any],
+    items: Iterable[Serializable],
+    items_key: str = "value",
+    content_type: str = "application/json",
+    status: int = 200,
+) -> Response:
+    """Serve a JSON object with a list of items, which are encoded while being sent
+
+    The items are added to the data under the key `items_key`. As the body is not known in
+    advance, the response is not validated against the response schema of the endpoint. The
+    items need to be in their final form already.
+
+    The first item is encoded before the response is returned, errors while preparing the items
+    still result in a problem response. Later errors are reported as crash, the list ends there
+    and the document is closed with an `error` member describing the crash.
+
+    Examples:
+
+        >>> from flask import Flask
+        >>> with Flask(__name__).test_request_context():
+        ...     response = serve_json_stream({"id": "host"}, iter([{"a": 1}, {"b": 2}]))
+        ...     response.is_streamed, response.get_data(as_text=True)
+        (True, '{"id": "host", "value": [{"a": 1}, {"b": 2}]}')
+
+    """
+
+    items = iter(items)
+    head = json_encode(data)[1:-1]
+    first_item = "".join(json_encode(item) for item in itertools.islice(items, 1))
+
+    def _chunks() -> Iterator[str]:
+        yield "{%s%s: [%s" % (head + ", " if head else "", json.dumps(items_key), first_item)
+        try:
+            for item in items:
+                yield ", " + json_encode(item)
+        except Exception as exc:
+            crash = APICrashReport.from_exception()
+            crash_reporting.CrashReportStore().save(crash)
+            logger.exception(
+                "Unhandled exception while streaming (Crash-ID: %s)", crash.ident_to_text()
+            )
+            error = {
+                "title": http.client.responses[500],
+                "detail": str(exc),
+                "crash_id": crash.ident_to_text(),
+            }
+            yield "], %s: %s}" % (json.dumps("error"), json_encode(error))
+            return
+        yield "]}"
+
+    response = Response(stream_with_context(_chunks()))
+    response.status_code = status
+    response.set_content_type(content_type)
+    return response
+
+
+class APICrashReport(crash_reporting.ABCCrashReport):
+    """API specific crash reporting class."""
+
+    @classmethod
+    def type(cls):
+        return "rest_api"
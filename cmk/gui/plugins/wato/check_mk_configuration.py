@@ -2820,6 +2820,35 @@ class ConfigVariableClusterMaxCachefileAge(ConfigVariable):
         )
 
 
+@config_variable_registry.register
+class ConfigVariableMaxConcurrentFetches(ConfigVariable):
+    def group(self) -> type[ConfigVariableGroup]:
+        return ConfigVariableGroupCheckExecution
+
+    def domain(self) -> type[ABCConfigDomain]:
+        return ConfigDomainCore
+
+    def ident(self) -> str:
+        return "max_concurrent_fetches"
+
+    def valuespec(self) -> ValueSpec:
+        return Integer(
+            title=_("Concurrent fetching of data sources"),
+            label=_("fetch at most"),
+            unit=_("data sources concurrently"),
+            minvalue=1,
+            help=_(
+                "By default the data sources of a host, e.g. the Checkmk agent, SNMP and special "
+                "agents, and the nodes of a cluster are fetched one after another. With a value "
+                "larger than one, up to this number of data sources are fetched concurrently by "
+                "each Checkmk process. This reduces the execution time of hosts with many data "
+                "sources and of clusters. SNMP and IPMI sources are still fetched one after "
+                "another. Note that the CPU time of special agents is not accounted to their "
+                "data sources anymore when fetching concurrently."
+            ),
+        )
+
+
 @config_variable_registry.register
 class ConfigVariablePiggybackMaxCachefileAge(ConfigVariable):
     def group(self) -> type[ConfigVariableGroup]:
@@ -2894,6 +2923,55 @@ class ConfigVariableUseDNSCache(ConfigVariable):
         )
 
 
+@config_variable_registry.register
+class ConfigVariableMaxConcurrentDNSLookups(ConfigVariable):
+    def group(self) -> type[ConfigVariableGroup]:
+        return ConfigVariableGroupCheckExecution
+
+    def domain(self) -> type[ABCConfigDomain]:
+        return ConfigDomainCore
+
+    def ident(self) -> str:
+        return "max_concurrent_dns_lookups"
+
+    def valuespec(self) -> ValueSpec:
+        return Integer(
+            title=_("Concurrent DNS lookups"),
+            label=_("resolve at most"),
+            unit=_("host names concurrently"),
+            minvalue=1,
+            help=_(
+                "Updating the DNS lookup cache and the configuration generation resolve the "
+                "host names missing in the cache with up to this number of concurrent lookups. "
+                "Reduce this number in case your name servers can not cope with the load."
+            ),
+        )
+
+
+@config_variable_registry.register
+class ConfigVariableDNSLookupTimeout(ConfigVariable):
+    def group(self) -> type[ConfigVariableGroup]:
+        return ConfigVariableGroupCheckExecution
+
+    def domain(self) -> type[ABCConfigDomain]:
+        return ConfigDomainCore
+
+    def ident(self) -> str:
+        return "dns_lookup_timeout"
+
+    def valuespec(self) -> ValueSpec:
+        return Float(
+            title=_("Timeout for DNS lookups"),
+            help=_(
+                "Host names which can not be resolved within this time while updating the DNS "
+                "lookup cache are treated as not resolvable."
+            ),
+            minvalue=1.0,
+            unit="sec",
+            display_format="%.1f",
+        )
+
+
 def transform_snmp_backend_default_to_valuespec(
     backend: Literal["classic", "inline"]
 ) -> SNMPBackendEnum:
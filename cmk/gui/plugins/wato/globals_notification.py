@@ -165,6 +165,31 @@ class ConfigVariableNotificationPluginTimeout(ConfigVariable):
         )
 
 
+@config_variable_registry.register
+class ConfigVariableNotificationPluginWorkers(ConfigVariable):
+    def group(self) -> type[ConfigVariableGroup]:
+        return ConfigVariableGroupNotifications
+
+    def domain(self) -> type[ABCConfigDomain]:
+        return ConfigDomainCore
+
+    def ident(self) -> str:
+        return "notification_plugin_workers"
+
+    def valuespec(self) -> ValueSpec:
+        return Integer(
+            title=_("Parallel notification plugin executions"),
+            help=_(
+                "The notification plugins of notifications which are not spooled are executed "
+                "in parallel by up to this number of processes. This way a slow plugin, e.g. "
+                "a mail relay which does not respond, does not delay the other notifications. "
+                "The notifications to a single contact are still sent in order. Set this to "
+                "<tt>1</tt> in order to execute one plugin after another."
+            ),
+            minvalue=1,
+        )
+
+
 @config_variable_registry.register
 class ConfigVariableNotificationLogging(ConfigVariable):
     def group(self) -> type[ConfigVariableGroup]:
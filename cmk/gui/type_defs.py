@@ -459,6 +459,7 @@ AllViewSpecs = dict[tuple[UserId, ViewName], ViewSpec]
 PermittedViewSpecs = dict[ViewName, ViewSpec]
 
 SorterFunction = Callable[[ColumnName, Row, Row], int]
+SortKeyFunction = Callable[[ColumnName, Row], Any]
 FilterHeader = str
 
 
@@ -24,6 +24,7 @@ from cmk.utils.crypto.secrets import AutomationUserSecret
 from cmk.utils.paths import htpasswd_file, var_dir
 from cmk.utils.store import (
     acquire_lock,
+    DimSerializer,
     load_from_mk_file,
     load_text_from_file,
     mkdir,
@@ -55,6 +56,9 @@ from cmk.gui.utils.roles import roles_of_user
 
 T = TypeVar("T")
 
+# Same format as written by save_cached_profile()
+_cached_profile_serializer = DimSerializer()
+
 
 def load_custom_attr(
     *,
@@ -322,49 +326,61 @@ def _save_user_profiles(  # pylint: disable=too-many-branches
         # authentication secret for local processes
         secret = AutomationUserSecret(user_id)
         if "automation_secret" in user:
-            secret.save(user["automation_secret"])
+            if _read_profile_file(secret.path) != user["automation_secret"]:
+                secret.save(user["automation_secret"])
         else:
             secret.delete()
 
         # Write out user attributes which are written to dedicated files in the user
         # profile directory. The primary reason to have separate files, is to reduce
         # the amount of data to be loaded during regular page processing
-        save_custom_attr(user_id, "serial", str(user.get("serial", 0)))
-        save_custom_attr(user_id, "num_failed_logins", str(user.get("num_failed_logins", 0)))
-        save_custom_attr(
-            user_id, "enforce_pw_change", str(int(bool(user.get("enforce_pw_change"))))
-        )
-        save_custom_attr(
-            user_id, "last_pw_change", str(user.get("last_pw_change", int(now.timestamp())))
+        _save_changed_custom_attrs(
+            user_id,
+            {
+                "serial": str(user.get("serial", 0)),
+                "num_failed_logins": str(user.get("num_failed_logins", 0)),
+                "enforce_pw_change": str(int(bool(user.get("enforce_pw_change")))),
+                "last_pw_change": str(user.get("last_pw_change", int(now.timestamp()))),
+                "idle_timeout": str(user["idle_timeout"]) if "idle_timeout" in user else None,
+                "start_url": (
+                    repr(user["start_url"]) if user.get("start_url") is not None else None
+                ),
+                "two_factor_credentials": (
+                    repr(user["two_factor_credentials"])
+                    if user.get("two_factor_credentials") is not None
+                    else None
+                ),
+                # Is None on first load
+                "ui_theme": str(user["ui_theme"]) if user.get("ui_theme") is not None else None,
+                "ui_sidebar_position": (
+                    str(user["ui_sidebar_position"]) if "ui_sidebar_position" in user else None
+                ),
+            },
         )
 
-        if "idle_timeout" in user:
-            save_custom_attr(user_id, "idle_timeout", user["idle_timeout"])
-        else:
-            remove_custom_attr(user_id, "idle_timeout")
+        _save_cached_profile(user_id, user, multisite_keys, non_contact_keys)
 
-        if user.get("start_url") is not None:
-            save_custom_attr(user_id, "start_url", repr(user["start_url"]))
-        else:
-            remove_custom_attr(user_id, "start_url")
 
-        if user.get("two_factor_credentials") is not None:
-            save_two_factor_credentials(user_id, user["two_factor_credentials"])
-        else:
-            remove_custom_attr(user_id, "two_factor_credentials")
+def _save_changed_custom_attrs(user_id: UserId, attrs: Mapping[str, str | None]) -> None:
+    """Write the custom attributes of a user which differ from the present files
 
-        # Is None on first load
-        if user.get("ui_theme") is not None:
-            save_custom_attr(user_id, "ui_theme", user["ui_theme"])
-        else:
-            remove_custom_attr(user_id, "ui_theme")
+    Attributes set to None are removed. Saving the users, e.g. during a user sync, rewrites all
+    users while only few of them changed. Reading the small files is a lot cheaper than writing
+    them atomically.
+    """
+    for key, val in attrs.items():
+        path = Path(custom_attr_path(user_id, key))
+        if val is None:
+            remove_custom_attr(user_id, key)
+        elif _read_profile_file(path) != "%s\n" % val:
+            save_custom_attr(user_id, key, val)
 
-        if "ui_sidebar_position" in user:
-            save_custom_attr(user_id, "ui_sidebar_position", user["ui_sidebar_position"])
-        else:
-            remove_custom_attr(user_id, "ui_sidebar_position")
 
-        _save_cached_profile(user_id, user, multisite_keys, non_contact_keys)
+def _read_profile_file(path: Path) -> str | None:
+    try:
+        return path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
 
 
 # During deletion of users we don't delete files which might contain user settings
@@ -561,7 +577,9 @@ def _save_cached_profile(
             # UserSpec is now a TypedDict, unfortunately not complete yet, thanks to such constructs.
             cache[key] = user[key]  # type: ignore[literal-required]
 
-    save_cached_profile(user_id, cache)
+    path = cmk.utils.paths.profile_dir / user_id / "cached_profile.mk"
+    if _read_profile_file(path) != _cached_profile_serializer.serialize(cache).decode("utf-8"):
+        save_cached_profile(user_id, cache)
 
 
 def contactgroups_of_user(user_id: UserId) -> list[ContactgroupName]:
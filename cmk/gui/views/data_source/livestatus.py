@@ -6,10 +6,10 @@
 from __future__ import annotations
 
 import functools
-from collections.abc import Callable, Sequence
+from collections.abc import Callable, Mapping, Sequence
 from typing import cast
 
-from livestatus import LivestatusColumn, LivestatusRow, OnlySites, Query, QuerySpecification
+from livestatus import LivestatusColumn, LivestatusRow, OnlySites, Query, QuerySpecification, SiteId
 
 from cmk.utils.check_utils import worst_service_state
 
@@ -127,13 +127,14 @@ class RowTableLivestatus(RowTable):
 def query_livestatus(
     query: Query, only_sites: OnlySites, limit: int | None, auth_domain: str
 ) -> list[LivestatusRow]:
-    if all(
+    debug_queries = all(
         (
             active_config.debug_livestatus_queries,
             request.accept_mimetypes.accept_html,
             display_options.enabled(display_options.W),
         )
-    ):
+    )
+    if debug_queries:
         html.open_div(class_=["livestatus", "message"])
         html.tt(str(query).replace("\n", "<br>\n"))
         html.close_div()
@@ -144,9 +145,24 @@ def query_livestatus(
 
     sites.live().set_auth_domain("read")
 
+    if debug_queries:
+        _show_site_latencies(sites.live().site_latencies())
+
     return data
 
 
+def _show_site_latencies(latencies: Mapping[SiteId, float]) -> None:
+    """Show the time the sites took to answer, the slowest first"""
+    html.open_div(class_=["livestatus", "message"])
+    html.tt(
+        ", ".join(
+            f"{site_id}: {latency * 1000:.1f} ms"
+            for site_id, latency in sorted(latencies.items(), key=lambda item: -item[1])
+        )
+    )
+    html.close_div()
+
+
 def _merge_data(
     data: list[LivestatusRow],
     columns: list[ColumnName],
@@ -577,44 +577,82 @@ def _link_to_folder_by_path(path: str) -> str:
 
 def _sort_data(data: "Rows", sorters: list[SorterEntry]) -> None:
     """Sort data according to list of sorters."""
-    if not sorters:
+    if not sorters or len(data) < 2:
         return
 
-    # Handle case where join columns are not present for all rows
-    def safe_compare(
-        compfunc: Callable[[Row, Row, Mapping[str, Any] | None], int],
-        row1: Row,
-        row2: Row,
-        parameters: Mapping[str, Any] | None,
-    ) -> int:
-        if row1 is None and row2 is None:
-            return 0
-        if row1 is None:
-            return -1
-        if row2 is None:
-            return 1
-        return compfunc(
-            row1,
-            row2,
-            parameters,
-        )
+    # The sort is stable, so sorting by the last sorters first and by the first sorters last gives
+    # the order of comparing with all sorters at once. Consecutive sorters providing sort keys are
+    # sorted in one pass with the keys of all of them, which are computed once per row.
+    for uses_keys, negate, entries in reversed(_sort_passes(sorters)):
+        if uses_keys:
+            data.sort(key=functools.partial(_sort_key, entries), reverse=negate)
+        else:
+            data.sort(key=functools.cmp_to_key(functools.partial(_multisort, entries)))
+
+
+def _sort_passes(sorters: list[SorterEntry]) -> list[tuple[bool, bool, list[SorterEntry]]]:
+    passes: list[tuple[bool, bool, list[SorterEntry]]] = []
+    for entry in sorters:
+        uses_keys = entry.sorter.has_sort_key
+        # Sorters without keys compare with their own direction each
+        negate = entry.negate if uses_keys else False
+        if passes and passes[-1][:2] == (uses_keys, negate):
+            passes[-1][2].append(entry)
+        else:
+            passes.append((uses_keys, negate, [entry]))
+    return passes
+
+
+def _sort_key(entries: list[SorterEntry], row: Row) -> tuple:
+    return tuple(
+        _join_sort_key(entry, row["JOIN"].get(entry.join_key))
+        if entry.join_key  # Sorter for join column, use JOIN info
+        else entry.sorter.sort_key(row, entry.parameters)
+        for entry in entries
+    )
 
-    def multisort(e1: Row, e2: Row) -> int:
-        for entry in sorters:
-            neg = -1 if entry.negate else 1
-
-            if entry.join_key:  # Sorter for join column, use JOIN info
-                c = neg * safe_compare(
-                    entry.sorter.cmp,
-                    e1["JOIN"].get(entry.join_key),
-                    e2["JOIN"].get(entry.join_key),
-                    entry.parameters,
-                )
-            else:
-                c = neg * entry.sorter.cmp(e1, e2, entry.parameters)
-
-            if c != 0:
-                return c
-        return 0  # equal
-
-    data.sort(key=functools.cmp_to_key(multisort))
+
+def _join_sort_key(entry: SorterEntry, row: Row | None) -> tuple:
+    # Handle case where join columns are not present for all rows: Those are sorted first
+    if row is None:
+        return (False,)
+    return True, entry.sorter.sort_key(row, entry.parameters)
+
+
+def _multisort(entries: list[SorterEntry], e1: Row, e2: Row) -> int:
+    for entry in entries:
+        neg = -1 if entry.negate else 1
+
+        if entry.join_key:  # Sorter for join column, use JOIN info
+            c = neg * _safe_compare(
+                entry.sorter.cmp,
+                e1["JOIN"].get(entry.join_key),
+                e2["JOIN"].get(entry.join_key),
+                entry.parameters,
+            )
+        else:
+            c = neg * entry.sorter.cmp(e1, e2, entry.parameters)
+
+        if c != 0:
+            return c
+    return 0  # equal
+
+
+# Handle case where join columns are not present for all rows
+def _safe_compare(
+    compfunc: Callable[[Row, Row, Mapping[str, Any] | None], int],
+    row1: Row,
+    row2: Row,
+    parameters: Mapping[str, Any] | None,
+) -> int:
+    if row1 is None and row2 is None:
+        return 0
+    if row1 is None:
+        return -1
+    if row2 is None:
+        return 1
+    return compfunc(
+        row1,
+        row2,
+        parameters,
+    )
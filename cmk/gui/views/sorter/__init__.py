@@ -15,6 +15,12 @@ from .helpers import (
     cmp_simple_string,
     cmp_string_list,
     compare_ips,
+    key_insensitive_string,
+    key_ip_address,
+    key_num_split,
+    key_simple_number,
+    key_simple_string,
+    key_string_list,
 )
 from .registry import (
     declare_1to1_sorter,
@@ -39,6 +45,12 @@ __all__ = [
     "cmp_simple_string",
     "cmp_string_list",
     "compare_ips",
+    "key_insensitive_string",
+    "key_ip_address",
+    "key_num_split",
+    "key_simple_number",
+    "key_simple_string",
+    "key_string_list",
     "declare_simple_sorter",
     "declare_1to1_sorter",
     "sorter_registry",
@@ -61,6 +61,19 @@ class Sorter(abc.ABC):
         """
         raise NotImplementedError()
 
+    def sort_key(self, row: Row, parameters: Mapping[str, Any] | None) -> Any:
+        """Optional key of a row, which is computed only once per row
+
+        Comparing the keys of two rows must give the same result as cmp. Sorting by keys is a lot
+        faster than calling cmp for each comparison, so sorters should implement this if they can.
+        Sorters which don't are sorted with cmp.
+        """
+        raise NotImplementedError()
+
+    @property
+    def has_sort_key(self) -> bool:
+        return type(self).sort_key is not Sorter.sort_key
+
     # TODO: Cleanup this hack
     @property
     def load_inv(self) -> bool:
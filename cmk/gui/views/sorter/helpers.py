@@ -3,8 +3,11 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+from typing import Any
+
 from cmk.gui.num_split import cmp_num_split as _cmp_num_split
-from cmk.gui.type_defs import ColumnName, Row, SorterFunction
+from cmk.gui.num_split import key_num_split as _key_num_split
+from cmk.gui.type_defs import ColumnName, Row, SorterFunction, SortKeyFunction
 
 
 def cmp_simple_number(column: ColumnName, r1: Row, r2: Row) -> int:
@@ -62,16 +65,68 @@ def cmp_ip_address(column: ColumnName, r1: Row, r2: Row) -> int:
 
 
 def compare_ips(ip1: str, ip2: str) -> int:
-    def split_ip(ip: str) -> tuple:
-        try:
-            return tuple(int(part) for part in ip.split("."))
-        except ValueError:
-            # Make hostnames comparable with IPv4 address representations
-            return (255, 255, 255, 255, ip)
-
-    v1, v2 = split_ip(ip1), split_ip(ip2)
+    v1, v2 = key_ip(ip1), key_ip(ip2)
     return (v1 > v2) - (v1 < v2)
 
 
+def key_ip(ip: str) -> tuple:
+    try:
+        return tuple(int(part) for part in ip.split("."))
+    except ValueError:
+        # Make hostnames comparable with IPv4 address representations
+        return (255, 255, 255, 255, ip)
+
+
 def _get_custom_var(row: Row, key: str) -> str:
     return row["custom_variables"].get(key, "")
+
+
+# The keys below sort the same way as the compare functions above. They are used by the sorters
+# declared with declare_simple_sorter() and declare_1to1_sorter() to sort by key.
+
+
+def key_simple_number(column: ColumnName, row: Row) -> Any:
+    return row[column]
+
+
+def key_simple_number_reversed(column: ColumnName, row: Row) -> Any:
+    return -row[column]
+
+
+def key_num_split(column: ColumnName, row: Row) -> tuple[int | str, ...]:
+    return _key_num_split(row[column].lower())
+
+
+def key_simple_string(column: ColumnName, row: Row) -> tuple[str, str]:
+    return key_insensitive_string(row.get(column, ""))
+
+
+def key_insensitive_string(value: str) -> tuple[str, str]:
+    # The case sensitive value forces a strict order in case of equal spelling but different case
+    return value.lower(), value
+
+
+def key_string_list(column: ColumnName, row: Row) -> tuple[str, str]:
+    return key_insensitive_string("".join(row.get(column, [])))
+
+
+def key_ip_address(column: ColumnName, row: Row) -> tuple:
+    return key_ip(row.get(column, ""))
+
+
+def key_custom_variable(row: Row, key: str) -> str:
+    return _get_custom_var(row, key)
+
+
+SORT_KEYS: dict[SorterFunction, SortKeyFunction] = {
+    cmp_simple_number: key_simple_number,
+    cmp_num_split: key_num_split,
+    cmp_simple_string: key_simple_string,
+    cmp_string_list: key_string_list,
+    cmp_ip_address: key_ip_address,
+}
+
+# Keys for sorters which compare the rows in reverse order
+REVERSED_SORT_KEYS: dict[SorterFunction, SortKeyFunction] = {
+    cmp_simple_number: key_simple_number_reversed,
+}
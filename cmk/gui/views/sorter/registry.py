@@ -7,10 +7,11 @@ from typing import Any
 
 from cmk.utils.plugin_registry import Registry
 
-from cmk.gui.type_defs import ColumnName, PainterName, SorterFunction
+from cmk.gui.type_defs import ColumnName, PainterName, SorterFunction, SortKeyFunction
 
 from ..painter.v0.base import painter_registry
 from .base import Sorter
+from .helpers import REVERSED_SORT_KEYS, SORT_KEYS
 
 
 class SorterRegistry(Registry[type[Sorter]]):
@@ -23,43 +24,58 @@ sorter_registry = SorterRegistry()
 
 # Kept for pre 1.6 compatibility. But also the inventory.py uses this to
 # register some painters dynamically
+# The optional "key" of the spec computes the sort key of a row, see Sorter.sort_key.
 def register_sorter(ident: str, spec: dict[str, Any]) -> None:
-    cls = type(
-        "LegacySorter%s" % str(ident).title(),
-        (Sorter,),
-        {
-            "_ident": ident,
-            "_spec": spec,
-            "ident": property(lambda s: s._ident),
-            "title": property(lambda s: s._spec["title"]),
-            "columns": property(lambda s: s._spec["columns"]),
-            "load_inv": property(lambda s: s._spec.get("load_inv", False)),
-            "cmp": lambda self, r1, r2, p: spec["cmp"](r1, r2),
-        },
-    )
+    attributes = {
+        "_ident": ident,
+        "_spec": spec,
+        "ident": property(lambda s: s._ident),
+        "title": property(lambda s: s._spec["title"]),
+        "columns": property(lambda s: s._spec["columns"]),
+        "load_inv": property(lambda s: s._spec.get("load_inv", False)),
+        "cmp": lambda self, r1, r2, p: spec["cmp"](r1, r2),
+    }
+    if "key" in spec:
+        attributes["sort_key"] = lambda self, row, p: spec["key"](row)
+    cls = type("LegacySorter%s" % str(ident).title(), (Sorter,), attributes)
     sorter_registry.register(cls)
 
 
-def declare_simple_sorter(name: str, title: str, column: ColumnName, func: SorterFunction) -> None:
-    register_sorter(
-        name,
-        {"title": title, "columns": [column], "cmp": lambda r1, r2: func(column, r1, r2)},
-    )
+def declare_simple_sorter(
+    name: str,
+    title: str,
+    column: ColumnName,
+    func: SorterFunction,
+    key: SortKeyFunction | None = None,
+) -> None:
+    spec: dict[str, Any] = {
+        "title": title,
+        "columns": [column],
+        "cmp": lambda r1, r2: func(column, r1, r2),
+    }
+    if (key := key or SORT_KEYS.get(func)) is not None:
+        spec["key"] = lambda row: key(column, row)
+    register_sorter(name, spec)
 
 
 def declare_1to1_sorter(
-    painter_name: PainterName, func: SorterFunction, col_num: int = 0, reverse: bool = False
+    painter_name: PainterName,
+    func: SorterFunction,
+    col_num: int = 0,
+    reverse: bool = False,
+    key: SortKeyFunction | None = None,
 ) -> PainterName:
+    """A given key has to sort like the sorter, so in reverse order if reverse is set"""
     painter = painter_registry[painter_name]()
 
-    register_sorter(
-        painter_name,
-        {
-            "title": painter.title,
-            "columns": painter.columns,
-            "cmp": (lambda r1, r2: func(painter.columns[col_num], r2, r1))
-            if reverse
-            else lambda r1, r2: func(painter.columns[col_num], r1, r2),
-        },
-    )
+    spec: dict[str, Any] = {
+        "title": painter.title,
+        "columns": painter.columns,
+        "cmp": (lambda r1, r2: func(painter.columns[col_num], r2, r1))
+        if reverse
+        else lambda r1, r2: func(painter.columns[col_num], r1, r2),
+    }
+    if (key := key or (REVERSED_SORT_KEYS if reverse else SORT_KEYS).get(func)) is not None:
+        spec["key"] = lambda row: key(painter.columns[col_num], row)
+    register_sorter(painter_name, spec)
     return painter_name
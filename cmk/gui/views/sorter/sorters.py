@@ -11,6 +11,7 @@ from typing import Any
 import cmk.gui.utils as utils
 from cmk.gui.config import active_config
 from cmk.gui.i18n import _
+from cmk.gui.num_split import key_num_split
 from cmk.gui.site_config import get_site_config
 from cmk.gui.type_defs import ColumnName, ColumnSpec, Row
 from cmk.gui.valuespec import Dictionary, DropdownChoice
@@ -29,6 +30,9 @@ from .helpers import (
     cmp_simple_string,
     cmp_string_list,
     compare_ips,
+    key_custom_variable,
+    key_insensitive_string,
+    key_ip,
 )
 from .registry import declare_1to1_sorter, declare_simple_sorter, SorterRegistry
 
@@ -59,7 +63,11 @@ def register_sorters(registry: SorterRegistry) -> None:
     registry.register(SorterNumProblems)
 
     declare_simple_sorter(
-        "svcdescr", _("Service description"), "service_description", cmp_service_name
+        "svcdescr",
+        _("Service description"),
+        "service_description",
+        cmp_service_name,
+        key=key_service_name,
     )
     declare_simple_sorter(
         "svcdispname",
@@ -211,9 +219,9 @@ def register_sorters(registry: SorterRegistry) -> None:
     declare_1to1_sorter("log_time", cmp_simple_number)
     declare_1to1_sorter("log_lineno", cmp_simple_number)
 
-    declare_1to1_sorter("log_what", cmp_log_what)
+    declare_1to1_sorter("log_what", cmp_log_what, key=key_log_what)
 
-    declare_1to1_sorter("log_date", cmp_date)
+    declare_1to1_sorter("log_date", cmp_date, key=key_date)
 
     # Alert statistics
     declare_simple_sorter(
@@ -276,6 +284,9 @@ class SorterSvcstate(Sorter):
             cmp_state_equiv(r1) < cmp_state_equiv(r2)
         )
 
+    def sort_key(self, row: Row, parameters: Mapping[str, Any] | None) -> int:
+        return cmp_state_equiv(row)
+
 
 class SorterHoststate(Sorter):
     @property
@@ -295,6 +306,9 @@ class SorterHoststate(Sorter):
             cmp_host_state_equiv(r1) < cmp_host_state_equiv(r2)
         )
 
+    def sort_key(self, row: Row, parameters: Mapping[str, Any] | None) -> int:
+        return cmp_host_state_equiv(row)
+
 
 class SorterSiteHost(Sorter):
     @property
@@ -314,6 +328,9 @@ class SorterSiteHost(Sorter):
             "host_name", r1, r2
         )
 
+    def sort_key(self, row: Row, parameters: Mapping[str, Any] | None) -> tuple:
+        return row["site"], key_num_split(row["host_name"].lower())
+
 
 class SorterHostName(Sorter):
     @property
@@ -331,6 +348,9 @@ class SorterHostName(Sorter):
     def cmp(self, r1: Row, r2: Row, parameters: Mapping[str, Any] | None) -> int:
         return cmp_num_split("host_name", r1, r2)
 
+    def sort_key(self, row: Row, parameters: Mapping[str, Any] | None) -> tuple:
+        return key_num_split(row["host_name"].lower())
+
 
 class SorterSitealias(Sorter):
     @property
@@ -350,6 +370,9 @@ class SorterSitealias(Sorter):
             get_site_config(r1["site"])["alias"] < get_site_config(r2["site"])["alias"]
         )
 
+    def sort_key(self, row: Row, parameters: Mapping[str, Any] | None) -> str:
+        return get_site_config(row["site"])["alias"]
+
 
 class ABCTagSorter(Sorter, abc.ABC):
     @property
@@ -362,6 +385,9 @@ class ABCTagSorter(Sorter, abc.ABC):
         tag_groups_2 = sorted(get_tag_groups(r2, self.object_type).items())
         return (tag_groups_1 > tag_groups_2) - (tag_groups_1 < tag_groups_2)
 
+    def sort_key(self, row: Row, parameters: Mapping[str, Any] | None) -> list:
+        return sorted(get_tag_groups(row, self.object_type).items())
+
 
 class SorterHost(ABCTagSorter):
     @property
@@ -410,6 +436,9 @@ class ABCLabelSorter(Sorter, abc.ABC):
         labels_2 = sorted(get_labels(r2, self.object_type).items())
         return (labels_1 > labels_2) - (labels_1 < labels_2)
 
+    def sort_key(self, row: Row, parameters: Mapping[str, Any] | None) -> list:
+        return sorted(get_labels(row, self.object_type).items())
+
 
 class SorterHostLabels(ABCLabelSorter):
     @property
@@ -463,6 +492,9 @@ class SorterServicelevel(Sorter):
     def cmp(self, r1: Row, r2: Row, parameters: Mapping[str, Any] | None) -> int:
         return cmp_custom_variable(r1, r2, "EC_SL", cmp_simple_number)
 
+    def sort_key(self, row: Row, parameters: Mapping[str, Any] | None) -> str:
+        return key_custom_variable(row, "EC_SL")
+
 
 def cmp_service_name(column, r1, r2):
     return (cmp_service_name_equiv(r1[column]) > cmp_service_name_equiv(r2[column])) - (
@@ -470,6 +502,10 @@ def cmp_service_name(column, r1, r2):
     ) or cmp_num_split(column, r1, r2)
 
 
+def key_service_name(column: ColumnName, row: Row) -> tuple:
+    return cmp_service_name_equiv(row[column]), key_num_split(row[column].lower())
+
+
 class PerfValSorter(Sorter):
     _num = 0
 
@@ -490,6 +526,9 @@ class PerfValSorter(Sorter):
         v2 = utils.savefloat(get_perfdata_nth_value(r2, self._num - 1, True))
         return (v1 > v2) - (v1 < v2)
 
+    def sort_key(self, row: Row, parameters: Mapping[str, Any] | None) -> float:
+        return utils.savefloat(get_perfdata_nth_value(row, self._num - 1, True))
+
 
 class SorterSvcPerfVal01(PerfValSorter):
     _num = 1
@@ -566,15 +605,21 @@ class SorterCustomHostVariable(ParameterizedSorter):
     def cmp(self, r1: Row, r2: Row, parameters: Mapping[str, Any] | None) -> int:
         assert parameters is not None
         variable_name = parameters["ident"].upper()
+        return cmp_insensitive_string(
+            self._get_value(r1, variable_name), self._get_value(r2, variable_name)
+        )
 
-        def _get_value(row: Row) -> str:
-            try:
-                index = row["host_custom_variable_names"].index(variable_name)
-            except ValueError:
-                return ""
-            return row["host_custom_variable_values"][index]
+    def sort_key(self, row: Row, parameters: Mapping[str, Any] | None) -> tuple[str, str]:
+        assert parameters is not None
+        return key_insensitive_string(self._get_value(row, parameters["ident"].upper()))
 
-        return cmp_insensitive_string(_get_value(r1), _get_value(r2))
+    @staticmethod
+    def _get_value(row: Row, variable_name: str) -> str:
+        try:
+            index = row["host_custom_variable_names"].index(variable_name)
+        except ValueError:
+            return ""
+        return row["host_custom_variable_values"][index]
 
 
 class SorterHostIpv4Address(Sorter):
@@ -591,13 +636,17 @@ class SorterHostIpv4Address(Sorter):
         return ["host_custom_variable_names", "host_custom_variable_values"]
 
     def cmp(self, r1: Row, r2: Row, parameters: Mapping[str, Any] | None) -> int:
-        def get_address(row):
-            custom_vars = dict(
-                zip(row["host_custom_variable_names"], row["host_custom_variable_values"])
-            )
-            return custom_vars.get("ADDRESS_4", "")
+        return compare_ips(self._get_address(r1), self._get_address(r2))
+
+    def sort_key(self, row: Row, parameters: Mapping[str, Any] | None) -> tuple:
+        return key_ip(self._get_address(row))
 
-        return compare_ips(get_address(r1), get_address(r2))
+    @staticmethod
+    def _get_address(row: Row) -> str:
+        custom_vars = dict(
+            zip(row["host_custom_variable_names"], row["host_custom_variable_values"])
+        )
+        return custom_vars.get("ADDRESS_4", "")
 
 
 class SorterNumProblems(Sorter):
@@ -622,11 +671,22 @@ class SorterNumProblems(Sorter):
             < r2["host_num_services"] - r2["host_num_services_ok"] - r2["host_num_services_pending"]
         )
 
+    def sort_key(self, row: Row, parameters: Mapping[str, Any] | None) -> int:
+        return (
+            row["host_num_services"]
+            - row["host_num_services_ok"]
+            - row["host_num_services_pending"]
+        )
+
 
 def cmp_log_what(col, a, b):
     return (log_what(a[col]) > log_what(b[col])) - (log_what(a[col]) < log_what(b[col]))
 
 
+def key_log_what(column: ColumnName, row: Row) -> int:
+    return log_what(row[column])
+
+
 def log_what(t):
     if "HOST" in t:
         return 1
@@ -648,3 +708,8 @@ def cmp_date(column, r1, r2):
     r1_date = get_day_start_timestamp(r1[column])
     r2_date = get_day_start_timestamp(r2[column])
     return (r2_date > r1_date) - (r2_date < r1_date)
+
+
+def key_date(column: ColumnName, row: Row) -> int:
+    # Reversed like cmp_date
+    return -get_day_start_timestamp(row[column])[0]
@@ -75,6 +75,7 @@ from cmk.gui.valuespec import (
     Dictionary,
     DropdownChoice,
     FixedValue,
+    Float,
     HTTPUrl,
     ID,
     Integer,
@@ -353,6 +354,30 @@ class ModeEditSite(WatoMode):
                     ),
                 ),
             ),
+            (
+                "query_timeout",
+                Alternative(
+                    title=_("Query timeout"),
+                    elements=[
+                        FixedValue(value=None, title=_("Wait for the response"), totext=""),
+                        Float(
+                            title=_("Wait at most"),
+                            size=4,
+                            unit=_("Seconds"),
+                            minvalue=0.1,
+                            display_format="%.1f",
+                            default_value=120.0,
+                        ),
+                    ],
+                    help=_(
+                        "This sets the time that the GUI waits for the response to a query "
+                        "sent to the site. A site which does not answer in time is shown as "
+                        "unreachable in the views, while the data of the other sites is shown "
+                        "without waiting any longer. By default the GUI waits until the site "
+                        "has answered."
+                    ),
+                ),
+            ),
             (
                 "persist",
                 Checkbox(
@@ -1100,6 +1100,13 @@ class CRESnapshotDataCollector(ABCSnapshotDataCollector):
         self._prepare_site_config_directory(first_site)
         self._clone_site_config_directories(first_site, site_ids)
 
+        # The site directories share the files, so hash them once for all sites here instead of
+        # in each site process. The hashes are looked up in the ConfigSyncFileHashCache later.
+        first_site_settings = self._site_snapshot_settings[first_site]
+        _get_config_sync_file_infos(
+            first_site_settings.snapshot_components, Path(first_site_settings.work_dir)
+        )
+
         for site_id, snapshot_settings in sorted(
             self._site_snapshot_settings.items(), key=lambda x: x[0]
         ):
@@ -1745,9 +1752,8 @@ class ActivateChangesSite(multiprocessing.Process, ActivateChanges):
         remote_file_infos, remote_config_generation = self._get_config_sync_state(replication_paths)
         self._logger.debug("Received %d file infos from remote", len(remote_file_infos))
 
-        # In case we experience performance issues here, we could postpone the hashing of the
-        # central files to only be done ad-hoc in get_file_names_to_sync when the other attributes
-        # are not enough to detect a differing file.
+        # The hashes of the central files are cached in the ConfigSyncFileHashCache, which is shared
+        # by the processes of all sites. Only new or changed files are hashed.
         site_config_dir = Path(self._snapshot_settings.work_dir)
         central_file_infos = _get_config_sync_file_infos(replication_paths, site_config_dir)
         self._logger.debug("Got %d file infos from %s", len(remote_file_infos), site_config_dir)
@@ -2469,6 +2475,7 @@ def _get_config_sync_file_infos(
     """
     infos = {}
     general_dir_excludes = ["__pycache__"]
+    hash_cache = ConfigSyncFileHashCache(_config_sync_file_hashes_path())
 
     for replication_path in replication_paths:
         path = base_dir.joinpath(replication_path.site_path)
@@ -2477,7 +2484,7 @@ def _get_config_sync_file_infos(
             continue  # Only report back existing things
 
         if replication_path.ty == "file":
-            infos[replication_path.site_path] = _get_config_sync_file_info(path)
+            infos[replication_path.site_path] = _get_config_sync_file_info(path, hash_cache)
 
         elif replication_path.ty == "dir":
             for entry in path.glob("**/*"):
@@ -2492,24 +2499,106 @@ def _get_config_sync_file_infos(
                     continue
 
                 entry_site_path = entry.relative_to(base_dir)
-                infos[str(entry_site_path)] = _get_config_sync_file_info(entry)
+                infos[str(entry_site_path)] = _get_config_sync_file_info(entry, hash_cache)
 
         else:
             raise NotImplementedError()
+
+    hash_cache.save()
     return infos
 
 
-def _get_config_sync_file_info(file_path: Path) -> ConfigSyncFileInfo:
+def _get_config_sync_file_info(
+    file_path: Path, hash_cache: ConfigSyncFileHashCache
+) -> ConfigSyncFileInfo:
     stat = file_path.lstat()
     is_symlink = file_path.is_symlink()
     return ConfigSyncFileInfo(
         stat.st_mode,
         stat.st_size,
         os.readlink(str(file_path)) if is_symlink else None,
-        _create_config_sync_file_hash(file_path) if not is_symlink else None,
+        hash_cache.file_hash(file_path, stat) if not is_symlink else None,
     )
 
 
+_ConfigSyncFileHashKey = tuple[int, int, int, int]  # st_dev, st_ino, st_size, st_mtime_ns
+
+
+class ConfigSyncFileHashCache:
+    """Persisted hashes of the files handled by the config sync
+
+    The site config directories of the sites are hard linked copies of the same files, so the
+    hashes are keyed by the identity of a file (st_dev, st_ino) together with st_size and
+    st_mtime_ns instead of the path. This way the processes of all sites and all following
+    activations share the hashes and a file is only hashed again once it has been changed.
+
+    Files modified within the last seconds are not cached: A file may be modified again within the
+    resolution of the modification time without changing the key.
+
+    The time of the last use is refreshed once a day, entries which have not been used for a week
+    are dropped.
+    """
+
+    _MIN_AGE = 2.0
+    _REFRESH_AGE = 86400.0
+    _MAX_UNUSED_AGE = 7 * 86400.0
+
+    def __init__(self, path: Path) -> None:
+        self._store = store.ObjectStore(
+            path,
+            serializer=store.PickleSerializer[dict[_ConfigSyncFileHashKey, tuple[str, float]]](),
+        )
+        self._now = time.time()
+        try:
+            self._cached = self._store.read_obj(default={})
+        except MKGeneralException as e:
+            logger.warning("Ignoring config sync file hash cache %s: %s", path, e)
+            self._cached = {}
+        self._used: dict[_ConfigSyncFileHashKey, tuple[str, float]] = {}
+
+    def file_hash(self, file_path: Path, stat: os.stat_result) -> str:
+        key = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if (used := self._used.get(key)) is not None:
+            return used[0]
+
+        if (cached := self._cached.get(key)) is not None:
+            file_hash = cached[0]
+        else:
+            file_hash = _create_config_sync_file_hash(file_path)
+
+        if stat.st_mtime < self._now - self._MIN_AGE:
+            self._used[key] = (file_hash, self._now)
+        return file_hash
+
+    def save(self) -> None:
+        """Add the used hashes to the persisted ones
+
+        Nothing is written as long as all hashes were already known, which is the usual case."""
+        if all(
+            (cached := self._cached.get(key)) is not None
+            and cached[1] >= self._now - self._REFRESH_AGE
+            for key in self._used
+        ):
+            return
+
+        store.makedirs(self._store.path.parent)
+        with self._store.locked():
+            # Other processes may have added hashes in the meantime
+            hashes = self._store.read_obj(default={})
+            hashes.update(self._used)
+            self._store.write_obj(
+                {
+                    key: value
+                    for key, value in hashes.items()
+                    if value[1] >= self._now - self._MAX_UNUSED_AGE
+                }
+            )
+
+
+def _config_sync_file_hashes_path() -> Path:
+    return wato_var_dir() / "config_sync_file_hashes.pkl"
+
+
 def _create_config_sync_file_hash(file_path: Path) -> str:
     sha256 = hashlib.sha256()
     with file_path.open("rb") as f:
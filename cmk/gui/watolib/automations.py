@@ -9,6 +9,7 @@ and similar things."""
 import ast
 import logging
 import re
+import socket
 import subprocess
 import uuid
 from collections.abc import Callable, Iterable, Mapping, Sequence
@@ -21,12 +22,19 @@ import urllib3
 
 from livestatus import SiteConfiguration, SiteId
 
+import cmk.utils.paths
 import cmk.utils.store as store
 import cmk.utils.version as cmk_version
 from cmk.utils.exceptions import MKGeneralException
 from cmk.utils.log import VERBOSE
 from cmk.utils.type_defs import PhaseOneResult, UserId
 
+from cmk.automations.helper import (
+    AutomationHelperRequest,
+    AutomationHelperResponse,
+    receive_message,
+    send_message,
+)
 from cmk.automations.results import result_type_registry, SerializedResult
 
 import cmk.gui.hooks as hooks
@@ -84,10 +92,13 @@ def check_mk_local_automation_serialized(
 
     cmd = ["check_mk"]
 
+    log_level = logging.INFO
     if auto_logger.isEnabledFor(logging.DEBUG):
         cmd.append("-vv")
+        log_level = logging.DEBUG
     elif auto_logger.isEnabledFor(VERBOSE):
         cmd.append("-v")
+        log_level = VERBOSE
 
     cmd += ["--automation", command] + new_args
 
@@ -102,14 +113,18 @@ def check_mk_local_automation_serialized(
     auto_logger.info("STDIN: %r" % stdin_data)
 
     try:
-        completed_process = subprocess.run(
-            cmd,
-            capture_output=True,
-            close_fds=True,
-            encoding="utf-8",
-            input=stdin_data,
-            check=False,
+        completed_process = _execute_in_automation_helper(
+            cmd, command, new_args, stdin_data, log_level
         )
+        if completed_process is None:
+            completed_process = subprocess.run(
+                cmd,
+                capture_output=True,
+                close_fds=True,
+                encoding="utf-8",
+                input=stdin_data,
+                check=False,
+            )
     except Exception as e:
         raise local_automation_failure(command=command, cmdline=cmd, exc=e)
 
@@ -147,6 +162,49 @@ def check_mk_local_automation_serialized(
     return cmd, SerializedResult(completed_process.stdout)
 
 
+def _execute_in_automation_helper(
+    cmd: Sequence[str],
+    command: str,
+    args: Sequence[str],
+    stdin_data: str,
+    log_level: int,
+) -> subprocess.CompletedProcess[str] | None:
+    """Execute the automation in the automation helper, which has the configuration loaded
+
+    Returns None in case the helper is not available or did not execute the automation. The
+    automation has to be executed in a "cmk --automation" process then.
+    """
+    try:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    except OSError:
+        return None
+
+    with connection:
+        try:
+            connection.connect(str(cmk.utils.paths.automation_helper_socket))
+        except OSError as e:
+            auto_logger.debug("Automation helper not available: %s" % e)
+            return None
+
+        # The automation may already be running from here on. It must not be executed again.
+        send_message(
+            connection,
+            AutomationHelperRequest(
+                command=command,
+                args=args,
+                stdin=stdin_data,
+                log_level=log_level,
+            ).serialize(),
+        )
+        response = AutomationHelperResponse.deserialize(receive_message(connection))
+
+    if not response.executed:
+        auto_logger.info("Automation helper is reloading, falling back to a subprocess")
+        return None
+
+    return subprocess.CompletedProcess(cmd, response.exit_code, response.stdout, response.stderr)
+
+
 def local_automation_failure(
     command: str,
     cmdline: Iterable[str],
@@ -352,6 +352,7 @@ class StatusConnection:
     connection: Socket
     proxy: Proxy
     connect_timeout: int
+    query_timeout: float | None
     persistent_connection: bool
     url_prefix: str
     status_host: StatusHost
@@ -363,6 +364,7 @@ class StatusConnection:
             connection=Socket.from_internal(internal_config["socket"]),
             proxy=Proxy.from_internal(internal_config=internal_config.get("proxy")),
             connect_timeout=internal_config["timeout"],
+            query_timeout=internal_config.get("query_timeout"),
             persistent_connection=internal_config["persist"],
             url_prefix=internal_config.get("url_prefix", ""),
             status_host=StatusHost.from_internal(
@@ -377,13 +379,14 @@ class StatusConnection:
             connection=Socket.from_external(external_config["connection"]),
             proxy=Proxy.from_external(external_config["proxy"]),
             connect_timeout=external_config["connect_timeout"],
+            query_timeout=external_config.get("query_timeout"),
             persistent_connection=external_config["persistent_connection"],
             url_prefix=external_config["url_prefix"],
             status_host=StatusHost(**external_config["status_host"]),
             disable_in_status_gui=external_config["disable_in_status_gui"],
         )
 
-    def to_external(self) -> Iterator[tuple[str, dict | bool | int]]:
+    def to_external(self) -> Iterator[tuple[str, dict | bool | int | float | None]]:
         for k, v in self.__dict__.items():
             if k == "status_host":
                 yield k, dict(self.status_host.to_external())
@@ -406,6 +409,7 @@ class StatusConnection:
             "proxy": self.proxy.to_internal(),
             "disabled": self.disable_in_status_gui,
             "timeout": self.connect_timeout,
+            "query_timeout": self.query_timeout,
             "persist": self.persistent_connection,
             "url_prefix": self.url_prefix,
         }
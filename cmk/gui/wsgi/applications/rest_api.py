@@ -39,6 +39,7 @@ from cmk.gui.plugins.openapi.restful_objects.parameters import (
     HEADER_CHECKMK_VERSION,
 )
 from cmk.gui.plugins.openapi.utils import (
+    APICrashReport,
     EXT,
     problem,
     ProblemException,
@@ -432,11 +433,3 @@ class CheckmkRESTAPI(AbstractWSGIApp):
                 detail=str(exc),
                 ext=EXT(crash_details),
             )(environ, start_response)
-
-
-class APICrashReport(crash_reporting.ABCCrashReport):
-    """API specific crash reporting class."""
-
-    @classmethod
-    def type(cls):
-        return "rest_api"
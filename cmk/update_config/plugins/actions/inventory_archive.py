@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 tribe29 GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+from logging import Logger
+from pathlib import Path
+
+import cmk.utils.paths
+from cmk.utils import debug
+from cmk.utils.log import VERBOSE
+from cmk.utils.structured_data import TreeOrArchiveStore
+
+from cmk.update_config.registry import update_action_registry, UpdateAction
+from cmk.update_config.update_state import UpdateActionState
+
+
+class ConvertInventoryArchive(UpdateAction):
+    def __call__(self, logger: Logger, update_action_state: UpdateActionState) -> None:
+        """Replace the archived inventory trees by deltas to their previous trees"""
+        archive_dir = Path(cmk.utils.paths.inventory_archive_dir)
+        if not archive_dir.exists():
+            return
+
+        tree_or_archive_store = TreeOrArchiveStore(
+            cmk.utils.paths.inventory_output_dir,
+            archive_dir,
+        )
+        for host_dir in archive_dir.iterdir():
+            if not host_dir.is_dir():
+                continue
+            logger.log(VERBOSE, "Converting inventory archive of %s", host_dir.name)
+            try:
+                tree_or_archive_store.convert_archive(host_name=host_dir.name)
+            except Exception as e:
+                if debug.enabled():
+                    raise
+                logger.error("Error converting inventory archive of %s: %s", host_dir.name, e)
+
+
+update_action_registry.register(
+    ConvertInventoryArchive(
+        name="inventory_archive",
+        title="Convert inventory archive",
+        sort_index=120,
+    )
+)
@@ -7,6 +7,7 @@ from __future__ import annotations
 
 import os
 import posix
+import resource
 from dataclasses import dataclass
 
 from cmk.utils.log import console
@@ -28,6 +29,17 @@ class Snapshot:
     def take(cls) -> Snapshot:
         return cls(os.times())
 
+    @classmethod
+    def take_thread(cls) -> Snapshot:
+        """Take a snapshot of the CPU times of the calling thread only
+
+        The CPU times of child processes can not be attributed to a thread and are left out.
+        """
+        usage = resource.getrusage(resource.RUSAGE_THREAD)
+        return cls(
+            posix.times_result((usage.ru_utime, usage.ru_stime, 0.0, 0.0, os.times().elapsed))
+        )
+
     @classmethod
     def deserialize(cls, serialized: object) -> Snapshot:
         try:
@@ -54,8 +66,9 @@ class Snapshot:
 
 
 class CPUTracker:
-    def __init__(self) -> None:
+    def __init__(self, *, per_thread: bool = False) -> None:
         super().__init__()
+        self._take = Snapshot.take_thread if per_thread else Snapshot.take
         self._start: Snapshot = Snapshot.null()
         self._end: Snapshot = Snapshot.null()
 
@@ -63,12 +76,12 @@ class CPUTracker:
         return "%s()" % type(self).__name__
 
     def __enter__(self) -> CPUTracker:
-        self._start = Snapshot.take()
+        self._start = self._take()
         console.vverbose("[cpu_tracking] Start [%x]\n", id(self))
         return self
 
     def __exit__(self, *exc_info: object) -> None:
-        self._end = Snapshot.take()
+        self._end = self._take()
         console.vverbose("[cpu_tracking] Stop [%x - %s]\n", id(self), self.duration)
 
     @property
@@ -68,6 +68,7 @@ nagios_binary = _omd_path_str("bin/nagios")
 apache_config_dir = _omd_path_str("etc/apache")
 htpasswd_file = _omd_path_str("etc/htpasswd")
 livestatus_unix_socket = _omd_path_str("tmp/run/live")
+automation_helper_socket = _omd_path("tmp/run/automation-helper")
 livebackendsdir = _omd_path_str("share/check_mk/livestatus")
 inventory_output_dir = _omd_path_str("var/check_mk/inventory")
 inventory_archive_dir = _omd_path_str("var/check_mk/inventory_archive")
@@ -80,11 +81,13 @@ discovered_host_labels_dir = base_discovered_host_labels_dir
 autodiscovery_dir = _omd_path_str("var/check_mk/autodiscovery")
 piggyback_dir = Path(tmp_dir, "piggyback")
 piggyback_source_dir = Path(tmp_dir, "piggyback_sources")
+piggyback_segments_dir = Path(tmp_dir, "piggyback_segments")
 profile_dir = Path(var_dir, "web")
 crash_dir = Path(var_dir, "crashes")
 diagnostics_dir = Path(var_dir, "diagnostics")
 site_config_dir = Path(var_dir, "site_configs")
 visuals_cache_dir = Path(tmp_dir, "visuals_cache")
+snmpwalks_index_dir = Path(tmp_dir, "snmpwalk_index")
 
 # persisted secret files
 # avoid using these paths directly; use wrappers in cmk.util.crypto.secrets instead
@@ -4,13 +4,16 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import errno
+import json
 import logging
 import os
+import struct
 import tempfile
+import time
 from collections.abc import Container, Iterable, Iterator, Mapping, Sequence
-from contextlib import suppress
+from contextlib import contextmanager, suppress
 from pathlib import Path
-from typing import Final, NamedTuple
+from typing import BinaryIO, Final, Literal, NamedTuple
 
 import cmk.utils
 import cmk.utils.paths
@@ -43,6 +46,20 @@ PiggybackTimeSettings = Sequence[_PiggybackTimeSetting]
 
 _PiggybackTimeSettingsMap = Mapping[tuple[str | None, str], int]
 
+PiggybackStorageFormat = Literal["files", "segments"]
+
+_storage_format: PiggybackStorageFormat = "files"
+
+
+def set_storage_format(storage_format: PiggybackStorageFormat) -> None:
+    """Choose the layout newly received piggyback data is written in
+
+    Readers always understand both layouts, so the format can be switched at any time.
+    """
+    global _storage_format
+    _storage_format = storage_format
+
+
 # ***** Terminology *****
 # "piggybacked_host_folder":
 # - tmp/check_mk/piggyback/HOST
@@ -59,6 +76,12 @@ _PiggybackTimeSettingsMap = Mapping[tuple[str | None, str], int]
 # "source_hostname":
 # - Path(tmp/check_mk/piggyback/HOST/SOURCE).name
 # - Path(tmp/check_mk/piggyback_sources/SOURCE).name
+# - Path(tmp/check_mk/piggyback_segments/SOURCE).name
+#
+# "piggyback_segment":
+# - tmp/check_mk/piggyback_segments/SOURCE
+# - holds the data of all piggybacked hosts of one source together with an index
+#   (see the "segments" section below)
 
 
 def get_piggyback_raw_data(
@@ -89,7 +112,7 @@ def get_piggyback_raw_data(
             # Raw data is always stored as bytes. Later the content is
             # converted to unicode in abstact.py:_parse_info which respects
             # 'encoding' in section options.
-            raw_data = AgentRawData(store.load_bytes_from_file(file_info.file_path))
+            raw_data = _load_raw_data(file_info, piggybacked_hostname)
 
         except OSError as e:
             reason = "Cannot read piggyback raw data from source '%s'" % file_info.source_hostname
@@ -138,15 +161,16 @@ def get_source_and_piggyback_hosts(
     time_settings: PiggybackTimeSettings,
 ) -> Iterator[tuple[HostName, HostName]]:
     """Generates all piggyback pig/piggybacked host pairs that have up-to-date data"""
-
-    for piggybacked_host_folder in _get_piggybacked_host_folders():
-        for file_info in _get_piggyback_processed_file_infos(
-            HostName(piggybacked_host_folder.name),
-            time_settings,
-        ):
-            if not file_info.successfully_processed:
-                continue
-            yield HostName(file_info.source_hostname), HostName(piggybacked_host_folder.name)
+    with read_pass():
+        host_pairs = [
+            (HostName(file_info.source_hostname), piggybacked_hostname)
+            for piggybacked_hostname in _get_piggybacked_hostnames()
+            for file_info in _get_piggyback_processed_file_infos(
+                piggybacked_hostname, time_settings
+            )
+            if file_info.successfully_processed
+        ]
+    yield from host_pairs
 
 
 def has_piggyback_raw_data(
@@ -227,19 +251,61 @@ def _get_piggyback_processed_file_infos(
     _get_piggyback_processed_file_infos(), store_piggyback_raw_data() or cleanup_piggyback_files()
     functions. Therefor all these functions needs to deal with suddenly vanishing or
     updated files/directories.
+
+    In case a source has data for the host in both layouts (e.g. after the storage format
+    has been switched), the more recently stored data is used.
     """
-    source_hostnames = get_source_hostnames(piggybacked_hostname)
-    expanded_time_settings = _TimeSettingsMap(source_hostnames, piggybacked_hostname, time_settings)
-    return [
-        _get_piggyback_processed_file_info(
-            source_hostname,
+    segments = {
+        segment.source_hostname: segment for segment in _get_segments_of(piggybacked_hostname)
+    }
+    file_source_hostnames = [
+        source_hostname
+        for source_hostname in _get_file_source_hostnames(piggybacked_hostname)
+        if not source_hostname.startswith(".")
+        and not _is_superseded_by_segment(
+            segments.get(source_hostname),
             piggybacked_hostname,
             _get_piggybacked_file_path(source_hostname, piggybacked_hostname),
-            expanded_time_settings,
         )
-        for source_hostname in source_hostnames
-        if not source_hostname.startswith(".")
     ]
+    expanded_time_settings = _TimeSettingsMap(
+        [*file_source_hostnames, *segments], piggybacked_hostname, time_settings
+    )
+    return [
+        *(
+            _get_piggyback_processed_file_info(
+                source_hostname,
+                piggybacked_hostname,
+                _get_piggybacked_file_path(source_hostname, piggybacked_hostname),
+                expanded_time_settings,
+            )
+            for source_hostname in file_source_hostnames
+        ),
+        *(
+            _get_piggyback_processed_segment_info(
+                segment,
+                piggybacked_hostname,
+                expanded_time_settings,
+            )
+            for source_hostname, segment in segments.items()
+            if source_hostname not in file_source_hostnames
+        ),
+    ]
+
+
+def _is_superseded_by_segment(
+    segment: "_Segment | None",
+    piggybacked_hostname: HostName,
+    piggyback_file_path: Path,
+) -> bool:
+    if segment is None:
+        return False
+    try:
+        return (
+            segment.entries[piggybacked_hostname].stored_at >= piggyback_file_path.stat().st_mtime
+        )
+    except FileNotFoundError:
+        return True
 
 
 def _get_piggyback_processed_file_info(
@@ -255,6 +321,45 @@ def _get_piggyback_processed_file_info(
             source_hostname, piggyback_file_path, False, "Piggyback file is missing", 0
         )
 
+    status_file_path = _get_source_status_file_path(source_hostname)
+    return _get_piggyback_processed_info(
+        source_hostname,
+        piggybacked_hostname,
+        piggyback_file_path,
+        settings,
+        file_age=file_age,
+        source_is_sending=status_file_path.exists(),
+        is_outdated=_is_piggyback_file_outdated(status_file_path, piggyback_file_path),
+    )
+
+
+def _get_piggyback_processed_segment_info(
+    segment: "_Segment",
+    piggybacked_hostname: HostName,
+    settings: _TimeSettingsMap,
+) -> PiggybackFileInfo:
+    stored_at = segment.entries[piggybacked_hostname].stored_at
+    return _get_piggyback_processed_info(
+        segment.source_hostname,
+        piggybacked_hostname,
+        segment.path,
+        settings,
+        file_age=time.time() - stored_at,
+        source_is_sending=segment.last_contact is not None,
+        is_outdated=segment.last_contact is not None and segment.last_contact > stored_at,
+    )
+
+
+def _get_piggyback_processed_info(
+    source_hostname: HostName,
+    piggybacked_hostname: HostName,
+    piggyback_file_path: Path,
+    settings: _TimeSettingsMap,
+    *,
+    file_age: float,
+    source_is_sending: bool,
+    is_outdated: bool,
+) -> PiggybackFileInfo:
     if (outdated := file_age - settings.max_cache_age(source_hostname, piggybacked_hostname)) > 0:
         return PiggybackFileInfo(
             source_hostname,
@@ -267,8 +372,7 @@ def _get_piggyback_processed_file_info(
     validity_period = settings.validity_period(source_hostname, piggybacked_hostname)
     validity_state = settings.validity_state(source_hostname, piggybacked_hostname)
 
-    status_file_path = _get_source_status_file_path(source_hostname)
-    if not status_file_path.exists():
+    if not source_is_sending:
         valid_msg = _validity_period_message(file_age, validity_period)
         return PiggybackFileInfo(
             source_hostname,
@@ -278,7 +382,7 @@ def _get_piggyback_processed_file_info(
             validity_state if valid_msg else 0,
         )
 
-    if _is_piggyback_file_outdated(status_file_path, piggyback_file_path):
+    if is_outdated:
         valid_msg = _validity_period_message(file_age, validity_period)
         return PiggybackFileInfo(
             source_hostname,
@@ -332,13 +436,19 @@ def remove_source_status_file(source_hostname: HostName) -> bool:
     """Remove the source_status_file of this piggyback host which will
     mark the piggyback data from this source as outdated."""
     source_status_path = _get_source_status_file_path(source_hostname)
-    return _remove_piggyback_file(source_status_path)
+    removed_status_file = _remove_piggyback_file(source_status_path)
+    marked_segment = _mark_segment_not_sending(source_hostname)
+    return removed_status_file or marked_segment
 
 
 def store_piggyback_raw_data(
     source_hostname: HostName,
     piggybacked_raw_data: Mapping[HostName, Sequence[bytes]],
 ) -> None:
+    if _storage_format == "segments":
+        _store_piggyback_segment(source_hostname, piggybacked_raw_data)
+        return
+
     piggyback_file_paths = []
     for piggybacked_hostname, lines in piggybacked_raw_data.items():
         piggyback_file_path = _get_piggybacked_file_path(source_hostname, piggybacked_hostname)
@@ -404,6 +514,323 @@ def _store_status_file_of(
     os.rename(tmp_path, str(status_file_path))
 
 
+#   .--segments------------------------------------------------------------.
+#   |                                                 _                    |
+#   |             ___  ___  __ _ _ __ ___   ___ _ __ | |_ ___              |
+#   |            / __|/ _ \/ _` | '_ ` _ \ / _ \ '_ \| __/ __|             |
+#   |            \__ \  __/ (_| | | | | | |  __/ | | | |_\__ \             |
+#   |            |___/\___|\__, |_| |_| |_|\___|_| |_|\__|___/             |
+#   |                      |___/                                           |
+#   |                                                                      |
+#   +----------------------------------------------------------------------+
+#   | With the "segments" storage format all data of a source is written   |
+#   | into a single file per cycle. The file starts with a header which    |
+#   | records the last contact with the source and maps every piggybacked  |
+#   | host to the byte range of its data and the time it was stored. This  |
+#   | replaces the mtimes of the per host files and the source status file |
+#   | of the "files" storage format.                                       |
+#   '----------------------------------------------------------------------'
+
+_SEGMENT_MAGIC: Final = b"CMK-PIGGYBACK-SEGMENT-1\n"
+_SEGMENT_HEADER_LENGTH: Final = struct.Struct("<I")
+
+
+class _SegmentEntry(NamedTuple):
+    offset: int
+    length: int
+    stored_at: float
+
+
+class _Segment(NamedTuple):
+    path: Path
+    source_hostname: HostName
+    last_contact: float | None
+    payload_offset: int
+    entries: Mapping[HostName, _SegmentEntry]
+
+
+# Data of a piggybacked host and the time it has been stored
+_SegmentData = dict[HostName, tuple[bytes, float]]
+
+# The headers are cached by path and validated with the inode, mtime and size of the file, so
+# that processes reading data of many hosts (e.g. the keepalive helpers) parse every header
+# only once per cycle of its source.
+_segment_cache: dict[Path, tuple[tuple[int, int, int], _Segment | None]] = {}
+
+
+class _SegmentIndex(NamedTuple):
+    segments: Sequence[_Segment]
+    by_piggybacked_host: Mapping[HostName, Sequence[_Segment]]
+
+
+# The segments found at the start of the current read pass, see read_pass()
+_read_pass_index: _SegmentIndex | None = None
+
+
+@contextmanager
+def read_pass() -> Iterator[None]:
+    """Look up the segments only once for all the reads done in this context
+
+    Otherwise every read of the data of a piggybacked host lists and opens all segments. Use
+    this when reading the data of many hosts at once. Segments written while the context is
+    active are not seen by the reads in it.
+    """
+    global _read_pass_index
+    if _read_pass_index is not None:
+        yield
+        return
+
+    _read_pass_index = _get_segment_index()
+    try:
+        yield
+    finally:
+        _read_pass_index = None
+
+
+def _get_segment_path(source_hostname: HostName) -> Path:
+    return cmk.utils.paths.piggyback_segments_dir / str(source_hostname)
+
+
+def _get_segments() -> Sequence[_Segment]:
+    if _read_pass_index is not None:
+        return _read_pass_index.segments
+    return _get_segment_index().segments
+
+
+def _get_segments_of(piggybacked_hostname: HostName) -> Sequence[_Segment]:
+    if _read_pass_index is not None:
+        return _read_pass_index.by_piggybacked_host.get(piggybacked_hostname, [])
+    return [segment for segment in _get_segments() if piggybacked_hostname in segment.entries]
+
+
+def _get_segment_index() -> _SegmentIndex:
+    segments = [
+        segment
+        for segment_path in _files_in(cmk.utils.paths.piggyback_segments_dir)
+        if (segment := _load_segment(segment_path)) is not None
+    ]
+    by_piggybacked_host: dict[HostName, list[_Segment]] = {}
+    for segment in segments:
+        for piggybacked_hostname in segment.entries:
+            by_piggybacked_host.setdefault(piggybacked_hostname, []).append(segment)
+    return _SegmentIndex(segments, by_piggybacked_host)
+
+
+def _load_segment(segment_path: Path) -> _Segment | None:
+    try:
+        with segment_path.open("rb") as f:
+            return _read_segment_header(segment_path, f)
+    except FileNotFoundError:
+        return None
+
+
+def _read_segment_header(segment_path: Path, f: BinaryIO) -> _Segment | None:
+    stat = os.fstat(f.fileno())
+    stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    if (cached := _segment_cache.get(segment_path)) is not None and cached[0] == stamp:
+        return cached[1]
+
+    segment = _parse_segment_header(segment_path, f)
+    _segment_cache[segment_path] = (stamp, segment)
+    return segment
+
+
+def _parse_segment_header(segment_path: Path, f: BinaryIO) -> _Segment | None:
+    # Files without a valid header are not an error: store.locked() creates an empty file
+    # while a segment is written for the first time.
+    if f.read(len(_SEGMENT_MAGIC)) != _SEGMENT_MAGIC:
+        return None
+    if len(raw_length := f.read(_SEGMENT_HEADER_LENGTH.size)) != _SEGMENT_HEADER_LENGTH.size:
+        return None
+    (header_length,) = _SEGMENT_HEADER_LENGTH.unpack(raw_length)
+    try:
+        header = json.loads(f.read(header_length))
+    except ValueError as e:
+        logger.log(VERBOSE, "Piggyback segment '%s' is corrupt (%s). Skip it.", segment_path, e)
+        return None
+
+    return _Segment(
+        path=segment_path,
+        source_hostname=HostName(header["source"]),
+        last_contact=header["last_contact"],
+        payload_offset=len(_SEGMENT_MAGIC) + _SEGMENT_HEADER_LENGTH.size + header_length,
+        entries={
+            HostName(piggybacked_hostname): _SegmentEntry(*entry)
+            for piggybacked_hostname, entry in header["hosts"].items()
+        },
+    )
+
+
+def _load_segment_raw_data(segment_path: Path, piggybacked_hostname: HostName) -> bytes:
+    # Header and data are read from the same file descriptor: a concurrently written segment
+    # replaces the file, it never modifies it in place.
+    with segment_path.open("rb") as f:
+        segment = _read_segment_header(segment_path, f)
+        if segment is None or (entry := segment.entries.get(piggybacked_hostname)) is None:
+            raise FileNotFoundError(
+                errno.ENOENT, f"No data of {piggybacked_hostname} in", str(segment_path)
+            )
+        f.seek(segment.payload_offset + entry.offset)
+        return f.read(entry.length)
+
+
+def _load_segment_data(segment_path: Path) -> tuple[_Segment, _SegmentData] | None:
+    try:
+        with segment_path.open("rb") as f:
+            if (segment := _read_segment_header(segment_path, f)) is None:
+                return None
+            f.seek(segment.payload_offset)
+            payload = f.read()
+    except FileNotFoundError:
+        return None
+
+    return segment, {
+        piggybacked_hostname: (payload[entry.offset : entry.offset + entry.length], entry.stored_at)
+        for piggybacked_hostname, entry in segment.entries.items()
+    }
+
+
+def _serialize_segment(
+    source_hostname: HostName,
+    last_contact: float | None,
+    segment_data: _SegmentData,
+) -> bytes:
+    index: dict[str, tuple[int, int, float]] = {}
+    offset = 0
+    for piggybacked_hostname, (raw_data, stored_at) in segment_data.items():
+        index[str(piggybacked_hostname)] = (offset, len(raw_data), stored_at)
+        offset += len(raw_data)
+
+    header = json.dumps(
+        {"source": str(source_hostname), "last_contact": last_contact, "hosts": index}
+    ).encode("utf-8")
+    return b"".join(
+        [
+            _SEGMENT_MAGIC,
+            _SEGMENT_HEADER_LENGTH.pack(len(header)),
+            header,
+            *(raw_data for raw_data, _stored_at in segment_data.values()),
+        ]
+    )
+
+
+def _save_segment(
+    source_hostname: HostName,
+    last_contact: float | None,
+    segment_data: _SegmentData,
+) -> None:
+    segment_path = _get_segment_path(source_hostname)
+    if not segment_data:
+        _remove_piggyback_file(segment_path)
+        return
+    store.save_bytes_to_file(
+        segment_path, _serialize_segment(source_hostname, last_contact, segment_data)
+    )
+
+
+def _store_piggyback_segment(
+    source_hostname: HostName,
+    piggybacked_raw_data: Mapping[HostName, Sequence[bytes]],
+) -> None:
+    if not piggybacked_raw_data:
+        logger.debug("Received no piggyback data")
+        _remove_piggyback_file(_get_source_status_file_path(source_hostname))
+        _mark_segment_not_sending(source_hostname)
+        return
+
+    logger.log(VERBOSE, "Received piggyback data for %d hosts", len(piggybacked_raw_data))
+    segment_path = _get_segment_path(source_hostname)
+    store.makedirs(segment_path.parent)
+    with store.locked(segment_path):
+        migrated_files: Sequence[Path] = []
+        if (loaded := _load_segment_data(segment_path)) is not None:
+            segment_data = loaded[1]
+        else:
+            # First segment of this source: take over what it has stored in the files layout
+            segment_data, migrated_files = _load_piggyback_files_of(source_hostname)
+
+        # Hosts which are missing in this cycle keep their data and store time. This way they
+        # are reported as "not updated by source", just like stale files of the files layout.
+        now = time.time()
+        for piggybacked_hostname, lines in piggybacked_raw_data.items():
+            logger.log(VERBOSE, "Storing piggyback data for: %r", piggybacked_hostname)
+            segment_data[piggybacked_hostname] = (b"%s\n" % b"\n".join(lines), now)
+
+        _save_segment(source_hostname, now, segment_data)
+
+    for piggyback_file_path in migrated_files:
+        _remove_piggyback_file(piggyback_file_path)
+    if migrated_files:
+        _remove_piggyback_file(_get_source_status_file_path(source_hostname))
+
+
+def _mark_segment_not_sending(source_hostname: HostName) -> bool:
+    segment_path = _get_segment_path(source_hostname)
+    # Do not let store.locked() create a segment for all the sources without piggyback data
+    if not segment_path.exists():
+        return False
+
+    with store.locked(segment_path):
+        loaded = _load_segment_data(segment_path)
+        if loaded is None or loaded[0].last_contact is None:
+            return False
+        _save_segment(source_hostname, None, loaded[1])
+    return True
+
+
+def _load_piggyback_files_of(source_hostname: HostName) -> tuple[_SegmentData, Sequence[Path]]:
+    segment_data: _SegmentData = {}
+    piggyback_file_paths = []
+    for piggybacked_host_folder in _get_piggybacked_host_folders():
+        piggyback_file_path = piggybacked_host_folder / str(source_hostname)
+        try:
+            stored_at = piggyback_file_path.stat().st_mtime
+            raw_data = piggyback_file_path.read_bytes()
+        except FileNotFoundError:
+            continue
+        segment_data[HostName(piggybacked_host_folder.name)] = (raw_data, stored_at)
+        piggyback_file_paths.append(piggyback_file_path)
+    return segment_data, piggyback_file_paths
+
+
+def migrate_piggyback_files_to_segments() -> None:
+    """Convert the piggyback data stored in the files layout into segments
+
+    The mtimes of the piggyback files and source status files become the store times and the
+    last contact times of the segments. Data which has already been written to a segment is
+    newer and therefore wins. Converted files are removed.
+    """
+    status_files = {HostName(path.name): path for path in _get_source_state_files()}
+    for source_hostname in sorted({*get_source_hostnames(), *status_files}):
+        segment_path = _get_segment_path(source_hostname)
+        store.makedirs(segment_path.parent)
+        with store.locked(segment_path):
+            segment_data, migrated_files = _load_piggyback_files_of(source_hostname)
+            if (loaded := _load_segment_data(segment_path)) is not None:
+                segment, current_data = loaded
+                last_contact = segment.last_contact
+                segment_data.update(current_data)
+            else:
+                try:
+                    last_contact = status_files[source_hostname].stat().st_mtime
+                except (KeyError, FileNotFoundError):
+                    last_contact = None
+
+            if migrated_files:
+                logger.log(
+                    VERBOSE,
+                    "Migrating %d piggyback files of source '%s' to segment",
+                    len(migrated_files),
+                    source_hostname,
+                )
+            _save_segment(source_hostname, last_contact, segment_data)
+
+        for piggyback_file_path in migrated_files:
+            _remove_piggyback_file(piggyback_file_path)
+        _remove_piggyback_file(_get_source_status_file_path(source_hostname))
+
+
+# .
 #   .--folders/files-------------------------------------------------------.
 #   |         __       _     _                  ____ _ _                   |
 #   |        / _| ___ | | __| | ___ _ __ ___   / / _(_) | ___  ___         |
@@ -415,6 +842,22 @@ def _store_status_file_of(
 
 
 def get_source_hostnames(piggybacked_hostname: HostName | None = None) -> Sequence[HostName]:
+    segment_source_hostnames = [
+        segment.source_hostname
+        for segment in (
+            _get_segments()
+            if piggybacked_hostname is None
+            else _get_segments_of(piggybacked_hostname)
+        )
+    ]
+    return list(
+        dict.fromkeys(
+            [*_get_file_source_hostnames(piggybacked_hostname), *segment_source_hostnames]
+        )
+    )
+
+
+def _get_file_source_hostnames(piggybacked_hostname: HostName | None) -> Sequence[HostName]:
     if piggybacked_hostname is None:
         return [
             HostName(source_host.name)
@@ -426,6 +869,21 @@ def get_source_hostnames(piggybacked_hostname: HostName | None = None) -> Sequen
     return [HostName(source_host.name) for source_host in _files_in(piggybacked_host_folder)]
 
 
+def _get_piggybacked_hostnames() -> Sequence[HostName]:
+    return list(
+        dict.fromkeys(
+            [
+                *(HostName(folder.name) for folder in _get_piggybacked_host_folders()),
+                *(
+                    piggybacked_hostname
+                    for segment in _get_segments()
+                    for piggybacked_hostname in segment.entries
+                ),
+            ]
+        )
+    )
+
+
 def _get_piggybacked_host_folders() -> Sequence[Path]:
     return _files_in(cmk.utils.paths.piggyback_dir)
 
@@ -452,6 +910,12 @@ def _get_piggybacked_file_path(
     return cmk.utils.paths.piggyback_dir / piggybacked_hostname / source_hostname
 
 
+def _load_raw_data(file_info: PiggybackFileInfo, piggybacked_hostname: HostName) -> AgentRawData:
+    if file_info.file_path.parent == cmk.utils.paths.piggyback_segments_dir:
+        return AgentRawData(_load_segment_raw_data(file_info.file_path, piggybacked_hostname))
+    return AgentRawData(store.load_bytes_from_file(file_info.file_path))
+
+
 # .
 #   .--clean up------------------------------------------------------------.
 #   |                     _                                                |
@@ -477,10 +941,14 @@ def cleanup_piggyback_files(time_settings: PiggybackTimeSettings) -> None:
         time_settings,
     )
 
+    if _storage_format == "segments":
+        migrate_piggyback_files_to_segments()
+
     piggybacked_hosts_settings = _get_piggybacked_hosts_settings(time_settings)
 
     _cleanup_old_source_status_files(piggybacked_hosts_settings)
     _cleanup_old_piggybacked_files(piggybacked_hosts_settings)
+    _cleanup_old_segments(time_settings)
 
 
 def _get_piggybacked_hosts_settings(
@@ -583,3 +1051,62 @@ def _cleanup_old_piggybacked_files(
             "Piggyback folder '%s' is empty. Removed it.",
             piggybacked_host_folder,
         )
+
+
+def _cleanup_old_segments(time_settings: PiggybackTimeSettings) -> None:
+    """Remove outdated data from the piggyback segments
+
+    This does the same as the cleanup of the files layout: The last contact with a source is
+    reset once it exceeds the greatest maximum cache age of its piggybacked hosts. Afterwards
+    the data of all hosts which would not be processed anymore is dropped and segments without
+    any data are removed."""
+    for segment_path in _files_in(cmk.utils.paths.piggyback_segments_dir):
+        with store.locked(segment_path):
+            if (loaded := _load_segment_data(segment_path)) is None:
+                _remove_piggyback_file(segment_path)
+                continue
+            segment, segment_data = loaded
+
+            time_settings_maps = {
+                piggybacked_hostname: _TimeSettingsMap(
+                    [segment.source_hostname], piggybacked_hostname, time_settings
+                )
+                for piggybacked_hostname in segment.entries
+            }
+            max_cache_age_of_source = max(
+                (
+                    settings.max_cache_age(segment.source_hostname, piggybacked_hostname)
+                    for piggybacked_hostname, settings in time_settings_maps.items()
+                ),
+                default=None,
+            )
+            last_contact = segment.last_contact
+            if (
+                last_contact is not None
+                and max_cache_age_of_source is not None
+                and (contact_age := time.time() - last_contact) > max_cache_age_of_source
+            ):
+                logger.log(
+                    VERBOSE,
+                    "Last contact of piggyback segment '%s' is outdated (%s). Reset it.",
+                    segment_path,
+                    Age(contact_age - max_cache_age_of_source),
+                )
+                last_contact = None
+
+            for piggybacked_hostname, settings in time_settings_maps.items():
+                file_info = _get_piggyback_processed_segment_info(
+                    segment._replace(last_contact=last_contact), piggybacked_hostname, settings
+                )
+                if not file_info.successfully_processed:
+                    logger.log(
+                        VERBOSE,
+                        "Piggyback data of '%s' in segment '%s' is outdated (%s). Remove it.",
+                        piggybacked_hostname,
+                        segment_path,
+                        file_info.message,
+                    )
+                    del segment_data[piggybacked_hostname]
+
+            if last_contact != segment.last_contact or len(segment_data) != len(segment.entries):
+                _save_segment(segment.source_hostname, last_contact, segment_data)
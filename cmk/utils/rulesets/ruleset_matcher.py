@@ -172,6 +172,7 @@ class RulesetMatcher:
         all_configured_hosts: set[HostName],
         clusters_of: dict[HostName, list[HostName]],
         nodes_of: dict[HostName, list[HostName]],
+        use_host_index: bool = True,
     ) -> None:
         super().__init__()
 
@@ -185,6 +186,7 @@ class RulesetMatcher:
             all_configured_hosts,
             clusters_of,
             nodes_of,
+            use_host_index=use_host_index,
         )
         self.labels_of_host = self.ruleset_optimizer.labels_of_host
         self.labels_of_service = self.ruleset_optimizer.labels_of_service
@@ -393,7 +395,14 @@ class RulesetMatcher:
 
 class RulesetOptimizer:
     """Performs some precalculations on the configured rulesets to improve the
-    processing performance"""
+    processing performance
+
+    The host conditions of the rules are resolved using inverted indexes which
+    map each tag, each label and each folder to the set of hosts having it. This
+    way a rule condition is reduced to a few set operations instead of checking
+    every host one by one. The one by one evaluation is still available (see
+    use_host_index) and is used to cross check the indexed matching.
+    """
 
     def __init__(
         self,
@@ -404,9 +413,11 @@ class RulesetOptimizer:
         all_configured_hosts: set[HostName],
         clusters_of: dict[HostName, list[HostName]],
         nodes_of: dict[HostName, list[HostName]],
+        use_host_index: bool = True,
     ) -> None:
         super().__init__()
         self._ruleset_matcher = ruleset_matcher
+        self._use_host_index = use_host_index
         self._labels = labels
         self._host_tags = {hn: set(tags_of_host.items()) for hn, tags_of_host in host_tags.items()}
         self._host_paths = host_paths
@@ -438,6 +449,17 @@ class RulesetOptimizer:
         # Reference hostname -> tag group reference
         self._host_grouped_ref: dict[HostName, tuple[tuple[TaggroupID, TagID], ...]] = {}
 
+        # Inverted indexes: (tag group, tag) / folder path -> configured hosts having it. Tag
+        # conditions may refer to the unset tag (None) of a tag group, which no host has.
+        self._hosts_by_tag: dict[tuple[TaggroupID, TagID | None], set[HostName]] = {}
+        self._hosts_by_folder: dict[str, set[HostName]] = {}
+
+        # Inverted index (label key, label value) -> hosts. The labels of a host are only
+        # computed when a label condition needs to be checked for it, so this index is
+        # filled incrementally. _label_indexed_hosts tracks the hosts already added.
+        self._hosts_by_label: dict[tuple[str, str], set[HostName]] = {}
+        self._label_indexed_hosts: set[HostName] = set()
+
         # TODO: Clean this one up?
         self._initialize_host_lookup()
 
@@ -448,6 +470,8 @@ class RulesetOptimizer:
     def clear_caches(self) -> None:
         self._host_ruleset_cache.clear()
         self._all_matching_hosts_match_cache.clear()
+        self._hosts_by_label.clear()
+        self._label_indexed_hosts.clear()
 
     def all_processed_hosts(self) -> set[HostName]:
         """Returns a set of all processed hosts"""
@@ -589,7 +613,7 @@ class RulesetOptimizer:
 
         return negate, regex("(?:%s)" % "|".join("(?:%s)" % p for p in pattern_parts))
 
-    def _all_matching_hosts(  # pylint: disable=too-many-branches
+    def _all_matching_hosts(
         self, condition: RuleConditionsSpec, with_foreign_hosts: bool
     ) -> set[HostName]:
         """Returns a set containing the names of hosts that match the given
@@ -625,8 +649,138 @@ class RulesetOptimizer:
             valid_hosts
         )
 
+        if self._use_host_index:
+            matching = self._match_hosts_by_index(valid_hosts, hostlist, tag_conditions, labels)
+        else:
+            matching = self._match_hosts_one_by_one(
+                cache_id, valid_hosts, hostlist, tag_conditions, labels
+            )
+
+        self._all_matching_hosts_match_cache[cache_id] = matching
+        return matching
+
+    def _match_hosts_by_index(
+        self,
+        valid_hosts: set[HostName],
+        hostlist: HostOrServiceConditions | None,
+        tag_conditions: TaggroupIDToTagCondition,
+        labels: LabelConditions,
+    ) -> set[HostName]:
+        """Computes the matching hosts using set operations on the inverted indexes
+
+        The conditions are applied from the cheapest to the most expensive one, so that
+        regex matching and label computation only have to deal with the remaining hosts.
+        """
+        if hostlist == []:
+            return set()  # Empty host list -> Nothing matches
+
+        negate, host_entries = parse_negated_condition_list(hostlist) if hostlist else (False, [])
+        explicit_hosts = {entry for entry in host_entries if not isinstance(entry, dict)}
+        host_patterns = [
+            regex(entry["$regex"]) for entry in host_entries if isinstance(entry, dict)
+        ]
+        # The generic agent host never matches a positive host condition
+        explicit_hosts.discard(HostName(""))
+
+        if host_entries and not negate and not host_patterns:
+            matching = valid_hosts.intersection(explicit_hosts)
+        else:
+            matching = set(valid_hosts)
+
+        for taggroup_id, tag_condition in tag_conditions.items():
+            if not matching:
+                return matching
+            self._filter_hosts_by_tag_condition(matching, taggroup_id, tag_condition)
+
+        if hostlist and (negate or host_patterns) and matching:
+            matched_by_name = {
+                hostname
+                for hostname in matching
+                if hostname
+                and (
+                    hostname in explicit_hosts
+                    or any(pattern.match(hostname) for pattern in host_patterns)
+                )
+            }
+            if negate:
+                matching.difference_update(matched_by_name)
+            else:
+                matching = matched_by_name
+
+        if labels and matching:
+            self._filter_hosts_by_labels(matching, labels)
+
+        return matching
+
+    def _filter_hosts_by_tag_condition(
+        self,
+        hosts: set[HostName],
+        taggroup_id: TaggroupID,
+        tag_condition: TagCondition,
+    ) -> None:
+        """Removes the hosts not matching the tag condition (in place)
+
+        The set operations are the inverted counterpart of matches_tag_condition.
+        """
+        if isinstance(tag_condition, dict):
+            if "$ne" in tag_condition:
+                hosts.difference_update(
+                    self._hosts_by_tag.get(
+                        (taggroup_id, cast(TagConditionNE, tag_condition)["$ne"]), ()
+                    )
+                )
+                return
+
+            if "$or" in tag_condition:
+                hosts_with_any_tag: set[HostName] = set()
+                for opt_tag_id in cast(TagConditionOR, tag_condition)["$or"]:
+                    hosts_with_any_tag.update(self._hosts_by_tag.get((taggroup_id, opt_tag_id), ()))
+                hosts.intersection_update(hosts_with_any_tag)
+                return
+
+            if "$nor" in tag_condition:
+                for opt_tag_id in cast(TagConditionNOR, tag_condition)["$nor"]:
+                    hosts.difference_update(self._hosts_by_tag.get((taggroup_id, opt_tag_id), ()))
+                return
+
+            raise NotImplementedError()
+
+        hosts.intersection_update(self._hosts_by_tag.get((taggroup_id, tag_condition), ()))
+
+    def _filter_hosts_by_labels(self, hosts: set[HostName], labels: LabelConditions) -> None:
+        """Removes the hosts not matching the label conditions (in place)
+
+        The set operations are the inverted counterpart of matches_labels.
+        """
+        self._index_labels_of_hosts(hosts)
+        for label_id, label_spec in labels.items():
+            if isinstance(label_spec, dict):
+                hosts.difference_update(self._hosts_by_label.get((label_id, label_spec["$ne"]), ()))
+            else:
+                hosts.intersection_update(self._hosts_by_label.get((label_id, label_spec), ()))
+
+    def _index_labels_of_hosts(self, hosts: set[HostName]) -> None:
+        for hostname in hosts - self._label_indexed_hosts:
+            for label_id, label_value in self.labels_of_host(hostname).items():
+                self._hosts_by_label.setdefault((label_id, label_value), set()).add(hostname)
+            self._label_indexed_hosts.add(hostname)
+
+    def _match_hosts_one_by_one(  # pylint: disable=too-many-branches
+        self,
+        cache_id: tuple[
+            tuple[tuple[str, ...], tuple[tuple[str, Any], ...], tuple[tuple[Any, Any], ...], Any],
+            bool,
+        ],
+        valid_hosts: set[HostName],
+        hostlist: HostOrServiceConditions | None,
+        tag_conditions: TaggroupIDToTagCondition,
+        labels: LabelConditions,
+    ) -> set[HostName]:
+        """Computes the matching hosts by evaluating the conditions for each host
+
+        This is the reference implementation of _match_hosts_by_index.
+        """
         if tag_conditions and hostlist is None and not labels:
-            # TODO: Labels could also be optimized like the tags
             matched_by_tags = self._match_hosts_by_tags(cache_id, valid_hosts, tag_conditions)
             if matched_by_tags is not None:
                 return matched_by_tags
@@ -675,7 +829,6 @@ class RulesetOptimizer:
 
                 matching.add(hostname)
 
-        self._all_matching_hosts_match_cache[cache_id] = matching
         return matching
 
     def matches_host_name(
@@ -819,15 +972,13 @@ class RulesetOptimizer:
     def get_hosts_within_folder(self, folder_path: str, with_foreign_hosts: bool) -> set[HostName]:
         cache_id = with_foreign_hosts, folder_path
         if cache_id not in self._folder_host_lookup:
-            hosts_in_folder = set()
-            relevant_hosts = (
-                self._all_configured_hosts if with_foreign_hosts else self._all_processed_hosts
-            )
-
-            for hostname in relevant_hosts:
-                host_path = self._host_paths.get(hostname, "/")
+            hosts_in_folder: set[HostName] = set()
+            for host_path, hosts in self._hosts_by_folder.items():
                 if host_path.startswith(folder_path):
-                    hosts_in_folder.add(hostname)
+                    hosts_in_folder.update(hosts)
+
+            if not with_foreign_hosts:
+                hosts_in_folder.intersection_update(self._all_processed_hosts)
 
             self._folder_host_lookup[cache_id] = hosts_in_folder
             return hosts_in_folder
@@ -840,6 +991,13 @@ class RulesetOptimizer:
             self._hosts_grouped_by_tags.setdefault(group_ref, set()).add(hostname)
             self._host_grouped_ref[hostname] = group_ref
 
+            for tag in self._host_tags[hostname]:
+                self._hosts_by_tag.setdefault(tag, set()).add(hostname)
+
+            self._hosts_by_folder.setdefault(self._host_paths.get(hostname, "/"), set()).add(
+                hostname
+            )
+
     def labels_of_host(self, hostname: HostName) -> Labels:
         """Returns the effective set of host labels from all available sources
 
@@ -64,6 +64,11 @@ _ROWS_KEY = "Rows"
 _NODES_KEY = "Nodes"
 _RETENTIONS_KEY = "Retentions"
 
+# Used for the delta files of the inventory archive
+_ARCHIVE_DELTA_SUFFIX = ".delta"
+_PREVIOUS_KEY = "Previous"
+_DELTA_KEY = "Delta"
+
 SDEncodeAs = Callable[[SDValue], tuple[SDValue | None, SDValue | None]]
 SDDeltaCounter = Counter[Literal["new", "changed", "removed"]]
 SDFilterFunc = Callable[[SDKey], bool]
@@ -165,7 +170,7 @@ class UpdateResult:
 
 # TODO Centralize different stores and loaders of tree files:
 #   - inventory/HOSTNAME, inventory/HOSTNAME.gz, inventory/.last
-#   - inventory_archive/HOSTNAME/TIMESTAMP,
+#   - inventory_archive/HOSTNAME/TIMESTAMP, inventory_archive/HOSTNAME/TIMESTAMP.delta
 #   - inventory_delta_cache/HOSTNAME/TIMESTAMP_{TIMESTAMP,None}
 #   - status_data/HOSTNAME, status_data/HOSTNAME.gz
 
@@ -211,35 +216,229 @@ class TreeStore:
         return self._tree_dir / f"{host_name}.gz"
 
 
+class ArchiveDelta(NamedTuple):
+    previous_timestamp: int
+    delta_tree: DeltaStructuredDataNode
+
+
+class _ArchiveEntries(NamedTuple):
+    snapshots: set[int]
+    deltas: set[int]
+
+    @property
+    def timestamps(self) -> list[int]:
+        return sorted(self.snapshots.union(self.deltas))
+
+
 class TreeOrArchiveStore(TreeStore):
-    def __init__(self, tree_dir: Path | str, archive: Path | str) -> None:
+    """Archived trees of a host are kept below inventory_archive/HOSTNAME:
+      - TIMESTAMP: the full tree
+      - TIMESTAMP.delta: the delta tree to the previous archived tree
+
+    Every archived tree gets a delta file. Only every 'snapshot_interval'th tree (and the trees
+    which cannot be restored from their delta) is additionally kept as full tree.
+    """
+
+    def __init__(
+        self, tree_dir: Path | str, archive: Path | str, *, snapshot_interval: int = 10
+    ) -> None:
         super().__init__(tree_dir)
         self._archive_dir = Path(archive)
+        self._snapshot_interval = snapshot_interval
 
     def load_previous(self, *, host_name: HostName | str) -> StructuredDataNode:
         if (tree_file := self._tree_file(host_name=host_name)).exists():
             return load_tree(tree_file)
 
-        try:
-            latest_archive_tree_file = max(
-                self._archive_host_dir(host_name).iterdir(), key=lambda tp: int(tp.name)
-            )
-        except (FileNotFoundError, ValueError):
+        if not (timestamps := self.archive_timestamps(host_name=host_name)):
             return StructuredDataNode()
 
-        return load_tree(latest_archive_tree_file)
+        return self.load_archive(host_name=host_name, timestamp=timestamps[-1])
 
-    def _archive_host_dir(self, host_name: HostName) -> Path:
-        return self._archive_dir / str(host_name)
+    def archive_timestamps(self, *, host_name: HostName | str) -> Sequence[int]:
+        return self._archive_entries(host_name).timestamps
+
+    def load_archive(self, *, host_name: HostName | str, timestamp: int) -> StructuredDataNode:
+        """Restores an archived tree from the latest full tree and the subsequent deltas.
+        Returns an empty tree if the archive has no such entry or the chain of deltas is broken."""
+        archive_entries = self._archive_entries(host_name)
+        timestamps = [ts for ts in archive_entries.timestamps if ts <= timestamp]
+        if not timestamps or timestamps[-1] != timestamp:
+            return StructuredDataNode()
+
+        snapshot_idx = max(
+            (idx for idx, ts in enumerate(timestamps) if ts in archive_entries.snapshots),
+            default=None,
+        )
+        if snapshot_idx is None:
+            return StructuredDataNode()
+
+        tree = load_tree(self._archive_tree_file(host_name, timestamps[snapshot_idx]))
+        for previous_timestamp, current_timestamp in zip(
+            timestamps[snapshot_idx:], timestamps[snapshot_idx + 1 :]
+        ):
+            archive_delta = self.load_archive_delta(
+                host_name=host_name, timestamp=current_timestamp
+            )
+            if archive_delta is None or archive_delta.previous_timestamp != previous_timestamp:
+                return StructuredDataNode()
+            tree = tree.apply_delta(archive_delta.delta_tree)
+
+        return tree
+
+    def load_archive_delta(
+        self, *, host_name: HostName | str, timestamp: int
+    ) -> ArchiveDelta | None:
+        raw_archive_delta = store.load_object_from_file(
+            self._archive_delta_file(host_name, timestamp), default=None
+        )
+        if not raw_archive_delta:
+            return None
+        return ArchiveDelta(
+            previous_timestamp=raw_archive_delta[_PREVIOUS_KEY],
+            delta_tree=DeltaStructuredDataNode.deserialize(raw_archive_delta[_DELTA_KEY]),
+        )
 
     def archive(self, *, host_name: HostName) -> None:
         if not (tree_file := self._tree_file(host_name)).exists():
             return
-        target_dir = self._archive_host_dir(host_name)
-        target_dir.mkdir(parents=True, exist_ok=True)
-        tree_file.rename(target_dir / str(int(tree_file.stat().st_mtime)))
+
+        timestamp = int(tree_file.stat().st_mtime)
+        archive_entries = self._archive_entries(host_name)
+        previous_timestamps = [ts for ts in archive_entries.timestamps if ts < timestamp]
+
+        self._archive_host_dir(host_name).mkdir(parents=True, exist_ok=True)
+        if previous_timestamps and self._save_archive_delta(
+            host_name,
+            timestamp=timestamp,
+            tree=load_tree(tree_file),
+            previous_timestamp=previous_timestamps[-1],
+            previous_tree=self.load_archive(host_name=host_name, timestamp=previous_timestamps[-1]),
+            num_deltas=self._count_deltas_since_snapshot(archive_entries, previous_timestamps),
+        ):
+            tree_file.unlink()
+            self._archive_tree_file(host_name, timestamp).unlink(missing_ok=True)
+        else:
+            tree_file.rename(self._archive_tree_file(host_name, timestamp))
+
         self._gz_file(host_name).unlink(missing_ok=True)
 
+    def convert_archive(self, *, host_name: HostName | str) -> None:
+        """Converts an archive of full trees into the delta format, leaving converted entries as
+        they are"""
+        archive_entries = self._archive_entries(host_name)
+        previous_timestamp: int | None = None
+        previous_tree = StructuredDataNode()
+        num_deltas = 0
+
+        for timestamp in archive_entries.timestamps:
+            if timestamp in archive_entries.snapshots:
+                tree = load_tree(self._archive_tree_file(host_name, timestamp))
+                if (
+                    timestamp not in archive_entries.deltas
+                    and previous_timestamp is not None
+                    and self._save_archive_delta(
+                        host_name,
+                        timestamp=timestamp,
+                        tree=tree,
+                        previous_timestamp=previous_timestamp,
+                        previous_tree=previous_tree,
+                        num_deltas=num_deltas,
+                    )
+                ):
+                    self._archive_tree_file(host_name, timestamp).unlink()
+                    num_deltas += 1
+                else:
+                    num_deltas = 0
+
+            else:
+                archive_delta = self.load_archive_delta(host_name=host_name, timestamp=timestamp)
+                if archive_delta is None or archive_delta.previous_timestamp != previous_timestamp:
+                    return
+                tree = previous_tree.apply_delta(archive_delta.delta_tree)
+                num_deltas += 1
+
+            previous_timestamp = timestamp
+            previous_tree = tree
+
+    def _save_archive_delta(
+        self,
+        host_name: HostName | str,
+        *,
+        timestamp: int,
+        tree: StructuredDataNode,
+        previous_timestamp: int,
+        previous_tree: StructuredDataNode,
+        num_deltas: int,
+    ) -> bool:
+        """Saves the delta to the previous tree and returns whether the full tree can be
+        dropped"""
+        if previous_tree.is_empty():
+            return False
+
+        delta_tree = tree.compare_with(previous_tree)
+        store.save_object_to_file(
+            self._archive_delta_file(host_name, timestamp),
+            {_PREVIOUS_KEY: previous_timestamp, _DELTA_KEY: delta_tree.serialize()},
+        )
+        return num_deltas + 1 < self._snapshot_interval and _is_restored(
+            tree, previous_tree.apply_delta(delta_tree)
+        )
+
+    @staticmethod
+    def _count_deltas_since_snapshot(
+        archive_entries: _ArchiveEntries, timestamps: Sequence[int]
+    ) -> int:
+        num_deltas = 0
+        for timestamp in reversed(timestamps):
+            if timestamp in archive_entries.snapshots:
+                break
+            num_deltas += 1
+        return num_deltas
+
+    def _archive_entries(self, host_name: HostName | str) -> _ArchiveEntries:
+        archive_entries = _ArchiveEntries(snapshots=set(), deltas=set())
+        try:
+            filepaths = list(self._archive_host_dir(host_name).iterdir())
+        except FileNotFoundError:
+            return archive_entries
+
+        for filepath in filepaths:
+            name = filepath.name.removesuffix(_ARCHIVE_DELTA_SUFFIX)
+            try:
+                timestamp = int(name)
+            except ValueError:
+                continue
+            if name == filepath.name:
+                archive_entries.snapshots.add(timestamp)
+            else:
+                archive_entries.deltas.add(timestamp)
+        return archive_entries
+
+    def _archive_host_dir(self, host_name: HostName | str) -> Path:
+        return self._archive_dir / str(host_name)
+
+    def _archive_tree_file(self, host_name: HostName | str, timestamp: int) -> Path:
+        return self._archive_host_dir(host_name) / str(timestamp)
+
+    def _archive_delta_file(self, host_name: HostName | str, timestamp: int) -> Path:
+        return self._archive_host_dir(host_name) / f"{timestamp}{_ARCHIVE_DELTA_SUFFIX}"
+
+
+def _is_restored(tree: StructuredDataNode, restored_tree: StructuredDataNode) -> bool:
+    # Stricter than is_equal: The retentions and key columns must survive, too.
+    return (
+        tree.attributes.pairs == restored_tree.attributes.pairs
+        and tree.attributes.retentions == restored_tree.attributes.retentions
+        and tree.table._rows == restored_tree.table._rows
+        and tree.table.retentions == restored_tree.table.retentions
+        and (not tree.table._rows or tree.table.key_columns == restored_tree.table.key_columns)
+        and tree._nodes.keys() == restored_tree._nodes.keys()
+        and all(
+            _is_restored(node, restored_tree._nodes[name]) for name, node in tree._nodes.items()
+        )
+    )
+
 
 # .
 #   .--filters-------------------------------------------------------------.
@@ -596,6 +795,26 @@ class StructuredDataNode:
             _nodes=delta_nodes,
         )
 
+    def apply_delta(self, delta_tree: DeltaStructuredDataNode) -> StructuredDataNode:
+        """Restores the tree of a delta tree which was computed by 'tree.compare_with(self)'.
+        Unchanged sub nodes are shared with this tree."""
+        node = StructuredDataNode(name=self.name, path=self.path)
+        node.attributes = self.attributes.apply_delta(delta_tree.attributes)
+        node.table = self.table.apply_delta(delta_tree.table)
+
+        for name, sub_node in self._nodes.items():
+            if name not in delta_tree._nodes:
+                node._nodes[name] = sub_node
+
+        for name, delta_sub_node in delta_tree._nodes.items():
+            sub_node = self._nodes.get(
+                name, StructuredDataNode(name=name, path=self.path + (name,))
+            )
+            if not (restored_sub_node := sub_node.apply_delta(delta_sub_node)).is_empty():
+                node._nodes[name] = restored_sub_node
+
+        return node
+
     #   ---filtering------------------------------------------------------------
 
     def get_filtered_node(self, filters: list[SDFilter]) -> StructuredDataNode:
@@ -930,6 +1149,25 @@ class Table:
             rows=delta_rows,
         )
 
+    def apply_delta(self, delta_table: DeltaTable) -> Table:
+        table = Table(
+            path=self.path,
+            key_columns=delta_table.key_columns if delta_table.rows else self.key_columns,
+            retentions=self.retentions,
+        )
+
+        rows = dict(self._rows)
+        for delta_row in delta_table.rows:
+            if old_row := {k: v0 for k, (v0, _v1) in delta_row.items() if v0 is not None}:
+                rows.pop(self._make_row_ident(old_row), None)
+        table._rows.update(rows)
+
+        for delta_row in delta_table.rows:
+            if new_row := {k: v1 for k, (_v0, v1) in delta_row.items() if v1 is not None}:
+                table._rows[table._make_row_ident(new_row)] = new_row
+
+        return table
+
     #   ---filtering------------------------------------------------------------
 
     def get_filtered_table(self, filter_func: SDFilterFunc) -> Table:
@@ -1085,6 +1323,16 @@ class Attributes:
             ).result_dict,
         )
 
+    def apply_delta(self, delta_attributes: DeltaAttributes) -> Attributes:
+        attributes = Attributes(path=self.path, retentions=self.retentions)
+        attributes.add_pairs(
+            {k: v for k, v in self.pairs.items() if k not in delta_attributes.pairs}
+        )
+        attributes.add_pairs(
+            {k: v1 for k, (_v0, v1) in delta_attributes.pairs.items() if v1 is not None}
+        )
+        return attributes
+
     #   ---filtering------------------------------------------------------------
 
     def get_filtered_attributes(self, filter_func: SDFilterFunc) -> Attributes:
@@ -1201,6 +1449,33 @@ class DeltaStructuredDataNode:
             counter.update(node.count_entries())
         return counter
 
+    def get_filtered_node(self, filters: Sequence[SDFilter]) -> DeltaStructuredDataNode:
+        own_filters = [f for f in filters if not f.path]
+
+        nodes: dict[SDNodeName, DeltaStructuredDataNode] = {}
+        for name, node in self._nodes.items():
+            # From GUI::permitted_paths: We always get a list of strs.
+            if any(f.filter_nodes(str(name)) for f in own_filters):
+                nodes[name] = node
+            elif (
+                sub_filters := [
+                    f._replace(path=f.path[1:]) for f in filters if f.path[:1] == (name,)
+                ]
+            ) and not (filtered_node := node.get_filtered_node(sub_filters)).is_empty():
+                nodes[name] = filtered_node
+
+        return DeltaStructuredDataNode(
+            name=self.name,
+            path=self.path,
+            attributes=self.attributes.get_filtered_attributes(
+                lambda k: any(f.filter_attributes(k) for f in own_filters)
+            ),
+            table=self.table.get_filtered_table(
+                lambda k: any(f.filter_columns(k) for f in own_filters)
+            ),
+            _nodes=nodes,
+        )
+
 
 @dataclass(frozen=True)
 class DeltaTable:
@@ -1238,6 +1513,19 @@ class DeltaTable:
             counter.update(_count_dict_entries(row))
         return counter
 
+    def get_filtered_table(self, filter_func: SDFilterFunc) -> DeltaTable:
+        # Rows which only have changes in filtered columns are dropped
+        return DeltaTable(
+            path=self.path,
+            key_columns=self.key_columns,
+            rows=[
+                filtered_row
+                for row in self.rows
+                if (filtered_row := _get_filtered_dict(row, filter_func))
+                and _count_dict_entries(filtered_row)
+            ],
+        )
+
 
 @dataclass(frozen=True)
 class DeltaAttributes:
@@ -1271,6 +1559,9 @@ class DeltaAttributes:
     def count_entries(self) -> SDDeltaCounter:
         return _count_dict_entries(self.pairs)
 
+    def get_filtered_attributes(self, filter_func: SDFilterFunc) -> DeltaAttributes:
+        return DeltaAttributes(path=self.path, pairs=_get_filtered_dict(self.pairs, filter_func))
+
 
 # .
 #   .--helpers-------------------------------------------------------------.
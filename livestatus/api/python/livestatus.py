@@ -12,6 +12,7 @@ import json
 import os
 import re
 import select
+import selectors
 import socket
 import ssl
 import threading
@@ -104,6 +105,8 @@ class SiteConfiguration(TypedDict, total=False):
     # Livestatus specific
     cache: bool
     tls: TLSInfo
+    # Seconds to wait for the response to a query, None or unset means waiting forever
+    query_timeout: float | None
 
 
 SiteConfigurations = NewType("SiteConfigurations", dict[SiteId, SiteConfiguration])
@@ -152,6 +155,12 @@ remove_cache_regex = re.compile("\nCache:[^\n]*")
 # Pattern for allowed UserId values
 validate_user_id_regex = re.compile(r"^[\w$][-@.\w$]*$", re.UNICODE)
 
+# Seconds to wait for the content of a response once its header has been received
+_RESPONSE_CONTENT_TIMEOUT = 30.0
+
+# Maximum number of bytes to read from a site socket at once in query_parallel()
+_RECEIVE_CHUNK_SIZE = 1024 * 1024
+
 
 class MKLivestatusException(Exception):
     pass
@@ -524,6 +533,7 @@ class SingleSiteConnection(Helpers):
         self.socketurl = socketurl
         self.socket: socket.socket | None = None
         self.timeout: int | None = None
+        self.query_timeout: float | None = None
         self.successful_persistence = False
         self._output_format = LivestatusOutputFormat.PYTHON
 
@@ -548,6 +558,10 @@ class SingleSiteConnection(Helpers):
         if self.socket:
             self.socket.settimeout(float(timeout))
 
+    def set_query_timeout(self, query_timeout: float) -> None:
+        """Limit the time to wait for the response to a query sent with query_parallel()"""
+        self.query_timeout = query_timeout
+
     def _try_get_persisted_connection(self) -> socket.socket | None:
         if self.persist and self.socketurl in persistent_connections:
             self.successful_persistence = True
@@ -736,62 +750,18 @@ class SingleSiteConnection(Helpers):
     ) -> bytes:
         try:
             # Headers are always ASCII encoded
-            resp = self.receive_data(16)
-            code = resp[0:3].decode("ascii")
-            try:
-                length = int(resp[4:15].lstrip())
-            except Exception:
-                self.disconnect()
-                raise MKLivestatusSocketError(
-                    "Malformed output. Livestatus TCP socket might be unreachable or wrong"
-                    "encryption settings are used."
-                )
+            code, length = self.parse_response_header(self.receive_data(16))
 
             # Apply a lower timeout for the content because the data is already available
             # in the socket. The liveproxyd (same system) has the complete data available
             # while the data from a standard connection can still take some time.
             # 30 seconds should be more than enough for the maximum telegram size of 100MB
-            data = self.receive_data(length, 30)
-
-            if code == "200":
-                return data
-
-            error_info = data.decode("utf-8")
-            if code == "404":
-                raise MKLivestatusTableNotFoundError("Not Found (%s): %r" % (code, error_info))
-
-            if code == "502":
-                raise MKLivestatusBadGatewayError(error_info)
+            data = self.receive_data(length, _RESPONSE_CONTENT_TIMEOUT)
 
-            raise MKLivestatusQueryError("%s: %s" % (code, error_info))
+            return self.check_response(code, data)
 
         except (MKLivestatusSocketClosed, IOError) as e:
-            # In case of an IO error or the other side having
-            # closed the socket do a reconnect and try again
-            self.disconnect()
-
-            # In case of unix socket connections, do not start any reconnection attempts
-            # The other side (liveproxyd) might have had a good reason to disconnect
-            # Note: In most scenarios the liveproxyd still tries to send back a reasonable
-            # error response back to the client
-            if self.socket and self.socket.family == socket.AF_UNIX:
-                raise MKLivestatusSocketError("Unix socket was closed by peer")
-
-            now = time.time()
-            if not timeout_at or timeout_at > now:
-                if timeout_at is None:
-                    # Try until timeout reached in case there was a timeout configured.
-                    # Otherwise only retry once.
-                    timeout_at = now
-                    if self.timeout:
-                        timeout_at += self.timeout
-
-                time.sleep(0.1)
-                self.connect()
-                self.send_query(query)
-                # do not send query again -> danger of infinite loop
-                return self.receive_raw_response(query, suppress_exceptions, timeout_at)
-            raise MKLivestatusSocketError(str(e))
+            return self.retry_raw_response(query, suppress_exceptions, timeout_at, e)
 
         except suppress_exceptions:
             raise
@@ -803,6 +773,66 @@ class SingleSiteConnection(Helpers):
             # FIXME: ? self.disconnect()
             raise MKLivestatusSocketError("Unhandled exception: %s" % e)
 
+    def retry_raw_response(
+        self,
+        query: str,
+        suppress_exceptions: tuple[Type[Exception], ...],
+        timeout_at: float | None,
+        error: Exception,
+    ) -> bytes:
+        """Reconnect and send the query again after receiving its response failed"""
+        # In case of an IO error or the other side having
+        # closed the socket do a reconnect and try again
+        self.disconnect()
+
+        # In case of unix socket connections, do not start any reconnection attempts
+        # The other side (liveproxyd) might have had a good reason to disconnect
+        # Note: In most scenarios the liveproxyd still tries to send back a reasonable
+        # error response back to the client
+        if self.socket and self.socket.family == socket.AF_UNIX:
+            raise MKLivestatusSocketError("Unix socket was closed by peer")
+
+        now = time.time()
+        if not timeout_at or timeout_at > now:
+            if timeout_at is None:
+                # Try until timeout reached in case there was a timeout configured.
+                # Otherwise only retry once.
+                timeout_at = now
+                if self.timeout:
+                    timeout_at += self.timeout
+
+            time.sleep(0.1)
+            self.connect()
+            self.send_query(query)
+            # do not send query again -> danger of infinite loop
+            return self.receive_raw_response(query, suppress_exceptions, timeout_at)
+        raise MKLivestatusSocketError(str(error))
+
+    def parse_response_header(self, header: bytes) -> tuple[str, int]:
+        """Split the fixed16 response header into the status code and the content length"""
+        code = header[0:3].decode("ascii")
+        try:
+            return code, int(header[4:15].lstrip())
+        except Exception:
+            self.disconnect()
+            raise MKLivestatusSocketError(
+                "Malformed output. Livestatus TCP socket might be unreachable or wrong"
+                "encryption settings are used."
+            )
+
+    def check_response(self, code: str, data: bytes) -> bytes:
+        if code == "200":
+            return data
+
+        error_info = data.decode("utf-8")
+        if code == "404":
+            raise MKLivestatusTableNotFoundError("Not Found (%s): %r" % (code, error_info))
+
+        if code == "502":
+            raise MKLivestatusBadGatewayError(error_info)
+
+        raise MKLivestatusQueryError("%s: %s" % (code, error_info))
+
     def parse_raw_response(self, raw_response: bytes, query: Query) -> LivestatusResponse:
         data = raw_response.decode("utf-8")
         try:
@@ -914,6 +944,54 @@ class ConnectedSite(NamedTuple):
 ConnectedSites = list[ConnectedSite]
 
 
+class _PendingResponse:
+    """Collects the response to a query sent to a site while it arrives
+
+    The response is read chunk by chunk whenever the site socket becomes readable, so that
+    MultiSiteConnection.query_parallel() can wait for the responses of all sites at once.
+    """
+
+    def __init__(self, connected_site: ConnectedSite, query: str, sent_at: float) -> None:
+        self.connected_site = connected_site
+        self.query = query
+        self.sent_at = sent_at
+        # Remember the socket, the connection forgets it when it is closed after an error
+        sock = connected_site.connection.socket
+        assert sock is not None  # The query has just been sent over it
+        self.socket: socket.socket = sock
+        query_timeout = connected_site.connection.query_timeout
+        self.deadline: float | None = None if query_timeout is None else sent_at + query_timeout
+        self._code: str | None = None
+        self._size = 16  # The fixed16 header is read first
+        self._data = BytesIO()
+
+    def receive(self) -> bytes | None:
+        """Read what is available on the socket, return the content once it is complete"""
+        connection = self.connected_site.connection
+        packet = self.socket.recv(min(self._size, _RECEIVE_CHUNK_SIZE))
+        if not packet:
+            raise MKLivestatusSocketClosed(
+                "Read zero data from socket, remote peer closed connection."
+            )
+        self._size -= len(packet)
+        self._data.write(packet)
+        if self._size > 0:
+            return None
+
+        if self._code is None:
+            self._code, self._size = connection.parse_response_header(self._data.getvalue())
+            self._data = BytesIO()
+            self.deadline = time.time() + _RESPONSE_CONTENT_TIMEOUT
+            if self._size > 0:
+                return None
+
+        return connection.check_response(self._code, self._data.getvalue())
+
+    def has_buffered_data(self) -> bool:
+        # SSL sockets may hold already decrypted data which select does not know about
+        return isinstance(self.socket, ssl.SSLSocket) and self.socket.pending() > 0
+
+
 class MultiSiteConnection(Helpers):
     def __init__(  # pylint: disable=too-many-branches
         self, sites: SiteConfigurations, disabled_sites: SiteConfigurations | None = None
@@ -928,6 +1006,7 @@ class MultiSiteConnection(Helpers):
         self.only_sites: OnlySites = None
         self.limit: int | None = None
         self.parallelize = True
+        self.latencies: dict[SiteId, float] = {}
 
         # Status host: A status host helps to prevent trying to connect
         # to a remote site which is unreachable. This is done by looking
@@ -1070,6 +1149,8 @@ class MultiSiteConnection(Helpers):
 
         if "timeout" in site:
             connection.set_timeout(int(site["timeout"]))
+        if (query_timeout := site.get("query_timeout")) is not None:
+            connection.set_query_timeout(float(query_timeout))
         connection.connect()
         return connection
 
@@ -1105,6 +1186,10 @@ class MultiSiteConnection(Helpers):
     def dead_sites(self) -> dict[SiteId, DeadSite]:
         return self.deadsites
 
+    def site_latencies(self) -> dict[SiteId, float]:
+        """Seconds each site took to answer the last query, including decoding its rows"""
+        return self.latencies
+
     def alive_sites(self) -> list[SiteId]:
         return [s.id for s in self.connections]
 
@@ -1148,6 +1233,7 @@ class MultiSiteConnection(Helpers):
         result = LivestatusResponse([])
         stillalive = []
         limit = self.limit
+        self.latencies = {}
         for connected_site in self.connections:
             if self.only_sites is not None and connected_site.id not in self.only_sites:
                 stillalive.append(connected_site)  # state unknown, assume still alive
@@ -1157,7 +1243,9 @@ class MultiSiteConnection(Helpers):
                     limit_header = "Limit: %d\n" % limit
                 else:
                     limit_header = ""
+                started_at = time.time()
                 r = connected_site.connection.query(query, add_headers + limit_header)
+                self.latencies[connected_site.id] = time.time() - started_at
                 if self.prepend_site:
                     for row in r:
                         row.insert(0, connected_site.id)
@@ -1179,7 +1267,7 @@ class MultiSiteConnection(Helpers):
     # New parallelized version of query(). The semantics differs in the handling
     # of Limit: since all sites are queried in parallel, the Limit: is simply
     # applied to all sites - resulting in possibly more results then Limit requests.
-    def query_parallel(  # pylint: disable=too-many-branches
+    def query_parallel(
         self,
         query: Query,
         add_headers: str = "",
@@ -1199,12 +1287,12 @@ class MultiSiteConnection(Helpers):
             limit_header = ""
 
         # First send all queries
-        retrieve_responses: list[tuple[str, ConnectedSite]] = []
+        pending_responses: list[_PendingResponse] = []
         for connected_site in connect_to_sites:
             try:
                 str_query = connected_site.connection.build_query(query, add_headers + limit_header)
                 connected_site.connection.send_query(str_query)
-                retrieve_responses.append((str_query, connected_site))
+                pending_responses.append(_PendingResponse(connected_site, str_query, time.time()))
             except LivestatusTestingError:
                 raise
             except Exception as e:
@@ -1213,42 +1301,24 @@ class MultiSiteConnection(Helpers):
                     "site": connected_site.config,
                 }
 
-        # Then retrieve all raw responses. We will be as slow as the slowest of all connections.
-        site_responses: list[tuple[ConnectedSite, bytes]] = []
-        for str_query, connected_site in retrieve_responses:
-            try:
-                site_responses.append(
-                    (
-                        connected_site,
-                        connected_site.connection.receive_raw_response(
-                            str_query, query.suppress_exceptions
-                        ),
-                    )
-                )
-            except query.suppress_exceptions:
-                # Mostly handles exception types MKLivestatusTableNotFoundError
-                stillalive.append(connected_site)
-                continue
-            except LivestatusTestingError:
-                raise
-            except Exception as e:
-                connected_site.connection.disconnect()
-                self.deadsites[connected_site.id] = {
-                    "exception": e,
-                    "site": connected_site.config,
-                }
-
-        # Convert responses to python format
+        # Then collect the responses in the order they arrive and convert each of them to python
+        # format right away. This way we are only as slow as the slowest of all connections.
         result = LivestatusResponse([])
-        for connected_site, raw_response in site_responses:
+        self.latencies = {}
+        for pending, raw_response in self._receive_responses(pending_responses, query):
+            connected_site = pending.connected_site
             try:
+                if isinstance(raw_response, Exception):
+                    raise raw_response
                 rows = connected_site.connection.parse_raw_response(raw_response, query)
+                self.latencies[connected_site.id] = time.time() - pending.sent_at
                 stillalive.append(connected_site)
                 if self.prepend_site:
                     for row in rows:
                         row.insert(0, connected_site.id)
                 result.extend(rows)
             except query.suppress_exceptions:
+                # Mostly handles exception types MKLivestatusTableNotFoundError
                 stillalive.append(connected_site)
                 continue
             except LivestatusTestingError:
@@ -1263,6 +1333,76 @@ class MultiSiteConnection(Helpers):
         self.connections = stillalive
         return result
 
+    def _receive_responses(
+        self,
+        pending_responses: Sequence[_PendingResponse],
+        query: Query,
+    ) -> Iterator[tuple[_PendingResponse, bytes | Exception]]:
+        """Wait for the responses of all sites at once and yield them as soon as they are complete
+
+        Errors are yielded instead of being raised, so that a failing site does not abort the
+        collection of the others. A site which exceeds its deadline is reported as failed."""
+        passed_errors: tuple[Type[Exception], ...] = (
+            LivestatusTestingError,
+            *query.suppress_exceptions,
+        )
+        with selectors.DefaultSelector() as selector:
+            for pending in pending_responses:
+                selector.register(pending.socket, selectors.EVENT_READ, pending)
+
+            while selector.get_map():
+                waiting: list[_PendingResponse] = [key.data for key in selector.get_map().values()]
+                # Data buffered in SSL sockets is handled without waiting for the socket
+                ready = [pending for pending in waiting if pending.has_buffered_data()]
+                if not ready:
+                    deadlines = [p.deadline for p in waiting if p.deadline is not None]
+                    select_timeout = max(0.0, min(deadlines) - time.time()) if deadlines else None
+                    ready = [key.data for key, _events in selector.select(select_timeout)]
+
+                for pending in ready:
+                    try:
+                        raw_response = pending.receive()
+                    except (MKLivestatusSocketClosed, IOError) as e:
+                        selector.unregister(pending.socket)
+                        yield pending, self._retry_response(pending, query, e)
+                        continue
+                    except passed_errors as e:
+                        selector.unregister(pending.socket)
+                        yield pending, e
+                        continue
+                    except Exception as e:
+                        selector.unregister(pending.socket)
+                        yield pending, MKLivestatusSocketError("Unhandled exception: %s" % e)
+                        continue
+                    if raw_response is not None:
+                        selector.unregister(pending.socket)
+                        yield pending, raw_response
+
+                now = time.time()
+                for pending in waiting:
+                    if pending in ready or pending.deadline is None or pending.deadline > now:
+                        continue
+                    selector.unregister(pending.socket)
+                    yield pending, MKLivestatusSocketError(
+                        "Timeout while waiting for the response of site %s (%.1fs)"
+                        % (pending.connected_site.id, now - pending.sent_at)
+                    )
+
+    def _retry_response(
+        self,
+        pending: _PendingResponse,
+        query: Query,
+        error: Exception,
+    ) -> bytes | Exception:
+        # The connection may have been closed because of the keepalive timeout, try again with
+        # a new connection. This is done synchronously since it is rarely needed.
+        try:
+            return pending.connected_site.connection.retry_raw_response(
+                pending.query, query.suppress_exceptions, None, error
+            )
+        except Exception as e:
+            return e
+
     def command(self, command: str, sitename: SiteId | None = SiteId("local")) -> None:
         if sitename in self.deadsites:
             raise MKLivestatusSocketError(
@@ -21,22 +21,103 @@
 # License along with GNU Make; see the file  COPYING.  If  not,  write
 # to the Free Software Foundation, Inc., 51 Franklin St,  Fifth Floor,
 # Boston, MA 02110-1301 USA.
-"""Cares about backing up the files of a site"""
+"""Cares about backing up the files of a site
+
+Each backup ends with a manifest of the backed up entries. Regular files are listed with their
+size, modification time, mode, owner and the hash of their content. An incremental backup only
+contains the regular files which changed compared to the manifest of its base backup, while all
+other entries are always contained. The reference to the base backup follows the version symlink at
+the start of the archive, which makes it possible to restore the chain of backups from the full
+backup to the incremental one.
+"""
 
 import contextlib
 import errno
 import fnmatch
+import hashlib
 import io
+import json
 import os
+import re
+import shutil
 import socket
 import sys
 import tarfile
-from collections.abc import Callable, Iterator
-from typing import BinaryIO
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, NamedTuple
 
 from omdlib.contexts import SiteContext
 from omdlib.type_defs import CommandOptions
 
+MANIFEST_NAME = ".omd-backup-manifest.json"
+BASE_REFERENCE_NAME = ".omd-backup-base.json"
+
+DEFAULT_READ_THREADS = 4
+
+# Regular files up to this size are read ahead in memory by the reading threads. Larger files are
+# read while they are added to the archive.
+_READ_AHEAD_LIMIT = 4 * 1024 * 1024
+
+
+class FileEntry(NamedTuple):
+    size: int
+    mtime: float
+    mode: int
+    sha256: str
+    # Not known for manifests written before the owner was recorded
+    uid: int | None = None
+    gid: int | None = None
+
+
+class BackupReference(NamedTuple):
+    """Identifies the base of an incremental backup"""
+
+    path: str
+    backup_id: str
+
+
+class BackupManifest(NamedTuple):
+    """The entries of a backup, identified by their path relative to the site directory
+
+    Only regular files have a FileEntry, all other entries are listed without details.
+    """
+
+    backup_id: str
+    entries: Mapping[str, FileEntry | None]
+
+    def serialize(self) -> bytes:
+        return json.dumps({"backup_id": self.backup_id, "entries": self.entries}).encode("utf-8")
+
+    @classmethod
+    def deserialize(cls, raw: bytes) -> "BackupManifest":
+        data = json.loads(raw)
+        return cls(
+            backup_id=data["backup_id"],
+            entries={
+                path: None if entry is None else FileEntry(*entry)
+                for path, entry in data["entries"].items()
+            },
+        )
+
+
+class BaseBackup(NamedTuple):
+    path: Path
+    manifest: BackupManifest
+
+
+class _Content(NamedTuple):
+    data: bytes
+    sha256: str
+
+
+_Entry = tuple[str, tarfile.TarInfo]
+
 
 def backup_site_to_tarfile(
     site: SiteContext,
@@ -44,44 +125,106 @@ def backup_site_to_tarfile(
     mode: str,
     options: CommandOptions,
     verbose: bool,
-) -> None:
+    *,
+    base: BaseBackup | None = None,
+    read_threads: int = DEFAULT_READ_THREADS,
+) -> BackupManifest:
+    """Write a full backup or, in case a base is given, an incremental backup of the site
+
+    Returns the manifest of the backup, which is also the last entry in the archive.
+    """
     if not os.path.isdir(site.dir):
         raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), site.dir)
 
-    excludes = get_exclude_patterns(options)
+    is_excluded = _exclude_matcher(get_exclude_patterns(options))
 
     def accepted_files(tarinfo: tarfile.TarInfo) -> bool:
         # patterns are relative to site directory, tarinfo.name includes site name.
-        return not any(
-            fnmatch.fnmatch(tarinfo.name[len(site.name) + 1 :], glob_pattern)
-            for glob_pattern in excludes
-        )
+        return not is_excluded(tarinfo.name[len(site.name) + 1 :])
+
+    base_entries = {} if base is None else base.manifest.entries
+    entries: dict[str, FileEntry | None] = {}
 
     with RRDSocket(site.dir, site.is_stopped(), site.name, verbose) as rrd_socket:
         with tarfile.TarFile.open(
             fileobj=fh,
             mode=mode,
         ) as tar:
+
+            def needs_reading(entry: _Entry) -> bool:
+                tarinfo = entry[1]
+                return (
+                    tarinfo.isreg()
+                    and tarinfo.size <= _READ_AHEAD_LIMIT
+                    and not _is_unchanged(base_entries.get(_site_path(tarinfo.name)), tarinfo)
+                )
+
+            def read(entry: _Entry) -> _Content:
+                name, tarinfo = entry
+                with rrd_socket.suspend_rrd_update_if_needed(tarinfo.name):
+                    with open(name, "rb") as file:
+                        data = file.read()
+                return _Content(data, hashlib.sha256(data).hexdigest())
+
             # Add the version symlink as first file to be able to
             # check a) the sitename and b) the version before reading
             # the whole tar archive. Important for streaming.
             # The file is added twice to get the first for validation
             # and the second for excration during restore.
-            tar_add(
-                rrd_socket,
-                tar,
-                site.dir + "/version",
-                site.name + "/version",
-                verbose=verbose,
-            )
-            tar_add(
-                rrd_socket,
-                tar,
-                site.dir,
-                site.name,
-                predicate=accepted_files,
-                verbose=verbose,
-            )
+            for _name, tarinfo in _iter_tree(
+                tar, site.dir + "/version", site.name + "/version", verbose=verbose
+            ):
+                tar.addfile(tarinfo)
+            if base is not None:
+                reference = BackupReference(str(base.path), base.manifest.backup_id)
+                _add_bytes(
+                    tar,
+                    f"{site.name}/{BASE_REFERENCE_NAME}",
+                    json.dumps(reference._asdict()).encode("utf-8"),
+                )
+
+            for (name, tarinfo), content in _read_ahead(
+                _iter_tree(tar, site.dir, site.name, predicate=accepted_files, verbose=verbose),
+                needs_reading,
+                read,
+                read_threads,
+            ):
+                site_path = _site_path(tarinfo.name)
+                if not tarinfo.isreg():
+                    tar.addfile(tarinfo)
+                    entries[site_path] = None
+                    continue
+
+                base_entry = base_entries.get(site_path)
+                if _is_unchanged(base_entry, tarinfo):
+                    entries[site_path] = base_entry
+                    continue
+
+                try:
+                    if content is None:
+                        sha256 = _add_large_file(rrd_socket, tar, name, tarinfo)
+                    else:
+                        data, sha256 = content.result()
+                        # Files which were only touched are not backed up again
+                        if (
+                            base_entry is None
+                            or base_entry.sha256 != sha256
+                            or not _has_same_metadata(base_entry, tarinfo)
+                        ):
+                            tarinfo.size = len(data)
+                            tar.addfile(tarinfo, io.BytesIO(data))
+                except FileNotFoundError:
+                    if verbose:
+                        sys.stdout.write("Skipping vanished file: %s\n" % tarinfo.name)
+                    continue
+                entries[site_path] = FileEntry(
+                    tarinfo.size, tarinfo.mtime, tarinfo.mode, sha256, tarinfo.uid, tarinfo.gid
+                )
+
+            manifest = BackupManifest(backup_id=uuid.uuid4().hex, entries=entries)
+            _add_bytes(tar, f"{site.name}/{MANIFEST_NAME}", manifest.serialize())
+
+    return manifest
 
 
 def get_exclude_patterns(options: CommandOptions) -> list[str]:
@@ -128,6 +271,37 @@ def get_exclude_patterns(options: CommandOptions) -> list[str]:
     return excludes
 
 
+def _exclude_matcher(excludes: Iterable[str]) -> Callable[[str], bool]:
+    """Match a path against all exclude patterns at once"""
+    if not (patterns := [fnmatch.translate(glob_pattern) for glob_pattern in excludes]):
+        return lambda _path: False
+    regex = re.compile("|".join(patterns))
+    return lambda path: regex.match(path) is not None
+
+
+def _site_path(arcname: str) -> str:
+    """Path relative to the site directory, the archive names start with the site name"""
+    return arcname.partition("/")[2]
+
+
+def _is_unchanged(base_entry: FileEntry | None, tarinfo: tarfile.TarInfo) -> bool:
+    return (
+        base_entry is not None
+        and base_entry.size == tarinfo.size
+        and base_entry.mtime == tarinfo.mtime
+        and _has_same_metadata(base_entry, tarinfo)
+    )
+
+
+def _has_same_metadata(base_entry: FileEntry, tarinfo: tarfile.TarInfo) -> bool:
+    """The metadata restored from the member, which does not change the modification time"""
+    return (
+        base_entry.mode == tarinfo.mode
+        and base_entry.uid == tarinfo.uid
+        and base_entry.gid == tarinfo.gid
+    )
+
+
 class RRDSocket(contextlib.AbstractContextManager):
     def __init__(self, site_dir: str, site_stopped: bool, site_name: str, verbose: bool) -> None:
         self._rrdcached_socket_path = site_dir + "/tmp/run/rrdcached.sock"
@@ -135,6 +309,8 @@ class RRDSocket(contextlib.AbstractContextManager):
             self._rrdcached_socket_path
         )
         self._sock: None | socket.socket = None
+        # The files are read by multiple threads
+        self._lock = threading.Lock()
         self._verbose: bool = verbose
         self._sites_path: str = os.path.realpath("/omd/sites")
         self._site_name: str = site_name
@@ -183,6 +359,10 @@ class RRDSocket(contextlib.AbstractContextManager):
         self._send_rrdcached_command("RESUMEALL")
 
     def _send_rrdcached_command(self, cmd: str) -> None:
+        with self._lock:
+            self._send_rrdcached_command_locked(cmd)
+
+    def _send_rrdcached_command_locked(self, cmd: str) -> None:
         if self._sock is None:
             sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
             try:
@@ -229,52 +409,37 @@ class RRDSocket(contextlib.AbstractContextManager):
             self._sock.close()
 
 
-def tar_add(
-    rrd_socket: RRDSocket,
+def _iter_tree(
     tar: tarfile.TarFile,
     name: str,
     arcname: str,
     *,
     predicate: Callable[[tarfile.TarInfo], bool] = lambda _: True,
     verbose: bool,
-) -> None:
-    """Reimplement tar.add().
+) -> Iterator[_Entry]:
+    """Walk through a directory tree like tar.add() does
 
-    Using tar.add() on a site directory is undesirable for two reasons:
-      - When reading file information via tar.addfile and tar.gettarinfo, we
-        don't want the rrd files to be modified. This addressed by RRDSocket.
-      - A file may vanish between os.listdir and calling a tarfile.Tarfile
-        method. Those files are silently skipped.
+    A file may vanish between os.listdir and calling a tarfile.Tarfile
+    method. Those files are silently skipped.
     """
     # Skip if somebody tries to archive the archive...
     if tar.name is not None and os.path.abspath(name) == tar.name:
         return
-    directory_files = []
     try:
-        with rrd_socket.suspend_rrd_update_if_needed(arcname):
-            # Create a TarInfo object from the file.
-            tarinfo = tar.gettarinfo(name, arcname)
-
-            # Exclude files.
-            if tarinfo is None or not predicate(tarinfo):
-                return
-
-            # Append the tar header and data to the archive.
-            if tarinfo.isreg():
-                with open(name, "rb") as file:
-                    tar.addfile(tarinfo, file)
-            else:
-                tar.addfile(tarinfo)
-
-            if tarinfo.isdir():
-                directory_files = sorted(os.listdir(name))
+        # Create a TarInfo object from the file.
+        tarinfo = tar.gettarinfo(name, arcname)
+        # Exclude files.
+        if tarinfo is None or not predicate(tarinfo):
+            return
+        directory_files = sorted(os.listdir(name)) if tarinfo.isdir() else []
     except FileNotFoundError:
         if verbose:
             sys.stdout.write("Skipping vanished file: %s\n" % arcname)
+        return
 
+    yield name, tarinfo
     for filename in directory_files:
-        tar_add(  # recursive call
-            rrd_socket,
+        yield from _iter_tree(  # recursive call
             tar,
             os.path.join(name, filename),
             os.path.join(arcname, filename),
@@ -283,6 +448,59 @@ def tar_add(
         )
 
 
+def _read_ahead(
+    entries: Iterable[_Entry],
+    needs_reading: Callable[[_Entry], bool],
+    read: Callable[[_Entry], _Content],
+    num_threads: int,
+) -> Iterator[tuple[_Entry, "Future[_Content] | None"]]:
+    """Read the files in parallel while the archive is written
+
+    The entries are returned in their original order. Only a limited number of them is read ahead
+    to limit the memory needed for holding their content.
+    """
+    pending: deque[tuple[_Entry, Future[_Content] | None]] = deque()
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        for entry in entries:
+            pending.append((entry, executor.submit(read, entry) if needs_reading(entry) else None))
+            if len(pending) > 4 * num_threads:
+                yield pending.popleft()
+        while pending:
+            yield pending.popleft()
+
+
+class _HashingReader:
+    def __init__(self, fileobj: BinaryIO) -> None:
+        self._fileobj = fileobj
+        self._hash = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._fileobj.read(size)
+        self._hash.update(data)
+        return data
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+def _add_large_file(
+    rrd_socket: RRDSocket, tar: tarfile.TarFile, name: str, tarinfo: tarfile.TarInfo
+) -> str:
+    """Add a file which is not read ahead and return the hash of its content"""
+    with rrd_socket.suspend_rrd_update_if_needed(tarinfo.name):
+        with open(name, "rb") as file:
+            reader = _HashingReader(file)
+            tar.addfile(tarinfo, reader)  # type: ignore[arg-type]
+    return reader.hexdigest()
+
+
+def _add_bytes(tar: tarfile.TarFile, arcname: str, data: bytes) -> None:
+    tarinfo = tarfile.TarInfo(arcname)
+    tarinfo.size = len(data)
+    tarinfo.mtime = int(time.time())
+    tar.addfile(tarinfo, io.BytesIO(data))
+
+
 def get_site_and_version_from_backup(tar: tarfile.TarFile) -> tuple[str, str]:
     """Get the first file of the tar archive. Expecting <site>/version symlink
     for validation reasons."""
@@ -304,3 +522,114 @@ def get_site_and_version_from_backup(tar: tarfile.TarFile) -> tuple[str, str]:
         raise Exception("Failed to detect version of backed up site.")
 
     return sitename, version
+
+
+def get_backup_base(tar: tarfile.TarFile, sitename: str) -> BackupReference | None:
+    """Get the reference to the base backup in case of an incremental backup
+
+    Needs to be called right after get_site_and_version_from_backup(). In full backups the
+    following entry is the site directory, which has no content that could be skipped while
+    streaming."""
+    tarinfo = tar.next()
+    if tarinfo is None or tarinfo.name != f"{sitename}/{BASE_REFERENCE_NAME}":
+        return None
+    return BackupReference(**json.loads(_read_member(tar, tarinfo)))
+
+
+def is_backup_metadata(tarinfo: tarfile.TarInfo) -> bool:
+    return "/" not in (site_path := _site_path(tarinfo.name)) and site_path in (
+        MANIFEST_NAME,
+        BASE_REFERENCE_NAME,
+    )
+
+
+def read_manifest_member(tar: tarfile.TarFile, tarinfo: tarfile.TarInfo) -> BackupManifest | None:
+    if _site_path(tarinfo.name) != MANIFEST_NAME:
+        return None
+    return BackupManifest.deserialize(_read_member(tar, tarinfo))
+
+
+def _read_member(tar: tarfile.TarFile, tarinfo: tarfile.TarInfo) -> bytes:
+    if (fileobj := tar.extractfile(tarinfo)) is None:
+        raise Exception("Failed to read %s from the backup." % tarinfo.name)
+    with fileobj:
+        return fileobj.read()
+
+
+def manifest_path(archive_path: Path) -> Path:
+    """The manifest is also saved next to the archive to read it without reading the archive"""
+    return archive_path.with_name(archive_path.name + ".manifest")
+
+
+def read_backup_manifest(archive_path: Path) -> BackupManifest:
+    try:
+        return BackupManifest.deserialize(manifest_path(archive_path).read_bytes())
+    except FileNotFoundError:
+        pass
+
+    with tarfile.open(archive_path, mode="r:*") as tar:
+        for tarinfo in tar:
+            if (manifest := read_manifest_member(tar, tarinfo)) is not None:
+                return manifest
+    raise Exception(
+        "The backup %s has no manifest. It has been created by a version without "
+        "support for incremental backups." % archive_path
+    )
+
+
+def get_backup_chain(reference: BackupReference, archive_dir: Path | None) -> list[BackupReference]:
+    """Find the backups needed to restore an incremental backup, starting with the full backup
+
+    The backups are looked up at their original path and next to the incremental backup, in case
+    the backups have been moved to another directory."""
+    chain: list[BackupReference] = []
+    base: BackupReference | None = reference
+    while base is not None:
+        path = _find_backup(Path(base.path), archive_dir)
+        if any(path == Path(r.path) for r in chain):
+            raise Exception("The backup %s is based on itself." % path)
+        chain.append(base._replace(path=str(path)))
+        with tarfile.open(path, mode="r:*") as tar:
+            sitename, _version = get_site_and_version_from_backup(tar)
+            base = get_backup_base(tar, sitename)
+    return chain[::-1]
+
+
+def _find_backup(path: Path, archive_dir: Path | None) -> Path:
+    candidates = [path] if archive_dir is None else [path, archive_dir / path.name]
+    for candidate in candidates:
+        if candidate.exists():
+            return candidate
+    raise Exception("The base backup %s does not exist." % path)
+
+
+def remove_replaced_entry(path: str, tarinfo: tarfile.TarInfo) -> None:
+    """Remove what a previous backup of the chain restored at the path of the entry
+
+    Only directories are kept for directories. Removing the files before extracting them keeps
+    them from being written through symlinks or to all files sharing their hard link.
+    """
+    if not os.path.lexists(path):
+        return
+    if os.path.isdir(path) and not os.path.islink(path):
+        if not tarinfo.isdir():
+            shutil.rmtree(path)
+        return
+    os.unlink(path)
+
+
+def remove_deleted_entries(
+    site_dir: str, previous: BackupManifest, manifest: BackupManifest
+) -> None:
+    """Remove what was restored from a previous backup of the chain but has been deleted since"""
+    site_dir = os.path.realpath(site_dir)
+    for site_path in sorted(set(previous.entries) - set(manifest.entries), reverse=True):
+        path = os.path.join(site_dir, site_path)
+        # Never remove something through a symlink that replaced one of the parent directories
+        if os.path.realpath(os.path.dirname(path)) != os.path.dirname(path):
+            continue
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path)
+        else:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)
@@ -3266,16 +3266,49 @@ def _try_backup_site_to_tarfile(
     options: CommandOptions,
     site: SiteContext,
     global_opts: "GlobalOptions",
-) -> None:
+    base: omdlib.backup.BaseBackup | None,
+) -> omdlib.backup.BackupManifest:
     if "no-compression" not in options:
         tar_mode += "gz"
 
     try:
-        omdlib.backup.backup_site_to_tarfile(site, fh, tar_mode, options, global_opts.verbose)
+        return omdlib.backup.backup_site_to_tarfile(
+            site,
+            fh,
+            tar_mode,
+            options,
+            global_opts.verbose,
+            base=base,
+            read_threads=_get_read_threads(options),
+        )
     except OSError as e:
         bail_out("Failed to perform backup: %s" % e)
 
 
+def _get_read_threads(options: CommandOptions) -> int:
+    if (value := options.get("read-threads")) is None:
+        return omdlib.backup.DEFAULT_READ_THREADS
+    try:
+        if (read_threads := int(value)) > 0:
+            return read_threads
+    except ValueError:
+        pass
+    bail_out("Invalid number of read threads: %s" % value)
+
+
+def _read_base_backup(
+    options: CommandOptions, global_opts: "GlobalOptions"
+) -> omdlib.backup.BaseBackup | None:
+    if (base := options.get("incremental")) is None:
+        return None
+    if not (base_path := Path(base)).is_absolute():
+        base_path = global_opts.orig_working_directory / base_path
+    try:
+        return omdlib.backup.BaseBackup(base_path, omdlib.backup.read_backup_manifest(base_path))
+    except Exception as e:
+        bail_out("Failed to read the base backup: %s" % e)
+
+
 def main_backup(
     version_info: VersionInfo,
     site: SiteContext,
@@ -3290,14 +3323,16 @@ def main_backup(
         )
 
     dest = args[0]
+    base = _read_base_backup(options, global_opts)
 
     if dest == "-":
-        _try_backup_site_to_tarfile(sys.stdout.buffer, "w|", options, site, global_opts)
+        _try_backup_site_to_tarfile(sys.stdout.buffer, "w|", options, site, global_opts, base)
     else:
         if not (dest_path := Path(dest)).is_absolute():
             dest_path = global_opts.orig_working_directory / dest_path
         with dest_path.open(mode="wb") as fh:
-            _try_backup_site_to_tarfile(fh, "w:", options, site, global_opts)
+            manifest = _try_backup_site_to_tarfile(fh, "w:", options, site, global_opts, base)
+        omdlib.backup.manifest_path(dest_path).write_bytes(manifest.serialize())
 
 
 def _restore_backup_from_tar(  # pylint: disable=too-many-branches
@@ -3308,10 +3343,12 @@ def _restore_backup_from_tar(  # pylint: disable=too-many-branches
     global_opts: "GlobalOptions",
     version_info: VersionInfo,
     source_descr: str,
+    archive_dir: Path | None,
     new_site_name: str | None,
 ) -> SiteContext:
     try:
         sitename, version = omdlib.backup.get_site_and_version_from_backup(tar)
+        base = omdlib.backup.get_backup_base(tar, sitename)
     except Exception as e:
         bail_out("%s" % e)
 
@@ -3332,6 +3369,11 @@ def _restore_backup_from_tar(  # pylint: disable=too-many-branches
 
     site = SiteContext(new_sitename)
 
+    try:
+        chain = [] if base is None else omdlib.backup.get_backup_chain(base, archive_dir)
+    except Exception as e:
+        bail_out("Failed to find the backups to restore: %s" % e)
+
     if is_root():
         sys.stdout.write(f"Restoring site {site.name} from {source_descr}...\n")
         sys.stdout.flush()
@@ -3347,30 +3389,16 @@ def _restore_backup_from_tar(  # pylint: disable=too-many-branches
 
         prepare_restore_as_site_user(site, global_opts, options)
 
-    # Now extract all files
-    for tarinfo in tar:
-        # The files in the tar archive start with the siteid as first element.
-        # Remove this first element from the file paths and also care for hard link
-        # targets.
-
-        # Remove leading site name from paths
-        tarinfo.name = "/".join(tarinfo.name.split("/")[1:])
-        if global_opts.verbose:
-            sys.stdout.write("Restoring %s...\n" % tarinfo.name)
-
-        if tarinfo.islnk():
-            parts = tarinfo.linkname.split("/")
-
-            if parts[0] == sitename:
-                new_linkname = "/".join(parts[1:])
-
-                if global_opts.verbose:
-                    sys.stdout.write(
-                        f"  Rewriting link target from {tarinfo.linkname} to {new_linkname}\n"
-                    )
-                tarinfo.linkname = new_linkname
-
-        tar.extract(tarinfo, path=site.dir)
+    # Now extract all files, starting with the backups an incremental backup is based on
+    previous = None
+    for reference in chain:
+        sys.stdout.write("Restoring base backup %s...\n" % reference.path)
+        with tarfile.open(reference.path, mode="r:*") as base_tar:
+            base_sitename, _base_version = omdlib.backup.get_site_and_version_from_backup(base_tar)
+            previous = _extract_backup(base_tar, base_sitename, site, global_opts, previous)
+        if previous is None or previous.backup_id != reference.backup_id:
+            bail_out("The backup %s is not the base of the restored backup." % reference.path)
+    _extract_backup(tar, sitename, site, global_opts, previous)
 
     site.load_config(load_defaults(site))
 
@@ -3397,6 +3425,57 @@ def _restore_backup_from_tar(  # pylint: disable=too-many-branches
     return site
 
 
+def _extract_backup(
+    tar: tarfile.TarFile,
+    sitename: str,
+    site: SiteContext,
+    global_opts: "GlobalOptions",
+    previous: omdlib.backup.BackupManifest | None,
+) -> omdlib.backup.BackupManifest | None:
+    """Extract a backup and return its manifest
+
+    The previous manifest is given when extracting an incremental backup on top of the backups
+    it is based on.
+    """
+    manifest = None
+    for tarinfo in tar:
+        if omdlib.backup.is_backup_metadata(tarinfo):
+            if (member_manifest := omdlib.backup.read_manifest_member(tar, tarinfo)) is not None:
+                manifest = member_manifest
+            continue
+
+        # The files in the tar archive start with the siteid as first element.
+        # Remove this first element from the file paths and also care for hard link
+        # targets.
+
+        # Remove leading site name from paths
+        tarinfo.name = "/".join(tarinfo.name.split("/")[1:])
+        if global_opts.verbose:
+            sys.stdout.write("Restoring %s...\n" % tarinfo.name)
+
+        if tarinfo.islnk():
+            parts = tarinfo.linkname.split("/")
+
+            if parts[0] == sitename:
+                new_linkname = "/".join(parts[1:])
+
+                if global_opts.verbose:
+                    sys.stdout.write(
+                        f"  Rewriting link target from {tarinfo.linkname} to {new_linkname}\n"
+                    )
+                tarinfo.linkname = new_linkname
+
+        if previous is not None and tarinfo.name:
+            omdlib.backup.remove_replaced_entry(os.path.join(site.dir, tarinfo.name), tarinfo)
+        tar.extract(tarinfo, path=site.dir)
+
+    if previous is not None:
+        if manifest is None:
+            bail_out("The incremental backup has no manifest.")
+        omdlib.backup.remove_deleted_entries(site.dir, previous, manifest)
+    return manifest
+
+
 def main_restore(
     version_info: VersionInfo,
     site: SiteContext,
@@ -3438,6 +3517,7 @@ def main_restore(
                 global_opts=global_opts,
                 version_info=version_info,
                 source_descr=source_descr,
+                archive_dir=None if name is None else name.parent,
                 new_site_name=new_site_name,
             )
     except tarfile.ReadError as e:
@@ -4309,6 +4389,19 @@ Usage:\n\
         options=exclude_options
         + [
             Option("no-compression", None, False, "do not compress tar archive"),
+            Option(
+                "incremental",
+                None,
+                True,
+                "only back up the files changed since the backup ARG",
+            ),
+            Option(
+                "read-threads",
+                None,
+                True,
+                "number of threads reading the files (defaults to %d)"
+                % omdlib.backup.DEFAULT_READ_THREADS,
+            ),
         ],
         description="Create a backup tarball of a site, writing it to a file or stdout",
         confirm_text="",
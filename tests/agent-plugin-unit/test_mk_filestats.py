@@ -103,6 +103,63 @@ def test_path_filter(reg_pat, paths, results) -> None:  # type: ignore[no-untype
         assert result == path_filter.matches(lazy_file)
 
 
+@pytest.mark.parametrize(
+    "filter_type,reg_pat,directory,excluded",
+    [
+        ("regex", "/var/spool/postfix/.*", "/var/spool", False),
+        ("regex", "/var/spool/postfix/.*", "/var/spool/postfix", False),
+        ("regex", "/var/spool/postfix/.*", "/var/spool/postfix/deferred", False),
+        ("regex", "/var/spool/postfix/.*", "/var/spool/postfix2", True),
+        ("regex", "/var/spool/postfix/.*", "/var/log", True),
+        ("regex", "/var/spool/postf?ix/.*", "/var/spool/postix", False),
+        ("regex", "/var/spool|/tmp", "/var/log", False),
+        ("regex", r".*\.txt", "/var/log", False),
+        ("regex_inverse", "/var/spool/postfix/", "/var/spool/postfix/deferred", True),
+        ("regex_inverse", "/var/spool/postfix/.*", "/var/spool/postfix", True),
+        ("regex_inverse", "/var/spool/postfix/.*", "/var/spool", False),
+        ("regex_inverse", r"/var/spool/postfix/.*\.tmp", "/var/spool/postfix", False),
+    ],
+)
+def test_path_filter_excludes_directory(  # type: ignore[no-untyped-def]
+    filter_type, reg_pat, directory, excluded
+) -> None:
+    path_filter = mk_filestats.get_file_filters({"filter_%s" % filter_type: reg_pat})[0]
+    assert path_filter.excludes_directory(directory) is excluded
+
+
+def test_pattern_iterator(tmp_path, monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    for path in ("a/keep.txt", "a/.hidden", "a/b/keep.log", "skip/deep/never.txt", "top.txt"):
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text("content")
+    (tmp_path / "a" / "broken_link").symlink_to(tmp_path / "nowhere")
+
+    filters = mk_filestats.get_file_filters(
+        {"filter_regex": "%s/(a|top)" % tmp_path, "filter_regex_inverse": "%s/skip" % tmp_path}
+    )
+    scanned = []
+    scandir = os.scandir
+
+    def recording_scandir(path):  # type: ignore[no-untyped-def]
+        scanned.append(path)
+        return scandir(path)
+
+    monkeypatch.setattr(os, "scandir", recording_scandir)
+
+    files = list(mk_filestats.PatternIterator([str(tmp_path / "*")], filters))
+
+    assert sorted(f.path for f in files) == sorted(
+        str(tmp_path / p) for p in ("a/keep.txt", "a/b/keep.log", "a/broken_link", "top.txt")
+    )
+    assert str(tmp_path / "a" / "b") in scanned
+    assert not [path for path in scanned if "skip" in path]
+    # only the files not found by os.scandir have been stat'ed so far
+    assert sorted(f.path for f in files if f._stat_done) == [
+        str(tmp_path / "a" / "broken_link"),
+        str(tmp_path / "top.txt"),
+    ]
+    assert [f.stat_status for f in files if f.path.endswith("broken_link")] == ["file vanished"]
+
+
 @pytest.mark.parametrize(
     "config",
     [
@@ -57,6 +57,7 @@ _TEST_CONFIG = u"""
 GLOBAL OPTIONS
  ignore invalid options
  retention_period 42
+ parallel_jobs 3
 
 not a cluster line
 
@@ -209,6 +210,7 @@ def test_read_global_options(parsed_config):
 
     assert isinstance(global_options, lw.GlobalOptions)
     assert global_options.retention_period == 42
+    assert global_options.parallel_jobs == 3
 
 
 def test_read_config_cluster(parsed_config):
@@ -700,6 +702,108 @@ def test_process_logfile(monkeypatch, logfile, patterns, opt_raw, state,
             assert state['offset'] >= 15000  # about the size of this file
 
 
+@pytest.mark.parametrize("raw_pattern, flags, expected_literal", [
+    (u"Fail event detected on md device", 0, u"Fail event detected on md device"),
+    (u"mdadm.*: Rebuild.*event detected", 0, u"event detected"),
+    (u"mdadm\\[", 0, u"mdadm["),
+    (u"ata.*soft reset failed (.*FIS failed)", 0, u"soft reset failed "),
+    (u"sshd\\[\\d+\\]: Failed passwords? for", 0, u"]: Failed password"),
+    (u"colou?r", 0, u"colo"),
+    (u"ab{2}cd", 0, u"cd"),
+    (u"\\x41BCD\\d", 0, None),
+    (u"[Ee]rror[s:]", 0, u"rror"),
+    (u"^ORA-\\d{5}$", 0, u"ORA-"),
+    (u"panic|Oops", 0, None),
+    (u"Error", re.IGNORECASE, None),
+    (u".*", 0, None),
+    (u"foo}bar", 0, u"foo}bar"),
+    (u"a}\\.", 0, u"a}."),
+    (u"]}-", 0, u"]}-"),
+    (u"x{y}z", 0, u"x{y}z"),
+    (u"{?|}]b", 0, None),
+    (u'"code": ?{"id"', 0, u'"code":'),
+])
+def test_required_literal(raw_pattern, flags, expected_literal):
+    # type: (str, int, str | None) -> None
+    assert lw._required_literal(re.compile(raw_pattern, re.UNICODE | flags)) == expected_literal
+
+
+@pytest.mark.parametrize("raw_pattern, line", [
+    (u"foo}bar", u"foo}bar"),
+    (u"a}\\.", u"xa}."),
+    (u"]}-", u"[]}-]"),
+    (u"x{y}z", u"x{y}z"),
+    (u"{?|}]b", u" b)b"),
+    (u'"level": "error"}', u'{"msg": "disk full", "level": "error"}'),
+])
+def test_pattern_matcher_literal_braces(raw_pattern, line):
+    # type: (str, str) -> None
+    pattern = re.compile(raw_pattern, re.UNICODE)
+    assert pattern.search(line)
+
+    matcher = lw.PatternMatcher([pattern])
+    matcher.prefilter(u"%s\n" % line)
+    assert matcher.search(line) is not None
+
+
+def test_pattern_matcher():
+    # type: () -> None
+    matcher = lw.PatternMatcher([
+        re.compile(u"Error: (.*)", re.UNICODE),
+        re.compile(u"disk.*full", re.UNICODE),
+        re.compile(u"Err", re.UNICODE),
+        re.compile(u".*", re.UNICODE),
+    ])
+    block = u"Errno 28: disk is full\nall good\n"
+    matcher.prefilter(block)
+
+    found = matcher.search(u"Errno 28: disk is full")
+    assert found is not None
+    assert found[0] == 1
+    assert matcher.search(u"all good")[0] == 3  # type: ignore[index]
+
+    # Error: does not occur in the block, so it is not considered ...
+    assert matcher.search(u"Error: disk full")[0] == 1  # type: ignore[index]
+    # ... unless the text is not part of the block
+    found = matcher.search(u"Error: disk full", prefiltered=False)
+    assert found is not None
+    assert found[0] == 0
+    assert found[1].groups() == (u"disk full",)
+
+
+def _no_fork_context(method=None):
+    raise ValueError("cannot find context for %r" % method)
+
+
+@pytest.mark.parametrize("fork_context", [True, False])
+def test_process_sections(tmpdir, monkeypatch, fork_context):
+    logfiles = []
+    for name in ("a.log", "b.log", "c.log"):
+        path = str(tmpdir.join(name))
+        with open(path, "w") as logfile:
+            logfile.write("all good\nError in %s\n" % name)
+        logfiles.append(path)
+
+    sections = []
+    for path in logfiles + [str(tmpdir.join("missing.log"))]:
+        section = lw.LogfileSection((path, path))
+        section.options.values.update({"fromstart": True, "nocontext": True})
+        section._compiled_patterns = [(u"C", re.compile(u"Error", re.UNICODE), [], [])]
+        sections.append(section)
+
+    monkeypatch.setattr(sys, 'stdout', MockStdout())
+    if not fork_context:
+        # The logfiles are processed serially
+        monkeypatch.setattr(lw.multiprocessing, "get_context", _no_fork_context, raising=False)
+    state = lw.State(str(tmpdir.join("state")))
+    output = lw.process_sections(sections, state, False, jobs=2)
+
+    assert output == [(u"[[[%s]]]\n" % path, [u"C Error in %s\n" % os.path.basename(path)])
+                      for path in logfiles] + [(u"[[[%s:cannotopen]]]\n" % sections[-1].name_write, [])]
+    for path in logfiles:
+        assert state.get(path)["offset"] == os.path.getsize(path)
+
+
 @pytest.mark.parametrize("input_lines, before, after, expected_output",
                          [([], 2, 3, []),
                           (["0", "1", "2", "C 3", "4", "5", "6", "7", "8", "9", "W 10"
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 tribe29 GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Simulate push agents sending their data to the agent receiver
+
+Registers synthetic push hosts in a temporary site directory and lets all of them upload their
+compressed agent data for a number of rounds. Within each round the uploads are spread evenly
+over the interval, like agents sending every minute. Some of the agents can send large outputs,
+which must not delay the uploads of the others. The requests are sent to the application in
+process. The latency is measured from the scheduled time of an upload, its percentiles and the
+throughput are reported, as well as the longest time the event loop was blocked.
+
+    python3 tests/performance/bench_agent_receiver.py --agents 1000 --interval 5 --large 10
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from uuid import uuid4
+
+# Make agent_receiver available when called from the git top level directory
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__)))),
+        "agent-receiver",
+    ),
+)
+
+
+def _agent_output(size: int) -> bytes:
+    line = b"<<<local:sep(0)>>>\n0 Service_%d count=%d Everything is fine\n"
+    lines: list[bytes] = []
+    length = 0
+    while length < size:
+        lines.append(line % (len(lines), len(lines)))
+        length += len(lines[-1])
+    return b"".join(lines)
+
+
+def _register_push_hosts(omd_root: Path, num_agents: int) -> list[str]:
+    from agent_receiver import site_context
+
+    site_context.agent_output_dir().mkdir(parents=True)
+    uuids = []
+    for n in range(num_agents):
+        uuid = str(uuid4())
+        (site_context.agent_output_dir() / uuid).symlink_to(
+            omd_root / "var/check_mk/push-agent" / f"host{n}"
+        )
+        uuids.append(uuid)
+    return uuids
+
+
+async def _run_agent(
+    client: object,
+    uuid: str,
+    data: bytes,
+    schedule: list[float],
+    latencies: list[float],
+) -> None:
+    for scheduled in schedule:
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        response = await client.post(  # type: ignore[attr-defined]
+            f"/agent_data/{uuid}",
+            headers={"compression": "zlib", "verified-uuid": uuid},
+            files={"monitoring_data": ("monitoring_data", data)},
+        )
+        latencies.append(time.perf_counter() - scheduled)
+        if response.status_code != 204:
+            raise RuntimeError(f"Upload failed: {response.status_code} {response.text}")
+
+
+async def _measure_stalls(stalls: list[float]) -> None:
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        stalls.append(time.perf_counter() - start)
+
+
+async def _run(uuids: list[str], args: argparse.Namespace) -> None:
+    import httpx
+    from agent_receiver.apps_and_routers import AGENT_RECEIVER_APP
+    from agent_receiver.main import main_app
+
+    main_app()
+    small = zlib.compress(_agent_output(args.size * 1024))
+    large = zlib.compress(_agent_output(args.large_size * 1024 * 1024))
+    small_latencies: list[float] = []
+    large_latencies: list[float] = []
+    stalls: list[float] = []
+    stall_task = asyncio.create_task(_measure_stalls(stalls))
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=AGENT_RECEIVER_APP),  # type: ignore[arg-type]
+        base_url="http://agent-receiver",
+        timeout=None,
+    ) as client:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(
+                _run_agent(
+                    client,
+                    uuid,
+                    large if n < args.large else small,
+                    [start + (r + n / len(uuids)) * args.interval for r in range(args.rounds)],
+                    large_latencies if n < args.large else small_latencies,
+                )
+                for n, uuid in enumerate(uuids)
+            )
+        )
+        duration = time.perf_counter() - start
+    stall_task.cancel()
+
+    print(f"{'agents':<8} {'uploads':>8} {'median':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for name, latencies in [("small", small_latencies), ("large", large_latencies)]:
+        if not latencies:
+            continue
+        latencies.sort()
+        print(
+            f"{name:<8} {len(latencies):>8} {statistics.median(latencies):>8.3f}s"
+            f" {_percentile(latencies, 95):>8.3f}s {_percentile(latencies, 99):>8.3f}s"
+            f" {latencies[-1]:>8.3f}s"
+        )
+    num_uploads = len(small_latencies) + len(large_latencies)
+    print(f"{num_uploads} uploads in {duration:.3f}s, {num_uploads / duration:.1f} uploads/s")
+    print(f"event loop blocked for up to {max(stalls):.3f}s")
+
+
+def _percentile(sorted_values: list[float], percent: int) -> float:
+    return sorted_values[min(len(sorted_values) - 1, len(sorted_values) * percent // 100)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--agents", type=int, default=1000, help="Number of push agents")
+    parser.add_argument("--rounds", type=int, default=3, help="Number of uploads per agent")
+    parser.add_argument("--interval", type=float, default=5.0, help="Duration of a round in s")
+    parser.add_argument("--size", type=int, default=64, help="Size of the agent output in KiB")
+    parser.add_argument("--large", type=int, default=10, help="Number of agents with large output")
+    parser.add_argument("--large-size", type=int, default=50, help="Size of large output in MiB")
+    args = parser.parse_args()
+
+    omd_root = Path(tempfile.mkdtemp(prefix="bench_agent_receiver_"))
+    # The paths of the agent receiver are derived from OMD_ROOT
+    os.environ["OMD_ROOT"] = str(omd_root)
+    os.environ.setdefault("OMD_SITE", "bench")
+    try:
+        (omd_root / "var/log/agent-receiver").mkdir(parents=True)
+        asyncio.run(_run(_register_push_hosts(omd_root, args.agents), args))
+    finally:
+        shutil.rmtree(omd_root)
+
+
+if __name__ == "__main__":
+    main()
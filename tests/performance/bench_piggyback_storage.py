@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 tribe29 GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Compare the piggyback storage formats
+
+Simulates a source (e.g. a vCenter or a Kubernetes cluster) which sends piggyback data for
+many hosts in every cycle and measures writing the data and reading it back host by host.
+
+    python3 tests/performance/bench_piggyback_storage.py --hosts 5000 --cycles 5
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+# Make cmk available when called from the git top level directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__)))))
+
+import cmk.utils.paths
+import cmk.utils.piggyback as piggyback
+from cmk.utils.type_defs import HostName
+
+_TIME_SETTINGS: piggyback.PiggybackTimeSettings = [(None, "max_cache_age", 3600)]
+
+
+def _timed(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def _run(
+    storage_format: piggyback.PiggybackStorageFormat,
+    base_dir: Path,
+    hosts: int,
+    lines: int,
+    cycles: int,
+) -> tuple[float, float]:
+    cmk.utils.paths.piggyback_dir = base_dir / "piggyback"
+    cmk.utils.paths.piggyback_source_dir = base_dir / "piggyback_sources"
+    cmk.utils.paths.piggyback_segments_dir = base_dir / "piggyback_segments"
+    piggyback.set_storage_format(storage_format)
+
+    source_hostname = HostName("source")
+    piggybacked_hostnames = [HostName(f"host-{n:06d}") for n in range(hosts)]
+    section = [b"<<<local:sep(0)>>>"] + [b"0 Service_%d - OK" % n for n in range(lines)]
+    raw_data = {piggybacked_hostname: section for piggybacked_hostname in piggybacked_hostnames}
+
+    def _read_all() -> None:
+        for piggybacked_hostname in piggybacked_hostnames:
+            piggyback.get_piggyback_raw_data(piggybacked_hostname, _TIME_SETTINGS)
+
+    write_time = read_time = 0.0
+    for _cycle in range(cycles):
+        write_time += _timed(lambda: piggyback.store_piggyback_raw_data(source_hostname, raw_data))
+        read_time += _timed(_read_all)
+    return write_time / cycles, read_time / cycles
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--hosts", type=int, default=5000, help="piggybacked hosts per source")
+    parser.add_argument("--lines", type=int, default=20, help="lines of data per host")
+    parser.add_argument("--cycles", type=int, default=3, help="number of check cycles")
+    args = parser.parse_args()
+
+    print(f"{args.hosts} piggybacked hosts, {args.lines} lines each, {args.cycles} cycles")
+    print(f"{'format':<10} {'write/cycle':>12} {'read all/cycle':>15}")
+    storage_formats: list[piggyback.PiggybackStorageFormat] = ["files", "segments"]
+    for storage_format in storage_formats:
+        with tempfile.TemporaryDirectory() as base_dir:
+            write_time, read_time = _run(
+                storage_format, Path(base_dir), args.hosts, args.lines, args.cycles
+            )
+        print(f"{storage_format:<10} {write_time:>11.3f}s {read_time:>14.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 tribe29 GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Compare importing all agent based plugins with importing them on demand
+
+Each measurement starts a fresh interpreter, which loads the agent based plugins and then looks up
+a number of check plugins, as "cmk --check" does for the services of a host. The plugin index
+needed for loading on demand is created in a temporary site directory before.
+
+    python3 tests/performance/bench_plugin_loading.py --plugins 20 --runs 5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Make cmk available when called from the git top level directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__)))))
+
+
+def _child(lazy: bool, num_plugins: int) -> None:
+    start = time.perf_counter()
+    # pylint: disable=import-outside-toplevel
+    from cmk.utils.type_defs import CheckPluginName
+
+    import cmk.base.api.agent_based.register as agent_based_register
+    from cmk.base.api.agent_based.register._index import load_plugin_index, plugin_index_path
+
+    imported = time.perf_counter()
+    agent_based_register.load_all_plugins(lazy=lazy)
+    loaded = time.perf_counter()
+
+    if (index := load_plugin_index(plugin_index_path(), _fingerprint())) is None:
+        raise RuntimeError("No plugin index")
+    for name in sorted(index.check_plugins)[::7][:num_plugins]:
+        plugin = agent_based_register.get_check_plugin(CheckPluginName(name))
+        assert plugin is not None, name
+    done = time.perf_counter()
+    print(f"{imported - start} {loaded - imported} {done - loaded}")
+
+
+def _fingerprint() -> str:
+    # pylint: disable=import-outside-toplevel
+    from cmk.base.api.agent_based.register._index import plugins_fingerprint
+
+    return plugins_fingerprint()
+
+
+def _run(site_dir: str, lazy: bool, num_plugins: int) -> tuple[float, ...]:
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", "lazy" if lazy else "eager"]
+        + ["--plugins", str(num_plugins)],
+        env={**os.environ, "OMD_ROOT": site_dir},
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return tuple(float(value) for value in output.split())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--plugins", type=int, default=20, help="Number of check plugins used")
+    parser.add_argument("--runs", type=int, default=5, help="Number of runs per mode")
+    parser.add_argument("--child", choices=["eager", "lazy"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child == "lazy", args.plugins)
+        return
+
+    with tempfile.TemporaryDirectory() as site_dir:
+        # Create the plugin index
+        _run(site_dir, True, 0)
+
+        print(f"{'mode':<6} {'imports':>9} {'load':>9} {'lookup':>9} {'total':>9}")
+        for lazy in (False, True):
+            durations = min(
+                (_run(site_dir, lazy, args.plugins) for _n in range(args.runs)), key=sum
+            )
+            print(
+                f"{'lazy' if lazy else 'eager':<6} "
+                + " ".join(f"{duration:>8.3f}s" for duration in durations)
+                + f" {sum(durations):>8.3f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
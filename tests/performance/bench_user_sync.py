@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 tribe29 GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Measure saving the users like a user sync does
+
+Creates synthetic users in a temporary site directory and saves them once initially and once
+after changing some of them, which is what an LDAP sync does for large user bases. The number
+of profile files written by each save is reported along with its duration.
+
+    python3 tests/performance/bench_user_sync.py --users 20000 --changed 1
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Make cmk available when called from the git top level directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__)))))
+
+
+def _make_users(num_users: int) -> dict:
+    return {
+        f"ldap-user-{n}": {
+            "alias": f"LDAP user {n}",
+            "email": f"ldap-user-{n}@example.com",
+            "connector": "ldap",
+            "locked": False,
+            "roles": ["user"],
+            "contactgroups": [f"group-{n % 50}"],
+            "serial": 1,
+            "num_failed_logins": 0,
+            "last_pw_change": 1680000000,
+            "enforce_pw_change": False,
+        }
+        for n in range(num_users)
+    }
+
+
+def _change_users(users: dict, percentage: float) -> None:
+    num_changed = int(len(users) * percentage / 100)
+    for user_id in list(users)[:num_changed]:
+        users[user_id]["alias"] += " (changed)"
+        users[user_id]["serial"] += 1
+
+
+def _timed_save(users: dict, profile_dir: Path) -> tuple[float, int]:
+    from cmk.gui.userdb.store import save_users
+
+    before = {path: path.stat().st_mtime_ns for path in profile_dir.rglob("*") if path.is_file()}
+    start = time.perf_counter()
+    save_users(users, datetime.now())
+    duration = time.perf_counter() - start
+    written = sum(
+        1
+        for path in profile_dir.rglob("*")
+        if path.is_file() and before.get(path) != path.stat().st_mtime_ns
+    )
+    return duration, written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--users", type=int, default=20000, help="Number of users")
+    parser.add_argument(
+        "--changed", type=float, default=1.0, help="Percentage of users changed by the sync"
+    )
+    args = parser.parse_args()
+
+    omd_root = Path(tempfile.mkdtemp(prefix="bench_user_sync_"))
+    # The paths of cmk are derived from OMD_ROOT while importing
+    os.environ["OMD_ROOT"] = str(omd_root)
+    os.environ.setdefault("OMD_SITE", "bench")
+    try:
+        _run(omd_root, args.users, args.changed)
+    finally:
+        shutil.rmtree(omd_root)
+
+
+def _run(omd_root: Path, num_users: int, percentage: float) -> None:
+    import cmk.utils.paths
+
+    from cmk.gui.utils.script_helpers import gui_context
+    from cmk.gui.wsgi.blueprints.global_vars import set_global_vars
+
+    for path in [
+        Path(cmk.utils.paths.default_config_dir, "multisite.d/wato"),
+        Path(cmk.utils.paths.check_mk_config_dir, "wato"),
+        Path(cmk.utils.paths.var_dir, "web"),
+        Path(cmk.utils.paths.htpasswd_file).parent,
+    ]:
+        path.mkdir(parents=True, exist_ok=True)
+    profile_dir = Path(cmk.utils.paths.var_dir, "web")
+
+    users = _make_users(num_users)
+    with gui_context():
+        set_global_vars()
+        print(f"{'save':<10} {'duration':>9} {'written':>8}")
+        duration, written = _timed_save(users, profile_dir)
+        print(f"{'initial':<10} {duration:>8.3f}s {written:>8}")
+        _change_users(users, percentage)
+        duration, written = _timed_save(users, profile_dir)
+        print(f"{'sync':<10} {duration:>8.3f}s {written:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 tribe29 GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Compare sorting view rows by sort keys with sorting by compare functions
+
+Sorts synthetic service rows with the sorters of a typical "All services" view, once with the
+sort keys of the sorters and once with their compare functions.
+
+    python3 tests/performance/bench_view_sorting.py --rows 50000
+"""
+
+import argparse
+import functools
+import os
+import random
+import sys
+import time
+
+# Make cmk available when called from the git top level directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__)))))
+
+from cmk.gui.type_defs import Rows
+from cmk.gui.views.page_show_view import _multisort, _sort_data
+from cmk.gui.views.painter.v0 import painters
+from cmk.gui.views.painter.v0.base import painter_registry
+from cmk.gui.views.painter_options import painter_option_registry
+from cmk.gui.views.sorter import register_sorters, sorter_registry, SorterEntry
+
+_SORTERS = {
+    "services": [("site_host", False), ("svcdescr", False)],
+    "problems": [("svcstate", True), ("stateage", False), ("site_host", False)],
+    "perfdata": [("svc_perf_val01", True), ("host_name", False), ("svcdescr", False)],
+}
+
+
+def _make_rows(num_rows: int) -> Rows:
+    rng = random.Random(42)
+    return [
+        {
+            "site": f"site{rng.randrange(5)}",
+            "host_name": f"host-{rng.randrange(num_rows // 20 + 1)}",
+            "service_description": rng.choice(["Check_MK", "CPU load", "Memory"])
+            + f" {rng.randrange(100)}",
+            "service_state": rng.randrange(4),
+            "service_has_been_checked": rng.randrange(10) > 0,
+            "service_last_state_change": rng.randrange(1_000_000),
+            "service_perf_data": f"value={rng.random() * 100:.2f};80;90;0;100",
+            "service_check_command": "check_mk-cpu",
+        }
+        for _n in range(num_rows)
+    ]
+
+
+def _timed_sort(rows: Rows, sorters: list[SorterEntry], by_keys: bool) -> tuple[float, Rows]:
+    rows = list(rows)
+    start = time.perf_counter()
+    if by_keys:
+        _sort_data(rows, sorters)
+    else:
+        rows.sort(key=functools.cmp_to_key(functools.partial(_multisort, sorters)))
+    return time.perf_counter() - start, rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--rows", type=int, default=50000, help="Number of view rows")
+    args = parser.parse_args()
+
+    painters.register(painter_option_registry, painter_registry)
+    register_sorters(sorter_registry)
+
+    rows = _make_rows(args.rows)
+    print(f"{'sorters':<10} {'cmp':>9} {'keys':>9}")
+    for name, spec in _SORTERS.items():
+        sorters = [
+            SorterEntry(sorter_registry[ident](), negate, None, None) for ident, negate in spec
+        ]
+        cmp_duration, cmp_rows = _timed_sort(rows, sorters, by_keys=False)
+        key_duration, key_rows = _timed_sort(rows, sorters, by_keys=True)
+        assert cmp_rows == key_rows, f"Different order with sorters {name}"
+        print(f"{name:<10} {cmp_duration:>8.3f}s {key_duration:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
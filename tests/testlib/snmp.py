@@ -4,7 +4,6 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import logging
-from collections.abc import Sequence
 from typing import Any
 
 from cmk.utils.type_defs import SectionName
@@ -13,7 +12,7 @@ from cmk.snmplib.snmp_table import get_snmp_table
 from cmk.snmplib.type_defs import BackendSNMPTree, SNMPBackendEnum, SNMPHostConfig
 from cmk.snmplib.utils import evaluate_snmp_detection
 
-from cmk.fetchers.snmp_backend import StoredWalkSNMPBackend
+from cmk.fetchers.snmp_backend import StoredWalkSNMPBackend, WalkIndex
 
 import cmk.base.api.agent_based.register as agent_based_register
 from cmk.base.api.agent_based.type_defs import SNMPSectionPlugin
@@ -44,8 +43,8 @@ class _StringSNMPBackend(StoredWalkSNMPBackend):
             logging.getLogger("tbd"),
         )
 
-    def read_walk_data(self) -> Sequence[str]:
-        return self.lines
+    def load_walk_index(self) -> WalkIndex:
+        return WalkIndex.from_lines(self.lines)
 
 
 def snmp_is_detected(section_name: SectionName, snmp_walk: str) -> bool:
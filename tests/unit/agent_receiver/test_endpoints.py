@@ -675,6 +675,30 @@ def test_agent_data_success(
     assert response.status_code == 204
 
 
+@pytest.mark.usefixtures("symlink_push_host")
+def test_agent_data_too_large(
+    tmp_path: Path,
+    mocker: MockerFixture,
+    client: TestClient,
+    uuid: UUID4,
+    agent_data_headers: Mapping[str, str],
+) -> None:
+    mocker.patch("agent_receiver.endpoints.MAX_AGENT_DATA_SIZE", 8)
+    file_path = tmp_path / "push-agent" / "hostname" / "agent_output"
+    file_path.write_text("previous data")
+
+    response = client.post(
+        f"/agent_data/{uuid}",
+        headers=typeshed_issue_7724(agent_data_headers),
+        files={"monitoring_data": ("filename", io.BytesIO(compress(b"certainly too large")))},
+    )
+
+    assert response.status_code == 413
+    assert response.json() == {"detail": "Decompressed agent data is too large"}
+    assert file_path.read_text() == "previous data"
+    assert [p.name for p in file_path.parent.iterdir()] == ["agent_output"]
+
+
 @pytest.fixture(name="registration_status_headers")
 def fixture_registration_status_headers(uuid: UUID4) -> Mapping[str, str]:
     return {
@@ -5,11 +5,12 @@
 
 import time
 from pathlib import Path
+from uuid import uuid4
 
 import pytest
 from agent_receiver import site_context
 from agent_receiver.models import ConnectionMode, RegistrationStatusEnum, RequestForRegistration
-from agent_receiver.utils import NotRegisteredException, R4R, RegisteredHost
+from agent_receiver.utils import NotRegisteredException, R4R, RegisteredHost, RegisteredHostCache
 from pydantic import UUID4
 
 
@@ -42,6 +43,40 @@ def test_push_host_registered(tmp_path: Path, uuid: UUID4) -> None:
     assert host.source_path == source
 
 
+def test_registered_host_cache(tmp_path: Path, uuid: UUID4) -> None:
+    cache = RegisteredHostCache(max_size=10)
+    with pytest.raises(NotRegisteredException):
+        cache.get(uuid)
+
+    source = site_context.agent_output_dir() / str(uuid)
+    source.symlink_to(tmp_path / "push-agent" / "hostname")
+    host = cache.get(uuid)
+    assert host.name == "hostname"
+    assert host.connection_mode is ConnectionMode.PUSH
+    assert cache.get(uuid) is host
+
+    source.unlink()
+    source.symlink_to(tmp_path / "other-hostname")
+    host = cache.get(uuid)
+    assert host.name == "other-hostname"
+    assert host.connection_mode is ConnectionMode.PULL
+
+    source.unlink()
+    with pytest.raises(NotRegisteredException):
+        cache.get(uuid)
+
+
+def test_registered_host_cache_size(tmp_path: Path) -> None:
+    cache = RegisteredHostCache(max_size=2)
+    uuids = [UUID4(str(uuid4())) for _ in range(3)]
+    for n, uuid in enumerate(uuids):
+        (site_context.agent_output_dir() / str(uuid)).symlink_to(tmp_path / f"host{n}")
+    hosts = [cache.get(uuid) for uuid in uuids]
+
+    assert cache.get(uuids[2]) is hosts[2]
+    assert cache.get(uuids[0]) is not hosts[0]
+
+
 def test_r4r(uuid: UUID4) -> None:
     r4r = R4R(
         status=RegistrationStatusEnum.NEW,
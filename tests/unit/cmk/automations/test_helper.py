@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 tribe29 GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import socket
+import threading
+
+import pytest
+
+from cmk.automations.helper import (
+    AutomationHelperRequest,
+    AutomationHelperResponse,
+    receive_message,
+    send_message,
+)
+
+
+def test_request_serialization() -> None:
+    request = AutomationHelperRequest(
+        command="service-discovery", args=["--timeout", "10", "heute"], stdin="{}", log_level=20
+    )
+    assert AutomationHelperRequest.deserialize(request.serialize()) == request
+
+
+def test_response_serialization() -> None:
+    response = AutomationHelperResponse(executed=True, exit_code=2, stdout="out", stderr="err")
+    assert AutomationHelperResponse.deserialize(response.serialize()) == response
+
+
+def test_send_and_receive_large_message() -> None:
+    payload = b"x" * (3 * 1024 * 1024 + 17)
+    left, right = socket.socketpair()
+    with left, right:
+        # The message does not fit into the socket buffers, so it has to be sent concurrently
+        sender = threading.Thread(target=send_message, args=(left, payload))
+        sender.start()
+        assert receive_message(right) == payload
+        sender.join()
+
+
+def test_receive_incomplete_message() -> None:
+    left, right = socket.socketpair()
+    with right:
+        with left:
+            left.sendall(b"\x00\x00\x00\x10incomplete")
+        with pytest.raises(ConnectionError):
+            receive_message(right)
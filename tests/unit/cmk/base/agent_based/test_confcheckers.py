@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 tribe29 GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import threading
+import time
+from collections.abc import Sequence
+
+import pytest
+
+from cmk.utils.type_defs import HostName, result
+
+from cmk.fetchers import FetcherType, Mode
+from cmk.fetchers.filecache import FileCacheOptions
+
+from cmk.checkers import SourceInfo, SourceType
+
+import cmk.base.agent_based.confcheckers as confcheckers
+
+
+class _FakeSource:
+    def __init__(self, ident: str, fetcher_type: FetcherType) -> None:
+        self.ident = ident
+        self.fetcher_type = fetcher_type
+
+    def source_info(self) -> SourceInfo:
+        return SourceInfo(HostName("node"), None, self.ident, self.fetcher_type, SourceType.HOST)
+
+    def file_cache(self, *, simulation: bool, file_cache_options: FileCacheOptions) -> str:
+        return self.ident
+
+    def fetcher(self) -> str:
+        return self.ident
+
+
+class _RecordingGetRawData:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.running: list[str] = []
+        self.max_running: dict[str, int] = {}
+
+    def __call__(self, file_cache: str, fetcher: str, mode: Mode) -> result.Result:
+        kind = fetcher.rstrip("0123456789")
+        with self._lock:
+            self.running.append(kind)
+            self.max_running[kind] = max(self.max_running.get(kind, 0), self.running.count(kind))
+        time.sleep(0.05)
+        with self._lock:
+            self.running.remove(kind)
+        return result.OK(fetcher.encode())
+
+
+@pytest.fixture(name="get_raw_data")
+def fixture_get_raw_data(monkeypatch: pytest.MonkeyPatch) -> _RecordingGetRawData:
+    get_raw_data = _RecordingGetRawData()
+    monkeypatch.setattr(confcheckers, "get_raw_data", get_raw_data)
+    return get_raw_data
+
+
+def _fetch(sources: Sequence[_FakeSource], max_concurrency: int) -> Sequence[str]:
+    fetched = confcheckers._fetch_all(
+        sources,  # type: ignore[arg-type]
+        simulation=False,
+        file_cache_options=FileCacheOptions(),
+        mode=Mode.CHECKING,
+        max_concurrency=max_concurrency,
+    )
+    return [source_info.ident for source_info, _raw_data, _duration in fetched]
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 4])
+def test_fetch_all_keeps_order(get_raw_data: _RecordingGetRawData, max_concurrency: int) -> None:
+    sources = [
+        _FakeSource("snmp1", FetcherType.SNMP),
+        *(_FakeSource(f"tcp{n}", FetcherType.TCP) for n in range(6)),
+        _FakeSource("snmp2", FetcherType.SNMP),
+    ]
+    assert _fetch(sources, max_concurrency) == [s.ident for s in sources]
+
+
+def test_fetch_all_concurrently(get_raw_data: _RecordingGetRawData) -> None:
+    sources = [
+        _FakeSource("snmp1", FetcherType.SNMP),
+        _FakeSource("snmp2", FetcherType.SNMP),
+        *(_FakeSource(f"tcp{n}", FetcherType.TCP) for n in range(6)),
+    ]
+    _fetch(sources, 4)
+    assert get_raw_data.max_running["snmp"] == 1
+    assert 1 < get_raw_data.max_running["tcp"] <= 4
+
+
+def test_fetch_all_sequentially(get_raw_data: _RecordingGetRawData) -> None:
+    _fetch([_FakeSource(f"tcp{n}", FetcherType.TCP) for n in range(3)], 1)
+    assert get_raw_data.max_running["tcp"] == 1
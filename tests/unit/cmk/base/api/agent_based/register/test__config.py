@@ -7,10 +7,11 @@
 
 from pytest import MonkeyPatch
 
-from cmk.utils.type_defs import CheckPluginName
+from cmk.utils.type_defs import CheckPluginName, RuleSetName
 
 import cmk.base.api.agent_based.register as agent_based_register
 from cmk.base.api.agent_based.checking_classes import CheckPlugin
+from cmk.base.api.agent_based.register._index import PluginIndex
 
 
 def test_get_registered_check_plugins(monkeypatch: MonkeyPatch) -> None:
@@ -46,3 +47,59 @@ def test_get_registered_check_plugins(monkeypatch: MonkeyPatch) -> None:
     assert mgmt_plugin is not None
     assert str(mgmt_plugin.name).startswith("mgmt_")
     assert mgmt_plugin.service_name.startswith("Management Interface: ")
+
+
+def test_lazy_loading(monkeypatch: MonkeyPatch) -> None:
+    test_plugin = CheckPlugin(
+        CheckPluginName("check_unit_test"),
+        [],
+        "Unit Test",
+        lambda: [],
+        None,
+        None,
+        "merged",
+        lambda: [],
+        None,
+        None,
+        None,
+        "unit_test",
+    )
+    imported: list[str] = []
+
+    def import_module(name: str) -> None:
+        imported.append(name)
+        if name == "unit_test":
+            agent_based_register._config.registered_check_plugins[test_plugin.name] = test_plugin
+
+    monkeypatch.setattr(agent_based_register._config, "registered_check_plugins", {})
+    monkeypatch.setattr(agent_based_register._config, "registered_inventory_plugins", {})
+    monkeypatch.setattr(agent_based_register._config, "stored_rulesets", {})
+    monkeypatch.setattr(agent_based_register._config, "_plugin_index", None)
+    monkeypatch.setattr(agent_based_register._config, "_imported_modules", set())
+    monkeypatch.setattr(agent_based_register._config.importlib, "import_module", import_module)
+
+    agent_based_register._config.enable_lazy_loading(
+        PluginIndex(
+            fingerprint="",
+            errors=[],
+            sections={},
+            parsed_sections={},
+            check_plugins={"check_unit_test": "unit_test"},
+            inventory_plugins={"inventory_unit_test": "other"},
+            rulesets={"unit_test_rules": ["unit_test"]},
+        )
+    )
+    assert list(agent_based_register.iter_all_discovery_rulesets()) == [
+        RuleSetName("unit_test_rules")
+    ]
+    assert not imported
+
+    assert agent_based_register.get_check_plugin(CheckPluginName("check_not_indexed")) is None
+    assert not imported
+
+    assert agent_based_register.get_check_plugin(test_plugin.name) is test_plugin
+    assert agent_based_register.get_check_plugin(CheckPluginName("mgmt_check_unit_test"))
+    assert imported == ["unit_test"]
+
+    assert list(agent_based_register.iter_all_inventory_plugins()) == []
+    assert imported == ["unit_test", "other"]
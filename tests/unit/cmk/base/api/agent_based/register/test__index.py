@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 tribe29 GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+from pathlib import Path
+
+from cmk.utils.type_defs import CheckPluginName, ParsedSectionName, RuleSetName, SectionName
+
+from cmk.base.api.agent_based.checking_classes import CheckPlugin
+from cmk.base.api.agent_based.register._index import (
+    create_plugin_index,
+    load_plugin_index,
+    PluginIndex,
+    save_plugin_index,
+)
+from cmk.base.api.agent_based.register.section_plugins import trivial_section_factory
+
+
+def _check_plugin(name: str, module: str | None) -> CheckPlugin:
+    return CheckPlugin(
+        CheckPluginName(name),
+        [ParsedSectionName(name)],
+        "Unit Test",
+        lambda: [],
+        None,
+        RuleSetName(f"{name}_discovery"),
+        "merged",
+        lambda: [],
+        None,
+        None,
+        None,
+        module,
+    )
+
+
+def _index() -> PluginIndex:
+    return create_plugin_index(
+        "fingerprint",
+        ["Error in agent based plugin broken: ValueError\n"],
+        [
+            trivial_section_factory(SectionName("unit_test"))._replace(module="unit_test"),
+            trivial_section_factory(SectionName("legacy")),
+        ],
+        [_check_plugin("unit_test", "unit_test"), _check_plugin("legacy", None)],
+        [],
+    )
+
+
+def test_create_plugin_index() -> None:
+    index = _index()
+
+    assert index.sections == {"unit_test": "cmk.base.plugins.agent_based.unit_test"}
+    assert index.parsed_sections == {"unit_test": ["cmk.base.plugins.agent_based.unit_test"]}
+    assert index.check_plugins == {"unit_test": "cmk.base.plugins.agent_based.unit_test"}
+    assert index.inventory_plugins == {}
+    assert index.rulesets == {"unit_test_discovery": ["cmk.base.plugins.agent_based.unit_test"]}
+    assert index.modules == ["cmk.base.plugins.agent_based.unit_test"]
+
+
+def test_save_and_load_plugin_index(tmp_path: Path) -> None:
+    path = tmp_path / "index.json"
+    index = _index()
+
+    assert load_plugin_index(path, "fingerprint") is None
+
+    save_plugin_index(path, index)
+    assert load_plugin_index(path, "fingerprint") == index
+    assert load_plugin_index(path, "changed") is None
+
+
+def test_load_broken_plugin_index(tmp_path: Path) -> None:
+    path = tmp_path / "index.json"
+    path.write_text('{"fingerprint": "fingerprint"}')
+    assert load_plugin_index(path, "fingerprint") is None
@@ -3,7 +3,9 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import marshal
 from ast import literal_eval
+from collections.abc import Mapping
 from pathlib import Path
 
 # pylint: disable=protected-access
@@ -17,6 +19,8 @@ from cmk.base.api.agent_based.value_store._utils import (
     _DynamicDiskSyncedMapping,
     _StaticDiskSyncedMapping,
     _ValueStore,
+    AppendLogValueStoreStorage,
+    LiteralValueStoreStorage,
     ServiceID,
     ValueStoreManager,
 )
@@ -101,10 +105,13 @@ class Test_StaticDiskSyncedMapping:
         tmp_path: Path,
     ) -> _StaticDiskSyncedMapping[tuple[str, str | None, str], object]:
         return _StaticDiskSyncedMapping(
-            path=tmp_path / "test-host",
+            storage=LiteralValueStoreStorage(
+                tmp_path / "test-host",
+                lambda msg: None,
+                serializer=repr,
+                deserializer=literal_eval,
+            ),
             log_debug=lambda msg: None,
-            serializer=repr,
-            deserializer=literal_eval,
         )
 
     def test_mapping_features(self, mocker, tmp_path: Path) -> None:  # type: ignore[no-untyped-def]
@@ -143,6 +150,97 @@ class Test_StaticDiskSyncedMapping:
         assert list(sdsm.items()) == list(expected_values.items())
 
 
+class TestAppendLogValueStoreStorage:
+    @staticmethod
+    def _get_sdsm(
+        path: Path,
+    ) -> _StaticDiskSyncedMapping[tuple[str, str | None, str], object]:
+        return _StaticDiskSyncedMapping(
+            storage=AppendLogValueStoreStorage(path, lambda msg: None),
+            log_debug=lambda msg: None,
+        )
+
+    def test_roundtrip(self, tmp_path: Path) -> None:
+        path = tmp_path / "test-host"
+        sdsm = self._get_sdsm(path)
+        assert not sdsm
+
+        sdsm.disksync(updated=[(("check1", None, "key"), (1.5, {"a": [1, 2]}))])
+        assert path.read_bytes().startswith(AppendLogValueStoreStorage.MAGIC)
+        assert dict(self._get_sdsm(path)) == {("check1", None, "key"): (1.5, {"a": [1, 2]})}
+
+    def test_changes_are_appended(self, tmp_path: Path) -> None:
+        path = tmp_path / "test-host"
+        sdsm = self._get_sdsm(path)
+        sdsm.disksync(updated=[(("check1", None, f"key{n}"), n) for n in range(100)])
+        size_snapshot = path.stat().st_size
+
+        other = self._get_sdsm(path)
+        sdsm.disksync(
+            removed={("check1", None, "key0")},
+            updated=[(("check1", None, "key1"), "new")],
+        )
+        size_appended = path.stat().st_size
+        assert size_snapshot < size_appended < 2 * size_snapshot
+
+        # the other instance only reads the appended changes
+        other.disksync()
+        assert ("check1", None, "key0") not in other
+        assert other[("check1", None, "key1")] == "new"
+        assert dict(other) == dict(self._get_sdsm(path))
+
+    def test_compaction(self, tmp_path: Path) -> None:
+        path = tmp_path / "test-host"
+        sdsm = self._get_sdsm(path)
+        for cycle in range(10):
+            sdsm.disksync(updated=[(("check1", None, f"key{n}"), cycle) for n in range(100)])
+            assert path.stat().st_size < 4 * 1024 + 3 * len(marshal_dumps_of(sdsm))
+
+        assert dict(self._get_sdsm(path)) == {("check1", None, f"key{n}"): 9 for n in range(100)}
+
+    def test_incomplete_record_is_ignored(self, tmp_path: Path) -> None:
+        path = tmp_path / "test-host"
+        sdsm = self._get_sdsm(path)
+        sdsm.disksync(updated=[(("check1", None, "key"), 1)])
+        with path.open("ab") as f:
+            f.write(b"\xff\x00\x00\x00incomplete")
+
+        assert dict(self._get_sdsm(path)) == {("check1", None, "key"): 1}
+
+    def test_rewritten_file_of_same_size_is_reloaded(self, tmp_path: Path) -> None:
+        path = tmp_path / "test-host"
+        sdsm = self._get_sdsm(path)
+        sdsm.disksync(updated=[(("check1", None, "key"), 1)])
+
+        # Another process compacted the file, the result has the same size and inode
+        other_path = tmp_path / "other-host"
+        self._get_sdsm(other_path).disksync(updated=[(("check1", None, "key"), 2)])
+        assert other_path.stat().st_size == path.stat().st_size
+        with path.open("r+b") as f:
+            f.write(other_path.read_bytes())
+
+        sdsm.disksync()
+        assert dict(sdsm) == {("check1", None, "key"): 2}
+
+    def test_migrate_literal_format(self, tmp_path: Path) -> None:
+        path = tmp_path / "test-host"
+        path.write_text(repr({("check1", None, "key"): 23}))
+
+        sdsm = self._get_sdsm(path)
+        assert dict(sdsm) == {("check1", None, "key"): 23}
+
+        sdsm.disksync(updated=[(("check2", "item", "key"), 42)])
+        assert path.read_bytes().startswith(AppendLogValueStoreStorage.MAGIC)
+        assert dict(self._get_sdsm(path)) == {
+            ("check1", None, "key"): 23,
+            ("check2", "item", "key"): 42,
+        }
+
+
+def marshal_dumps_of(data: Mapping[tuple[str, str | None, str], object]) -> bytes:
+    return marshal.dumps(list(data.items()))
+
+
 class Test_DiskSyncedMapping:
     @staticmethod
     def _get_dsm() -> _DiskSyncedMapping:
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 tribe29 GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import logging
+import os
+import socket
+import sys
+
+import pytest
+
+from cmk.automations.helper import (
+    AutomationHelperRequest,
+    AutomationHelperResponse,
+    receive_message,
+    send_message,
+)
+
+import cmk.base.automation_helper as automation_helper
+from cmk.base.automation_helper import AutomationHelper
+
+
+class _FakeAutomations:
+    def execute(self, cmd: str, args: list[str], *, preloaded: bool = False) -> int:
+        assert preloaded
+        sys.stdout.write(f"{cmd} {args} {sys.stdin.read()}\n")
+        os.system("echo from a subprocess >&2")
+        return 1
+
+
+@pytest.fixture(name="generations")
+def fixture_generations(monkeypatch: pytest.MonkeyPatch) -> dict[str, tuple]:
+    generations: dict[str, tuple] = {"config": (("main.mk", 1),), "plugins": ()}
+    monkeypatch.setattr(automation_helper, "_config_generation", lambda: generations["config"])
+    monkeypatch.setattr(automation_helper, "_plugins_generation", lambda: generations["plugins"])
+    return generations
+
+
+@pytest.fixture(name="config_loads")
+def fixture_config_loads(monkeypatch: pytest.MonkeyPatch) -> list[bool]:
+    config_loads: list[bool] = []
+    monkeypatch.setattr(
+        automation_helper.config, "load", lambda validate_hosts: config_loads.append(True)
+    )
+    monkeypatch.setattr(automation_helper.automations, "automations", _FakeAutomations())
+    return config_loads
+
+
+def _request(helper: AutomationHelper) -> tuple[bool, AutomationHelperResponse]:
+    client, server = socket.socketpair()
+    with client, server, socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+        send_message(
+            client,
+            AutomationHelperRequest(
+                command="get-check-information", args=["a"], stdin="stdin", log_level=logging.INFO
+            ).serialize(),
+        )
+        keep_serving = helper._handle_connection(server, listener)
+        server.close()
+        response = AutomationHelperResponse.deserialize(receive_message(client))
+    automation_helper._reap_children()
+    return keep_serving, response
+
+
+@pytest.mark.usefixtures("generations")
+def test_execute_automation_in_child_process(config_loads: list[bool]) -> None:
+    helper = AutomationHelper(automation_helper.cmk.utils.paths.automation_helper_socket)
+    helper._load_config()
+
+    keep_serving, response = _request(helper)
+
+    assert keep_serving
+    assert response == AutomationHelperResponse(
+        executed=True,
+        exit_code=1,
+        stdout="get-check-information ['a'] stdin\n",
+        stderr="from a subprocess\n",
+    )
+    assert len(config_loads) == 1
+
+
+def test_reload_changed_config(generations: dict[str, tuple], config_loads: list[bool]) -> None:
+    helper = AutomationHelper(automation_helper.cmk.utils.paths.automation_helper_socket)
+    helper._load_config()
+    _request(helper)
+    generations["config"] = (("main.mk", 2),)
+
+    keep_serving, response = _request(helper)
+
+    assert keep_serving
+    assert response.executed
+    assert len(config_loads) == 2
+
+
+@pytest.mark.usefixtures("config_loads")
+def test_restart_on_changed_plugins(generations: dict[str, tuple]) -> None:
+    helper = AutomationHelper(automation_helper.cmk.utils.paths.automation_helper_socket)
+    helper._load_config()
+    generations["plugins"] = (("local/share/check_mk/checks/foo", 1),)
+
+    keep_serving, response = _request(helper)
+
+    assert not keep_serving
+    assert response == AutomationHelperResponse(executed=False)
@@ -3,6 +3,7 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import pickle
 import re
 import shutil
 import socket
@@ -2713,6 +2714,10 @@ def test_save_packed_config(monkeypatch: MonkeyPatch, config_path: VersionedConf
     config.save_packed_config(config_path, config_cache)
 
     assert precompiled_check_config.exists()
+    assert (
+        config.PackedConfigStore.from_serial(config_path).read()
+        == config.PackedConfigGenerator(config_cache).generate()
+    )
 
 
 def test_load_packed_config(config_path: VersionedConfigPath) -> None:
@@ -2743,6 +2748,86 @@ class TestPackedConfigStore:
         assert precompiled_check_config.exists()
         assert store.read() == {"abc": 1}
 
+    def test_read_unsliced_file(
+        self, store: config.PackedConfigStore, config_path: VersionedConfigPath
+    ) -> None:
+        store.path.parent.mkdir(parents=True, exist_ok=True)
+        store.path.write_bytes(pickle.dumps({"abc": 1}))
+        assert store.read() == {"abc": 1}
+        assert store.read([HostName("heute")]) == {"abc": 1}
+
+    @pytest.fixture(name="helper_config")
+    def fixture_helper_config(self) -> Mapping[str, object]:
+        return {
+            "all_hosts": ["node1|lnx", "node2|lnx", "standalone|lnx"],
+            "clusters": {"cluster|lnx": ["node1", "node2"]},
+            "host_tags": {
+                "node1": {"os": "lnx"},
+                "node2": {"os": "lnx"},
+                "standalone": {"os": "lnx"},
+                "cluster": {"os": "lnx"},
+            },
+            "explicit_host_conf": {"parents": {"node1": "router", "standalone": "switch"}},
+            "host_label_rules": [
+                {"condition": {"host_name": ["standalone"]}, "value": {"a": "1"}},
+                {"condition": {}, "value": {"a": "2"}},
+                {"condition": {"host_name": ["node1", "standalone"]}, "value": {"a": "3"}},
+                {"condition": {"host_name": [{"$regex": "node"}]}, "value": {"a": "4"}},
+            ],
+            "checkgroup_parameters": {
+                "filesystem": [
+                    {"condition": {"host_name": ["node2"]}, "value": {"levels": (1, 2)}},
+                    {"condition": {"host_tags": {"os": "lnx"}}, "value": {"levels": (3, 4)}},
+                ],
+            },
+            "tcp_connect_timeout": 2.0,
+        }
+
+    def test_write_sliced(
+        self, store: config.PackedConfigStore, helper_config: Mapping[str, object]
+    ) -> None:
+        store.write(helper_config)
+        assert store.read() == helper_config
+
+    def test_read_slice_of_host(
+        self, store: config.PackedConfigStore, helper_config: Mapping[str, object]
+    ) -> None:
+        store.write(helper_config)
+        assert store.read([HostName("standalone")]) == {
+            "all_hosts": ["standalone|lnx"],
+            "clusters": {},
+            "host_tags": {"standalone": {"os": "lnx"}},
+            "explicit_host_conf": {"parents": {"standalone": "switch"}},
+            "host_label_rules": [
+                {"condition": {"host_name": ["standalone"]}, "value": {"a": "1"}},
+                {"condition": {}, "value": {"a": "2"}},
+                {"condition": {"host_name": ["node1", "standalone"]}, "value": {"a": "3"}},
+                {"condition": {"host_name": [{"$regex": "node"}]}, "value": {"a": "4"}},
+            ],
+            "checkgroup_parameters": {
+                "filesystem": [
+                    {"condition": {"host_tags": {"os": "lnx"}}, "value": {"levels": (3, 4)}},
+                ],
+            },
+            "tcp_connect_timeout": 2.0,
+        }
+
+    def test_read_slice_of_node(
+        self, store: config.PackedConfigStore, helper_config: Mapping[str, object]
+    ) -> None:
+        store.write(helper_config)
+        node_config = store.read([HostName("node2")])
+        assert node_config["all_hosts"] == ["node2|lnx"]
+        assert node_config["clusters"] == {"cluster|lnx": ["node1", "node2"]}
+        assert node_config["host_tags"] == {"node2": {"os": "lnx"}, "cluster": {"os": "lnx"}}
+        assert node_config["checkgroup_parameters"] == helper_config["checkgroup_parameters"]
+
+    def test_read_slice_of_unknown_host(
+        self, store: config.PackedConfigStore, helper_config: Mapping[str, object]
+    ) -> None:
+        store.write(helper_config)
+        assert store.read([HostName("unknown")])["all_hosts"] == []
+
 
 def test__extract_check_plugins(monkeypatch: MonkeyPatch) -> None:
     duplicate_plugin = {
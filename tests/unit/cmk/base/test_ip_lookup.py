@@ -4,6 +4,7 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import socket
+import time
 from collections.abc import Mapping
 from pathlib import Path
 
@@ -331,6 +332,18 @@ class TestIPLookupCache:
         new_cache_instance.load_persisted()
         assert new_cache_instance[cache_id1] == "0.0.0.0"
 
+    def test_update_many(self, tmp_path: Path) -> None:
+        cache_id1 = HostName("host1"), socket.AF_INET
+        cache_id2 = HostName("host2"), socket.AF_INET
+
+        ip_lookup_cache = ip_lookup.IPLookupCache({})
+        ip_lookup_cache[cache_id1] = "0.0.0.0"
+        ip_lookup_cache.update({cache_id1: "127.0.0.1", cache_id2: "127.0.0.2"})
+
+        new_cache_instance = ip_lookup.IPLookupCache({})
+        new_cache_instance.load_persisted()
+        assert new_cache_instance == {cache_id1: "127.0.0.1", cache_id2: "127.0.0.2"}
+
     def test_load_legacy(self, tmp_path: Path) -> None:
         cache_id1 = HostName("host1"), socket.AF_INET
         cache_id2 = HostName("host2"), socket.AF_INET
@@ -392,6 +405,8 @@ def test_update_dns_cache(monkeypatch: MonkeyPatch) -> None:
         configured_ipv6_addresses={},
         simulation_mode=False,
         override_dns=None,
+        max_workers=2,
+        timeout=5.0,
     )
     assert ip_lookup_cache() == {
         ("blub", socket.AF_INET): "127.0.0.13",
@@ -412,6 +427,53 @@ def test_update_dns_cache(monkeypatch: MonkeyPatch) -> None:
     assert cache.get((HostName("dual"), socket.AF_INET6)) is None
 
 
+def test_prefetch_dns_lookups(monkeypatch: MonkeyPatch) -> None:
+    looked_up: list[tuple[str, socket.AddressFamily]] = []
+
+    def getaddrinfo(host: str, _port: None, family: socket.AddressFamily) -> list:
+        looked_up.append((host, family))
+        if host == "slow":
+            time.sleep(1)
+        return [(family, None, None, None, (f"127.0.0.{len(host)}", 0))]
+
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+
+    ts = Scenario()
+    ts.add_host(HostName("cached"))
+    ts.add_host(HostName("configured"))
+    ts.add_host(HostName("new"))
+    ts.add_host(HostName("slow"))
+    ts.apply(monkeypatch)
+    config_cache = config.get_config_cache()
+
+    ip_lookup_cache = ip_lookup.IPLookupCache({})
+    ip_lookup_cache[(HostName("cached"), socket.AF_INET)] = "127.0.0.1"
+    monkeypatch.setattr(ip_lookup, "_get_ip_lookup_cache", lambda: ip_lookup_cache)
+
+    failed = ip_lookup.prefetch_dns_lookups(
+        ip_lookup_configs=(
+            config_cache.ip_lookup_config(hn) for hn in sorted(config_cache.all_active_hosts())
+        ),
+        configured_ipv4_addresses={HostName("configured"): "127.0.0.2"},
+        configured_ipv6_addresses={},
+        simulation_mode=False,
+        override_dns=None,
+        max_workers=4,
+        timeout=0.2,
+    )
+
+    assert sorted(looked_up) == [("new", socket.AF_INET), ("slow", socket.AF_INET)]
+    assert list(failed) == [(HostName("slow"), socket.AF_INET)]
+    assert "Timeout" in str(failed[(HostName("slow"), socket.AF_INET)])
+
+    new_cache_instance = ip_lookup.IPLookupCache({})
+    new_cache_instance.load_persisted()
+    assert new_cache_instance == {
+        (HostName("cached"), socket.AF_INET): "127.0.0.1",
+        (HostName("new"), socket.AF_INET): "127.0.0.3",
+    }
+
+
 @pytest.mark.parametrize(
     "hostname_str, tags, result_address",
     [
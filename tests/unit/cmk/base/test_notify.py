@@ -5,6 +5,7 @@
 
 import os
 from collections.abc import Mapping
+from pathlib import Path
 
 import pytest
 from _pytest.monkeypatch import MonkeyPatch
@@ -105,3 +106,83 @@ def test_rbn_groups_contacts(
     assert notify.rbn_groups_contacts(["all"]) == {"dong"}
     assert notify.rbn_groups_contacts(["foo"]) == {"ding", "harry"}
     assert notify.rbn_groups_contacts(["foo", "all"]) == {"ding", "dong", "harry"}
+
+
+def _make_plugin_context(contact: str, sleep: str) -> NotificationContext:
+    return NotificationContext(
+        {
+            "CONTACTNAME": contact,
+            "HOSTNAME": "heute",
+            "HOSTSTATE": "DOWN",
+            "HOSTOUTPUT": "output",
+            "SLEEP": sleep,
+        }
+    )
+
+
+@pytest.fixture(name="history")
+def fixture_history(monkeypatch: MonkeyPatch, tmp_path: Path) -> list[str]:
+    script = tmp_path / "plugin"
+    script.write_text(
+        "#!/bin/sh\n"
+        "sleep $NOTIFY_SLEEP\n"
+        'echo "$NOTIFY_CONTACTNAME" >> %s\n'
+        'echo "done $NOTIFY_CONTACTNAME"\n' % (tmp_path / "finished")
+    )
+    script.chmod(0o755)
+    monkeypatch.setattr(notify, "path_to_notification_script", lambda plugin_name: str(script))
+
+    history: list[str] = []
+    monkeypatch.setattr(notify, "log_to_history", history.append)
+    return history
+
+
+def test_plugin_pool_logs_history_in_order(history: list[str], tmp_path: Path) -> None:
+    pool = notify.NotificationPluginPool(
+        workers=2, max_per_plugin=2, max_per_contact=1, max_queued=10
+    )
+    pool.submit("plugin", _make_plugin_context("slow", "0.5"))
+    pool.submit("plugin", _make_plugin_context("fast", "0"))
+    pool.shutdown()
+
+    # The fast plugin did not wait for the slow one
+    assert (tmp_path / "finished").read_text().split() == ["fast", "slow"]
+    assert history == [
+        "HOST NOTIFICATION: slow;heute;DOWN;plugin;output",
+        "HOST NOTIFICATION: fast;heute;DOWN;plugin;output",
+        "HOST NOTIFICATION RESULT: slow;heute;OK;plugin;done slow;done slow",
+        "HOST NOTIFICATION RESULT: fast;heute;OK;plugin;done fast;done fast",
+    ]
+
+    statistics = pool.statistics()
+    assert statistics.submitted == statistics.completed == 2
+    assert statistics.queued == statistics.running == 0
+    assert statistics.run_time_max >= 0.5
+
+
+def test_plugin_pool_limits_per_contact(history: list[str], tmp_path: Path) -> None:
+    pool = notify.NotificationPluginPool(
+        workers=2, max_per_plugin=2, max_per_contact=1, max_queued=10
+    )
+    pool.submit("plugin", _make_plugin_context("first", "0.5"))
+    pool.submit("plugin", _make_plugin_context("first", "0"))
+    pool.submit("plugin", _make_plugin_context("second", "0"))
+    pool.shutdown()
+
+    assert (tmp_path / "finished").read_text().split() == ["second", "first", "first"]
+    assert [message.split(";")[0] for message in history[3:]] == [
+        "HOST NOTIFICATION RESULT: first",
+        "HOST NOTIFICATION RESULT: first",
+        "HOST NOTIFICATION RESULT: second",
+    ]
+
+
+def test_plugin_pool_timeout(history: list[str], monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(notify.config, "notification_plugin_timeout", 1, raising=False)
+    pool = notify.NotificationPluginPool(
+        workers=1, max_per_plugin=1, max_per_contact=1, max_queued=1
+    )
+    pool.submit("plugin", _make_plugin_context("contact", "10"))
+    pool.shutdown()
+
+    assert history[-1] == "HOST NOTIFICATION RESULT: contact;heute;WARNING;plugin;;"
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 tribe29 GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import copy
+import multiprocessing
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+import pytest
+from pytest_mock import MockerFixture
+
+from livestatus import LivestatusOutputFormat, LivestatusResponse, LivestatusRow, SiteId
+
+from cmk.utils import store
+from cmk.utils.paths import default_config_dir
+
+from cmk.bi.compiler import BICompiler
+from cmk.bi.lib import SitesCallback
+
+from .bi_test_data import sample_config
+
+
+class _MockSite:
+    def __init__(self) -> None:
+        self.program_start = 1
+        self.hosts: dict[str, tuple] = dict(copy.deepcopy(sample_config.bi_structure_states))
+
+    def query(
+        self,
+        query: str,
+        only_sites: list[SiteId] | None = None,
+        output_format: LivestatusOutputFormat = LivestatusOutputFormat.PYTHON,
+        fetch_full_data: bool = False,
+    ) -> LivestatusResponse:
+        if query.startswith("GET status"):
+            return LivestatusResponse([LivestatusRow(["heute", self.program_start])])
+        if query.startswith("GET hosts"):
+            return LivestatusResponse(
+                [
+                    LivestatusRow(
+                        [
+                            site,
+                            name,
+                            dict(tags),
+                            labels,
+                            list(children),
+                            list(parents),
+                            alias,
+                            folder,
+                        ]
+                    )
+                    for site, tags, labels, folder, _services, children, parents, alias, name in (
+                        self.hosts.values()
+                    )
+                ]
+            )
+        if query.startswith("GET services"):
+            return LivestatusResponse(
+                [
+                    LivestatusRow([site, name, description, tags, labels])
+                    for site, _tags, _labels, _folder, services, *_rest, name in self.hosts.values()
+                    for description, (tags, labels) in services.items()
+                ]
+            )
+        raise NotImplementedError(query)
+
+    def restart(self, hosts: Mapping[str, tuple]) -> None:
+        self.program_start += 1
+        self.hosts = dict(hosts)
+
+
+def _bi_config() -> dict[str, Any]:
+    config: dict[str, Any] = dict(copy.deepcopy(sample_config.bi_packs_config))
+    aggregations = config["packs"][0]["aggregations"]
+    other_aggregation = copy.deepcopy(aggregations[0])
+    other_aggregation["id"] = "other_aggregation"
+    other_aggregation["node"]["search"]["conditions"] = {
+        "host_choice": {"type": "host_name_regex", "pattern": "other.*"},
+        "host_folder": "",
+        "host_labels": {},
+        "host_tags": {},
+    }
+    aggregations.append(other_aggregation)
+    return config
+
+
+@pytest.fixture(name="site")
+def fixture_site() -> _MockSite:
+    return _MockSite()
+
+
+@pytest.fixture(name="compiler", params=[False, True], ids=["serial", "parallel"])
+def fixture_compiler(
+    request: pytest.FixtureRequest, tmp_path: Path, site: _MockSite, monkeypatch: pytest.MonkeyPatch
+) -> BICompiler:
+    Path(default_config_dir, "multisite.d").mkdir(parents=True, exist_ok=True)
+    store.save_object_to_file(config_file := tmp_path / "bi_config.bi", _bi_config())
+    monkeypatch.setattr(multiprocessing, "cpu_count", lambda: 4)
+    return BICompiler(
+        str(config_file),
+        SitesCallback(lambda: [(SiteId("heute"), True)], site.query, lambda s: s),
+        parallel_compilation=request.param,
+    )
+
+
+def _compile(compiler: BICompiler, mocker: MockerFixture) -> set[str]:
+    compile_aggregations = mocker.patch.object(
+        compiler, "_compile_aggregations", wraps=compiler._compile_aggregations
+    )
+    compiler.cleanup()
+    compiler.load_compiled_aggregations()
+    mocker.stop(compile_aggregations)
+    return {aggr_id for call in compile_aggregations.call_args_list for aggr_id in call.args[0]}
+
+
+def test_compile_only_affected_aggregations(
+    compiler: BICompiler, site: _MockSite, mocker: MockerFixture
+) -> None:
+    assert _compile(compiler, mocker) == {"default_aggregation", "other_aggregation"}
+    assert compiler.is_part_of_aggregation("heute_clone", "Interface 5")
+
+    # A restart without structural changes
+    site.restart(site.hosts)
+    assert _compile(compiler, mocker) == set()
+
+    # A service of a host in one of the aggregations vanished
+    hosts = copy.deepcopy(site.hosts)
+    del hosts["heute_clone"][4]["Interface 5"]
+    site.restart(hosts)
+    assert _compile(compiler, mocker) == {"default_aggregation"}
+    assert not compiler.is_part_of_aggregation("heute_clone", "Interface 5")
+    assert compiler.is_part_of_aggregation("heute_clone", "Interface 4")
+
+    # A new host matching the search of the other aggregation
+    hosts = copy.deepcopy(site.hosts)
+    hosts["other"] = (*hosts["heute_clone"][:1], set(), *hosts["heute_clone"][2:-1], "other")
+    site.restart(hosts)
+    assert _compile(compiler, mocker) == {"other_aggregation"}
+    assert compiler.is_part_of_aggregation("other", "Interface 4")
+    assert {
+        branch.properties.title
+        for branch in compiler.compiled_aggregations["other_aggregation"].branches
+    } == {"Host other"}
+
+
+def test_compile_changed_configuration(
+    compiler: BICompiler, tmp_path: Path, mocker: MockerFixture
+) -> None:
+    _compile(compiler, mocker)
+
+    config = _bi_config()
+    config["packs"][0]["aggregations"][1]["groups"]["names"] = ["Other hosts"]
+    store.save_object_to_file(tmp_path / "bi_config.bi", config)
+    mocker.patch.object(compiler, "_get_compilation_timestamp", return_value=0.0)
+    assert _compile(compiler, mocker) == {"other_aggregation"}
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 tribe29 GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from pytest_mock import MockerFixture
+
+from livestatus import LivestatusOutputFormat, LivestatusResponse, LivestatusRow, SiteId
+
+from cmk.utils.type_defs import HostName
+
+from cmk.bi.data_fetcher import BIStatusFetcher, BIStructureFetcher
+from cmk.bi.lib import RequiredBIElement, SitesCallback
+from cmk.bi.packs import BIAggregationPacks
+from cmk.bi.searcher import BISearcher
+from cmk.bi.state_engine import BIStateEngine
+
+from .bi_test_data import sample_config
+
+_HOST_COLUMNS = BIStatusFetcher.get_status_columns()[1:-1]
+_SERVICE_COLUMNS = [
+    "description",
+    "state",
+    "has_been_checked",
+    "plugin_output",
+    "last_hard_state",
+    "current_attempt",
+    "max_check_attempts",
+    "scheduled_downtime_depth",
+    "acknowledged",
+    "in_service_period",
+]
+
+
+class _MockCore:
+    """Answers the livestatus queries of the state engine based on the sample status data"""
+
+    def __init__(self) -> None:
+        self.program_start = 1
+        self.now = 1000
+        self.queries: list[str] = []
+        self.hosts: dict[str, dict[str, Any]] = {}
+        self.services: dict[tuple[str, str], dict[str, Any]] = {}
+        for _site, name, *values, services in sample_config.bi_status_rows:
+            self.hosts[name] = dict(
+                zip(_HOST_COLUMNS, values), name=name, last_check=self.now, execution_time=1.0
+            )
+            for service in services:
+                self.services[(name, service[0])] = dict(
+                    zip(_SERVICE_COLUMNS, service),
+                    host_name=name,
+                    last_check=self.now,
+                    execution_time=1.0,
+                )
+
+    def check(self, host_name: str, description: str | None, **values: Any) -> None:
+        self.now += 10
+        self.update(host_name, description, last_check=self.now, **values)
+
+    def update(self, host_name: str, description: str | None, **values: Any) -> None:
+        if description is None:
+            self.hosts[host_name].update(values)
+        else:
+            self.services[(host_name, description)].update(values)
+
+    def query(
+        self,
+        query: str,
+        only_sites: list[SiteId] | None = None,
+        output_format: LivestatusOutputFormat = LivestatusOutputFormat.PYTHON,
+        fetch_full_data: bool = False,
+    ) -> LivestatusResponse:
+        self.queries.append(query)
+        lines = query.splitlines()
+        table = lines[0].split()[1]
+        if table == "status":
+            return LivestatusResponse([LivestatusRow(["heute", self.program_start])])
+
+        rows = list(self.hosts.values()) if table == "hosts" else list(self.services.values())
+        columns: list[str] = []
+        stats_columns: list[str] = []
+        filters: list[Callable[[dict[str, Any]], bool]] = []
+        for line in lines[1:]:
+            header, value = line.split(": ", 1)
+            if header == "Columns":
+                columns = value.split()
+            elif header == "Stats":
+                stats_columns.append(value.split()[1])
+            elif header == "Filter":
+                filters.append(_filter(*value.split(" ", 2)))
+            elif header == "Or":
+                alternatives = filters[-int(value) :]
+                del filters[-int(value) :]
+                filters.append(_any(alternatives))
+
+        rows = [row for row in rows if all(f(row) for f in filters)]
+        if stats_columns:
+            return LivestatusResponse(
+                [
+                    LivestatusRow(
+                        ["heute", *(max((r[c] for r in rows), default=0) for c in stats_columns)]
+                    )
+                ]
+            )
+        return LivestatusResponse(
+            [
+                LivestatusRow(["heute", *(self._value(row, column) for column in columns)])
+                for row in rows
+            ]
+        )
+
+    def _value(self, row: dict[str, Any], column: str) -> Any:
+        if column != "services_with_fullstate":
+            return row[column]
+        return [
+            [service[column] for column in _SERVICE_COLUMNS]
+            for (host_name, _description), service in self.services.items()
+            if host_name == row["name"]
+        ]
+
+
+def _filter(column: str, operator: str, operand: str) -> Callable[[dict[str, Any]], bool]:
+    if operator == "=":
+        return lambda row: str(row[column]) == operand
+    if operator == ">":
+        return lambda row: row[column] > int(operand)
+    assert operator == ">="
+    return lambda row: row[column] >= int(operand)
+
+
+def _any(filters: list[Callable[[dict[str, Any]], bool]]) -> Callable[[dict[str, Any]], bool]:
+    return lambda row: any(f(row) for f in filters)
+
+
+@pytest.fixture(name="core")
+def fixture_core() -> _MockCore:
+    return _MockCore()
+
+
+@pytest.fixture(name="state_engine")
+def fixture_state_engine(core: _MockCore) -> BIStateEngine:
+    state_engine = BIStateEngine(
+        SitesCallback(lambda: [(SiteId("heute"), True)], core.query, lambda s: s)
+    )
+    state_engine.set_compiled_version(1)
+    return state_engine
+
+
+_REQUIRED_ELEMENTS = {
+    RequiredBIElement(SiteId("heute"), HostName("heute"), None),
+    RequiredBIElement(SiteId("heute"), HostName("heute_clone"), None),
+}
+
+
+def _current_states(core: _MockCore) -> dict:
+    return BIStatusFetcher.create_bi_status_data(
+        core.query("GET hosts\nColumns: %s\n" % " ".join(BIStatusFetcher.get_status_columns()))
+    )
+
+
+def test_update_states(state_engine: BIStateEngine, core: _MockCore) -> None:
+    assert state_engine.update_states(_REQUIRED_ELEMENTS) == _current_states(core)
+
+    # Checks which changed a service and a host
+    core.check("heute", "Interface 4", state=2, plugin_output="CRIT - Link down")
+    core.check("heute_clone", None, plugin_output="Packet received via smart PING (1 ms)")
+    core.queries.clear()
+    assert state_engine.update_states(_REQUIRED_ELEMENTS) == _current_states(core)
+    assert not any("Filter: name =" in query for query in core.queries)
+
+    # Downtimes and acknowledgements are not related to checks
+    core.update("heute", "Uptime", scheduled_downtime_depth=1)
+    core.update("heute_clone", None, acknowledged=1)
+    core.update("heute_clone", "Check_MK", in_service_period=0)
+    assert state_engine.update_states(_REQUIRED_ELEMENTS) == _current_states(core)
+
+    core.update("heute", "Uptime", scheduled_downtime_depth=0)
+    core.update("heute_clone", None, acknowledged=0)
+    assert state_engine.update_states(_REQUIRED_ELEMENTS) == _current_states(core)
+
+    # A new host after a restart of the core
+    core.program_start += 1
+    core.hosts["new_host"] = dict(core.hosts["heute"], name="new_host")
+    required_elements = _REQUIRED_ELEMENTS | {
+        RequiredBIElement(SiteId("heute"), HostName("new_host"), None),
+        RequiredBIElement(SiteId("heute"), HostName("missing_host"), None),
+    }
+    assert state_engine.update_states(required_elements) == _current_states(core)
+
+
+def test_update_states_long_running_check(state_engine: BIStateEngine, core: _MockCore) -> None:
+    core.update("heute", "Interface 4", execution_time=60.0)
+    assert state_engine.update_states(_REQUIRED_ELEMENTS) == _current_states(core)
+
+    # The result of a check started long before the last update is only processed now
+    core.now += 10
+    core.update("heute", "Interface 4", last_check=core.now - 55, state=2, execution_time=55.0)
+    assert state_engine.update_states(_REQUIRED_ELEMENTS) == _current_states(core)
+
+
+def test_compute_only_changed_branches(
+    state_engine: BIStateEngine, core: _MockCore, mocker: MockerFixture
+) -> None:
+    structure_fetcher = BIStructureFetcher(SitesCallback(lambda: [], core.query, lambda s: s))
+    structure_fetcher.add_site_data(SiteId("heute"), sample_config.bi_structure_states)
+    searcher = BISearcher()
+    searcher.set_hosts(structure_fetcher.hosts)
+    bi_packs = BIAggregationPacks("")
+    bi_packs._load_config(sample_config.bi_packs_config)
+    compiled_aggregation = bi_packs.get_aggregation_mandatory("default_aggregation").compile(
+        searcher
+    )
+    status_fetcher = BIStatusFetcher(SitesCallback(lambda: [], core.query, lambda s: s))
+    compute_branches = mocker.patch.object(
+        compiled_aggregation, "compute_branches", wraps=compiled_aggregation.compute_branches
+    )
+
+    def compute() -> dict[str, int]:
+        compute_branches.reset_mock()
+        status_fetcher.states = state_engine.update_states(_REQUIRED_ELEMENTS)
+        results = state_engine.compute_branches(
+            compiled_aggregation, compiled_aggregation.branches, status_fetcher
+        )
+        return {bundle.instance.properties.title: bundle.actual_result.state for bundle in results}
+
+    assert compute() == {"Host heute": 1, "Host heute_clone": 1}
+    assert compute_branches.call_count == 2
+
+    assert compute() == {"Host heute": 1, "Host heute_clone": 1}
+    assert compute_branches.call_count == 0
+
+    core.check("heute_clone", "Interface 4", state=2)
+    assert compute() == {"Host heute": 1, "Host heute_clone": 2}
+    assert compute_branches.call_count == 1
+
+    # Branches affected by assumed states are always computed
+    status_fetcher.set_assumed_states({("heute", "heute"): 2})
+    assert compute() == {"Host heute": 1, "Host heute_clone": 2}
+    assert compute_branches.call_count == 1
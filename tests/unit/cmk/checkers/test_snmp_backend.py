@@ -3,10 +3,20 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import logging
+import os
+from collections import OrderedDict
+from pathlib import Path
+
 import pytest
 
+import cmk.utils.paths
+from cmk.utils.type_defs import HostName
+
+from cmk.snmplib.type_defs import SNMPBackendEnum, SNMPHostConfig
+
 import cmk.fetchers.snmp_backend._utils as utils
-from cmk.fetchers.snmp_backend import StoredWalkSNMPBackend
+from cmk.fetchers.snmp_backend import stored_walk, StoredWalkSNMPBackend, WalkIndex
 
 
 @pytest.mark.parametrize(
@@ -24,21 +34,6 @@ def test_strip_snmp_value(value, expected) -> None:  # type: ignore[no-untyped-d
 
 @pytest.mark.usefixtures("create_files")
 class TestStoredWalkSNMPBackend:
-    @pytest.mark.parametrize(
-        "a, b, result",
-        [
-            ("1.2.3", "1.2.3", 0),
-            ("1.2.3", ".1.2.3", 0),
-            (".1.2.3", "1.2.3", 0),
-            (".1.2.3", ".1.2.3", 0),
-            ("1.2.3", "1.2.3.4", 0),
-            ("1.2.3.4", "1.2.3", 1),
-            ("1.2.3", "4.5.6", -1),
-        ],
-    )
-    def test_compare_oids(self, a, b, result) -> None:  # type: ignore[no-untyped-def]
-        assert StoredWalkSNMPBackend._compare_oids(a, b) == result
-
     def test_read_walk_data(self, tmpdir) -> None:  # type: ignore[no-untyped-def]
         assert StoredWalkSNMPBackend.read_walk_from_path(tmpdir / "walkdata" / "1.txt") == [
             ".1.2.3 foo\n",
@@ -50,6 +45,92 @@ class TestStoredWalkSNMPBackend:
         ]
 
 
+@pytest.fixture(name="stored_walk_backend")
+def fixture_stored_walk_backend(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> StoredWalkSNMPBackend:
+    monkeypatch.setattr(cmk.utils.paths, "snmpwalks_dir", str(tmp_path / "snmpwalks"))
+    monkeypatch.setattr(cmk.utils.paths, "snmpwalks_index_dir", tmp_path / "snmpwalk_index")
+    (tmp_path / "snmpwalks").mkdir()
+    (tmp_path / "snmpwalks" / "walkhost").write_text(
+        ".1.2.3.1 foo\n"
+        ".1.2.3.2 bar\n"
+        "continued\n"
+        ".1.2.10.1 baz\n"
+        ".1.2.30.1 unsorted\n"
+        ".1.2.4.1 qux\n"
+    )
+    return StoredWalkSNMPBackend(
+        SNMPHostConfig(
+            False,
+            HostName("walkhost"),
+            "127.0.0.1",
+            "",
+            0,
+            False,
+            False,
+            0,
+            {},
+            {},
+            [],
+            None,
+            SNMPBackendEnum.STORED_WALK,
+        ),
+        logging.getLogger("test"),
+    )
+
+
+class TestWalkIndex:
+    def test_find_prefix(self) -> None:
+        walk_index = WalkIndex.from_lines([".1.2.3 a", ".1.2.30 b", ".1.2.3.1 c", ".1.3 d"])
+        assert [walk_index.line(i) for i in walk_index.find_prefix((1, 2, 3))] == [
+            ".1.2.3 a",
+            ".1.2.3.1 c",
+        ]
+        assert not walk_index.find_prefix((1, 4))
+
+    def test_walk(self, stored_walk_backend: StoredWalkSNMPBackend) -> None:
+        assert stored_walk_backend.walk(".1.2.3") == [
+            (".1.2.3.1", b"foo"),
+            (".1.2.3.2", b"bar\ncontinued"),
+        ]
+        assert stored_walk_backend.walk(".1.2.30") == [(".1.2.30.1", b"unsorted")]
+        assert stored_walk_backend.walk(".1.2.4.*") == [(".1.2.4.1", b"qux")]
+        assert stored_walk_backend.walk(".1.5") == []
+        assert stored_walk_backend.get(".1.2.10.1") == b"baz"
+        assert stored_walk_backend.get(".1.2.10") is None
+
+    def test_index_is_rebuilt_on_change(
+        self, stored_walk_backend: StoredWalkSNMPBackend, tmp_path: Path
+    ) -> None:
+        assert stored_walk_backend.get(".1.2.10.1") == b"baz"
+        assert (tmp_path / "snmpwalk_index" / "walkhost").exists()
+
+        walk_path = tmp_path / "snmpwalks" / "walkhost"
+        walk_path.write_text(".1.2.10.1 changed\n")
+        os.utime(walk_path, ns=(0, 0))
+        assert stored_walk_backend.get(".1.2.10.1") == b"changed"
+        assert stored_walk_backend.get(".1.2.3.1") is None
+
+    def test_cached_walk_indexes_are_bounded(
+        self,
+        stored_walk_backend: StoredWalkSNMPBackend,
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: Path,
+    ) -> None:
+        monkeypatch.setattr(stored_walk, "_MAX_CACHED_WALK_INDEXES", 1)
+        monkeypatch.setattr(StoredWalkSNMPBackend, "_walk_index_cache", OrderedDict())
+        assert stored_walk_backend.get(".1.2.10.1") == b"baz"
+
+        (tmp_path / "other_snmpwalks").mkdir()
+        (tmp_path / "other_snmpwalks" / "walkhost").write_text(".1.2.10.1 other\n")
+        monkeypatch.setattr(cmk.utils.paths, "snmpwalks_dir", str(tmp_path / "other_snmpwalks"))
+        assert stored_walk_backend.get(".1.2.10.1") == b"other"
+        assert list(StoredWalkSNMPBackend._walk_index_cache) == [
+            tmp_path / "other_snmpwalks" / "walkhost"
+        ]
+
+
 @pytest.fixture
 def create_files(tmpdir):
     tmpdir.mkdir("walkdata")
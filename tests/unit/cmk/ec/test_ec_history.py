@@ -7,7 +7,19 @@ import logging
 import shlex
 from pathlib import Path
 
-from cmk.ec.history import _grep_pipeline, convert_history_line, History, parse_history_file
+import pytest
+
+from tests.testlib import CMKEventConsole
+
+from cmk.ec.history import (
+    _grep_pipeline,
+    convert_history_line,
+    History,
+    HistoryFileIndex,
+    parse_history_file,
+)
+from cmk.ec.main import StatusServer
+from cmk.ec.query import Query, QueryGET
 
 
 def test_convert_history_line(history: History) -> None:
@@ -52,3 +64,107 @@ def test_history_parse(history: History, tmp_path: Path) -> None:
 
     assert len(new_entries) == 4
     assert new_entries[0][1] == 1666942292.3000507
+
+
+def _add_events(history: History, hosts: list[str]) -> None:
+    for event_id, host in enumerate(hosts, start=1):
+        event = CMKEventConsole.new_event({"host": host, "text": f"text {event_id}"})
+        event["id"] = event_id
+        history.add(event, "NEW")
+
+
+def _query(status_server: StatusServer, *headers: str) -> QueryGET:
+    query = Query.make(status_server, ["GET history", *headers], logging.getLogger("cmk.mkeventd"))
+    assert isinstance(query, QueryGET)
+    return query
+
+
+def _event_ids(history: History, query: QueryGET) -> list[int]:
+    return [row[5] for row in history.get(query)]
+
+
+def test_history_index_filters(history: History, status_server: StatusServer) -> None:
+    _add_events(history, ["host1", "host2", "host1", "host3", "host1"])
+
+    assert _event_ids(history, _query(status_server)) == [5, 4, 3, 2, 1]
+    assert _event_ids(history, _query(status_server, "Filter: event_host = host1")) == [5, 3, 1]
+    assert _event_ids(
+        history,
+        _query(status_server, "Filter: event_host = host1", "Filter: event_id > 1"),
+    ) == [5, 3]
+    assert _event_ids(history, _query(status_server, "Filter: event_host in host2 host3")) == [4, 2]
+    assert not _event_ids(history, _query(status_server, "Filter: event_host = unknown"))
+    assert _event_ids(history, _query(status_server, "Filter: event_text ~ text [24]")) == [4, 2]
+
+
+def test_history_index_limit(history: History, status_server: StatusServer) -> None:
+    _add_events(history, ["host1", "host2", "host1", "host3", "host1"])
+
+    assert _event_ids(history, _query(status_server, "Filter: event_host = host1", "Limit: 2")) == [
+        5,
+        3,
+    ]
+
+
+def test_history_index_is_updated_and_persisted(
+    history: History, status_server: StatusServer
+) -> None:
+    _add_events(history, ["host1", "host2"])
+    assert _event_ids(history, _query(status_server)) == [2, 1]
+
+    # Lines added after the index has been built are indexed incrementally
+    _add_events(history, ["host1", "host2", "host3"])
+    assert _event_ids(history, _query(status_server, "Filter: event_host = host3")) == [3]
+
+    (path,) = history._settings.paths.history_dir.value.glob("*.log")
+    index_path = path.with_suffix(HistoryFileIndex.SUFFIX)
+    assert len(index_path.read_text().splitlines()) == 5
+
+    # A new index continues with the persisted one, dropping records without a history line
+    with index_path.open("a") as f:
+        f.write("100000\t1.0\n")
+    history._file_indexes.clear()
+    assert _event_ids(history, _query(status_server, "Filter: event_host = host1")) == [1, 1]
+    assert len(index_path.read_text().splitlines()) == 5
+
+
+def test_history_index_event_ids(history: History, status_server: StatusServer) -> None:
+    _add_events(history, ["host1", "host2", "host3", "host4"])
+    assert _event_ids(history, _query(status_server)) == [4, 3, 2, 1]
+
+    # Updates of older events are sorted into the indexed event IDs
+    _add_events(history, ["host1", "host2"])
+    assert _event_ids(history, _query(status_server, "Filter: event_id = 1")) == [1, 1]
+    assert _event_ids(history, _query(status_server, "Filter: event_id < 3")) == [2, 1, 2, 1]
+    assert _event_ids(history, _query(status_server, "Filter: event_id >= 4")) == [4]
+    assert not _event_ids(history, _query(status_server, "Filter: event_id = 5"))
+
+
+def test_history_index_update_errors_are_ignored(
+    history: History, status_server: StatusServer, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _add_events(history, ["host1"])
+    assert _event_ids(history, _query(status_server)) == [1]
+
+    def _update(self: HistoryFileIndex, blocking: bool = True) -> None:
+        raise OSError("index file vanished")
+
+    with monkeypatch.context() as m:
+        m.setattr(HistoryFileIndex, "update", _update)
+        _add_events(history, ["host1", "host2"])
+
+    # The next query catches up with the lines added meanwhile
+    assert _event_ids(history, _query(status_server, "Filter: event_host = host2")) == [2]
+
+
+def test_history_index_of_invalid_lines(history: History) -> None:
+    _add_events(history, ["host1"])
+    (path,) = history._settings.paths.history_dir.value.glob("*.log")
+    with path.open("a") as f:
+        f.write("no history line\n")
+    _add_events(history, ["host2"])
+
+    index = HistoryFileIndex(path, history._history_columns, logging.getLogger("cmk.mkeventd"))
+    rows = list(index.query([], (None, None), lambda row: True))
+
+    assert [(row[0], row[12]) for row in rows] == [(3, "host2"), (1, "host1")]
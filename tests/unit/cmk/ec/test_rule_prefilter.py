@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 tribe29 GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+from collections.abc import Mapping
+from typing import cast
+
+import pytest
+
+from livestatus import SiteId
+
+from cmk.ec.main import Event, EventServer
+from cmk.ec.rule_matcher import MatchSuccess, Rule, RuleMatcher
+from cmk.ec.rule_prefilter import required_literals, rule_requirement, RulePrefilter
+
+
+def _compile(rule: Mapping[str, object]) -> Rule:
+    compiled: dict[str, object] = {
+        key: EventServer._compile_matching_value(key, str(value))
+        if key in ("match", "match_ok", "match_host", "match_application", "cancel_application")
+        else value
+        for key, value in rule.items()
+    }
+    return cast(Rule, compiled | {"pack": "pack"})
+
+
+@pytest.mark.parametrize(
+    "pattern,expected",
+    [
+        ("Disk Full", {"disk full"}),
+        ("disk (full|error)", {"disk "}),
+        ("(full|error) on disk", {" on disk"}),
+        ("^(eth|wlan)[0-9]+$", {"eth", "wlan"}),
+        (r"Kernel: \d+", {"kernel: "}),
+        ("(abc)+x?", {"abc"}),
+        ("a*b?", None),
+        ("foo|.*", None),
+        ("[0-9]+", None),
+        ("Größe", None),
+    ],
+)
+def test_required_literals(pattern: str, expected: set[str] | None) -> None:
+    assert required_literals(EventServer._compile_matching_value("match", pattern)) == (
+        None if expected is None else frozenset(expected)
+    )
+
+
+@pytest.mark.parametrize(
+    "rule,expected",
+    [
+        ({}, None),
+        ({"match": "disk"}, ("text", {"disk"})),
+        ({"match": "disk", "invert_matching": True}, None),
+        ({"match": "disk", "match_ok": "disk.*ok"}, ("text", {"disk"})),
+        ({"match": "disk", "match_ok": ".+"}, None),
+        ({"match_ok": "disk"}, None),
+        ({"match": "x", "match_host": "server.*"}, ("host", {"server"})),
+        ({"cancel_application": "sshd"}, ("application", {"sshd"})),
+        (
+            {"match": "x", "match_application": "cron", "cancel_application": "anacron"},
+            ("application", {"cron", "anacron"}),
+        ),
+    ],
+)
+def test_rule_requirement(rule: Rule, expected: tuple[str, set[str]] | None) -> None:
+    assert rule_requirement(_compile(rule)) == (
+        None if expected is None else (expected[0], frozenset(expected[1]))
+    )
+
+
+_RULE_SPECS: list[Mapping[str, object]] = [
+    {"id": "disk", "match": "disk (full|error)"},
+    {"id": "error", "match": "error"},
+    {"id": "err", "match": "err"},
+    {"id": "ror", "match": "ror on"},
+    {"id": "any", "match": ".*"},
+    {"id": "inverted", "match": "error", "invert_matching": True},
+    {"id": "host", "match_host": "web[0-9]+"},
+    {"id": "exact_host", "match_host": "db1"},
+    {"id": "cancel", "match": "link down", "match_ok": "link up"},
+    {"id": "application", "match_application": "^sshd$", "match": "failed"},
+]
+_RULES: list[Rule] = [_compile(rule) for rule in _RULE_SPECS]
+
+
+@pytest.mark.parametrize(
+    "text,host,application",
+    [
+        ("Disk error on sda", "web01", "kernel"),
+        ("an ERROR occurred", "db1", "app"),
+        ("Link up", "db12", "lldpd"),
+        ("Failed password", "host", "sshd"),
+        ("nothing interesting", "other", "cron"),
+        ("Größe: disk full", "web1", "kernel"),
+    ],
+)
+def test_prefilter_keeps_matching_rules(text: str, host: str, application: str) -> None:
+    event: Event = {
+        "text": text,
+        "host": host,
+        "application": application,
+        "ipaddress": "127.0.0.1",
+        "facility": 1,
+        "priority": 2,
+    }
+    matcher = RuleMatcher(None, SiteId("test_site"), lambda time_period_name: True)
+    matching = [
+        rule["id"]
+        for rule in _RULES
+        if isinstance(matcher.event_rule_matches(rule, event), MatchSuccess)
+    ]
+
+    candidates = [rule["id"] for rule in RulePrefilter(_RULES).filter(None, _RULES, event)]
+
+    assert [rule_id for rule_id in candidates if rule_id in matching] == matching
+    assert candidates == [rule["id"] for rule in _RULES if rule["id"] in candidates]
+
+
+def test_prefilter_skips_rules() -> None:
+    event: Event = {"text": "an ERROR occurred", "host": "db1", "application": "app"}
+    assert [rule["id"] for rule in RulePrefilter(_RULES).filter(None, _RULES, event)] == [
+        "error",
+        "err",
+        "any",
+        "inverted",
+        "exact_host",
+    ]
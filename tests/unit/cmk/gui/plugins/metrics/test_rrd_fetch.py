@@ -5,10 +5,13 @@
 
 import pytest
 
-from livestatus import LivestatusRow
+from livestatus import LivestatusRow, SiteId
+
+from cmk.utils.prediction import TimeSeries
 
 import cmk.gui.plugins.metrics.rrd_fetch as rf
-from cmk.gui.plugins.metrics.utils import GraphRecipe
+from cmk.gui.plugins.metrics.utils import GraphRecipe, RRDData
+from cmk.gui.type_defs import GraphConsoldiationFunction
 
 QUERY_RESULT = LivestatusRow(
     [
@@ -52,3 +55,40 @@ def test_convert_query_results(
     query_results: LivestatusRow, graph_recipe: GraphRecipe, expected_results: LivestatusRow
 ) -> None:
     assert rf._convert_query_results(query_results, graph_recipe) == expected_results
+
+
+@pytest.mark.parametrize(
+    "cf, expected",
+    [
+        pytest.param("max", [1, 4, 5], id="max"),
+        pytest.param("min", [1, 2, 5], id="min"),
+        pytest.param("average", [1, 3, 5], id="average"),
+    ],
+)
+def test_align_and_resample_rrds_downsample(
+    cf: GraphConsoldiationFunction, expected: list[float | None]
+) -> None:
+    rrd_data: RRDData = {
+        (SiteId("site"), "host", "svc", "reference", "max", 1): TimeSeries([0, 360, 120, 1, 1, 1]),
+        (SiteId("site"), "host", "svc", "metric", None, 1): TimeSeries(
+            [0, 360, 60, 1, None, 2, 4, 5, None]
+        ),
+    }
+    rf.align_and_resample_rrds(rrd_data, cf)
+    assert rrd_data[(SiteId("site"), "host", "svc", "metric", None, 1)].values == expected
+
+
+def test_align_and_resample_rrds_upsample() -> None:
+    rrd_data: RRDData = {
+        (SiteId("site"), "host", "svc", "reference", "max", 1): TimeSeries(
+            [0, 240, 60, 1, 1, 1, 1]
+        ),
+        (SiteId("site"), "host", "svc", "metric", "max", 1): TimeSeries([0, 240, 120, 1, None]),
+    }
+    rf.align_and_resample_rrds(rrd_data, "max")
+    assert rrd_data[(SiteId("site"), "host", "svc", "metric", "max", 1)].values == [
+        1,
+        1,
+        None,
+        None,
+    ]
@@ -5,9 +5,12 @@
 
 import pytest
 
+from livestatus import SiteId
+
 from cmk.utils.exceptions import MKGeneralException
 
 import cmk.gui.plugins.metrics.timeseries as ts
+from cmk.gui.plugins.metrics.utils import RRDData
 
 
 @pytest.mark.parametrize(
@@ -43,3 +46,55 @@ def test_time_series_math_exc(args) -> None:  # type: ignore[no-untyped-def]
 def test_time_series_math_stable_singles(operator) -> None:  # type: ignore[no-untyped-def]
     test_ts = ts.TimeSeries([0, 180, 60, 6, 5, 10, None, -2, -3.14])
     assert ts.time_series_math(operator, [test_ts]) == test_ts
+
+
+@pytest.mark.parametrize(
+    "operator, expected",
+    [
+        pytest.param("+", [3, 1, 2, None], id="Sum skips None"),
+        pytest.param("*", [2, None, None, None], id="Product of None is None"),
+        pytest.param("-", [-1, None, None, None], id="Difference of None is None"),
+        pytest.param("/", [0.5, None, None, None], id="Fraction of None is None"),
+        pytest.param("MAX", [2, 1, 2, None], id="Maximum skips None"),
+        pytest.param("MIN", [1, 1, 2, None], id="Minimum skips None"),
+        pytest.param("AVERAGE", [1.5, 1, 2, None], id="Average skips None"),
+        pytest.param("MERGE", [1, 1, 2, None], id="First non None"),
+    ],
+)
+def test_time_series_math_none_values(operator: str, expected: list[float | None]) -> None:
+    operands = [
+        ts.TimeSeries([0, 240, 60, 1, 1, None, None]),
+        ts.TimeSeries([0, 240, 60, 2, None, 2, None]),
+    ]
+    result = ts.time_series_math(operator, operands)  # type: ignore[arg-type]
+    assert result == ts.TimeSeries([0, 240, 60, *expected])
+
+
+def test_time_series_math_division_by_zero() -> None:
+    assert ts.time_series_math(
+        "/", [ts.TimeSeries([0, 120, 60, 1, 0]), ts.TimeSeries([0, 120, 60, 0, 0])]
+    ) == ts.TimeSeries([0, 120, 60, None, None])
+
+
+def test_time_series_math_shortest_operand() -> None:
+    assert ts.time_series_math(
+        "+", [ts.TimeSeries([0, 180, 60, 1, 2, 3]), ts.TimeSeries([0, 180, 60, 1, 2])]
+    ) == ts.TimeSeries([0, 180, 60, 2, 4])
+
+
+def test_evaluate_nested_operators() -> None:
+    rrd_data: RRDData = {
+        (SiteId("site"), "host", "svc", "a", "max", 1): ts.TimeSeries([0, 180, 60, 1, None, 4]),
+        (SiteId("site"), "host", "svc", "b", "max", 1): ts.TimeSeries([0, 180, 60, 3, 2, 0]),
+    }
+    expression = (
+        "operator",
+        "/",
+        [
+            ("operator", "+", [("rrd", "site", "host", "svc", "a", "max", 1), ("constant", 1)]),
+            ("rrd", "site", "host", "svc", "b", "max", 1),
+        ],
+    )
+    assert ts.evaluate_time_series_expression(expression, rrd_data) == [
+        ts.TimeSeries([0, 180, 60, 2 / 3, 0.5, None])
+    ]
@@ -804,6 +804,69 @@ def test_openapi_host_collection_effective_attributes(
         assert host["extensions"]["effective_attributes"] is None
 
 
+def test_openapi_host_collection_pagination(api_client: RestApiClient) -> None:
+    api_client.bulk_create_hosts(
+        *({"host_name": f"host{n}", "folder": "/"} for n in [3, 1, 4, 0, 2])
+    )
+
+    pages = []
+    resp = api_client.request(
+        "get", url="/domain-types/host_config/collections/all", query_params={"limit": "2"}
+    )
+    while True:
+        pages.append([host["id"] for host in resp.json["value"]])
+        next_links = [link for link in resp.json["links"] if link["rel"] == "next"]
+        if not next_links:
+            break
+        resp = api_client.request("get", url=next_links[0]["href"], url_is_complete=True)
+
+    assert pages == [["host0", "host1"], ["host2", "host3"], ["host4"]]
+
+
+def test_openapi_host_collection_filters(api_client: RestApiClient) -> None:
+    api_client.create_folder("servers", title="Servers", parent="/")
+    api_client.bulk_create_hosts(
+        {
+            "host_name": "linux",
+            "folder": "/servers",
+            "attributes": {"ipaddress": "127.0.0.2", "labels": {"os": "linux"}},
+        },
+        {
+            "host_name": "windows",
+            "folder": "/",
+            "attributes": {"ipaddress": "127.0.0.3", "labels": {"os": "windows"}},
+        },
+    )
+
+    def _host_names(query_params: dict[str, str]) -> list[str]:
+        resp = api_client.request(
+            "get", url="/domain-types/host_config/collections/all", query_params=query_params
+        )
+        return [host["id"] for host in resp.json["value"]]
+
+    assert _host_names({}) == ["linux", "windows"]
+    assert _host_names({"folder": "/servers"}) == ["linux"]
+    assert _host_names({"sites": "NO_SITE"}) == ["linux", "windows"]
+    assert _host_names({"attributes": "ipaddress=127.0.0.3"}) == ["windows"]
+    assert _host_names({"labels": "os:linux"}) == ["linux"]
+    assert _host_names({"labels": "os:solaris"}) == []
+    assert _host_names({"cursor": "linux"}) == ["windows"]
+
+    resp = api_client.request(
+        "get",
+        url="/domain-types/host_config/collections/all",
+        query_params={"folder": "/servers", "fields": "folder"},
+    )
+    assert [host["extensions"] for host in resp.json["value"]] == [{"folder": "/servers"}]
+
+    api_client.request(
+        "get",
+        url="/domain-types/host_config/collections/all",
+        query_params={"limit": "0"},
+        expect_ok=False,
+    ).assert_status_code(400)
+
+
 def test_openapi_host_rename(
     aut_user_auth_wsgi_app: WebTestAppForCMK,
     monkeypatch: pytest.MonkeyPatch,
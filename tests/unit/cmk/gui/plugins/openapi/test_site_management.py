@@ -786,3 +786,36 @@ def test_put_update_url_prefix_400(
 
     config["site_config"]["status_connection"]["url_prefix"] = "/remote_site_1"
     put_site(url=f"{object_base}{site_id}", params=json.dumps(config), status=400)
+
+
+@pytest.mark.parametrize("data", [30.5, None])
+def test_put_update_query_timeout_200(
+    post_site: Callable,
+    object_base: str,
+    collection_base: str,
+    put_site: Callable,
+    data: float | None,
+) -> None:
+    config = _default_config()
+    site_id = "site_id_1"
+    post_site(url=collection_base, params=json.dumps(config))
+
+    config["site_config"]["status_connection"]["query_timeout"] = data
+    resp = put_site(url=f"{object_base}{site_id}", params=json.dumps(config))
+    assert resp.json["extensions"]["status_connection"]["query_timeout"] == data
+
+
+@pytest.mark.parametrize("data", [0.0, -1.0, "fast"])
+def test_put_update_query_timeout_400(
+    post_site: Callable,
+    object_base: str,
+    collection_base: str,
+    put_site: Callable,
+    data: Any,
+) -> None:
+    config = _default_config()
+    site_id = "site_id_1"
+    post_site(url=collection_base, params=json.dumps(config))
+
+    config["site_config"]["status_connection"]["query_timeout"] = data
+    put_site(url=f"{object_base}{site_id}", params=json.dumps(config), status=400)
@@ -3,6 +3,7 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import os
 from pathlib import Path
 
 import pytest
@@ -10,7 +11,7 @@ from pytest import MonkeyPatch
 
 import cmk.utils
 from cmk.utils.exceptions import MKGeneralException
-from cmk.utils.structured_data import StructuredDataNode
+from cmk.utils.structured_data import StructuredDataNode, TreeOrArchiveStore
 
 import cmk.gui.inventory
 from cmk.gui.inventory import InventoryPath, TreeSource
@@ -286,6 +287,45 @@ def test_get_history() -> None:
         assert delta_cache_filename == expected_delta_cache_filename
 
 
+def test_get_history_delta_archive() -> None:
+    hostname = "inv-host"
+    tree_or_archive_store = TreeOrArchiveStore(
+        cmk.utils.paths.inventory_output_dir,
+        cmk.utils.paths.inventory_archive_dir,
+        snapshot_interval=2,
+    )
+    for timestamp, raw_tree in enumerate(
+        [{"inv": "attr-0"}, {"inv": "attr-1"}, {"inv-2": "attr"}, {"inv": "attr-3"}]
+    ):
+        tree_or_archive_store.save(
+            host_name=hostname,
+            tree=StructuredDataNode.deserialize(raw_tree),
+        )
+        os.utime(Path(cmk.utils.paths.inventory_output_dir, hostname), (timestamp, timestamp))
+        tree_or_archive_store.archive(host_name=hostname)
+    # current tree
+    cmk.utils.store.save_object_to_file(
+        Path(cmk.utils.paths.inventory_output_dir, hostname),
+        StructuredDataNode.deserialize({"inv": "attr"}).serialize(),
+    )
+
+    history, corrupted_history_files = cmk.gui.inventory.get_history(hostname)
+
+    assert [(entry.new, entry.changed, entry.removed) for entry in history] == [
+        (1, 0, 0),
+        (0, 1, 0),
+        (1, 0, 1),
+        (1, 0, 1),
+        (0, 1, 0),
+    ]
+    assert len(corrupted_history_files) == 0
+    # Only the deltas of the current tree and the first archived tree are computed
+    assert sorted(
+        fp.name.split("_")[0]
+        for fp in Path(cmk.utils.paths.inventory_delta_cache_dir, hostname).iterdir()
+    ) == ["3", "None"]
+
+
 @pytest.mark.usefixtures("create_inventory_history")
 @pytest.mark.parametrize(
     "search_timestamp, expected_raw_delta_tree",
@@ -822,3 +822,31 @@ def test_is_two_factor_backup_code_valid_matches(user_id: UserId) -> None:
 
     credentials = userdb.load_two_factor_credentials(user_id)
     assert len(credentials["backup_codes"]) == 9
+
+
+def test_save_users_writes_changed_profile_files_only(user_id: UserId) -> None:
+    def inodes() -> dict[str, int]:
+        return {
+            key: path.stat().st_ino
+            for key in ("serial", "num_failed_logins", "last_pw_change", "idle_timeout")
+            if (path := Path(userdb.custom_attr_path(user_id, key))).exists()
+        }
+
+    now = datetime.now()
+    userdb.save_users(_load_users_uncached(lock=True), now)
+    unchanged = inodes()
+
+    userdb.save_users(_load_users_uncached(lock=True), now)
+    assert inodes() == unchanged
+
+    users = _load_users_uncached(lock=True)
+    users[user_id]["num_failed_logins"] = 3
+    users[user_id]["idle_timeout"] = 42
+    userdb.save_users(users, now)
+
+    changed = inodes()
+    assert {key for key, inode in changed.items() if unchanged.get(key) != inode} == {
+        "num_failed_logins",
+        "idle_timeout",
+    }
+    assert _load_failed_logins(user_id) == 3
@@ -3,9 +3,16 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+import pytest
+
 from cmk.gui.plugins.visuals.utils import Filter
+from cmk.gui.type_defs import ColumnName, Row, Rows
 from cmk.gui.view import View
-from cmk.gui.views.page_show_view import _get_needed_regular_columns
+from cmk.gui.views.page_show_view import _get_needed_regular_columns, _sort_data
+from cmk.gui.views.sorter import Sorter, SorterEntry
 
 
 def test_get_needed_regular_columns(view: View) -> None:
@@ -67,3 +74,85 @@ def test_get_needed_regular_columns(view: View) -> None:
             "some_column",
         ]
     )
+
+
+class _CmpSorter(Sorter):
+    def __init__(self, column: ColumnName = "name") -> None:
+        self._column = column
+
+    @property
+    def ident(self) -> str:
+        return self._column
+
+    @property
+    def title(self) -> str:
+        return self._column
+
+    @property
+    def columns(self) -> Sequence[ColumnName]:
+        return [self._column]
+
+    def cmp(self, r1: Row, r2: Row, parameters: Mapping[str, Any] | None) -> int:
+        return (r1[self._column] > r2[self._column]) - (r1[self._column] < r2[self._column])
+
+
+class _KeySorter(_CmpSorter):
+    def sort_key(self, row: Row, parameters: Mapping[str, Any] | None) -> Any:
+        return row[self._column]
+
+
+_ROWS: Rows = [
+    {"name": "b", "state": 0, "JOIN": {"svc": {"name": "y"}}},
+    {"name": "a", "state": 2, "JOIN": {}},
+    {"name": "c", "state": 2, "JOIN": {"svc": {"name": "x"}}},
+    {"name": "a", "state": 0, "JOIN": {"svc": {"name": "x"}}},
+]
+
+
+@pytest.mark.parametrize("sorter_class", [_CmpSorter, _KeySorter])
+@pytest.mark.parametrize(
+    "sorters, expected",
+    [
+        pytest.param(
+            [("state", False, None), ("name", False, None)],
+            [("a", 0), ("b", 0), ("a", 2), ("c", 2)],
+            id="ascending",
+        ),
+        pytest.param(
+            [("state", True, None), ("name", False, None)],
+            [("a", 2), ("c", 2), ("a", 0), ("b", 0)],
+            id="mixed directions",
+        ),
+        pytest.param(
+            [("name", False, "svc"), ("name", True, None)],
+            [("a", 2), ("c", 2), ("a", 0), ("b", 0)],
+            id="join column",
+        ),
+    ],
+)
+def test_sort_data(
+    sorter_class: type[_CmpSorter],
+    sorters: list[tuple[ColumnName, bool, str | None]],
+    expected: list[tuple[str, int]],
+) -> None:
+    rows = list(_ROWS)
+    _sort_data(
+        rows,
+        [
+            SorterEntry(sorter_class(column), negate, join_key, None)
+            for column, negate, join_key in sorters
+        ],
+    )
+    assert [(row["name"], row["state"]) for row in rows] == expected
+
+
+def test_sort_data_mixes_key_and_cmp_sorters() -> None:
+    rows = list(_ROWS)
+    _sort_data(
+        rows,
+        [
+            SorterEntry(_KeySorter("state"), True, None, None),
+            SorterEntry(_CmpSorter("name"), True, None, None),
+        ],
+    )
+    assert [(row["name"], row["state"]) for row in rows] == [("c", 2), ("a", 2), ("b", 0), ("a", 0)]
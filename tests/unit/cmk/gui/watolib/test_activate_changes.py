@@ -5,6 +5,7 @@
 
 import io
 import logging
+import os
 import tarfile
 from pathlib import Path
 
@@ -356,6 +357,55 @@ def test_get_config_sync_file_infos() -> None:
     }
 
 
+def test_config_sync_file_hash_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    file_path = tmp_path / "config" / "file.mk"
+    file_path.parent.mkdir()
+    file_path.write_text("content")
+    os.utime(file_path, (1000, 1000))
+    link_path = tmp_path / "config" / "link.mk"
+    os.link(file_path, link_path)
+    cache_path = tmp_path / "cache.pkl"
+
+    hashed: list[Path] = []
+    create_hash = activate_changes._create_config_sync_file_hash
+
+    def _create_hash(path: Path) -> str:
+        hashed.append(path)
+        return create_hash(path)
+
+    monkeypatch.setattr(activate_changes, "_create_config_sync_file_hash", _create_hash)
+
+    def _file_hash(path: Path) -> str:
+        cache = activate_changes.ConfigSyncFileHashCache(cache_path)
+        file_hash = cache.file_hash(path, path.lstat())
+        cache.save()
+        return file_hash
+
+    file_hash = _file_hash(file_path)
+    assert hashed == [file_path]
+
+    # Hard links share the hash, e.g. the site config directories of all sites
+    assert _file_hash(link_path) == file_hash
+    assert hashed == [file_path]
+
+    file_path.write_text("changed")
+    os.utime(file_path, (2000, 2000))
+    assert _file_hash(link_path) != file_hash
+    assert hashed == [file_path, link_path]
+
+
+def test_config_sync_file_hash_cache_skips_recently_modified_files(tmp_path: Path) -> None:
+    file_path = tmp_path / "file.mk"
+    file_path.write_text("content")
+    cache_path = tmp_path / "cache.pkl"
+
+    cache = activate_changes.ConfigSyncFileHashCache(cache_path)
+    cache.file_hash(file_path, file_path.lstat())
+    cache.save()
+
+    assert not cache_path.exists()
+
+
 def _create_get_config_sync_file_infos_test_config(base_dir):
     base_dir.joinpath("etc/d1").mkdir(parents=True, exist_ok=True)
 
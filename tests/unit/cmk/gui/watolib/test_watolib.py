@@ -100,6 +100,7 @@ def test_registered_configvars() -> None:
         "default_bi_layout",
         "delay_precompile",
         "diskspace_cleanup",
+        "dns_lookup_timeout",
         "enable_sounds",
         "escape_plugin_output",
         "event_limit",
@@ -121,6 +122,8 @@ def test_registered_configvars() -> None:
         "log_messages",
         "log_rulehits",
         "login_screen",
+        "max_concurrent_dns_lookups",
+        "max_concurrent_fetches",
         "mkeventd_connect_timeout",
         "mkeventd_notify_contactgroup",
         "mkeventd_notify_facility",
@@ -134,6 +137,7 @@ def test_registered_configvars() -> None:
         "notification_fallback_format",
         "notification_logging",
         "notification_plugin_timeout",
+        "notification_plugin_workers",
         "page_heading",
         "pagetitle_date_format",
         "password_policy",
@@ -3,8 +3,11 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import socket
+import threading
 from collections.abc import Sequence
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Any
 from unittest.mock import MagicMock
 
@@ -12,6 +15,12 @@ import pytest
 
 from cmk.utils import version as cmk_version
 
+from cmk.automations.helper import (
+    AutomationHelperRequest,
+    AutomationHelperResponse,
+    receive_message,
+    send_message,
+)
 from cmk.automations.results import ABCAutomationResult, ResultTypeRegistry, SerializedResult
 
 from cmk.gui.watolib import automations
@@ -131,3 +140,68 @@ class TestCheckmkAutomationBackgroundJob:
             api_request,
         )
         assert RESULT == "i was very different previously"
+
+
+def _serve_automation_helper_once(
+    listener: socket.socket, response: AutomationHelperResponse
+) -> list[AutomationHelperRequest]:
+    requests: list[AutomationHelperRequest] = []
+
+    def serve() -> None:
+        connection, _addr = listener.accept()
+        with connection:
+            requests.append(AutomationHelperRequest.deserialize(receive_message(connection)))
+            send_message(connection, response.serialize())
+
+    threading.Thread(target=serve, daemon=True).start()
+    return requests
+
+
+def _execute_in_automation_helper() -> Any:
+    return automations._execute_in_automation_helper(
+        ["check_mk", "--automation", "get-configuration"],
+        "get-configuration",
+        ["--timeout", "10"],
+        "['x']",
+        20,
+    )
+
+
+@pytest.fixture(name="helper_socket")
+def fixture_helper_socket(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    path = tmp_path / "automation-helper"
+    monkeypatch.setattr(automations.cmk.utils.paths, "automation_helper_socket", path)
+    return path
+
+
+def test_automation_helper_executes(helper_socket: Path) -> None:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+        listener.bind(str(helper_socket))
+        listener.listen()
+        requests = _serve_automation_helper_once(
+            listener, AutomationHelperResponse(executed=True, exit_code=0, stdout="{}\n")
+        )
+
+        completed_process = _execute_in_automation_helper()
+
+    assert requests == [
+        AutomationHelperRequest(
+            command="get-configuration", args=["--timeout", "10"], stdin="['x']", log_level=20
+        )
+    ]
+    assert completed_process.returncode == 0
+    assert completed_process.stdout == "{}\n"
+
+
+def test_automation_helper_reloading(helper_socket: Path) -> None:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+        listener.bind(str(helper_socket))
+        listener.listen()
+        _serve_automation_helper_once(listener, AutomationHelperResponse(executed=False))
+
+        assert _execute_in_automation_helper() is None
+
+
+@pytest.mark.usefixtures("helper_socket")
+def test_automation_helper_not_running() -> None:
+    assert _execute_in_automation_helper() is None
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 tribe29 GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import logging
+from pathlib import Path
+
+import pytest
+
+import cmk.utils.paths
+import cmk.utils.store as store
+from cmk.utils.structured_data import StructuredDataNode, TreeOrArchiveStore
+
+from cmk.update_config.plugins.actions.inventory_archive import ConvertInventoryArchive
+
+
+@pytest.fixture(name="plugin", scope="module")
+def fixture_plugin() -> ConvertInventoryArchive:
+    return ConvertInventoryArchive(
+        name="inventory_archive",
+        title="Convert inventory archive",
+        sort_index=120,
+    )
+
+
+def test_convert_missing_archive(plugin: ConvertInventoryArchive) -> None:
+    plugin(logging.getLogger(), {})
+
+
+def test_convert_archive(plugin: ConvertInventoryArchive) -> None:
+    archive_dir = Path(cmk.utils.paths.inventory_archive_dir, "inv-host")
+    raw_trees = [{"inv": "attr-0"}, {"inv": "attr-1"}, {"inv-2": "attr"}]
+    for timestamp, raw_tree in enumerate(raw_trees):
+        store.save_object_to_file(
+            archive_dir / str(timestamp),
+            StructuredDataNode.deserialize(raw_tree).serialize(),
+        )
+
+    plugin(logging.getLogger(), {})
+
+    assert sorted(fp.name for fp in archive_dir.iterdir()) == ["0", "1.delta", "2.delta"]
+    tree_or_archive_store = TreeOrArchiveStore(
+        cmk.utils.paths.inventory_output_dir,
+        cmk.utils.paths.inventory_archive_dir,
+    )
+    for timestamp, raw_tree in enumerate(raw_trees):
+        assert tree_or_archive_store.load_archive(
+            host_name="inv-host", timestamp=timestamp
+        ).is_equal(StructuredDataNode.deserialize(raw_tree))
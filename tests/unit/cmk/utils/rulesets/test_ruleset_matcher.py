@@ -923,3 +923,79 @@ def test_matches_tag_condition(
         )
         is expected_result
     )
+
+
+@pytest.mark.parametrize(
+    "condition",
+    [
+        pytest.param({}, id="no condition"),
+        pytest.param({"host_name": []}, id="empty host list"),
+        pytest.param({"host_name": ["host1", "host3", "unknown"]}, id="explicit hosts"),
+        pytest.param({"host_name": {"$nor": ["host1"]}}, id="negated explicit hosts"),
+        pytest.param({"host_name": [{"$regex": "host[12]"}, "lvl1"]}, id="regex hosts"),
+        pytest.param({"host_name": {"$nor": [{"$regex": "lvl"}]}}, id="negated regex hosts"),
+        pytest.param({"host_tags": {"criticality": "prod"}}, id="tag"),
+        pytest.param({"host_tags": {"networking": {"$ne": "lan"}}}, id="negated tag"),
+        pytest.param({"host_tags": {"networking": {"$or": ["lan", "dmz"]}}}, id="or tags"),
+        pytest.param({"host_tags": {"networking": {"$nor": ["lan", "dmz"]}}}, id="nor tags"),
+        pytest.param({"host_labels": {"os": "linux"}}, id="label"),
+        pytest.param({"host_labels": {"os": {"$ne": "linux"}}}, id="negated label"),
+        pytest.param({"host_folder": "/lvl1/"}, id="folder"),
+        pytest.param(
+            {
+                "host_name": [{"$regex": "host"}],
+                "host_tags": {"criticality": {"$ne": "test"}, "networking": {"$nor": ["wan"]}},
+                "host_labels": {"os": "linux", "env": {"$ne": "dev"}},
+                "host_folder": "/",
+            },
+            id="mixed conditions",
+        ),
+        pytest.param(
+            {
+                "host_tags": {"criticality": "test"},
+                "host_labels": {"env": "dev"},
+                "host_folder": "/lvl1/",
+            },
+            id="mixed conditions in folder",
+        ),
+    ],
+)
+def test_ruleset_optimizer_host_index_matches_one_by_one(
+    monkeypatch: MonkeyPatch, condition: RuleConditionsSpec
+) -> None:
+    ts = Scenario()
+    ts.add_host(
+        HostName("host1"),
+        tags={"criticality": "prod", "networking": "lan"},
+        labels={"os": "linux", "env": "prod"},
+    )
+    ts.add_host(
+        HostName("host2"),
+        tags={"criticality": "test", "networking": "wan"},
+        labels={"os": "linux", "env": "dev"},
+    )
+    ts.add_host(
+        HostName("host3"),
+        tags={"criticality": "test", "networking": "dmz"},
+        labels={"os": "windows"},
+    )
+    ts.add_host(
+        HostName("lvl1"),
+        tags={"criticality": "test"},
+        labels={"env": "dev"},
+        host_path="/lvl1/hosts.mk",
+    )
+    ts.add_host(HostName("lvl2"), host_path="/lvl1/lvl2/hosts.mk")
+    config_cache = ts.apply(monkeypatch)
+    ruleset_optimizer = config_cache.ruleset_matcher.ruleset_optimizer
+
+    for with_foreign_hosts in (True, False):
+        ruleset_optimizer._use_host_index = True
+        ruleset_optimizer.clear_caches()
+        by_index = ruleset_optimizer._all_matching_hosts(condition, with_foreign_hosts)
+
+        ruleset_optimizer._use_host_index = False
+        ruleset_optimizer.clear_caches()
+        one_by_one = ruleset_optimizer._all_matching_hosts(condition, with_foreign_hosts)
+
+        assert by_index == one_by_one
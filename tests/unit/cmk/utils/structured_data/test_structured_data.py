@@ -4,6 +4,7 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import gzip
+import os
 import shutil
 from collections.abc import Iterable, Mapping, Sequence
 from pathlib import Path
@@ -23,6 +24,7 @@ from cmk.utils.structured_data import (
     StructuredDataNode,
     Table,
     TableRetentions,
+    TreeOrArchiveStore,
     TreeStore,
 )
 from cmk.utils.type_defs import HostName
@@ -1479,3 +1481,193 @@ def test_table_update_from_previous_filtered() -> None:
         }
     }
     assert current_table.rows == [{"c2": "C2: only prev", "c3": "C3: only cur", "kc": "KC"}]
+
+
+@pytest.mark.parametrize(
+    "tree_name_old, tree_name_new",
+    [
+        (HostName("tree_old_addresses"), HostName("tree_new_addresses")),
+        (HostName("tree_old_arrays"), HostName("tree_new_arrays")),
+        (HostName("tree_old_interfaces"), HostName("tree_new_interfaces")),
+        (HostName("tree_old_memory"), HostName("tree_new_memory")),
+        (HostName("tree_old_heute"), HostName("tree_new_heute")),
+        (HostName("tree_new_heute"), HostName("tree_old_heute")),
+    ],
+)
+def test_real_apply_delta(tree_name_old: HostName, tree_name_new: HostName) -> None:
+    old_tree = _get_tree_store().load(host_name=tree_name_old)
+    new_tree = _get_tree_store().load(host_name=tree_name_new)
+    restored_tree = old_tree.apply_delta(new_tree.compare_with(old_tree))
+    assert restored_tree.is_equal(new_tree)
+    assert old_tree.is_equal(_get_tree_store().load(host_name=tree_name_old))
+
+
+def _make_raw_tree_with_table(value: str) -> dict:
+    return {
+        "Attributes": {},
+        "Table": {},
+        "Nodes": {
+            "node": {
+                "Attributes": {"Pairs": {"attr": value, "hidden": value}},
+                "Table": {},
+                "Nodes": {
+                    "table": {
+                        "Attributes": {},
+                        "Table": {
+                            "KeyColumns": ["name"],
+                            "Rows": [{"name": "n1", "col": "old", "hidden": value}],
+                        },
+                        "Nodes": {},
+                    },
+                },
+            },
+            "other": {"Attributes": {"Pairs": {"attr": value}}, "Table": {}, "Nodes": {}},
+        },
+    }
+
+
+def test_delta_get_filtered_node() -> None:
+    old_tree = StructuredDataNode.deserialize(_make_raw_tree_with_table("old"))
+    new_tree = StructuredDataNode.deserialize(_make_raw_tree_with_table("new"))
+    filtered_delta_tree = new_tree.compare_with(old_tree).get_filtered_node(
+        [
+            make_filter(
+                {
+                    "visible_raw_path": "node",
+                    "attributes": ("choices", ["attr"]),
+                    "nodes": "nothing",
+                }
+            ),
+            make_filter(
+                {
+                    "visible_raw_path": "node.table",
+                    "columns": ("choices", ["name", "col"]),
+                }
+            ),
+        ]
+    )
+    assert filtered_delta_tree.serialize() == {
+        "Attributes": {},
+        "Table": {},
+        "Nodes": {
+            "node": {
+                "Attributes": {"Pairs": {"attr": ("old", "new")}},
+                "Table": {},
+                "Nodes": {},
+            },
+        },
+    }
+    assert filtered_delta_tree.count_entries() == {"changed": 1}
+
+
+def _archive_trees(
+    tree_or_archive_store: TreeOrArchiveStore, tmp_path: Path, trees: Sequence[StructuredDataNode]
+) -> None:
+    host_name = HostName("heute")
+    for timestamp, tree in enumerate(trees):
+        tree_or_archive_store.save(host_name=host_name, tree=tree)
+        os.utime(tmp_path / "inventory" / str(host_name), (timestamp, timestamp))
+        tree_or_archive_store.archive(host_name=host_name)
+
+
+def _make_trees(count: int) -> Sequence[StructuredDataNode]:
+    return [
+        StructuredDataNode.deserialize(
+            {
+                "hardware": {"cpu": {"cores": idx % 3}},
+                "software": {
+                    "packages": [{"name": f"package-{n}", "version": n + idx} for n in range(idx)]
+                },
+            }
+        )
+        for idx in range(count)
+    ]
+
+
+def test_tree_or_archive_store_archive(tmp_path: Path) -> None:
+    host_name = HostName("heute")
+    tree_or_archive_store = TreeOrArchiveStore(
+        tmp_path / "inventory",
+        tmp_path / "inventory_archive",
+        snapshot_interval=3,
+    )
+    trees = _make_trees(7)
+    _archive_trees(tree_or_archive_store, tmp_path, trees)
+
+    assert sorted(
+        fp.name for fp in (tmp_path / "inventory_archive" / str(host_name)).iterdir()
+    ) == [
+        "0",
+        "1.delta",
+        "2.delta",
+        "3",
+        "3.delta",
+        "4.delta",
+        "5.delta",
+        "6",
+        "6.delta",
+    ]
+    assert tree_or_archive_store.archive_timestamps(host_name=host_name) == list(range(7))
+    for timestamp, tree in enumerate(trees):
+        assert tree_or_archive_store.load_archive(
+            host_name=host_name, timestamp=timestamp
+        ).is_equal(tree)
+
+    archive_delta = tree_or_archive_store.load_archive_delta(host_name=host_name, timestamp=2)
+    assert archive_delta is not None
+    assert archive_delta.previous_timestamp == 1
+    assert archive_delta.delta_tree.count_entries() == {"changed": 1, "new": 4, "removed": 2}
+
+    assert tree_or_archive_store.load_previous(host_name=host_name).is_equal(trees[-1])
+
+
+def test_tree_or_archive_store_load_archive_broken_chain(tmp_path: Path) -> None:
+    host_name = HostName("heute")
+    tree_or_archive_store = TreeOrArchiveStore(
+        tmp_path / "inventory", tmp_path / "inventory_archive"
+    )
+    _archive_trees(tree_or_archive_store, tmp_path, _make_trees(4))
+
+    (tmp_path / "inventory_archive" / str(host_name) / "2.delta").unlink()
+
+    assert not tree_or_archive_store.load_archive(host_name=host_name, timestamp=1).is_empty()
+    assert tree_or_archive_store.load_archive(host_name=host_name, timestamp=3).is_empty()
+    assert tree_or_archive_store.load_archive(host_name=host_name, timestamp=4).is_empty()
+
+
+def test_tree_or_archive_store_convert_archive(tmp_path: Path) -> None:
+    host_name = HostName("heute")
+    archive_dir = tmp_path / "inventory_archive" / str(host_name)
+    archive_dir.mkdir(parents=True)
+    trees = _make_trees(5)
+    for timestamp, tree in enumerate(trees):
+        TreeStore(archive_dir).save(host_name=HostName(str(timestamp)), tree=tree)
+    for filepath in archive_dir.glob("*.gz"):
+        filepath.unlink()
+    (archive_dir / ".last").unlink()
+
+    tree_or_archive_store = TreeOrArchiveStore(
+        tmp_path / "inventory",
+        tmp_path / "inventory_archive",
+        snapshot_interval=3,
+    )
+    tree_or_archive_store.convert_archive(host_name=host_name)
+    converted_names = sorted(fp.name for fp in archive_dir.iterdir())
+    tree_or_archive_store.convert_archive(host_name=host_name)
+
+    assert (
+        sorted(fp.name for fp in archive_dir.iterdir())
+        == converted_names
+        == [
+            "0",
+            "1.delta",
+            "2.delta",
+            "3",
+            "3.delta",
+            "4.delta",
+        ]
+    )
+    for timestamp, tree in enumerate(trees):
+        assert tree_or_archive_store.load_archive(
+            host_name=host_name, timestamp=timestamp
+        ).is_equal(tree)
@@ -50,3 +50,8 @@ class TestCpuTracking:
 
     def test_json_serialization_now(self, now: Snapshot) -> None:
         assert Snapshot.deserialize(json_identity(now.serialize())) == now
+
+    def test_take_thread(self) -> None:
+        snapshot = Snapshot.take_thread()
+        assert snapshot.process.children_user == snapshot.process.children_system == 0.0
+        assert snapshot.process.elapsed > 0.0
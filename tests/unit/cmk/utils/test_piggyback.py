@@ -11,6 +11,7 @@ from pathlib import Path
 import pytest
 from _pytest.monkeypatch import MonkeyPatch
 from freezegun import freeze_time
+from pytest_mock import MockerFixture
 
 import cmk.utils.log
 import cmk.utils.paths
@@ -31,6 +32,7 @@ _FREEZE_DATETIME = datetime.utcfromtimestamp(_REF_TIME + 10.0)
 def fixture_setup_files(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
     monkeypatch.setattr("cmk.utils.paths.piggyback_dir", tmp_path / "piggyback")
     monkeypatch.setattr("cmk.utils.paths.piggyback_source_dir", tmp_path / "piggyback_source")
+    monkeypatch.setattr("cmk.utils.paths.piggyback_segments_dir", tmp_path / "piggyback_segments")
 
     host_dir = cmk.utils.paths.piggyback_dir / str(_TEST_HOST_NAME)
     host_dir.mkdir(parents=True, exist_ok=False)
@@ -589,3 +591,205 @@ def test_get_piggyback_matching_time_settings(
             [HostName("source-host")], HostName("piggybacked-host"), time_settings
         )._expanded_settings.keys()
     ) == sorted(expected_time_setting_keys)
+
+
+@pytest.fixture(name="segments")
+def fixture_segments(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(piggyback, "_storage_format", "segments")
+
+
+@pytest.mark.usefixtures("setup_files", "segments")
+def test_store_piggyback_segment() -> None:
+    time_settings: piggyback.PiggybackTimeSettings = [
+        (None, "max_cache_age", _PIGGYBACK_MAX_CACHEFILE_AGE),
+    ]
+
+    piggyback.store_piggyback_raw_data(
+        HostName("source2"),
+        {
+            HostName("pig"): [b"<<<check_mk>>>", b"lulu"],
+            HostName("pog"): [b"<<<check_mk>>>", b"lolo"],
+        },
+    )
+
+    assert not (cmk.utils.paths.piggyback_dir / "pig").exists()
+    assert list(cmk.utils.paths.piggyback_segments_dir.iterdir()) == [
+        cmk.utils.paths.piggyback_segments_dir / "source2"
+    ]
+
+    raw_data = _get_only_raw_data_element(HostName("pig"), time_settings)
+    assert raw_data.info.source_hostname == "source2"
+    assert raw_data.info.file_path == cmk.utils.paths.piggyback_segments_dir / "source2"
+    assert raw_data.info.successfully_processed is True
+    assert raw_data.info.message == "Successfully processed from source 'source2'"
+    assert raw_data.raw_data == b"<<<check_mk>>>\nlulu\n"
+
+    assert _get_only_raw_data_element(HostName("pog"), time_settings).raw_data == (
+        b"<<<check_mk>>>\nlolo\n"
+    )
+    assert sorted(piggyback.get_source_hostnames()) == ["source1", "source2"]
+    assert sorted(piggyback.get_source_and_piggyback_hosts(time_settings)) == [
+        (HostName("source2"), HostName("pig")),
+        (HostName("source2"), HostName("pog")),
+    ]
+
+
+@pytest.mark.usefixtures("setup_files", "segments")
+def test_store_piggyback_segment_not_updated() -> None:
+    time_settings: piggyback.PiggybackTimeSettings = [
+        (None, "max_cache_age", _PIGGYBACK_MAX_CACHEFILE_AGE),
+        ("source2", "validity_period", 1000),
+    ]
+
+    with freeze_time(_FREEZE_DATETIME) as frozen_time:
+        piggyback.store_piggyback_raw_data(
+            HostName("source2"),
+            {
+                HostName("pig"): [b"<<<check_mk>>>", b"lulu"],
+                HostName("pog"): [b"<<<check_mk>>>", b"lolo"],
+            },
+        )
+        frozen_time.tick(10)
+        piggyback.store_piggyback_raw_data(
+            HostName("source2"), {HostName("pig"): [b"<<<check_mk>>>", b"lala"]}
+        )
+
+        assert _get_only_raw_data_element(HostName("pig"), time_settings).raw_data == (
+            b"<<<check_mk>>>\nlala\n"
+        )
+        raw_data = _get_only_raw_data_element(HostName("pog"), time_settings)
+
+    assert raw_data.info.successfully_processed is True
+    assert raw_data.info.message == (
+        "Piggyback file not updated by source 'source2' (still valid, 16 m left)"
+    )
+    assert raw_data.raw_data == b"<<<check_mk>>>\nlolo\n"
+
+
+@pytest.mark.usefixtures("setup_files", "segments")
+def test_store_piggyback_segment_not_sending() -> None:
+    time_settings: piggyback.PiggybackTimeSettings = [
+        (None, "max_cache_age", _PIGGYBACK_MAX_CACHEFILE_AGE),
+    ]
+
+    piggyback.store_piggyback_raw_data(
+        HostName("source2"), {HostName("pig"): [b"<<<check_mk>>>", b"lulu"]}
+    )
+    piggyback.store_piggyback_raw_data(HostName("source2"), {})
+
+    raw_data = _get_only_raw_data_element(HostName("pig"), time_settings)
+    assert raw_data.info.successfully_processed is False
+    assert raw_data.info.message == "Source 'source2' not sending piggyback data"
+    assert raw_data.raw_data == b"<<<check_mk>>>\nlulu\n"
+
+    # Sources which never sent piggyback data do not get a segment
+    piggyback.store_piggyback_raw_data(HostName("source3"), {})
+    assert not (cmk.utils.paths.piggyback_segments_dir / "source3").exists()
+
+
+@pytest.mark.usefixtures("setup_files", "segments")
+def test_store_piggyback_segment_takes_over_files() -> None:
+    time_settings: piggyback.PiggybackTimeSettings = [
+        (None, "max_cache_age", _PIGGYBACK_MAX_CACHEFILE_AGE),
+    ]
+
+    with freeze_time(_FREEZE_DATETIME):
+        piggyback.store_piggyback_raw_data(
+            HostName("source1"), {HostName("pig"): [b"<<<check_mk>>>", b"lulu"]}
+        )
+        raw_data = _get_only_raw_data_element(_TEST_HOST_NAME, time_settings)
+
+    assert not (cmk.utils.paths.piggyback_dir / str(_TEST_HOST_NAME) / "source1").exists()
+    assert not (cmk.utils.paths.piggyback_source_dir / "source1").exists()
+    assert raw_data.info.file_path == cmk.utils.paths.piggyback_segments_dir / "source1"
+    assert raw_data.info.message == "Piggyback file not updated by source 'source1'"
+    assert raw_data.raw_data == _PAYLOAD
+
+
+@pytest.mark.usefixtures("setup_files")
+def test_migrate_piggyback_files_to_segments() -> None:
+    time_settings: piggyback.PiggybackTimeSettings = [
+        (None, "max_cache_age", _PIGGYBACK_MAX_CACHEFILE_AGE),
+    ]
+
+    with freeze_time(_FREEZE_DATETIME):
+        piggyback.migrate_piggyback_files_to_segments()
+        raw_data = _get_only_raw_data_element(_TEST_HOST_NAME, time_settings)
+
+    assert not list(cmk.utils.paths.piggyback_dir.glob("*/*"))
+    assert not list(cmk.utils.paths.piggyback_source_dir.glob("*"))
+    assert raw_data.info.file_path == cmk.utils.paths.piggyback_segments_dir / "source1"
+    assert raw_data.info.successfully_processed is True
+    assert raw_data.info.message == "Successfully processed from source 'source1'"
+    assert raw_data.raw_data == _PAYLOAD
+
+
+@pytest.mark.usefixtures("setup_files", "segments")
+def test_files_supersede_older_segment() -> None:
+    time_settings: piggyback.PiggybackTimeSettings = [
+        (None, "max_cache_age", _PIGGYBACK_MAX_CACHEFILE_AGE),
+    ]
+
+    with freeze_time(_FREEZE_DATETIME):
+        piggyback.migrate_piggyback_files_to_segments()
+
+    # Switching back: newer data in the files layout wins over the segment
+    piggyback.set_storage_format("files")
+    piggyback.store_piggyback_raw_data(
+        HostName("source1"), {_TEST_HOST_NAME: [b"<<<check_mk>>>", b"lulu"]}
+    )
+
+    raw_data = _get_only_raw_data_element(_TEST_HOST_NAME, time_settings)
+    assert raw_data.info.file_path.parts[-2:] == ("test-host", "source1")
+    assert raw_data.raw_data == b"<<<check_mk>>>\nlulu\n"
+
+
+@pytest.mark.usefixtures("setup_files", "segments")
+def test_cleanup_piggyback_segments() -> None:
+    with freeze_time(_FREEZE_DATETIME) as frozen_time:
+        piggyback.store_piggyback_raw_data(
+            HostName("source2"), {HostName("pig"): [b"<<<check_mk>>>", b"lulu"]}
+        )
+        frozen_time.tick(10)
+        piggyback.store_piggyback_raw_data(
+            HostName("source2"), {HostName("pog"): [b"<<<check_mk>>>", b"lolo"]}
+        )
+
+        # "pig" is not updated by the source anymore, the old files have been migrated
+        piggyback.cleanup_piggyback_files([(None, "max_cache_age", _PIGGYBACK_MAX_CACHEFILE_AGE)])
+        assert piggyback.get_source_hostnames(HostName("pig")) == []
+        assert piggyback.get_source_hostnames(HostName("pog")) == ["source2"]
+        assert piggyback.get_source_hostnames(_TEST_HOST_NAME) == ["source1"]
+
+        piggyback.cleanup_piggyback_files([(None, "max_cache_age", -1)])
+
+    assert not list(cmk.utils.paths.piggyback_segments_dir.iterdir())
+
+
+@pytest.mark.usefixtures("setup_files", "segments")
+def test_read_pass_loads_segments_once(mocker: MockerFixture) -> None:
+    time_settings: piggyback.PiggybackTimeSettings = [
+        (None, "max_cache_age", _PIGGYBACK_MAX_CACHEFILE_AGE),
+    ]
+    for source_hostname in ["source2", "source3"]:
+        piggyback.store_piggyback_raw_data(
+            HostName(source_hostname),
+            {
+                HostName("pig"): [b"<<<check_mk>>>", b"lulu"],
+                HostName("pog"): [b"<<<check_mk>>>", b"lolo"],
+            },
+        )
+    load_segment = mocker.spy(piggyback, "_load_segment")
+
+    with piggyback.read_pass():
+        for piggybacked_hostname in ["pig", "pog"]:
+            assert sorted(
+                rd.info.source_hostname
+                for rd in piggyback.get_piggyback_raw_data(
+                    HostName(piggybacked_hostname), time_settings
+                )
+            ) == ["source2", "source3"]
+        assert load_segment.call_count == 2
+
+    assert piggyback.has_piggyback_raw_data(HostName("pig"), time_settings)
+    assert load_segment.call_count == 4
@@ -8,7 +8,9 @@
 import errno
 import socket
 import ssl
-from contextlib import closing
+import threading
+import time
+from contextlib import closing, suppress
 from pathlib import Path
 
 import pytest
@@ -272,3 +274,61 @@ def test_set_auth_user(
             return
 
         livestatus.LocalConnection().set_auth_user("mydomain", user_id)
+
+
+def _serve_one_query(sock_path: Path, response: bytes, delay: float) -> threading.Thread:
+    server = socket.socket(socket.AF_UNIX)
+    server.bind(str(sock_path))
+    server.listen(1)
+
+    def _serve() -> None:
+        with closing(server), closing(server.accept()[0]) as conn:
+            data = b""
+            while not data.endswith(b"\n\n"):
+                data += conn.recv(4096)
+            time.sleep(delay)
+            # The client may have given up waiting already
+            with suppress(OSError):
+                conn.sendall(b"200 %11d\n%s" % (len(response), response))
+                # Keep the connection open until the client is done
+                conn.recv(1)
+
+    thread = threading.Thread(target=_serve, daemon=True)
+    thread.start()
+    return thread
+
+
+def _multisite_connection(
+    tmp_path: Path, delays: dict[str, float], query_timeout: float | None = None
+) -> livestatus.MultiSiteConnection:
+    sites: dict[livestatus.SiteId, livestatus.SiteConfiguration] = {}
+    for site_id, delay in delays.items():
+        sock_path = tmp_path / site_id
+        _serve_one_query(sock_path, b'[["%s"]]' % site_id.encode(), delay)
+        sites[livestatus.SiteId(site_id)] = {"socket": f"unix:{sock_path}"}
+        if query_timeout is not None:
+            sites[livestatus.SiteId(site_id)]["query_timeout"] = query_timeout
+    return livestatus.MultiSiteConnection(livestatus.SiteConfigurations(sites))
+
+
+def test_query_parallel_collects_responses_as_they_arrive(tmp_path: Path) -> None:
+    live = _multisite_connection(tmp_path, {"slow": 0.3, "fast": 0.0})
+    live.set_prepend_site(True)
+
+    # The rows of the fast site are decoded first, it does not have to wait for the slow one
+    assert live.query("GET hosts\nColumns: name") == [["fast", "fast"], ["slow", "slow"]]
+    assert not live.dead_sites()
+    latencies = live.site_latencies()
+    assert latencies.keys() == {"fast", "slow"}
+    assert latencies[livestatus.SiteId("fast")] < 0.3 <= latencies[livestatus.SiteId("slow")]
+
+
+def test_query_parallel_query_timeout(tmp_path: Path) -> None:
+    live = _multisite_connection(tmp_path, {"slow": 1.0, "fast": 0.0}, query_timeout=0.2)
+
+    assert live.query("GET hosts\nColumns: name") == [["fast"]]
+    assert live.alive_sites() == ["fast"]
+    assert "Timeout while waiting for the response of site slow" in str(
+        live.dead_sites()[livestatus.SiteId("slow")]["exception"]
+    )
+    assert live.site_latencies().keys() == {"fast"}
@@ -5,6 +5,9 @@
 
 # pylint: disable=redefined-outer-name
 
+import hashlib
+import os
+import shutil
 import tarfile
 from pathlib import Path
 
@@ -90,3 +93,196 @@ def test_backup_site_to_tarfile_vanishing_files(  # type: ignore[no-untyped-def]
     with tar_path.open("rb") as backup_tar:
         with tarfile.open(fileobj=backup_tar, mode="r:*") as tar:
             _sitename, _version = omdlib.backup.get_site_and_version_from_backup(tar)
+
+
+def _backup(site: omdlib.main.SiteContext, tar_path: Path, base: Path | None = None) -> None:
+    with tar_path.open("wb") as backup_tar:
+        manifest = omdlib.backup.backup_site_to_tarfile(
+            site,
+            backup_tar,
+            mode="w:",
+            options={},
+            verbose=False,
+            base=None
+            if base is None
+            else omdlib.backup.BaseBackup(base, omdlib.backup.read_backup_manifest(base)),
+        )
+    omdlib.backup.manifest_path(tar_path).write_bytes(manifest.serialize())
+
+
+def _restore(
+    site: omdlib.main.SiteContext, tar_path: Path, previous: omdlib.backup.BackupManifest | None
+) -> omdlib.backup.BackupManifest | None:
+    global_opts = omdlib.main.GlobalOptions(
+        verbose=False, force=False, interactive=False, orig_working_directory="/"
+    )
+    with tarfile.open(tar_path, mode="r:*") as tar:
+        sitename, _version = omdlib.backup.get_site_and_version_from_backup(tar)
+        return omdlib.main._extract_backup(tar, sitename, site, global_opts, previous)
+
+
+def test_backup_site_to_tarfile_manifest(site, tmp_path) -> None:  # type: ignore[no-untyped-def]
+    Path(site.dir, "test123").write_text("uftauftauftata")
+
+    tar_path = tmp_path / "backup.tar"
+    _backup(site, tar_path)
+
+    manifest = omdlib.backup.read_backup_manifest(tar_path)
+    omdlib.backup.manifest_path(tar_path).unlink()
+    assert omdlib.backup.read_backup_manifest(tar_path) == manifest
+
+    entry = manifest.entries["test123"]
+    assert entry is not None
+    assert entry.size == 14
+    assert entry.sha256 == hashlib.sha256(b"uftauftauftata").hexdigest()
+    assert manifest.entries["version"] is None
+
+
+def test_incremental_backup(site, tmp_path) -> None:  # type: ignore[no-untyped-def]
+    site_dir = Path(site.dir)
+    (site_dir / "unchanged").write_text("unchanged")
+    (site_dir / "changed").write_text("old")
+    (site_dir / "touched").write_text("touched")
+    (site_dir / "deleted").write_text("deleted")
+    (site_dir / "dir").mkdir()
+    full_path = tmp_path / "full.tar"
+    _backup(site, full_path)
+
+    (site_dir / "changed").write_text("new")
+    os.utime(site_dir / "touched", (0, 0))
+    (site_dir / "deleted").unlink()
+    (site_dir / "dir" / "added").write_text("added")
+    incremental_path = tmp_path / "incremental.tar"
+    _backup(site, incremental_path, base=full_path)
+
+    with tarfile.open(incremental_path, mode="r:*") as tar:
+        sitename, _version = omdlib.backup.get_site_and_version_from_backup(tar)
+        assert omdlib.backup.get_backup_base(tar, sitename) == omdlib.backup.BackupReference(
+            str(full_path), omdlib.backup.read_backup_manifest(full_path).backup_id
+        )
+        files = {tarinfo.name for tarinfo in tar if tarinfo.isreg()}
+    assert files == {
+        "unit/" + omdlib.backup.BASE_REFERENCE_NAME,
+        "unit/changed",
+        "unit/dir/added",
+        "unit/" + omdlib.backup.MANIFEST_NAME,
+    }
+
+    manifest = omdlib.backup.read_backup_manifest(incremental_path)
+    assert "deleted" not in manifest.entries
+    assert manifest.entries["touched"] is not None
+    assert manifest.entries["touched"].mtime == 0
+
+
+def test_restore_backup_chain(site, tmp_path) -> None:  # type: ignore[no-untyped-def]
+    site_dir = Path(site.dir)
+    (site_dir / "unchanged").write_text("unchanged")
+    (site_dir / "changed").write_text("old")
+    (site_dir / "replaced").mkdir()
+    (site_dir / "replaced" / "file").write_text("file")
+    (site_dir / "deleted").write_text("deleted")
+    full_path = tmp_path / "full.tar"
+    _backup(site, full_path)
+
+    (site_dir / "changed").write_text("new")
+    (site_dir / "deleted").unlink()
+    (site_dir / "added").write_text("added")
+    incremental_path = tmp_path / "incremental.tar"
+    _backup(site, incremental_path, base=full_path)
+
+    shutil.rmtree(site_dir / "replaced")
+    (site_dir / "replaced").symlink_to("added")
+    (site_dir / "changed").write_text("newer")
+    incremental_path_2 = tmp_path / "incremental2.tar"
+    _backup(site, incremental_path_2, base=incremental_path)
+
+    with tarfile.open(incremental_path_2, mode="r:*") as tar:
+        sitename, _version = omdlib.backup.get_site_and_version_from_backup(tar)
+        reference = omdlib.backup.get_backup_base(tar, sitename)
+    assert reference is not None
+    # The backups are found next to the restored one after moving them
+    moved_dir = tmp_path / "moved"
+    moved_dir.mkdir()
+    for path in (full_path, incremental_path, incremental_path_2):
+        path.rename(moved_dir / path.name)
+    chain = omdlib.backup.get_backup_chain(reference, moved_dir)
+    assert [Path(r.path) for r in chain] == [moved_dir / "full.tar", moved_dir / "incremental.tar"]
+
+    restore_dir = tmp_path / "restored"
+    restore_dir.mkdir()
+
+    class RestoredSite(omdlib.main.SiteContext):
+        @property
+        def dir(self):
+            return str(restore_dir)
+
+    restored_site = RestoredSite("unit")
+    previous = None
+    for path in (full_path, incremental_path, incremental_path_2):
+        previous = _restore(restored_site, moved_dir / path.name, previous)
+
+    assert sorted(str(p.relative_to(restore_dir)) for p in restore_dir.rglob("*")) == [
+        "added",
+        "changed",
+        "replaced",
+        "unchanged",
+        "version",
+    ]
+    assert (restore_dir / "changed").read_text() == "newer"
+    assert (restore_dir / "unchanged").read_text() == "unchanged"
+    assert os.readlink(restore_dir / "replaced") == "added"
+
+
+def test_restore_backup_chain_mode_change(site, tmp_path) -> None:  # type: ignore[no-untyped-def]
+    site_dir = Path(site.dir)
+    (site_dir / "script").write_text("#!/bin/sh")
+    (site_dir / "script").chmod(0o644)
+    full_path = tmp_path / "full.tar"
+    _backup(site, full_path)
+
+    # Changing the mode keeps the content and the modification time
+    (site_dir / "script").chmod(0o755)
+    incremental_path = tmp_path / "incremental.tar"
+    _backup(site, incremental_path, base=full_path)
+    incremental_path_2 = tmp_path / "incremental2.tar"
+    _backup(site, incremental_path_2, base=incremental_path)
+
+    with tarfile.open(incremental_path, mode="r:*") as tar:
+        assert "unit/script" in tar.getnames()
+    with tarfile.open(incremental_path_2, mode="r:*") as tar:
+        assert "unit/script" not in tar.getnames()
+
+    restore_dir = tmp_path / "restored"
+    restore_dir.mkdir()
+
+    class RestoredSite(omdlib.main.SiteContext):
+        @property
+        def dir(self):
+            return str(restore_dir)
+
+    restored_site = RestoredSite("unit")
+    previous = None
+    for path in (full_path, incremental_path, incremental_path_2):
+        previous = _restore(restored_site, path, previous)
+
+    assert (restore_dir / "script").stat().st_mode & 0o777 == 0o755
+    assert (restore_dir / "script").read_text() == "#!/bin/sh"
+
+
+def test_restore_full_backup_without_manifest(site, tmp_path) -> None:  # type: ignore[no-untyped-def]
+    Path(site.dir, "test123").write_text("uftauftauftata")
+    tar_path = tmp_path / "backup.tar"
+    with tarfile.open(tar_path, mode="w:") as tar:
+        tar.add(site.dir + "/version", "unit/version")
+        tar.add(site.dir, "unit")
+
+    restore_dir = tmp_path / "restored"
+    restore_dir.mkdir()
+
+    class RestoredSite(omdlib.main.SiteContext):
+        @property
+        def dir(self):
+            return str(restore_dir)
+
+    assert _restore(RestoredSite("unit"), tar_path, None) is None
+    assert (restore_dir / "test123").read_text() == "uftauftauftata"